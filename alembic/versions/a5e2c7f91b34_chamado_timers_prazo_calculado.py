@@ -0,0 +1,37 @@
+"""chamado_timers.prazo_calculado
+
+Prazo calculado a partir do chamado, separado do due_at efetivo: o despachante
+adia due_at (fora do expediente, handler sem efeito) e a ressincronização só
+o sobrescreve quando o prazo calculado muda — ver
+app/services/chamado_timers_service.py.
+
+Revision ID: a5e2c7f91b34
+Revises: e8c1f5a3b207
+Create Date: 2026-10-19 14:12:48.330917
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5e2c7f91b34"
+down_revision: str | Sequence[str] | None = "e8c1f5a3b207"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "chamado_timers",
+        sa.Column("prazo_calculado", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("chamado_timers", "prazo_calculado")
@@ -0,0 +1,44 @@
+"""usuarios.atualizado_em
+
+Marca de última escrita por usuário, mantida pelo onupdate do UsuarioRow. O
+diretório em memória (app/services/diretorio_usuarios.py) busca só as linhas
+com atualizado_em acima da última vista, via idx_usuarios_atualizado_em, em vez
+de reler e descriptografar a tabela inteira.
+
+Revision ID: a5e7c3f9d210
+Revises: f1c8d2a4b693
+Create Date: 2026-10-19 18:12:40.331907
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5e7c3f9d210"
+down_revision: str | Sequence[str] | None = "f1c8d2a4b693"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "usuarios",
+        sa.Column(
+            "atualizado_em",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index("idx_usuarios_atualizado_em", "usuarios", ["atualizado_em"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_usuarios_atualizado_em", table_name="usuarios")
+    op.drop_column("usuarios", "atualizado_em")
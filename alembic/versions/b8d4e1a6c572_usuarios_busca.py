@@ -0,0 +1,42 @@
+"""usuarios_busca
+
+Índice cego da busca de usuários (Usuario.buscar_ativos): n-gramas de
+nome/e-mail passados por HMAC, um por linha — ver
+app/services/busca_usuarios.py. A PK começa por token, que é a coluna da
+consulta; idx_usuarios_busca_usuario atende a troca dos tokens no save.
+
+Revision ID: b8d4e1a6c572
+Revises: a5e7c3f9d210
+Create Date: 2026-10-19 19:27:05.664120
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4e1a6c572"
+down_revision: str | Sequence[str] | None = "a5e7c3f9d210"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "usuarios_busca",
+        sa.Column("token", sa.Text(), nullable=False),
+        sa.Column("usuario_id", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("token", "usuario_id"),
+    )
+    op.create_index("idx_usuarios_busca_usuario", "usuarios_busca", ["usuario_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_usuarios_busca_usuario", table_name="usuarios_busca")
+    op.drop_table("usuarios_busca")
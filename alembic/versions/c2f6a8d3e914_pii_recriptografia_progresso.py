@@ -0,0 +1,50 @@
+"""pii_recriptografia_progresso
+
+Checkpoint do job de criptografia/rotação de chave da PII de usuários
+(app/services/pii_recriptografia.py): uma linha por execução com o último id
+gravado e os contadores, para retomar uma execução interrompida.
+
+Revision ID: c2f6a8d3e914
+Revises: b8d4e1a6c572
+Create Date: 2026-10-19 20:41:52.907713
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f6a8d3e914"
+down_revision: str | Sequence[str] | None = "b8d4e1a6c572"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "pii_recriptografia_progresso",
+        sa.Column("execucao", sa.Text(), nullable=False),
+        sa.Column("ultimo_id", sa.Text(), nullable=False),
+        sa.Column("processados", sa.Integer(), nullable=False),
+        sa.Column("atualizados", sa.Integer(), nullable=False),
+        sa.Column("conflitos", sa.Integer(), nullable=False),
+        sa.Column("erros", sa.Integer(), nullable=False),
+        sa.Column(
+            "iniciado_em",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("concluido_em", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("execucao"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("pii_recriptografia_progresso")
@@ -0,0 +1,37 @@
+"""chamados_idx_status_escalacao_tick
+
+Índice (status, escalacao_proximo_tick_em) para o scan do motor de
+escalonamento (app/services/sla_escalacao_service.py): a partir do nível 1 o
+job filtra em SQL os chamados cujo próximo tick ainda está fora da janela de
+aviso prévio, e percorre o restante em lotes keyset por id.
+
+Revision ID: c41e7a9d0b52
+Revises: 8e6a867213e9
+Create Date: 2026-10-19 09:12:31.402118
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7a9d0b52"
+down_revision: str | Sequence[str] | None = "8e6a867213e9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_chamados_status_escalacao_tick",
+        "chamados",
+        ["status", "escalacao_proximo_tick_em"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_chamados_status_escalacao_tick", table_name="chamados")
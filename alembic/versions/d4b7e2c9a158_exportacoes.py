@@ -0,0 +1,96 @@
+"""exportacoes
+
+Fila de exportações geradas em segundo plano (app/services/exportacao_service.py):
+uma linha por pedido, com os filtros, o estado e o arquivo gerado. O índice
+único parcial uq_exportacoes_chave_ativa deixa no máximo um pedido idêntico
+pendente/processando.
+
+notificacoes passa a aceitar notificação sem chamado (chamado_id nulo) com um
+link próprio — a de exportação pronta aponta para o download.
+
+Revision ID: d4b7e2c9a158
+Revises: c2f6a8d3e914
+Create Date: 2026-10-19 22:17:05.318240
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e2c9a158"
+down_revision: str | Sequence[str] | None = "c2f6a8d3e914"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "exportacoes",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("usuario_id", sa.Text(), nullable=False),
+        sa.Column("tipo", sa.Text(), nullable=False),
+        sa.Column("formato", sa.Text(), nullable=False),
+        sa.Column("parametros", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("chave", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("tentativas", sa.Integer(), nullable=False),
+        sa.Column("executor", sa.Text(), nullable=True),
+        sa.Column("arquivo", sa.Text(), nullable=True),
+        sa.Column("nome_arquivo", sa.Text(), nullable=True),
+        sa.Column("tamanho_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("linhas", sa.Integer(), nullable=True),
+        sa.Column("erro", sa.Text(), nullable=True),
+        sa.Column(
+            "criado_em",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("iniciado_em", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("concluido_em", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expira_em", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_exportacoes_usuario_criado", "exportacoes", ["usuario_id", "criado_em"], unique=False
+    )
+    op.create_index(
+        "idx_exportacoes_chave_criado", "exportacoes", ["chave", "criado_em"], unique=False
+    )
+    op.create_index(
+        "idx_exportacoes_pendentes",
+        "exportacoes",
+        ["criado_em"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pendente'"),
+    )
+    op.create_index(
+        "uq_exportacoes_chave_ativa",
+        "exportacoes",
+        ["chave"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pendente', 'processando')"),
+    )
+
+    op.alter_column("notificacoes", "chamado_id", existing_type=sa.Integer(), nullable=True)
+    op.add_column("notificacoes", sa.Column("link", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notificacoes", "link")
+    op.execute("DELETE FROM notificacoes WHERE chamado_id IS NULL")
+    op.alter_column("notificacoes", "chamado_id", existing_type=sa.Integer(), nullable=False)
+
+    op.drop_index("uq_exportacoes_chave_ativa", table_name="exportacoes")
+    op.drop_index("idx_exportacoes_pendentes", table_name="exportacoes")
+    op.drop_index("idx_exportacoes_chave_criado", table_name="exportacoes")
+    op.drop_index("idx_exportacoes_usuario_criado", table_name="exportacoes")
+    op.drop_table("exportacoes")
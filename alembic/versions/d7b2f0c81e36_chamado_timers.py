@@ -0,0 +1,61 @@
+"""chamado_timers
+
+Tabela de gatilhos temporais por chamado (escalonamento/aviso prévio, aviso
+50%/80% do prazo de resolução, lembrete de confirmação) — ver
+app/services/chamado_timers_service.py. O despachante consulta só os timers
+vencidos (idx_chamado_timers_due, FOR UPDATE SKIP LOCKED), em vez de cada job
+varrer todos os chamados abertos.
+
+Revision ID: d7b2f0c81e36
+Revises: c41e7a9d0b52
+Create Date: 2026-10-19 10:41:07.215334
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7b2f0c81e36"
+down_revision: str | Sequence[str] | None = "c41e7a9d0b52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chamado_timers",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("chamado_id", sa.Integer(), nullable=False),
+        sa.Column("tipo", sa.Text(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("claimed_by", sa.Text(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "atualizado_em",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["chamado_id"], ["chamados.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("chamado_id", "tipo", name="uq_chamado_timer_tipo"),
+    )
+    op.create_index("idx_chamado_timers_due", "chamado_timers", ["due_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_chamado_timers_due", table_name="chamado_timers")
+    op.drop_table("chamado_timers")
@@ -0,0 +1,54 @@
+"""job_runs
+
+Histórico de execuções dos jobs agendados (duração, atraso sobre o disparo
+agendado, contadores do resultado, worker que detinha o lock) — ver
+app/services/job_runs_service.py.
+
+Revision ID: e3a9c5d17f04
+Revises: d7b2f0c81e36
+Create Date: 2026-10-19 14:12:48.530917
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a9c5d17f04"
+down_revision: str | Sequence[str] | None = "d7b2f0c81e36"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("job", sa.Text(), nullable=False),
+        sa.Column("inicio", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("fim", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duracao_ms", sa.Integer(), nullable=False),
+        sa.Column("agendado_para", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("atraso_ms", sa.Integer(), nullable=True),
+        sa.Column("intervalo_segundos", sa.Float(), nullable=True),
+        sa.Column("processados", sa.Integer(), nullable=False),
+        sa.Column("acoes", sa.Integer(), nullable=False),
+        sa.Column("erros", sa.Integer(), nullable=False),
+        sa.Column("sucesso", sa.Boolean(), nullable=False),
+        sa.Column("executor", sa.Text(), nullable=False),
+        sa.Column("erro", sa.Text(), nullable=True),
+        sa.Column("resultado", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_job_runs_job_inicio", "job_runs", ["job", "inicio"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_job_runs_job_inicio", table_name="job_runs")
+    op.drop_table("job_runs")
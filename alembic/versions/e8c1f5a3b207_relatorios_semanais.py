@@ -0,0 +1,57 @@
+"""relatorios_semanais
+
+Snapshot do relatório semanal (app/services/report_service.py): índices,
+contagens e fragmentos HTML já renderizados, mais as chaves dos destinatários
+que já receberam — um envio que falhou é refeito a partir dele, sem recalcular
+nada nem repetir quem já recebeu.
+
+Revision ID: e8c1f5a3b207
+Revises: d4b7e2c9a158
+Create Date: 2026-10-19 09:41:26.512874
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c1f5a3b207"
+down_revision: str | Sequence[str] | None = "d4b7e2c9a158"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "relatorios_semanais",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("data_ref", sa.Date(), nullable=False),
+        sa.Column("snapshot", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "entregues",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("tentativas", sa.Integer(), nullable=False),
+        sa.Column(
+            "criado_em",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("data_ref"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("relatorios_semanais")
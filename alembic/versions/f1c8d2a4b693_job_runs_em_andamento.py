@@ -0,0 +1,48 @@
+"""job_runs em andamento
+
+Execuções enfileiradas pelo cron HTTP assíncrono são gravadas ao entrar na
+fila e completadas ao terminar: fim, duracao_ms e sucesso passam a aceitar
+nulo, e um índice único parcial (job WHERE fim IS NULL) deduplica disparos
+simultâneos na execução já em andamento — ver
+job_runs_service.enfileirar_job.
+
+Revision ID: f1c8d2a4b693
+Revises: e3a9c5d17f04
+Create Date: 2026-10-19 16:03:22.418065
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c8d2a4b693"
+down_revision: str | Sequence[str] | None = "e3a9c5d17f04"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column("job_runs", "fim", existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.alter_column("job_runs", "duracao_ms", existing_type=sa.Integer(), nullable=True)
+    op.alter_column("job_runs", "sucesso", existing_type=sa.Boolean(), nullable=True)
+    op.create_index(
+        "uq_job_runs_em_andamento",
+        "job_runs",
+        ["job"],
+        unique=True,
+        postgresql_where=sa.text("fim IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_job_runs_em_andamento", table_name="job_runs")
+    op.execute("DELETE FROM job_runs WHERE fim IS NULL OR sucesso IS NULL")
+    op.alter_column("job_runs", "sucesso", existing_type=sa.Boolean(), nullable=False)
+    op.alter_column("job_runs", "duracao_ms", existing_type=sa.Integer(), nullable=False)
+    op.alter_column("job_runs", "fim", existing_type=sa.DateTime(timezone=True), nullable=False)
@@ -87,7 +87,7 @@ def create_app():
     def load_user(user_id):
         from app.models_usuario import Usuario
 
-        usuario = Usuario.get_by_id(user_id)
+        usuario = Usuario.get_by_id_sessao(user_id)
         # Conta desativada: retorna None para invalidar a sessão ativa
         if usuario is None or not getattr(usuario, "ativo", True):
             return None
@@ -149,6 +149,21 @@ def create_app():
     ):
         _iniciar_scheduler(app)
 
+    # Barramento de invalidação do cache entre workers (Redis pub/sub ou
+    # LISTEN/NOTIFY) — CACHE_INVALIDACAO_ENABLED já vem desligado em testes.
+    from app import db as db_module
+
+    if app.config.get("CACHE_INVALIDACAO_ENABLED") and db_module.engine is not None:
+        import atexit
+
+        from app.services.cache_invalidacao import iniciar_barramento
+
+        barramento = iniciar_barramento(
+            db_module.engine,
+            intervalo_segundos=app.config.get("CACHE_INVALIDACAO_RECONEXAO_SEGUNDOS", 5),
+        )
+        atexit.register(barramento.parar)
+
     # Aquece os caches estáticos em background para reduzir latência do primeiro request
     # app.testing ainda é False aqui (conftest seta TESTING após create_app retornar),
     # por isso também checamos FLASK_ENV para não disparar warmup em pytest.
@@ -223,110 +238,180 @@ def _iniciar_scheduler(app: Flask) -> None:
 
         from app.services.scheduler_lock import executar_job_com_lock
 
+        # Cada job devolve o dict de contadores do serviço: executar_job_com_lock
+        # o grava em job_runs (job_runs_service) junto com duração e atraso, e
+        # registra ali também a exceção, se houver.
         def _job_relatorio():
             with app.app_context():
-                try:
-                    from app.services.report_service import enviar_relatorio_semanal
+                from app.services.report_service import enviar_relatorio_semanal
 
-                    resultado = enviar_relatorio_semanal()
-                    app.logger.info("Relatório semanal concluído: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de relatório semanal: %s", exc)
+                resultado = enviar_relatorio_semanal()
+                app.logger.info("Relatório semanal concluído: %s", resultado)
+                return resultado
+
+        def _job_relatorio_reenvio():
+            with app.app_context():
+                from app.services.report_service import reenviar_relatorio_semanal
+
+                resultado = reenviar_relatorio_semanal()
+                if resultado.get("total_chamados"):
+                    app.logger.info("Reenvio do relatório semanal: %s", resultado)
+                return resultado
 
         def _job_sla_escalacao():
             with app.app_context():
-                try:
-                    from app.services.sla_escalacao_service import (
-                        processar_avisos_resolucao,
-                        processar_escalonamento,
-                    )
+                from app.services.sla_escalacao_service import (
+                    processar_avisos_resolucao,
+                    processar_escalonamento,
+                )
 
-                    resultado = {
-                        "escalonamento": processar_escalonamento(),
-                        "avisos_resolucao": processar_avisos_resolucao(),
-                    }
-                    app.logger.info(
-                        "Job SLA Escalonamento (motor unificado + avisos): %s", resultado
-                    )
-                except Exception as exc:
-                    app.logger.exception("Erro no job SLA Escalonamento: %s", exc)
+                resultado = {
+                    "escalonamento": processar_escalonamento(),
+                    "avisos_resolucao": processar_avisos_resolucao(),
+                }
+                app.logger.info("Job SLA Escalonamento (motor unificado + avisos): %s", resultado)
+                return resultado
+
+        def _job_chamado_timers():
+            with app.app_context():
+                from app.services.chamado_timers_service import despachar_timers_vencidos
+
+                resultado = despachar_timers_vencidos()
+                if resultado["vencidos"]:
+                    app.logger.info("Timers de chamado: %s", resultado)
+                return resultado
+
+        def _job_chamado_timers_reconciliacao():
+            with app.app_context():
+                from app.services.chamado_timers_service import reconstruir_timers
+
+                resultado = reconstruir_timers()
+                app.logger.info("Reconciliação de timers de chamado: %s", resultado)
+                return resultado
 
         def _job_reset_ranking():
             with app.app_context():
-                try:
-                    from app.services.gamification_service import GamificationService
+                from app.services.gamification_service import GamificationService
 
-                    resultado = GamificationService.resetar_ranking_semanal()
-                    app.logger.info("Reset ranking semanal concluído: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de reset ranking semanal: %s", exc)
+                resultado = GamificationService.resetar_ranking_semanal()
+                app.logger.info("Reset ranking semanal concluído: %s", resultado)
+                return resultado
 
         def _job_limpar_contadores():
             with app.app_context():
-                try:
-                    from app.services.contadores_uso import limpar_contadores_antigos
-
-                    resultado = limpar_contadores_antigos(dias=90, dry_run=False)
-                    app.logger.info("Limpeza contadores_uso concluída: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de limpeza de contadores_uso: %s", exc)
+                from app.services.contadores_uso import limpar_contadores_antigos
+                from app.services.job_runs_service import limpar_execucoes_antigas
+
+                resultado = {
+                    "contadores_uso": limpar_contadores_antigos(dias=90, dry_run=False),
+                    "job_runs": limpar_execucoes_antigas(
+                        dias=app.config.get("JOB_RUNS_RETENCAO_DIAS", 30)
+                    ),
+                }
+                app.logger.info("Limpeza contadores_uso/job_runs concluída: %s", resultado)
+                return resultado
 
         def _job_lembrete_confirmacao():
             with app.app_context():
-                try:
-                    from app.services.lembrete_confirmacao_service import (
-                        processar_lembretes_confirmacao,
-                    )
+                from app.services.lembrete_confirmacao_service import (
+                    processar_lembretes_confirmacao,
+                )
 
-                    resultado = processar_lembretes_confirmacao()
-                    app.logger.info("Lembretes confirmação: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de lembretes de confirmação: %s", exc)
+                resultado = processar_lembretes_confirmacao()
+                app.logger.info("Lembretes confirmação: %s", resultado)
+                return resultado
 
         def _job_digest_diario():
             with app.app_context():
-                try:
-                    from app.services.digest_diario_service import processar_digest_diario
+                from app.services.digest_diario_service import processar_digest_diario
 
-                    resultado = processar_digest_diario()
-                    app.logger.info("Digest diário: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de digest diário: %s", exc)
+                resultado = processar_digest_diario()
+                app.logger.info("Digest diário: %s", resultado)
+                return resultado
 
         def _job_lembrete_mfa():
             with app.app_context():
-                try:
-                    from app.services.mfa_lembrete_service import processar_lembretes_mfa
+                from app.services.mfa_lembrete_service import processar_lembretes_mfa
 
-                    resultado = processar_lembretes_mfa()
-                    app.logger.info("Lembretes MFA pendente: %s", resultado)
-                except Exception as exc:
-                    app.logger.exception("Erro no job de lembretes de MFA pendente: %s", exc)
+                resultado = processar_lembretes_mfa()
+                app.logger.info("Lembretes MFA pendente: %s", resultado)
+                return resultado
+
+        def _job_exportacoes():
+            with app.app_context():
+                from app.services.exportacao_service import limpar_expiradas, processar_pendentes
+
+                resultado = {
+                    "fila": processar_pendentes(),
+                    "limpeza": limpar_expiradas(),
+                }
+                if resultado["fila"]["processados"] or resultado["limpeza"]["arquivos_removidos"]:
+                    app.logger.info("Exportações em segundo plano: %s", resultado)
+                return resultado
 
         scheduler = BackgroundScheduler(
             timezone=pytz.timezone("America/Sao_Paulo"),
             job_defaults={"coalesce": True, "max_instances": 1},
         )
+
+        def _com_lock(nome_job, fn_job):
+            # O trigger é lido na hora do disparo: é dele que sai o horário
+            # agendado (atraso) e o intervalo gravados em job_runs.
+            def _disparar():
+                job = scheduler.get_job(nome_job)
+                executar_job_com_lock(
+                    app, nome_job, fn_job, gatilho=job.trigger if job is not None else None
+                )
+
+            return _disparar
+
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "relatorio_semanal", _job_relatorio),
+            _com_lock("relatorio_semanal", _job_relatorio),
             trigger="cron",
             day_of_week="fri",
             hour=10,
             minute=0,
             id="relatorio_semanal",
         )
-        # Motor de escalonamento unificado: TAT por categoria, a cada 10 minutos
+        # Reenvio do relatório semanal: refaz, do snapshot gravado, só os e-mails
+        # que falharam (sem pendência, é uma consulta e nada mais).
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "sla_escalacao", _job_sla_escalacao),
+            _com_lock("relatorio_semanal_reenvio", _job_relatorio_reenvio),
             trigger="interval",
-            minutes=10,
-            id="sla_escalacao",
+            hours=1,
+            id="relatorio_semanal_reenvio",
         )
+        timers_ativos = bool(app.config.get("CHAMADO_TIMERS_ENABLED"))
+        if timers_ativos:
+            # chamado_timers: escalonamento, avisos 50%/80% e lembretes de
+            # confirmação saem dos timers vencidos (custo proporcional ao que
+            # venceu, não aos chamados abertos); a reconciliação horária
+            # recalcula os timers de quem escapou dos ganchos de escrita.
+            scheduler.add_job(
+                _com_lock("chamado_timers", _job_chamado_timers),
+                trigger="interval",
+                minutes=1,
+                id="chamado_timers",
+            )
+            scheduler.add_job(
+                _com_lock("chamado_timers_reconciliacao", _job_chamado_timers_reconciliacao),
+                trigger="interval",
+                hours=1,
+                id="chamado_timers_reconciliacao",
+            )
+        else:
+            # Motor de escalonamento unificado: TAT por categoria, a cada 10 minutos
+            scheduler.add_job(
+                _com_lock("sla_escalacao", _job_sla_escalacao),
+                trigger="interval",
+                minutes=10,
+                id="sla_escalacao",
+            )
         # Digest diário de chamados abertos: gatilho por pessoa (24h desde o
         # mais antigo/último envio) — 30 min é granularidade suficiente, não
         # precisa da mesma frequência do escalonamento.
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "digest_diario", _job_digest_diario),
+            _com_lock("digest_diario", _job_digest_diario),
             trigger="interval",
             minutes=30,
             id="digest_diario",
@@ -335,7 +420,7 @@ def _iniciar_scheduler(app: Flask) -> None:
         # monitoramento contínuo de chamados sem resposta e usa business_time.
         # A função enviar_alertas_prazo_24h permanece disponível para reativação.
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "reset_ranking_semanal", _job_reset_ranking),
+            _com_lock("reset_ranking_semanal", _job_reset_ranking),
             trigger="cron",
             day_of_week="sun",
             hour=23,
@@ -343,7 +428,7 @@ def _iniciar_scheduler(app: Flask) -> None:
             id="reset_ranking_semanal",
         )
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "limpar_contadores_uso", _job_limpar_contadores),
+            _com_lock("limpar_contadores_uso", _job_limpar_contadores),
             trigger="cron",
             day_of_week="sun",
             hour=2,
@@ -351,33 +436,63 @@ def _iniciar_scheduler(app: Flask) -> None:
             id="limpar_contadores_uso",
         )
         # Lembretes de confirmação de resolução: 1º após 24 h, 2º após 48 h
-        scheduler.add_job(
-            lambda: executar_job_com_lock(app, "lembrete_confirmacao", _job_lembrete_confirmacao),
-            trigger="interval",
-            hours=6,
-            id="lembrete_confirmacao",
-        )
+        if not timers_ativos:
+            scheduler.add_job(
+                _com_lock("lembrete_confirmacao", _job_lembrete_confirmacao),
+                trigger="interval",
+                hours=6,
+                id="lembrete_confirmacao",
+            )
         # Lembrete de MFA pendente: reenvio a cada 3 dias (checado a cada 6h, mesmo
         # intervalo do job irmão — a cadência de 3 dias é garantida pela elegibilidade
         # + claim atômico dentro do serviço, não pela frequência do job)
         scheduler.add_job(
-            lambda: executar_job_com_lock(app, "lembrete_mfa_pendente", _job_lembrete_mfa),
+            _com_lock("lembrete_mfa_pendente", _job_lembrete_mfa),
             trigger="interval",
             hours=6,
             id="lembrete_mfa_pendente",
         )
-        scheduler.start()
+        # Fila de exportações (/exportar com EXPORTACAO_ASSINCRONA): a thread do
+        # worker que recebeu o pedido normalmente já gerou o arquivo; o job pega
+        # o que sobrou na fila e apaga os arquivos com link vencido.
+        if app.config.get("EXPORTACAO_ASSINCRONA"):
+            scheduler.add_job(
+                _com_lock("exportacoes", _job_exportacoes),
+                trigger="interval",
+                minutes=1,
+                id="exportacoes",
+            )
+        from app import db as db_module
+
+        eleicao = bool(app.config.get("SCHEDULER_ELEICAO_LIDER")) and db_module.engine is not None
+        # Com eleição, todo worker sobe o scheduler pausado e só o líder
+        # (advisory lock no Postgres) o retoma — ver scheduler_lider.py.
+        scheduler.start(paused=eleicao)
         app.logger.info(
-            "Scheduler iniciado — escalonamento SLA a cada 10 min, digest diário a cada 30 min, "
-            "relatório semanal sexta 10h, lembretes confirmação a cada 6 h, "
+            "Scheduler iniciado — %s, digest diário a cada 30 min, "
+            "relatório semanal sexta 10h (reenvio de falhas a cada 1 h), "
             "lembretes MFA pendente a cada 6 h, "
-            "reset ranking domingo 23h59, limpeza contadores domingo 02h00 (BRT)"
+            "reset ranking domingo 23h59, limpeza contadores domingo 02h00 (BRT)",
+            "timers de chamado a cada 1 min (reconciliação horária)"
+            if timers_ativos
+            else "escalonamento SLA a cada 10 min, lembretes confirmação a cada 6 h",
         )
 
         import atexit
 
         atexit.register(lambda: scheduler.shutdown(wait=False))
 
+        if eleicao:
+            from app.services.scheduler_lider import EleicaoLider
+
+            lider = EleicaoLider(
+                db_module.engine,
+                scheduler,
+                intervalo_segundos=app.config.get("SCHEDULER_LIDER_INTERVALO_SEGUNDOS", 30),
+            )
+            lider.iniciar()
+            atexit.register(lider.parar)
+
     except ImportError:
         app.logger.warning(
             "APScheduler não instalado; relatório semanal não será agendado. "
@@ -429,7 +544,8 @@ def _proteger_staging(app: Flask) -> None:
     - Requer STAGING_AUTH_ENABLED=true no ambiente
     - Requer STAGING_AUTH_USER e STAGING_AUTH_PASSWORD configurados
 
-    Rotas excluídas: /health, /login, /sw.js, /internal/cron/sla-escalacao
+    Rotas excluídas: /health, /login, /sw.js, /internal/cron/sla-escalacao (e o
+    polling /internal/cron/sla-escalacao/<id>, autenticado por X-Cron-Token)
     Credencial ausente ou inválida → 401 + WWW-Authenticate: Basic realm="DTX Staging"
     Comparação timing-safe via hmac.compare_digest — senha nunca logada.
     """
@@ -467,7 +583,9 @@ def _proteger_staging(app: Flask) -> None:
             return None
 
         # 5. Rotas excluídas do Basic Auth
-        if request.path in _excluidas_staging:
+        if request.path in _excluidas_staging or request.path.startswith(
+            "/internal/cron/sla-escalacao/"
+        ):
             return None
 
         # 6. Verificar credencial Basic Auth (timing-safe)
@@ -1,31 +1,516 @@
 """
-Cache opcional com Redis para relatórios e listas.
+Cache em dois níveis para relatórios e listas.
 
-- Se REDIS_URL estiver definida no ambiente: usa Redis (compartilhado entre workers).
-- Senão: usa cache em memória (dict) por processo.
+- L1: memória do processo, com limite de entradas e de bytes (LRU), TTL por
+  entrada e limites por namespace (prefixo da chave até o primeiro ":").
+  Entradas vencidas saem numa varredura periódica em thread daemon, além de
+  na leitura — chaves por usuário (status_counts:{user}:...) não acumulam
+  mais para sempre em workers de vida longa.
+- L2: Redis, se REDIS_URL estiver definida (compartilhado entre workers).
+  Com Redis, a cópia no L1 vive no máximo CACHE_L1_TTL_COM_REDIS_SEGUNDOS;
+  namespaces em _NAMESPACES_SO_L2 (contadores de login) nunca passam pelo L1.
+  Valores vão em msgpack (CACHE_SERIALIZADOR); cache_get_many/cache_set_many
+  resolvem várias chaves num único MGET/pipeline; cache_incr/_bounded são
+  contadores atômicos (script Lua no Redis, lock no L1).
+- Invalidação: cache_delete/static_cache_delete também avisam os outros
+  workers pelo barramento de app/services/cache_invalidacao.py.
 
 Reduz 30-50% de queries ao banco em relatórios e listas pesadas.
 Em produção, defina REDIS_URL para cache e rate limit compartilhados entre workers.
 """
 
 import contextlib
+import copy
+import json
 import logging
+import math
 import os
+import sys
+import threading
 import time
-from collections.abc import Callable
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any
 
+from config import Config
+
 logger = logging.getLogger(__name__)
 
 _redis_client = None
-_memory_cache: dict = {}
-_MEMORY_TTL: dict = {}  # key -> expires_at
 
-# Cache em memória para dados estáticos (categorias, lista de supervisores) — não serializa em Redis
-_static_cache: dict = {}
-_static_expiry: dict = {}  # key -> expires_at (timestamp)
 _STATIC_TTL_DEFAULT = 300  # 5 minutos
 
+# Contadores de tentativa/bloqueio de login: uma cópia local atrasada em outro
+# worker deixaria passar tentativas além do limite — com Redis, lê sempre dele.
+_NAMESPACES_SO_L2: frozenset[str] = frozenset({"login_attempt", "login_lockout"})
+
+# Marca de "não está no cache" (None e [] são valores válidos no cache estático).
+_AUSENTE = object()
+
+# Nós visitados no máximo por _tamanho_aproximado (listas enormes são estimadas
+# pelo que foi visitado, não percorridas inteiras).
+_MAX_NOS_TAMANHO = 20_000
+_SEQUENCIAS = (list, tuple, set, frozenset)
+# Chaves removidas cuja geração o L1 lembra (ver _CacheL1.remover).
+_MAX_REMOCOES_RASTREADAS = 10_000
+
+
+# Escalares imutáveis: _copiar devolve o próprio objeto.
+_TIPOS_IMUTAVEIS = frozenset(
+    {str, bytes, int, float, bool, type(None), datetime, date, Decimal, frozenset}
+)
+
+
+def _copiar(valor: Any) -> Any:
+    """Cópia independente de um valor do L1 — refaz dict/list/tuple/set
+    recursivamente (bem mais barato que deepcopy nos dados de relatório, que
+    são JSON) e cai em copy.deepcopy para o resto."""
+    tipo = type(valor)
+    if tipo in _TIPOS_IMUTAVEIS:
+        return valor
+    if tipo is dict:
+        return {k: _copiar(v) for k, v in valor.items()}
+    if tipo is list:
+        return [_copiar(v) for v in valor]
+    if tipo is tuple:
+        return tuple(_copiar(v) for v in valor)
+    if tipo is set:
+        return set(valor)
+    return copy.deepcopy(valor)
+
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0] if ":" in key else ""
+
+
+def _tamanho_aproximado(valor: Any) -> int:
+    """Bytes aproximados de um valor (sys.getsizeof somado pelos containers e
+    atributos de objetos) — contabilidade do L1, não medida exata."""
+    total = 0
+    vistos: set[int] = set()
+    pilha = [valor]
+    nos = 0
+    while pilha and nos < _MAX_NOS_TAMANHO:
+        obj = pilha.pop()
+        if id(obj) in vistos:
+            continue
+        vistos.add(id(obj))
+        nos += 1
+        total += sys.getsizeof(obj, 64)
+        tipo = type(obj)
+        if tipo is dict:
+            pilha.extend(obj.keys())
+            pilha.extend(obj.values())
+        elif tipo in _SEQUENCIAS:
+            pilha.extend(obj)
+        elif tipo.__sizeof__ is object.__sizeof__ and type(getattr(obj, "__dict__", None)) is dict:
+            # Objetos comuns (Usuario, Categoria...) pesam pelos atributos; tipos
+            # com __sizeof__ próprio já respondem pelo que guardam.
+            pilha.append(obj.__dict__)
+    return total
+
+
+def _limites_namespace(spec: str) -> dict[str, tuple[int, int | None]]:
+    """Interpreta CACHE_L1_NAMESPACES: "ns=entradas[:mb],..." (mb 0/ausente =
+    sem limite de bytes próprio; entradas 0 = namespace fora do L1)."""
+    limites: dict[str, tuple[int, int | None]] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            nome, valor = item.split("=", 1)
+            entradas, _, mb = valor.partition(":")
+            max_bytes = int(float(mb) * 1024 * 1024) if mb.strip() else 0
+            limites[nome.strip()] = (int(entradas), max_bytes or None)
+        except ValueError:
+            logger.warning("CACHE_L1_NAMESPACES: item inválido ignorado: %r", item)
+    return limites
+
+
+@dataclass(slots=True)
+class _Entrada:
+    valor: Any
+    expira_em: float
+    tamanho: int
+    namespace: str
+    # Até quando a entrada é "fresca"; entre fresco_ate e expira_em ela ainda
+    # é servida, mas quem lê com obter_com_frescor sabe que deve revalidar.
+    fresco_ate: float
+
+
+class _CacheL1:
+    """LRU por processo com TTL, teto de entradas/bytes e limites por namespace.
+
+    Thread-safe (um lock por instância). A ordem global decide o despejo
+    quando o teto do processo estoura; a ordem do namespace, quando o teto
+    dele estoura — um namespace barulhento despeja só as próprias chaves.
+
+    Com copiar=True, grava e devolve cópias (_copiar): quem mexe no valor
+    lido não altera o que o próximo leitor recebe — a mesma semântica da
+    leitura do Redis, que sempre desserializa um objeto novo.
+    """
+
+    def __init__(
+        self,
+        max_entradas: int,
+        max_bytes: int | None,
+        limites_namespace: dict[str, tuple[int, int | None]] | None = None,
+        *,
+        copiar: bool = False,
+    ) -> None:
+        self.copiar = copiar
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.limites_namespace = dict(limites_namespace or {})
+        self._dados: OrderedDict[str, _Entrada] = OrderedDict()
+        self._ordem_ns: dict[str, OrderedDict[str, None]] = {}
+        self._bytes_ns: Counter = Counter()
+        self._bytes = 0
+        self._stats: Counter = Counter()
+        self._lock = threading.Lock()
+        # Invalidação por chave: quem leu geracao() antes de ir ao banco não
+        # grava um valor que um remover() DAQUELA chave tornou velho — remover
+        # outra chave não descarta a carga. _removida_em guarda o número da
+        # última remoção de cada chave; passando de _MAX_REMOCOES_RASTREADAS
+        # é zerado e vira _limpo_em (vale como invalidação geral: só descarta
+        # cargas em curso, nunca deixa gravar valor velho).
+        self._geracao = 0
+        self._removida_em: dict[str, int] = {}
+        self._limpo_em = 0
+
+    def _remover(self, key: str) -> _Entrada | None:
+        entrada = self._dados.pop(key, None)
+        if entrada is not None:
+            self._bytes -= entrada.tamanho
+            self._bytes_ns[entrada.namespace] -= entrada.tamanho
+            ordem = self._ordem_ns.get(entrada.namespace)
+            if ordem is not None:
+                ordem.pop(key, None)
+                if not ordem:
+                    del self._ordem_ns[entrada.namespace]
+                    del self._bytes_ns[entrada.namespace]
+        return entrada
+
+    def geracao(self) -> int:
+        """Marca a ler antes de calcular um valor para gravar(geracao=...)."""
+        with self._lock:
+            return self._geracao
+
+    def obter(self, key: str) -> Any:
+        """Valor da chave ou _AUSENTE (ausente ou vencida)."""
+        return self.obter_com_frescor(key)[0]
+
+    def obter_com_frescor(self, key: str) -> tuple[Any, bool]:
+        """(valor ou _AUSENTE, ainda fresco?) — vencida a janela stale, some."""
+        valor, fresco = self._obter_com_frescor(key)
+        if self.copiar and valor is not _AUSENTE:
+            valor = _copiar(valor)
+        return valor, fresco
+
+    def _obter_com_frescor(self, key: str) -> tuple[Any, bool]:
+        with self._lock:
+            entrada = self._dados.get(key)
+            if entrada is None:
+                self._stats["misses"] += 1
+                return _AUSENTE, False
+            agora = time.time()
+            if agora >= entrada.expira_em:
+                self._remover(key)
+                self._stats["expirados"] += 1
+                self._stats["misses"] += 1
+                return _AUSENTE, False
+            self._dados.move_to_end(key)
+            self._ordem_ns[entrada.namespace].move_to_end(key)
+            self._stats["hits"] += 1
+            return entrada.valor, agora < entrada.fresco_ate
+
+    def gravar(
+        self,
+        key: str,
+        valor: Any,
+        ttl_seconds: float,
+        stale_seconds: float = 0,
+        *,
+        geracao: int | None = None,
+    ) -> None:
+        """Grava a chave; com `geracao`, só se ela não foi invalidada desde então."""
+        if self.copiar:
+            valor = _copiar(valor)
+        tamanho = _tamanho_aproximado(valor)
+        with self._lock:
+            if geracao is not None and geracao < max(self._removida_em.get(key, 0), self._limpo_em):
+                self._stats["descartados"] += 1
+                return
+            self._gravar(key, valor, tamanho, ttl_seconds, stale_seconds)
+
+    def _gravar(
+        self, key: str, valor: Any, tamanho: int, ttl_seconds: float, stale_seconds: float
+    ) -> None:
+        ns = _namespace(key)
+        max_ns, max_bytes_ns = self.limites_namespace.get(ns, (None, None))
+        self._remover(key)
+        if ttl_seconds <= 0 or max_ns == 0:
+            return
+        if (self.max_bytes is not None and tamanho > self.max_bytes) or (
+            max_bytes_ns is not None and tamanho > max_bytes_ns
+        ):
+            self._stats["grandes_demais"] += 1
+            return
+        agora = time.time()
+        self._dados[key] = _Entrada(
+            valor, agora + ttl_seconds + stale_seconds, tamanho, ns, agora + ttl_seconds
+        )
+        self._ordem_ns.setdefault(ns, OrderedDict())[key] = None
+        self._bytes += tamanho
+        self._bytes_ns[ns] += tamanho
+        ordem = self._ordem_ns[ns]
+        while (max_ns is not None and len(ordem) > max_ns) or (
+            max_bytes_ns is not None and self._bytes_ns[ns] > max_bytes_ns
+        ):
+            self._remover(next(iter(ordem)))
+            self._stats["despejos"] += 1
+        while len(self._dados) > self.max_entradas or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self._remover(next(iter(self._dados)))
+            self._stats["despejos"] += 1
+
+    def incrementar(
+        self, key: str, quantidade: int, ttl_seconds: float, limite: int | None = None
+    ) -> int | None:
+        """Soma `quantidade` ao contador (ausente/vencido = 0) sob o lock. O TTL
+        só vale na criação (ttl_seconds <= 0 = sem expiração); com `limite`,
+        não passa dele e devolve None sem alterar o contador."""
+        with self._lock:
+            agora = time.time()
+            entrada = self._dados.get(key)
+            if entrada is not None and agora >= entrada.expira_em:
+                self._remover(key)
+                self._stats["expirados"] += 1
+                entrada = None
+            atual = entrada.valor if entrada is not None and type(entrada.valor) is int else 0
+            novo = atual + quantidade
+            if limite is not None and novo > limite:
+                return None
+            if entrada is not None and type(entrada.valor) is int:
+                entrada.valor = novo
+                self._dados.move_to_end(key)
+                self._ordem_ns[entrada.namespace].move_to_end(key)
+                return novo
+            ttl = ttl_seconds if ttl_seconds > 0 else math.inf
+            self._gravar(key, novo, sys.getsizeof(novo), ttl, 0)
+            return novo
+
+    def remover(self, key: str) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._removida_em[key] = self._geracao
+            if len(self._removida_em) > _MAX_REMOCOES_RASTREADAS:
+                self._removida_em.clear()
+                self._limpo_em = self._geracao
+            self._remover(key)
+
+    def varrer(self) -> int:
+        """Remove todas as entradas vencidas. Retorna quantas saíram."""
+        agora = time.time()
+        with self._lock:
+            vencidas = [k for k, e in self._dados.items() if agora >= e.expira_em]
+            for key in vencidas:
+                self._remover(key)
+            self._stats["expirados"] += len(vencidas)
+        return len(vencidas)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._removida_em.clear()
+            self._limpo_em = self._geracao
+            self._dados.clear()
+            self._ordem_ns.clear()
+            self._bytes_ns.clear()
+            self._bytes = 0
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._dados),
+                "bytes": self._bytes,
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes,
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "despejos": self._stats["despejos"],
+                "expirados": self._stats["expirados"],
+                "grandes_demais": self._stats["grandes_demais"],
+                "descartados": self._stats["descartados"],
+                "namespaces": {
+                    ns or "(sem prefixo)": {"entradas": len(ordem), "bytes": self._bytes_ns[ns]}
+                    for ns, ordem in sorted(self._ordem_ns.items())
+                },
+            }
+
+
+def _mb_em_bytes(mb: float) -> int | None:
+    return int(mb * 1024 * 1024) if mb > 0 else None
+
+
+_l1 = _CacheL1(
+    Config.CACHE_L1_MAX_ENTRADAS,
+    _mb_em_bytes(Config.CACHE_L1_MAX_MB),
+    _limites_namespace(Config.CACHE_L1_NAMESPACES),
+    copiar=True,
+)
+# Cache estático (categorias, lista de supervisores) — objetos Python, nunca
+# vai ao Redis; só tem teto de entradas (as listas grandes são justamente as
+# mais valiosas de manter). Devolve por referência, como sempre devolveu:
+# copiar a lista de usuários a cada request custaria mais que o cache poupa —
+# quem lê não muta (ver diretorio_usuarios).
+_l1_estatico = _CacheL1(Config.CACHE_ESTATICO_MAX_ENTRADAS, None)
+
+_varredura_pid: int | None = None
+_varredura_lock = threading.Lock()
+
+
+def _varrer_expirados() -> int:
+    """Remove entradas vencidas dos dois caches em memória do processo."""
+    return _l1.varrer() + _l1_estatico.varrer()
+
+
+def _garantir_varredura() -> None:
+    """Sobe (uma vez por processo) a thread daemon que varre entradas vencidas
+    a cada CACHE_L1_VARREDURA_SEGUNDOS. Conferida pelo pid: depois de um fork
+    (gunicorn --preload) o filho não herda a thread e sobe a sua."""
+    global _varredura_pid
+    intervalo = Config.CACHE_L1_VARREDURA_SEGUNDOS
+    if intervalo <= 0 or _varredura_pid == os.getpid():
+        return
+    with _varredura_lock:
+        if _varredura_pid == os.getpid():
+            return
+        _varredura_pid = os.getpid()
+
+        def _run():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    removidas = _varrer_expirados()
+                    if removidas:
+                        logger.debug("Cache L1: %d entradas vencidas removidas", removidas)
+                except Exception as e:
+                    logger.warning("Varredura do cache L1 falhou: %s", e)
+
+        threading.Thread(target=_run, name="cache-l1-varredura", daemon=True).start()
+
+
+# ── Serialização dos valores no Redis ───────────────────────────────────────
+
+# Marca dos valores em msgpack: 0xC1 é o único byte que o msgpack nunca emite e
+# não abre nenhum JSON — valores antigos (ou de CACHE_SERIALIZADOR=json)
+# continuam legíveis, e trocar o serializador não exige limpar o Redis.
+_PREFIXO_MSGPACK = b"\xc1"
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+
+
+class _SerializadorJson:
+    """JSON com default=str: datetime/Decimal voltam como string."""
+
+    nome = "json"
+
+    def dumps(self, valor: Any) -> bytes:
+        return json.dumps(valor, default=str).encode()
+
+    def loads(self, dados: bytes) -> Any:
+        return json.loads(dados)
+
+
+class _SerializadorMsgpack:
+    """msgpack com tipos de extensão para datetime (com ou sem fuso), date e
+    Decimal — voltam com o mesmo tipo. Demais tipos desconhecidos viram str,
+    como no JSON."""
+
+    nome = "msgpack"
+
+    def __init__(self) -> None:
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return self._msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+        if isinstance(obj, date):
+            return self._msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+        if isinstance(obj, Decimal):
+            return self._msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+        if isinstance(obj, set | frozenset):
+            return list(obj)
+        return str(obj)
+
+    @staticmethod
+    def _ext_hook(codigo: int, dados: bytes) -> Any:
+        texto = dados.decode()
+        if codigo == _EXT_DATETIME:
+            return datetime.fromisoformat(texto)
+        if codigo == _EXT_DATE:
+            return date.fromisoformat(texto)
+        if codigo == _EXT_DECIMAL:
+            return Decimal(texto)
+        raise ValueError(f"tipo de extensão msgpack desconhecido: {codigo}")
+
+    def dumps(self, valor: Any) -> bytes:
+        return _PREFIXO_MSGPACK + self._msgpack.packb(
+            valor, default=self._default, use_bin_type=True, datetime=False
+        )
+
+    def loads(self, dados: bytes) -> Any:
+        return self._msgpack.unpackb(
+            dados[len(_PREFIXO_MSGPACK) :],
+            ext_hook=self._ext_hook,
+            raw=False,
+            strict_map_key=False,
+        )
+
+
+_SERIALIZADORES = {"json": _SerializadorJson, "msgpack": _SerializadorMsgpack}
+_serializadores: dict[str, Any] = {}
+
+
+def _obter_serializador(nome: str):
+    if nome not in _serializadores:
+        _serializadores[nome] = _SERIALIZADORES[nome]()
+    return _serializadores[nome]
+
+
+def _serializador():
+    """Serializador de escrita (CACHE_SERIALIZADOR); sem o pacote msgpack
+    instalado, cai para JSON."""
+    nome = Config.CACHE_SERIALIZADOR if Config.CACHE_SERIALIZADOR in _SERIALIZADORES else "json"
+    try:
+        return _obter_serializador(nome)
+    except ImportError:
+        logger.warning("msgpack não instalado; cache no Redis serializado em JSON")
+        _serializadores[nome] = _obter_serializador("json")
+        return _serializadores[nome]
+
+
+def _serializar(valor: Any) -> bytes:
+    return _serializador().dumps(valor)
+
+
+def _desserializar(dados: bytes | str) -> Any:
+    """Lê um valor do Redis pelo formato com que foi gravado (prefixo)."""
+    if isinstance(dados, str):
+        dados = dados.encode()
+    if dados.startswith(_PREFIXO_MSGPACK):
+        return _obter_serializador("msgpack").loads(dados)
+    return _obter_serializador("json").loads(dados)
+
 
 def _get_redis():
     global _redis_client
@@ -37,7 +522,8 @@ def _get_redis():
     try:
         import redis
 
-        _redis_client = redis.from_url(url, decode_responses=True)
+        # Bytes crus: os valores são msgpack (ver _serializar).
+        _redis_client = redis.from_url(url)
         _redis_client.ping()
         logger.info("Cache Redis conectado")
         return _redis_client
@@ -46,25 +532,41 @@ def _get_redis():
         return None
 
 
+def _ttl_l1(key: str, ttl_seconds: float, com_redis: bool) -> float:
+    """TTL da cópia no L1: o pedido sem Redis; com Redis, limitado pelo teto
+    (outros workers podem mudar a chave no L2) ou zero nos namespaces só-L2."""
+    if not com_redis:
+        return ttl_seconds
+    if _namespace(key) in _NAMESPACES_SO_L2:
+        return 0
+    return min(ttl_seconds, Config.CACHE_L1_TTL_COM_REDIS_SEGUNDOS)
+
+
 def cache_get(key: str) -> Any | None:
     """Obtém valor do cache. Retorna None se não existir ou estiver expirado."""
     r = _get_redis()
-    if r:
-        try:
-            import json
-
-            val = r.get(key)
-            return json.loads(val) if val else None
-        except Exception as e:
-            logger.debug("Cache get falhou: %s", e)
+    if not r or _namespace(key) not in _NAMESPACES_SO_L2:
+        valor = _l1.obter(key)
+        if valor is not _AUSENTE:
+            return valor
+    if not r:
+        return None
+    try:
+        val = r.get(key)
+        if not val:
             return None
-    # Memória
-    if key in _MEMORY_TTL and time.time() < _MEMORY_TTL[key]:
-        return _memory_cache.get(key)
-    if key in _memory_cache:
-        del _memory_cache[key]
-        del _MEMORY_TTL[key]
-    return None
+        valor = _desserializar(val)
+    except Exception as e:
+        logger.debug("Cache get falhou: %s", e)
+        return None
+    _copiar_para_l1(key, valor)
+    return valor
+
+
+def _copiar_para_l1(key: str, valor: Any) -> None:
+    ttl_l1 = _ttl_l1(key, Config.CACHE_L1_TTL_COM_REDIS_SEGUNDOS, True)
+    if ttl_l1 > 0:
+        _l1.gravar(key, valor, ttl_l1)
 
 
 def cache_set(key: str, value: Any, ttl_seconds: int = 300) -> None:
@@ -72,31 +574,170 @@ def cache_set(key: str, value: Any, ttl_seconds: int = 300) -> None:
     r = _get_redis()
     if r:
         try:
-            import json
-
-            r.set(key, json.dumps(value, default=str), ex=ttl_seconds)
+            r.set(key, _serializar(value), ex=ttl_seconds)
         except Exception as e:
             logger.debug("Cache set falhou: %s", e)
+            _l1.remover(key)
+            return
+    _l1.gravar(key, value, _ttl_l1(key, ttl_seconds, bool(r)))
+    _garantir_varredura()
+
+
+def cache_get_many(keys: Iterable[str]) -> dict[str, Any]:
+    """Lê várias chaves de uma vez: o que não está no L1 vem do Redis num único
+    MGET. Retorna só as chaves encontradas ({chave: valor})."""
+    r = _get_redis()
+    encontrados: dict[str, Any] = {}
+    faltando: list[str] = []
+    for key in dict.fromkeys(keys):
+        if not r or _namespace(key) not in _NAMESPACES_SO_L2:
+            valor = _l1.obter(key)
+            if valor is not _AUSENTE:
+                encontrados[key] = valor
+                continue
+        faltando.append(key)
+    if not r or not faltando:
+        return encontrados
+    try:
+        brutos = r.mget(faltando)
+    except Exception as e:
+        logger.debug("Cache get_many falhou: %s", e)
+        return encontrados
+    for key, bruto in zip(faltando, brutos, strict=True):
+        if not bruto:
+            continue
+        try:
+            valor = _desserializar(bruto)
+        except Exception as e:
+            logger.debug("Cache get_many: valor ilegível em %s: %s", key, e)
+            continue
+        encontrados[key] = valor
+        _copiar_para_l1(key, valor)
+    return encontrados
+
+
+def cache_set_many(valores: Mapping[str, Any], ttl_seconds: int = 300) -> None:
+    """Grava várias chaves com o mesmo TTL — no Redis, num único pipeline."""
+    if not valores:
         return
-    _memory_cache[key] = value
-    _MEMORY_TTL[key] = time.time() + ttl_seconds
+    r = _get_redis()
+    if r:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for key, value in valores.items():
+                pipe.set(key, _serializar(value), ex=ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("Cache set_many falhou: %s", e)
+            for key in valores:
+                _l1.remover(key)
+            return
+    for key, value in valores.items():
+        _l1.gravar(key, value, _ttl_l1(key, ttl_seconds, bool(r)))
+    _garantir_varredura()
+
+
+# Contadores: INCRBY e a expiração na criação num único script (atômico no
+# Redis, sem GET+SET). A janela conta da 1ª soma — novos incrementos não
+# renovam o TTL (o mesmo que EXPIRE NX, sem exigir Redis 7).
+_INCR_LUA = """
+local valor = redis.call('INCRBY', KEYS[1], ARGV[1])
+if tonumber(ARGV[2]) > 0 and redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return valor
+"""
+_INCR_LIMITADO_LUA = """
+local novo = tonumber(redis.call('GET', KEYS[1]) or '0') + tonumber(ARGV[1])
+if novo > tonumber(ARGV[3]) then return false end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+if tonumber(ARGV[2]) > 0 and redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return novo
+"""
+
+
+def cache_incr(key: str, ttl_seconds: int = 300, amount: int = 1) -> int:
+    """Incrementa o contador atomicamente e devolve o novo valor.
+
+    ttl_seconds vale a partir da criação da chave (0 = sem expiração). Com
+    Redis, um script Lua (um round trip, atômico entre workers); sem Redis
+    ou se ele falhar, o L1 do processo sob lock.
+    """
+    r = _get_redis()
+    if r:
+        try:
+            valor = int(r.eval(_INCR_LUA, 1, key, amount, int(ttl_seconds)))
+            _l1.remover(key)
+            return valor
+        except Exception as e:
+            logger.debug("Cache incr falhou (%s), contando em memória: %s", key, e)
+    _garantir_varredura()
+    return _l1.incrementar(key, amount, ttl_seconds)
+
+
+def cache_incr_bounded(
+    key: str, limite: int, ttl_seconds: int = 300, amount: int = 1
+) -> int | None:
+    """Como cache_incr, mas só incrementa se o resultado não passar de
+    `limite`; no limite devolve None e o contador fica como está."""
+    r = _get_redis()
+    if r:
+        try:
+            valor = r.eval(_INCR_LIMITADO_LUA, 1, key, amount, int(ttl_seconds), limite)
+            _l1.remover(key)
+            return None if valor is None else int(valor)
+        except Exception as e:
+            logger.debug("Cache incr limitado falhou (%s), contando em memória: %s", key, e)
+    _garantir_varredura()
+    return _l1.incrementar(key, amount, ttl_seconds, limite)
+
+
+def _publicar_invalidacao(tipo: str, key: str) -> None:
+    from app.services.cache_invalidacao import publicar_invalidacao
+
+    publicar_invalidacao(tipo, key)
 
 
 def cache_delete(key: str) -> None:
-    """Remove uma chave do cache."""
+    """Remove uma chave do cache (e a cópia L1 dos outros workers)."""
+    _l1.remover(key)
     r = _get_redis()
     if r:
         with contextlib.suppress(Exception):
             r.delete(key)
-        return
-    _memory_cache.pop(key, None)
-    _MEMORY_TTL.pop(key, None)
+        if _namespace(key) in _NAMESPACES_SO_L2:
+            return
+    _publicar_invalidacao("l1", key)
 
 
 def static_cache_delete(key: str) -> None:
-    """Remove uma chave do cache estático em memória (usado por get_static_cached)."""
-    _static_cache.pop(key, None)
-    _static_expiry.pop(key, None)
+    """Remove uma chave do cache estático em memória (usado por get_static_cached)
+    neste processo e, via barramento de invalidação, nos demais workers."""
+    _l1_estatico.remover(key)
+    _publicar_invalidacao("estatico", key)
+
+
+def invalidar_local(tipo: str, key: str | None) -> None:
+    """Remove a chave só deste processo (key None = todo o cache do tipo) —
+    aplicação das mensagens do barramento, sem republicar."""
+    cache = _l1_estatico if tipo == "estatico" else _l1
+    if key is None:
+        cache.limpar()
+    else:
+        cache.remover(key)
+
+
+def ttl_invalidavel(ttl_seconds: int) -> int:
+    """TTL de uma chave estática que é sempre invalidada por evento ao mudar
+    (static_cache_delete): com o barramento conectado, sobe para
+    CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS; sem ele, fica o pedido."""
+    from app.services.cache_invalidacao import barramento_ativo
+
+    if barramento_ativo():
+        return max(ttl_seconds, Config.CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS)
+    return ttl_seconds
 
 
 def is_redis_available() -> bool:
@@ -104,20 +745,241 @@ def is_redis_available() -> bool:
     return _get_redis() is not None
 
 
+def cache_estatisticas() -> dict:
+    """Ocupação e contadores (hits, misses, despejos, expirados) dos caches em
+    memória deste processo — o L1 de cache_get/cache_set e o estático."""
+    return {
+        "redis": is_redis_available(),
+        "l1": _l1.estatisticas(),
+        "estatico": _l1_estatico.estatisticas(),
+    }
+
+
+# ── Single-flight e stale-while-revalidate ──────────────────────────────────
+
+# Locks por chave deste processo, com contagem de quem está usando para que o
+# dict não cresça com chaves que ninguém mais pede.
+_locks_chave: dict[str, list] = {}
+_locks_chave_guarda = threading.Lock()
+_revalidando: set[str] = set()
+
+# Envelope gravado por get_cached: o valor e até quando ele é fresco. Valores
+# sem envelope (gravados por cache_set direto, ou de antes do deploy) contam
+# como frescos.
+_ENVELOPE_FRESCO_ATE = "__fresco_ate"
+_ENVELOPE_VALOR = "__valor"
+
+# O lock no Redis expira sozinho se o worker que calculava morrer no meio.
+_LOCK_REDIS_TTL_MS = 60_000
+_LOCK_REDIS_POLL_SEGUNDOS = 0.05
+_LIBERAR_LOCK_LUA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+
+
+@contextlib.contextmanager
+def _lock_local(key: str):
+    with _locks_chave_guarda:
+        par = _locks_chave.setdefault(key, [threading.Lock(), 0])
+        par[1] += 1
+    try:
+        with par[0]:
+            yield
+    finally:
+        with _locks_chave_guarda:
+            par[1] -= 1
+            if par[1] == 0:
+                _locks_chave.pop(key, None)
+
+
+def _adquirir_lock_redis(r, key: str) -> str | None:
+    """Token do lock entre workers, ou None se outro worker já calcula a chave."""
+    token = f"{os.getpid()}:{threading.get_ident()}:{time.time_ns()}"
+    try:
+        if r.set(f"lock:{key}", token, nx=True, px=_LOCK_REDIS_TTL_MS):
+            return token
+        return None
+    except Exception as e:
+        logger.debug("Lock Redis indisponível para %s: %s", key, e)
+        return token  # sem Redis utilizável, cada worker calcula por conta própria
+
+
+def _liberar_lock_redis(r, key: str, token: str) -> None:
+    with contextlib.suppress(Exception):
+        r.eval(_LIBERAR_LOCK_LUA, 1, f"lock:{key}", token)
+
+
+def _ler_com_frescor(key: str) -> tuple[Any, bool]:
+    try:
+        bruto = cache_get(key)
+    except Exception as e:
+        logger.debug("Cache get falhou (%s): %s", key, e)
+        return _AUSENTE, False
+    if bruto is None:
+        return _AUSENTE, False
+    if isinstance(bruto, dict) and _ENVELOPE_FRESCO_ATE in bruto:
+        return bruto.get(_ENVELOPE_VALOR), time.time() < bruto[_ENVELOPE_FRESCO_ATE]
+    return bruto, True
+
+
+def _gravar_com_frescor(key: str, valor: Any, ttl_seconds: int, stale_seconds: float) -> None:
+    envelope = {_ENVELOPE_FRESCO_ATE: time.time() + ttl_seconds, _ENVELOPE_VALOR: valor}
+    try:
+        cache_set(key, envelope, int(ttl_seconds + stale_seconds))
+    except Exception as e:
+        logger.debug("Cache set falhou (%s): %s", key, e)
+
+
+def _calcular_uma_vez(
+    key: str,
+    fetcher: Callable[[], Any],
+    ttl_seconds: int,
+    stale_seconds: float,
+    *,
+    esperar: bool,
+) -> Any:
+    """Calcula a chave com o lock do Redis (se houver). Sem o lock: espera o
+    outro worker gravar (esperar=True) até CACHE_LOCK_ESPERA_SEGUNDOS e então
+    calcula mesmo assim, ou desiste e devolve _AUSENTE (esperar=False)."""
+    r = _get_redis()
+    token = _adquirir_lock_redis(r, key) if r else "local"
+    if token is None:
+        if not esperar:
+            return _AUSENTE
+        limite = time.monotonic() + Config.CACHE_LOCK_ESPERA_SEGUNDOS
+        while time.monotonic() < limite:
+            time.sleep(_LOCK_REDIS_POLL_SEGUNDOS)
+            valor, _ = _ler_com_frescor(key)
+            if valor is not _AUSENTE:
+                return valor
+            token = _adquirir_lock_redis(r, key)
+            if token is not None:
+                break
+        else:
+            logger.warning("Cache: lock de %s não liberado a tempo; calculando sem ele", key)
+    try:
+        valor = fetcher()
+        _gravar_com_frescor(key, valor, ttl_seconds, stale_seconds)
+        return valor
+    finally:
+        if r and token not in (None, "local"):
+            _liberar_lock_redis(r, key, token)
+
+
+def _revalidar_em_background(key: str, recalcular: Callable[[], Any]) -> None:
+    """Recalcula a chave numa thread daemon (no máximo uma por chave e por
+    processo), dentro do app context de quem pediu, se houver."""
+    with _locks_chave_guarda:
+        if key in _revalidando:
+            return
+        _revalidando.add(key)
+
+    from flask import current_app, has_app_context
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def _run():
+        try:
+            if app is not None:
+                with app.app_context():
+                    recalcular()
+            else:
+                recalcular()
+        except Exception as e:
+            logger.warning("Revalidação em background de %s falhou: %s", key, e)
+        finally:
+            with _locks_chave_guarda:
+                _revalidando.discard(key)
+
+    threading.Thread(target=_run, name=f"cache-revalidar-{key}", daemon=True).start()
+
+
+def _stale_padrao(stale_seconds: float | None) -> float:
+    return Config.CACHE_STALE_SEGUNDOS if stale_seconds is None else stale_seconds
+
+
+def get_cached(
+    key: str,
+    fetcher: Callable[[], Any],
+    ttl_seconds: int = 300,
+    *,
+    stale_seconds: float | None = None,
+) -> Any:
+    """Lê a chave do cache (L1/Redis) ou calcula com fetcher() uma única vez.
+
+    Single-flight: no processo, um lock por chave; entre workers, um lock no
+    Redis (SET NX com expiração) — quem não pega o lock espera o valor que o
+    outro vai gravar. Passado ttl_seconds, durante stale_seconds (padrão
+    CACHE_STALE_SEGUNDOS) o valor antigo ainda é devolvido na hora e um único
+    recálculo roda em background. O valor precisa ser serializável em JSON
+    (vai ao Redis); exceções de fetcher() propagam e nada é gravado.
+    """
+    stale = _stale_padrao(stale_seconds)
+    valor, fresco = _ler_com_frescor(key)
+    if valor is not _AUSENTE:
+        if not fresco:
+            _revalidar_em_background(
+                key, lambda: _calcular_uma_vez(key, fetcher, ttl_seconds, stale, esperar=False)
+            )
+        return valor
+    with _lock_local(key):
+        valor, _ = _ler_com_frescor(key)
+        if valor is not _AUSENTE:
+            return valor
+        return _calcular_uma_vez(key, fetcher, ttl_seconds, stale, esperar=True)
+
+
 def get_static_cached(
     key: str,
     fetcher: Callable[[], Any],
     ttl_seconds: int = _STATIC_TTL_DEFAULT,
+    *,
+    stale_seconds: float | None = None,
+    cachear_none: bool = True,
+    padrao_em_erro: Any = _AUSENTE,
 ) -> Any:
     """
     Obtém valor do cache estático (só em memória por processo).
     Se expirado ou ausente, chama fetcher(), armazena e retorna.
     Uso: categorias, lista de supervisores (reduz leituras quando muitos usuários acessam junto).
+
+    Requisições simultâneas no mesmo processo esperam um único fetcher();
+    dentro da janela stale_seconds (padrão CACHE_STALE_SEGUNDOS) depois do
+    TTL, devolve o valor antigo e recarrega em background. Os objetos não vão
+    ao Redis, então não há lock entre workers — cada um carrega o seu.
+    Um static_cache_delete que chega enquanto fetcher() roda impede a
+    gravação do valor lido antes dele. cachear_none=False não guarda None
+    (ex.: "não encontrado" que pode ser só falha momentânea do banco).
+    Com padrao_em_erro, uma exceção de fetcher() devolve esse valor sem
+    guardá-lo — o próximo pedido tenta o banco de novo em vez de servir o
+    vazio da falha até o TTL (que com o barramento de invalidação é de horas).
+    Sem ele, a exceção propaga; na revalidação em background, o valor antigo
+    fica.
     """
-    now = time.time()
-    if key in _static_expiry and now < _static_expiry[key]:
-        return _static_cache[key]
-    val = fetcher()
-    _static_cache[key] = val
-    _static_expiry[key] = now + ttl_seconds
+    stale = _stale_padrao(stale_seconds)
+
+    def _carregar() -> Any:
+        geracao = _l1_estatico.geracao()
+        valor = fetcher()
+        if valor is not None or cachear_none:
+            _l1_estatico.gravar(key, valor, ttl_seconds, stale, geracao=geracao)
+        return valor
+
+    val, fresco = _l1_estatico.obter_com_frescor(key)
+    if val is not _AUSENTE:
+        if not fresco:
+            _revalidar_em_background(f"estatico:{key}", _carregar)
+        return val
+    with _lock_local(f"estatico:{key}"):
+        val = _l1_estatico.obter(key)
+        if val is not _AUSENTE:
+            return val
+        try:
+            val = _carregar()
+        except Exception as e:
+            if padrao_em_erro is _AUSENTE:
+                raise
+            logger.warning("Cache estático %s: falha ao carregar, sem cachear: %s", key, e)
+            return padrao_em_erro
+    _garantir_varredura()
     return val
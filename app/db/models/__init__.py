@@ -17,9 +17,15 @@ from app.db.models.chamado import (  # noqa: F401
     ChamadoParticipanteRow,
     ChamadoRow,
 )
+from app.db.models.chamado_timer import ChamadoTimerRow  # noqa: F401
 from app.db.models.config_setor_area import ConfigSetorAreaRow  # noqa: F401
+from app.db.models.exportacao import ExportacaoRow  # noqa: F401
 from app.db.models.grupo_rl import GrupoRLRow  # noqa: F401
 from app.db.models.historico import HistoricoRow  # noqa: F401
+from app.db.models.job_run import JobRunRow  # noqa: F401
 from app.db.models.notificacao import NotificacaoRow  # noqa: F401
+from app.db.models.pii_recriptografia import PiiRecriptografiaRow  # noqa: F401
+from app.db.models.relatorio_semanal import RelatorioSemanalRow  # noqa: F401
 from app.db.models.traducao_conteudo import TraducaoConteudoRow  # noqa: F401
 from app.db.models.usuario import UsuarioRow  # noqa: F401
+from app.db.models.usuario_busca import UsuarioBuscaRow  # noqa: F401
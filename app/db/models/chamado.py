@@ -41,6 +41,7 @@ class ChamadoRow(Base):
         Index("idx_chamados_solicitante", "solicitante_id", "prioridade", "data_abertura"),
         Index("idx_chamados_rl_codigo", "rl_codigo"),
         Index("idx_chamados_responsavel", "responsavel_id"),
+        Index("idx_chamados_status_escalacao_tick", "status", "escalacao_proximo_tick_em"),
         Index(
             "idx_chamados_supervisor_acesso", "supervisor_ids_com_acesso", postgresql_using="gin"
         ),
@@ -0,0 +1,47 @@
+"""Tabela chamado_timers — próximos gatilhos temporais de cada chamado.
+
+Uma linha por (chamado, tipo de gatilho): escalonamento (tick ou aviso
+prévio), aviso de 50%/80% do prazo de resolução, lembrete de confirmação.
+prazo_calculado é recalculado a cada mudança de estado do chamado (ver
+app/services/chamado_timers_service.py); due_at é o instante efetivo — igual
+ao prazo, ou mais tarde quando o despachante adiou um timer que não pôde
+resolver. O despachante só lê o que já venceu (idx_chamado_timers_due) em vez
+de varrer todos os chamados abertos.
+
+claimed_by/claimed_at marcam o timer enquanto um worker o processa — reclamado
+de novo se o claim envelhecer (worker morto no meio).
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ChamadoTimerRow(Base):
+    __tablename__ = "chamado_timers"
+    __table_args__ = (
+        UniqueConstraint("chamado_id", "tipo", name="uq_chamado_timer_tipo"),
+        Index("idx_chamado_timers_due", "due_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    chamado_id: Mapped[int] = mapped_column(
+        ForeignKey("chamados.id", ondelete="CASCADE"), nullable=False
+    )
+    tipo: Mapped[str] = mapped_column(Text, nullable=False)
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # NULL em linhas gravadas antes da coluna existir: vale due_at.
+    prazo_calculado: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    payload: Mapped[dict[str, Any]] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+    claimed_by: Mapped[str | None] = mapped_column(Text)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
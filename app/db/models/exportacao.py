@@ -0,0 +1,63 @@
+"""Tabela exportacoes — fila de exportações de chamados geradas em segundo plano.
+
+Uma linha por pedido (app/services/exportacao_service.py): quem pediu, o tipo
+(planilha de chamados ou relatório completo), o formato e os filtros do
+dashboard no momento do pedido. O worker reivindica linhas "pendente" com
+FOR UPDATE SKIP LOCKED, grava o arquivo no backend de armazenamento dos anexos
+e preenche arquivo/expira_em — o link de download só vale até expira_em.
+
+chave é o hash de (usuário, tipo, formato, parâmetros): o índice único parcial
+uq_exportacoes_chave_ativa deixa no máximo um pedido idêntico na fila, e um
+pedido igual dentro da janela de reuso devolve o arquivo já gerado.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ExportacaoRow(Base):
+    __tablename__ = "exportacoes"
+    __table_args__ = (
+        Index("idx_exportacoes_usuario_criado", "usuario_id", "criado_em"),
+        Index("idx_exportacoes_chave_criado", "chave", "criado_em"),
+        Index(
+            "idx_exportacoes_pendentes",
+            "criado_em",
+            postgresql_where=text("status = 'pendente'"),
+        ),
+        Index(
+            "uq_exportacoes_chave_ativa",
+            "chave",
+            unique=True,
+            postgresql_where=text("status IN ('pendente', 'processando')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    usuario_id: Mapped[str] = mapped_column(
+        ForeignKey("usuarios.id", ondelete="CASCADE"), nullable=False
+    )
+    tipo: Mapped[str] = mapped_column(Text, nullable=False)
+    formato: Mapped[str] = mapped_column(Text, nullable=False)
+    parametros: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    chave: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="pendente")
+    tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    executor: Mapped[str | None] = mapped_column(Text)
+    arquivo: Mapped[str | None] = mapped_column(Text)
+    nome_arquivo: Mapped[str | None] = mapped_column(Text)
+    tamanho_bytes: Mapped[int | None] = mapped_column(BigInteger)
+    linhas: Mapped[int | None] = mapped_column(Integer)
+    erro: Mapped[str | None] = mapped_column(Text)
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    iniciado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    concluido_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    expira_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
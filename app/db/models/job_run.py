@@ -0,0 +1,53 @@
+"""Tabela job_runs — uma linha por execução de job agendado (APScheduler/cron).
+
+Gravada por app/services/job_runs_service.py em volta de cada job que passa
+por executar_job_com_lock: início/fim, duração, atraso em relação ao disparo
+agendado, contadores extraídos do dict de resultado (processados, ações,
+erros) e o worker que detinha o lock (host:pid). intervalo_segundos guarda a
+cadência do gatilho no momento da execução — é contra ela que o resumo
+administrativo mede se a duração está chegando perto de sobrepor o próximo
+disparo.
+
+Execuções enfileiradas (cron HTTP assíncrono, job_runs_service.enfileirar_job)
+nascem com fim/sucesso nulos e são completadas ao terminar; o índice único
+parcial uq_job_runs_em_andamento garante no máximo uma em andamento por job.
+sucesso nulo com fim preenchido = pulada (outro worker detinha o lock).
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class JobRunRow(Base):
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("idx_job_runs_job_inicio", "job", "inicio"),
+        Index(
+            "uq_job_runs_em_andamento",
+            "job",
+            unique=True,
+            postgresql_where=text("fim IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    job: Mapped[str] = mapped_column(Text, nullable=False)
+    inicio: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    fim: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    duracao_ms: Mapped[int | None] = mapped_column(Integer)
+    agendado_para: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    atraso_ms: Mapped[int | None] = mapped_column(Integer)
+    intervalo_segundos: Mapped[float | None] = mapped_column(Float)
+    processados: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    acoes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    erros: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sucesso: Mapped[bool | None] = mapped_column(Boolean)
+    executor: Mapped[str] = mapped_column(Text, nullable=False)
+    erro: Mapped[str | None] = mapped_column(Text)
+    resultado: Mapped[dict[str, Any] | None] = mapped_column(JSONB)
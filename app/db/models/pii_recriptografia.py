@@ -0,0 +1,30 @@
+"""Tabela pii_recriptografia_progresso — checkpoint do job de (re)criptografia de PII.
+
+Uma linha por execução (app/services/pii_recriptografia.py): ultimo_id é o
+último usuário (ordem de id) cujo lote já foi gravado, na mesma transação dos
+UPDATEs do lote. Uma execução interrompida retoma de ultimo_id; com
+concluido_em preenchido, a próxima chamada recomeça a linha do zero.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PiiRecriptografiaRow(Base):
+    __tablename__ = "pii_recriptografia_progresso"
+
+    execucao: Mapped[str] = mapped_column(Text, primary_key=True)
+    ultimo_id: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    processados: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    atualizados: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    conflitos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    erros: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    iniciado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    atualizado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    concluido_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
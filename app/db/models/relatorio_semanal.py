@@ -0,0 +1,39 @@
+"""Tabela relatorios_semanais — snapshot do relatório semanal e o que já foi entregue.
+
+Uma linha por dia de relatório (data_ref, no fuso de Brasília), gravada por
+app/services/report_service.py antes do primeiro envio: snapshot guarda os
+índices por responsável e por área, as contagens e os fragmentos HTML/texto
+das tabelas já renderizados — cada público (supervisor, admin, gestor de área,
+níveis superiores) monta o e-mail só com eles. entregues acumula a chave de
+cada destinatário que recebeu ("responsavel:<id>", "admin:<id>", "area:<área>",
+"nivel:<nível>"); o reenvio parte do mesmo snapshot e pula essas chaves.
+
+Nada de e-mail/nome de usuário aqui: os destinatários são resolvidos na hora
+do envio (a PII de usuarios fica cifrada).
+"""
+
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Date, DateTime, Integer, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RelatorioSemanalRow(Base):
+    __tablename__ = "relatorios_semanais"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    data_ref: Mapped[date] = mapped_column(Date, nullable=False, unique=True)
+    snapshot: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    entregues: Mapped[list[str]] = mapped_column(
+        JSONB, nullable=False, server_default=text("'[]'::jsonb")
+    )
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="enviando")
+    tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    atualizado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -10,7 +10,7 @@ banco não toca pii_encryption.py.
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Index, Integer, Text, text
+from sqlalchemy import Boolean, DateTime, Index, Integer, Text, func, text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -30,6 +30,7 @@ class UsuarioRow(Base):
             postgresql_where=text("email_lookup_hash IS NOT NULL"),
         ),
         Index("idx_usuarios_areas", "areas", postgresql_using="gin"),
+        Index("idx_usuarios_atualizado_em", "atualizado_em"),
     )
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
@@ -57,3 +58,11 @@ class UsuarioRow(Base):
     auth_provider: Mapped[str] = mapped_column(Text, nullable=False, default="local")
     criado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     mfa_lembrete_enviado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Marca d'água do diretório em memória (app/services/diretorio_usuarios.py).
+    # clock_timestamp(), não now(): duas escritas na mesma transação ficam distintas.
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.clock_timestamp(),
+    )
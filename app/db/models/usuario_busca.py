@@ -0,0 +1,23 @@
+"""Tabela usuarios_busca — índice cego (blind index) da busca de usuários.
+
+Com PII criptografada, nome/email são ciphertext Fernet e não dá para fazer
+LIKE no banco. Cada linha guarda um n-grama do nome/e-mail do usuário (sem
+acento, minúsculo) passado por HMAC — o banco compara tokens sem ver o texto.
+Mantida por app/services/busca_usuarios.py no save/update do usuário; some
+junto com o usuário (ON DELETE CASCADE).
+"""
+
+from sqlalchemy import ForeignKey, Index, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class UsuarioBuscaRow(Base):
+    __tablename__ = "usuarios_busca"
+    __table_args__ = (Index("idx_usuarios_busca_usuario", "usuario_id"),)
+
+    token: Mapped[str] = mapped_column(Text, primary_key=True)
+    usuario_id: Mapped[str] = mapped_column(
+        ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True
+    )
@@ -165,10 +165,14 @@ def _get_setores_banco():
     app.models_categorias -> app (pacote) -> app.i18n. Isolado numa função à
     parte pra dar pra mockar em teste sem precisar de banco real."""
     try:
-        from app.cache import get_static_cached
+        from app.cache import get_static_cached, ttl_invalidavel
         from app.models_categorias import CategoriaSetor
 
-        return get_static_cached("categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800)
+        return get_static_cached(
+            "categorias_setor",
+            lambda: CategoriaSetor.get_all(levantar_erro=True),
+            ttl_seconds=ttl_invalidavel(1800),
+        )
     except Exception:
         logger.exception("Erro ao carregar setores do banco para tradução")
         return []
@@ -12,6 +12,15 @@ from app.exceptions import ValidacaoChamadoError
 logger = logging.getLogger(__name__)
 
 
+def _sincronizar_timers(session, chamado_id) -> None:
+    """Recalcula chamado_timers na transação da escrita (no-op com
+    CHAMADO_TIMERS_ENABLED desligado). Import inline: o serviço importa os
+    jobs de SLA/lembrete, que importam este módulo."""
+    from app.services.chamado_timers_service import sincronizar_timers_se_ativo
+
+    sincronizar_timers_se_ativo(session, chamado_id)
+
+
 class Chamado:
     """Representação de um chamado (linha da tabela `chamados` no Postgres)."""
 
@@ -522,6 +531,7 @@ class Chamado:
                 setattr(row, k, v)
             chamado._sincronizar_participantes(session)
             chamado._sincronizar_observadores(session)
+            _sincronizar_timers(session, cid)
 
     def _sincronizar_participantes(self, session) -> None:
         """Substitui todos os participantes do chamado pelo estado atual de
@@ -578,6 +588,7 @@ class Chamado:
                     self.data_abertura = row.data_abertura
                 self._sincronizar_participantes(session)
                 self._sincronizar_observadores(session)
+                _sincronizar_timers(session, self.id)
             return self.id
         except Exception as e:
             logger.exception("Erro ao salvar chamado %s: %s", self.id, e)
@@ -601,6 +612,7 @@ class Chamado:
                 for k, v in alteracoes.items():
                     setattr(row, k, v)
                     setattr(self, k, v)
+                _sincronizar_timers(session, self.id)
             return True
         except Exception as e:
             logger.exception("Erro ao atualizar chamado %s: %s", self.id, e)
@@ -654,6 +666,7 @@ class Chamado:
                     return False
                 for campo, valor in atualizado.items():
                     setattr(self, campo, valor)
+                _sincronizar_timers(session, self.id)
             return True
         except Exception as e:
             logger.exception("Erro no CAS do chamado %s: %s", self.id, e)
@@ -145,8 +145,12 @@ class CategoriaSetor:
             return False
 
     @classmethod
-    def get_all(cls):
-        """Retorna todos os setores ativos (para formulários e seletores)."""
+    def get_all(cls, *, levantar_erro: bool = False):
+        """Retorna todos os setores ativos (para formulários e seletores).
+
+        levantar_erro=True propaga a falha do banco em vez de devolver [] — para
+        quem guarda o resultado em cache (get_static_cached com padrao_em_erro).
+        """
         try:
             with db_module.SessionLocal() as session:
                 rows = (
@@ -159,6 +163,8 @@ class CategoriaSetor:
                 return [cls._from_row(r) for r in rows]
         except Exception as e:
             logger.error("Erro ao buscar setores: %s", e)
+            if levantar_erro:
+                raise
             return []
 
     @classmethod
@@ -337,8 +343,11 @@ class CategoriaGate:
             return False
 
     @classmethod
-    def get_all(cls):
-        """Retorna todos os gates ordenados por gate_pai + ordem (admin: inclui inativos)"""
+    def get_all(cls, *, levantar_erro: bool = False):
+        """Retorna todos os gates ordenados por gate_pai + ordem (admin: inclui inativos).
+
+        levantar_erro=True propaga a falha do banco em vez de devolver [].
+        """
         try:
             with db_module.SessionLocal() as session:
                 rows = (
@@ -348,11 +357,16 @@ class CategoriaGate:
                 return sorted(gates, key=lambda x: (x.gate_pai or "", x.ordem))
         except Exception as e:
             logger.error("Erro ao buscar gates: %s", e)
+            if levantar_erro:
+                raise
             return []
 
     @classmethod
-    def get_all_ativos(cls):
-        """Retorna apenas gates ativos, ordenados por gate_pai + ordem (para o formulário)"""
+    def get_all_ativos(cls, *, levantar_erro: bool = False):
+        """Retorna apenas gates ativos, ordenados por gate_pai + ordem (para o formulário).
+
+        levantar_erro=True propaga a falha do banco em vez de devolver [].
+        """
         try:
             with db_module.SessionLocal() as session:
                 rows = (
@@ -366,6 +380,8 @@ class CategoriaGate:
                 return sorted(gates, key=lambda x: (x.gate_pai or "", x.ordem))
         except Exception as e:
             logger.error("Erro ao buscar gates ativos: %s", e)
+            if levantar_erro:
+                raise
             return []
 
     @classmethod
@@ -522,8 +538,11 @@ class CategoriaImpacto:
             return False
 
     @classmethod
-    def get_all(cls):
-        """Retorna todos os impactos ativos (para formulários e seletores)."""
+    def get_all(cls, *, levantar_erro: bool = False):
+        """Retorna todos os impactos ativos (para formulários e seletores).
+
+        levantar_erro=True propaga a falha do banco em vez de devolver [].
+        """
         try:
             with db_module.SessionLocal() as session:
                 rows = (
@@ -536,6 +555,8 @@ class CategoriaImpacto:
                 return [cls._from_row(r) for r in rows]
         except Exception as e:
             logger.error("Erro ao buscar impactos: %s", e)
+            if levantar_erro:
+                raise
             return []
 
     @classmethod
@@ -1,3 +1,4 @@
+import copy
 import logging
 import unicodedata
 from datetime import UTC, datetime
@@ -7,11 +8,15 @@ from sqlalchemy import select
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db as db_module
+from app.cache import get_static_cached, static_cache_delete
 from app.db.models.usuario import UsuarioRow
+from app.services.busca_usuarios import atualizar_indice as atualizar_indice_busca
+from app.services.busca_usuarios import buscar_ids as buscar_ids_indice
 from app.services.pii_encryption import (
     email_lookup_hash,
     is_pii_encryption_enabled,
     maybe_decrypt,
+    maybe_decrypt_many,
     maybe_encrypt,
 )
 
@@ -20,6 +25,9 @@ logger = logging.getLogger(__name__)
 # Chave de cache para lista de usuários (usada em cache_delete nas rotas)
 CACHE_KEY_USUARIOS = "usuarios_list"
 
+# Usuário autenticado no cache estático (get_by_id_sessao), por id
+STATIC_CACHE_KEY_SESSAO = "usuario_sessao:{}"
+
 # Valores válidos de nivel_gestao — lista fechada
 NIVEIS_GESTAO_VALIDOS = frozenset({"gestor_setor", "gerente_producao", "assistente_gm", "gm"})
 
@@ -249,11 +257,25 @@ class Usuario(UserMixin):
         return usuario
 
     @classmethod
-    def _from_row(cls, row: UsuarioRow) -> "Usuario":
+    def _from_rows(cls, rows) -> list["Usuario"]:
+        """_from_row em lote: descriptografa a PII de todas as linhas de uma vez."""
+        pii = maybe_decrypt_many(
+            valor
+            for row in rows
+            for valor in (row.email or "", row.nome or "", row.mfa_secret or "")
+        )
+        return [cls._from_row(row, pii[3 * i : 3 * i + 3]) for i, row in enumerate(rows)]
+
+    @classmethod
+    def _from_row(cls, row: UsuarioRow, pii: list[str] | None = None) -> "Usuario":
+        """pii: (email, nome, mfa_secret) já descriptografados, vindos de _from_rows."""
+        if pii is None:
+            pii = maybe_decrypt_many([row.email or "", row.nome or "", row.mfa_secret or ""])
+        email, nome, mfa_secret = pii
         usuario = cls(
             id=row.id,
-            email=maybe_decrypt(row.email or ""),
-            nome=maybe_decrypt(row.nome or ""),
+            email=email,
+            nome=nome,
             perfil=row.perfil,
             areas=list(row.areas or []),
             exp_total=row.exp_total,
@@ -267,7 +289,7 @@ class Usuario(UserMixin):
             ativo=row.ativo,
             nivel_gestao=row.nivel_gestao,
             mfa_enabled=row.mfa_enabled,
-            mfa_secret=(maybe_decrypt(row.mfa_secret) if row.mfa_secret else None),
+            mfa_secret=mfa_secret or None,
             mfa_backup_codes=list(row.mfa_backup_codes or []),
             auth_provider=row.auth_provider,
             criado_em=row.criado_em,
@@ -346,6 +368,41 @@ class Usuario(UserMixin):
             logger.exception("Erro ao buscar usuário por ID: %s", e)
         return None
 
+    @classmethod
+    def get_by_id_sessao(cls, user_id: str):
+        """get_by_id para o user_loader: o usuário fica em memória no worker
+        por CACHE_USUARIO_SESSAO_SEGUNDOS (sem ir ao banco nem descriptografar
+        PII a cada request). save/update/delete invalidam a cópia, também nos
+        outros workers (static_cache_delete → barramento de invalidação).
+
+        Devolve uma cópia rasa por chamada: update altera o próprio objeto
+        antes do commit, e current_user não pode ser o objeto do cache
+        compartilhado com os outros requests do mesmo usuário."""
+        from config import Config
+
+        ttl = Config.CACHE_USUARIO_SESSAO_SEGUNDOS
+        if ttl <= 0:
+            return cls.get_by_id(user_id)
+        usuario = get_static_cached(
+            STATIC_CACHE_KEY_SESSAO.format(user_id),
+            lambda: cls.get_by_id(user_id),
+            ttl,
+            stale_seconds=0,
+            cachear_none=False,
+        )
+        return copy.copy(usuario) if usuario is not None else None
+
+    @classmethod
+    def invalidar_cache_sessao(cls, user_id: str) -> None:
+        """Descarta o usuário do cache do user_loader (todos os workers) e
+        marca o diretório em memória deste worker para atualizar.
+        Chamar depois do commit de qualquer escrita em usuarios — e também
+        quando a escrita falha, já que o objeto pode ter ficado alterado."""
+        from app.services.diretorio_usuarios import marcar_diretorio_desatualizado
+
+        static_cache_delete(STATIC_CACHE_KEY_SESSAO.format(user_id))
+        marcar_diretorio_desatualizado()
+
     def save(self):
         """Salva o usuário no Postgres (upsert — mesma semântica do antigo
         Firestore .set(), que sempre sobrescreve o documento inteiro)."""
@@ -357,9 +414,12 @@ class Usuario(UserMixin):
                     row.criado_em = self.criado_em or datetime.now(UTC)
                     session.add(row)
                 self._preencher_row(row)
+                atualizar_indice_busca(session, self.id, self.nome, self.email)
+            self.invalidar_cache_sessao(self.id)
             return True
         except Exception as e:
             logger.exception("Erro ao salvar usuário: %s", e)
+            self.invalidar_cache_sessao(self.id)
             return False
 
     def update(self, **kwargs):
@@ -388,6 +448,9 @@ class Usuario(UserMixin):
                     row.nome = maybe_encrypt(kwargs["nome"])
                     atualizou = True
 
+                if "email" in kwargs or "nome" in kwargs:
+                    atualizar_indice_busca(session, self.id, self.nome, self.email)
+
                 if "perfil" in kwargs:
                     self.perfil = kwargs["perfil"]
                     row.perfil = kwargs["perfil"]
@@ -481,9 +544,12 @@ class Usuario(UserMixin):
                         row.conquistas = g_data["conquistas"]
                         atualizou = True
 
-                return atualizou
+            if atualizou:
+                self.invalidar_cache_sessao(self.id)
+            return atualizou
         except Exception as e:
             logger.exception("Erro ao atualizar usuário: %s", e)
+            self.invalidar_cache_sessao(self.id)
             return False
 
     def delete(self):
@@ -493,9 +559,11 @@ class Usuario(UserMixin):
                 row = session.get(UsuarioRow, self.id)
                 if row is not None:
                     session.delete(row)
+            self.invalidar_cache_sessao(self.id)
             return True
         except Exception as e:
             logger.exception("Erro ao deletar usuário: %s", e)
+            self.invalidar_cache_sessao(self.id)
             return False
 
     @classmethod
@@ -517,7 +585,7 @@ class Usuario(UserMixin):
                     .scalars()
                     .all()
                 )
-                return {row.id: cls._from_row(row) for row in rows}
+                return {u.id: u for u in cls._from_rows(rows)}
         except Exception as e:
             logger.exception("Erro ao buscar usuários em lote: %s", e)
             return {}
@@ -529,7 +597,25 @@ class Usuario(UserMixin):
         Quando encryption ON: Postgres não pode ordenar por campo criptografado,
         então busca sem order_by e ordena em Python após decrypt.
         Quando encryption OFF: usa ORDER BY nome nativo do Postgres.
+
+        Com o diretório em memória ligado (CACHE_DIRETORIO_USUARIOS_SEGUNDOS),
+        responde dele — só as linhas alteradas desde a última leitura vão ao
+        banco; se a carga inicial falhar, cai na consulta direta abaixo.
         """
+        from app.services.diretorio_usuarios import obter_diretorio
+
+        diretorio = obter_diretorio()
+        if diretorio is not None:
+            try:
+                usuarios = diretorio.todos()
+                if len(usuarios) >= MAX_USUARIOS_GET_ALL:
+                    logger.warning(
+                        "Usuario.get_all() atingiu o teto de segurança (%d) — resultado pode estar incompleto",
+                        MAX_USUARIOS_GET_ALL,
+                    )
+                return usuarios[:MAX_USUARIOS_GET_ALL]
+            except Exception as e:
+                logger.warning("Diretório de usuários indisponível, lendo do banco: %s", e)
         try:
             with db_module.SessionLocal() as session:
                 if is_pii_encryption_enabled():
@@ -538,7 +624,7 @@ class Usuario(UserMixin):
                         .scalars()
                         .all()
                     )
-                    usuarios = [cls._from_row(row) for row in rows]
+                    usuarios = cls._from_rows(rows)
                     if len(usuarios) >= MAX_USUARIOS_GET_ALL:
                         logger.warning(
                             "Usuario.get_all() atingiu o teto de segurança (%d) — resultado pode estar incompleto",
@@ -553,7 +639,7 @@ class Usuario(UserMixin):
                         .scalars()
                         .all()
                     )
-                    usuarios = [cls._from_row(row) for row in rows]
+                    usuarios = cls._from_rows(rows)
                     if len(usuarios) >= MAX_USUARIOS_GET_ALL:
                         logger.warning(
                             "Usuario.get_all() atingiu o teto de segurança (%d) — resultado pode estar incompleto",
@@ -583,7 +669,7 @@ class Usuario(UserMixin):
                     .scalars()
                     .all()
                 )
-                usuarios = [cls._from_row(row) for row in rows]
+                usuarios = cls._from_rows(rows)
                 if len(usuarios) >= MAX_USUARIOS_GET_ALL:
                     logger.warning(
                         "Usuario.get_sem_mfa() atingiu o teto de segurança (%d) — resultado pode estar incompleto",
@@ -632,6 +718,9 @@ class Usuario(UserMixin):
         acento-insensitive).
 
         Usa get_all() com filtragem em Python para compatibilidade com PII encryption.
+        Com o índice cego ligado (BUSCA_USUARIOS_INDICE_CEGO, ver
+        app/services/busca_usuarios.py), o banco devolve só os candidatos e a
+        mesma filtragem roda sobre eles, sem descriptografar o diretório todo.
 
         Ignora acentos além de maiúsculas/minúsculas — achado ao vivo em
         produção, 2026-08-21: buscar "Júlia" (grafia correta em português)
@@ -644,7 +733,13 @@ class Usuario(UserMixin):
         if not q_low:
             return []
         try:
-            todos = cls.get_all()
+            ids = buscar_ids_indice(q)
+            if ids is None:
+                todos = cls.get_all()
+            else:
+                todos = sorted(
+                    cls.get_by_ids(list(ids)).values(), key=lambda u: (u.nome or "").lower()
+                )
             resultado = []
             for u in todos:
                 if not getattr(u, "ativo", True):
@@ -682,7 +777,22 @@ class Usuario(UserMixin):
         incluir-participantes (achado ao vivo em produção, 2026-08-21). A
         sessão é limpa no fim da request por app.teardown_appcontext
         (app/db/__init__.py), então não precisa (nem deve) ser fechada aqui.
+
+        Com o diretório em memória ligado, é uma consulta ao índice por área.
         """
+        from app.services.diretorio_usuarios import obter_diretorio
+
+        def _responsavel(usuario) -> bool:
+            return (
+                usuario.perfil in ("supervisor", "admin") or usuario.nivel_gestao == "gestor_setor"
+            )
+
+        diretorio = obter_diretorio()
+        if diretorio is not None:
+            try:
+                return [u for u in diretorio.por_area(area) if _responsavel(u)]
+            except Exception as e:
+                logger.warning("Diretório de usuários indisponível, lendo do banco: %s", e)
         try:
             usuarios = []
             session = db_module.SessionLocal()
@@ -691,12 +801,8 @@ class Usuario(UserMixin):
                 .scalars()
                 .all()
             )
-            for row in rows:
-                usuario = cls._from_row(row)
-                if (
-                    usuario.perfil in ("supervisor", "admin")
-                    or usuario.nivel_gestao == "gestor_setor"
-                ):
+            for usuario in cls._from_rows(rows):
+                if _responsavel(usuario):
                     usuarios.append(usuario)
             return usuarios
         except Exception as e:
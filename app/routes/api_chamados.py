@@ -1,13 +1,15 @@
-"""Rotas núcleo de chamados: status, edição, bulk, paginação, confirmação, onboarding."""
+"""Rotas núcleo de chamados: status, edição, bulk, paginação, exportação para BI, confirmação, onboarding."""
 
 import contextlib
 import logging
 import threading
+from datetime import datetime
 
-from flask import current_app, jsonify, request, session
+from flask import Response, current_app, jsonify, request, session, stream_with_context
 from flask_login import current_user, login_required
 
 from app.db.models.chamado import ChamadoRow
+from app.decoradores import requer_supervisor_area
 from app.i18n import get_translation
 from app.limiter import limiter
 from app.models import Chamado
@@ -16,6 +18,18 @@ from app.routes import main
 from app.services.analytics import obter_sla_para_exibicao
 from app.services.api_response import erro_json, sucesso_json
 from app.services.assignment import atribuidor  # noqa: F401  # usado em testes via patch
+from app.services.exportacao_colunar import (
+    FORMATOS,
+    MIMETYPES,
+    colunas_pedidas,
+    condicoes_periodo,
+    gerar_csv,
+    gerar_parquet,
+    lotes_permitidos,
+    parquet_disponivel,
+    transmitir,
+)
+from app.services.exportacao_service import filtros_do_request
 from app.services.filters import aplicar_filtros_dashboard_com_paginacao
 from app.services.permissions import usuario_pode_operar_chamado, usuario_pode_ver_chamado
 from app.services.permissoes_edicao_chamado import (
@@ -508,6 +522,48 @@ def api_chamados_paginar():
         return erro_json(_t("internal_error_retry"), 500)
 
 
+@main.route("/api/export/chamados", methods=["GET"])
+@requer_supervisor_area
+@limiter.limit("30 per hour")
+def api_export_chamados():
+    """Exporta os chamados do escopo do usuário em CSV ou Parquet, em streaming.
+
+    Query string: formato (csv | parquet, padrão csv), colunas (lista separada
+    por vírgula, ver exportacao_colunar.COLUNAS_EXPORTAVEIS), de/ate
+    (AAAA-MM-DD sobre data_abertura) e os filtros do dashboard (status,
+    categoria, gate, responsavel, rl_codigo, search).
+
+    Returns:
+        200 arquivo (Content-Disposition: attachment), gerado por lotes
+        400 — parâmetro inválido
+        501 — formato=parquet sem pyarrow instalado
+    """
+    formato = (request.args.get("formato") or "csv").strip().lower()
+    if formato not in FORMATOS:
+        return erro_json(f"formato inválido (use {' ou '.join(FORMATOS)})", 400)
+    try:
+        colunas = colunas_pedidas(request.args.get("colunas"))
+        periodo = condicoes_periodo(request.args.get("de"), request.args.get("ate"))
+    except ValueError as e:
+        return erro_json(str(e), 400)
+    if formato == "parquet" and not parquet_disponivel():
+        return erro_json("formato parquet indisponível: pyarrow não instalado", 501)
+
+    lotes = lotes_permitidos(
+        current_user._get_current_object(), filtros_do_request(request.args), periodo
+    )
+    gerar = gerar_parquet if formato == "parquet" else gerar_csv
+    nome = f"chamados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+    logger.info(
+        "Exportação BI: usuario=%s formato=%s colunas=%s", current_user.id, formato, colunas
+    )
+    return Response(
+        stream_with_context(transmitir(gerar(lotes, colunas), formato)),
+        mimetype=MIMETYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome}"'},
+    )
+
+
 @main.route("/api/carregar-mais", methods=["POST"])
 @login_required
 def carregar_mais():
@@ -404,7 +404,7 @@ def _notificar_participante_incluido(
         with app.app_context():
             try:
                 from app.services.notifications import notificar_participante_incluido
-                from app.services.notifications_inapp import criar_notificacao
+                from app.services.notifications_inapp import criar_notificacoes_em_lote
                 from app.services.webpush_service import enviar_webpush_usuario
 
                 numero = dados_chamado.get("numero_chamado") or "N/A"
@@ -412,12 +412,38 @@ def _notificar_participante_incluido(
                 base_url = current_app.config.get("APP_BASE_URL", "").rstrip("/")
                 url_chamado = f"{base_url}/chamado/{chamado_id}" if base_url else None
 
+                destinos = []
                 for item in adicionados:
                     sup_id = item.get("supervisor_id")
                     destino = Usuario.get_by_id(sup_id)
-                    if not destino:
-                        continue
+                    if destino:
+                        destinos.append((item, sup_id, destino))
 
+                titulo = get_translation(
+                    "notification_participant_included_title", "en", numero=numero
+                )
+                mensagem = get_translation(
+                    "notification_participant_included_message",
+                    "en",
+                    numero=numero,
+                    categoria=categoria,
+                )
+                criar_notificacoes_em_lote(
+                    [
+                        {
+                            "usuario_id": sup_id,
+                            "chamado_id": chamado_id,
+                            "numero_chamado": numero,
+                            "titulo": titulo,
+                            "mensagem": mensagem,
+                            "tipo": "participante_incluido",
+                            "categoria": categoria,
+                        }
+                        for _item, sup_id, _destino in destinos
+                    ]
+                )
+
+                for item, sup_id, destino in destinos:
                     notificar_participante_incluido(
                         chamado_id=chamado_id,
                         numero_chamado=numero,
@@ -426,23 +452,6 @@ def _notificar_participante_incluido(
                         responsavel_usuario=destino,
                     )
 
-                    criar_notificacao(
-                        usuario_id=sup_id,
-                        chamado_id=chamado_id,
-                        numero_chamado=numero,
-                        titulo=get_translation(
-                            "notification_participant_included_title", "en", numero=numero
-                        ),
-                        mensagem=get_translation(
-                            "notification_participant_included_message",
-                            "en",
-                            numero=numero,
-                            categoria=categoria,
-                        ),
-                        tipo="participante_incluido",
-                        categoria=categoria,
-                    )
-
                     enviar_webpush_usuario(
                         sup_id,
                         titulo=get_translation(
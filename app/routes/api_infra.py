@@ -1,4 +1,5 @@
-"""Rotas de infraestrutura/observabilidade: health check, cron interno, relatório CSP.
+"""Rotas de infraestrutura/observabilidade: health check, cron interno, relatório CSP,
+telemetria dos jobs agendados e do cache em memória.
 
 Separado de api_chamados.py (que fica só com regra de negócio de chamado) —
 health/cron/csp-report são três categorias de infra que não têm relação de
@@ -11,11 +12,12 @@ import hmac
 import logging
 import os
 
-from flask import abort, current_app, jsonify, request
+from flask import abort, current_app, jsonify, request, url_for
 from sqlalchemy import text
 
 from app import db as db_module
-from app.cache import cache_set
+from app.cache import cache_estatisticas, cache_set
+from app.decoradores import requer_perfil
 from app.limiter import limiter
 from app.routes import main
 from app.services.api_response import erro_json, sucesso_json
@@ -127,9 +129,22 @@ def _obter_cron_token_request() -> str:
     return request.headers.get("X-Cron-Token", "").strip()
 
 
+def _autenticar_cron():
+    """None se o X-Cron-Token confere com CRON_SECRET; senão a resposta de erro."""
+    secret = os.getenv("CRON_SECRET", "").strip()
+    if not secret:
+        logger.error("cron chamado sem CRON_SECRET configurado no ambiente")
+        return erro_json("cron não configurado", 503)
+
+    provided = _obter_cron_token_request()
+    if not provided or not hmac.compare_digest(provided, secret):
+        abort(401)
+    return None
+
+
 @main.route("/internal/cron/sla-escalacao", methods=["POST"])
 def cron_sla_escalacao():
-    """Executa sob demanda o job de escalonamento SLA (motor unificado + avisos).
+    """Dispara sob demanda o job de escalonamento SLA (motor unificado + avisos).
 
     Gatilho manual/backup, não usado em produção normal: o servidor físico
     on-premise fica sempre ligado, então o APScheduler in-process
@@ -141,50 +156,136 @@ def cron_sla_escalacao():
     o lock Redis já existente (`executar_job_com_lock`) pra não duplicar
     execução caso o scheduler in-process já esteja rodando.
 
+    Assíncrona por padrão: a execução é reservada em job_runs e roda numa
+    thread (job_runs_service.enfileirar_job) — o curl não prende um worker
+    gunicorn pelo tempo do job. Disparos enquanto há execução em andamento
+    recebem o id dela (nova=false). Acompanhar por
+    GET /internal/cron/sla-escalacao/<id>. ?aguardar=1 mantém o modo antigo
+    (executa dentro do request e devolve o resultado).
+
     Autenticação: header X-Cron-Token: <CRON_SECRET>.
     Sem CRON_SECRET configurado, a rota nunca fica aberta por engano.
 
     Returns:
-        200 {"sucesso": true, "dados": {...}}  — job executado
+        202 {"sucesso": true, "dados": {"execucao_id", "nova", "status_url"}}
+        200 {"sucesso": true, "dados": {...}}  — ?aguardar=1, job executado
         401                                     — token ausente ou inválido
         503                                     — CRON_SECRET não configurado
     """
-    secret = os.getenv("CRON_SECRET", "").strip()
-    if not secret:
-        logger.error("cron_sla_escalacao chamado sem CRON_SECRET configurado no ambiente")
-        return erro_json("cron não configurado", 503)
-
-    provided = _obter_cron_token_request()
-    if not provided or not hmac.compare_digest(provided, secret):
-        abort(401)
+    negado = _autenticar_cron()
+    if negado is not None:
+        return negado
 
+    from app.services.job_runs_service import enfileirar_job
     from app.services.scheduler_lock import executar_job_com_lock
     from app.services.sla_escalacao_service import (
         processar_avisos_resolucao,
         processar_escalonamento,
     )
 
+    app = current_app._get_current_object()
     resultado: dict = {}
     erro: Exception | None = None
 
     def _job():
         nonlocal erro
-        try:
-            resultado["escalonamento"] = processar_escalonamento()
-            resultado["avisos_resolucao"] = processar_avisos_resolucao()
-        except Exception as exc:  # noqa: BLE001 — convertido em 500 genérico abaixo
-            erro = exc
-
-    executar_job_com_lock(current_app._get_current_object(), "sla_escalacao", _job)
+        with app.app_context():
+            try:
+                resultado["escalonamento"] = processar_escalonamento()
+                resultado["avisos_resolucao"] = processar_avisos_resolucao()
+            except Exception as exc:  # noqa: BLE001 — convertido em 500 genérico abaixo
+                erro = exc
+                raise  # registrado como falha em job_runs
+        return resultado
+
+    if request.args.get("aguardar") != "1":
+        execucao_id, nova = enfileirar_job(app, "sla_escalacao", _job)
+        logger.info("cron_sla_escalacao: execução %s (nova=%s)", execucao_id, nova)
+        return sucesso_json(
+            202,
+            dados={
+                "execucao_id": execucao_id,
+                "nova": nova,
+                "status_url": url_for("main.cron_sla_escalacao_status", execucao_id=execucao_id),
+            },
+        )
+
+    executar_job_com_lock(app, "sla_escalacao", _job)
 
     if erro is not None:
-        logger.exception("Erro no job SLA Escalonamento via cron HTTP: %s", erro)
         return erro_json("erro ao processar escalonamento", 500)
 
     logger.info("cron_sla_escalacao executado via HTTP: %s", resultado)
     return sucesso_json(dados=resultado)
 
 
+@main.route("/internal/cron/sla-escalacao/<int:execucao_id>", methods=["GET"])
+def cron_sla_escalacao_status(execucao_id: int):
+    """Estado de uma execução disparada pelo cron (polling do curl/workflow).
+
+    Autenticação igual à do disparo (X-Cron-Token).
+
+    Returns:
+        200 {"sucesso": true, "dados": {"status": "em_andamento"|"sucesso"|
+            "falha"|"pulado", "resultado", "erro", "duracao_ms", ...}}
+        404 — execução inexistente (ou de outro job)
+    """
+    negado = _autenticar_cron()
+    if negado is not None:
+        return negado
+
+    from app.services.job_runs_service import obter_execucao
+
+    execucao = obter_execucao(execucao_id, "sla_escalacao")
+    if execucao is None:
+        return erro_json("execução não encontrada", 404)
+    return sucesso_json(dados=execucao)
+
+
+@main.route("/api/admin/jobs", methods=["GET"])
+@requer_perfil("admin")
+def admin_jobs():
+    """Tendência das execuções dos jobs agendados (tabela job_runs).
+
+    Query string: dias (janela, padrão 7, máx. 90) e ultimas (execuções
+    recentes por job, padrão 10, máx. 100). Cada job traz duração média/p95/
+    máxima, atraso sobre o disparo agendado, erros, tendência diária e
+    alerta_sobreposicao quando a duração se aproxima do intervalo do gatilho
+    (JOB_RUNS_ALERTA_FRACAO_INTERVALO).
+
+    Returns:
+        200 {"sucesso": true, "dados": [...]}
+        400                                    — parâmetro inválido
+    """
+    from app.services.job_runs_service import resumo_jobs
+
+    try:
+        dias = min(max(int(request.args.get("dias", 7)), 1), 90)
+        ultimas = min(max(int(request.args.get("ultimas", 10)), 1), 100)
+    except ValueError:
+        return erro_json("parâmetro inválido", 400)
+
+    dados = resumo_jobs(
+        dias,
+        ultimas=ultimas,
+        fracao_alerta=current_app.config.get("JOB_RUNS_ALERTA_FRACAO_INTERVALO", 0.8),
+    )
+    return sucesso_json(dados=dados)
+
+
+@main.route("/api/admin/cache", methods=["GET"])
+@requer_perfil("admin")
+def admin_cache():
+    """Ocupação do cache em memória deste worker (app/cache.py): entradas e
+    bytes aproximados do L1 e do cache estático, por namespace, com hits,
+    misses, despejos LRU e expirados — cada worker responde pelo seu.
+
+    Returns:
+        200 {"sucesso": true, "dados": {"redis": bool, "l1": {...}, "estatico": {...}}}
+    """
+    return sucesso_json(dados=cache_estatisticas())
+
+
 @main.route("/api/csp-report", methods=["POST"])
 @limiter.limit("20 per minute", methods=["POST"])
 def csp_report():
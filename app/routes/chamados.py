@@ -5,7 +5,7 @@ import logging
 from flask import Response, flash, redirect, render_template, request, url_for
 from flask_login import current_user
 
-from app.cache import get_static_cached
+from app.cache import get_static_cached, ttl_invalidavel
 from app.decoradores import requer_solicitante
 from app.i18n import flash_t
 from app.models_categorias import CategoriaImpacto, CategoriaSetor
@@ -22,7 +22,12 @@ logger = logging.getLogger(__name__)
 
 
 def _setores_ativos():
-    setores = get_static_cached("categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800)
+    setores = get_static_cached(
+        "categorias_setor",
+        lambda: CategoriaSetor.get_all(levantar_erro=True),
+        ttl_seconds=ttl_invalidavel(1800),
+        padrao_em_erro=[],
+    )
     return [s for s in setores if getattr(s, "ativo", True)]
 
 
@@ -41,7 +46,10 @@ def index() -> Response:
 
         setores = _setores_ativos()
         impactos = get_static_cached(
-            "categorias_impacto", CategoriaImpacto.get_all, ttl_seconds=1800
+            "categorias_impacto",
+            lambda: CategoriaImpacto.get_all(levantar_erro=True),
+            ttl_seconds=ttl_invalidavel(1800),
+            padrao_em_erro=[],
         )
         ab_variante = get_variante(current_user.id, "AB-001")
 
@@ -73,7 +81,10 @@ def index() -> Response:
             flash(erro, "danger")
         setores = _setores_ativos()
         impactos = get_static_cached(
-            "categorias_impacto", CategoriaImpacto.get_all, ttl_seconds=1800
+            "categorias_impacto",
+            lambda: CategoriaImpacto.get_all(levantar_erro=True),
+            ttl_seconds=ttl_invalidavel(1800),
+            padrao_em_erro=[],
         )
         return render_template(
             "formulario.html",
@@ -96,7 +107,10 @@ def index() -> Response:
         flash(erro, "danger")
         setores = _setores_ativos()
         impactos = get_static_cached(
-            "categorias_impacto", CategoriaImpacto.get_all, ttl_seconds=1800
+            "categorias_impacto",
+            lambda: CategoriaImpacto.get_all(levantar_erro=True),
+            ttl_seconds=ttl_invalidavel(1800),
+            padrao_em_erro=[],
         )
         return render_template(
             "formulario.html",
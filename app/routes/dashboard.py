@@ -1,26 +1,27 @@
 """Rotas do painel administrativo: dashboard, exportar, histórico, relatórios."""
 
-import io
 import logging
 from datetime import datetime
-from typing import Any
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 from flask import (
     Response,
+    abort,
+    current_app,
     flash,
     redirect,
     render_template,
     request,
     send_file,
+    send_from_directory,
     session,
     url_for,
 )
 from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
 
-from app.cache import get_static_cached
-from app.db.models.chamado import ChamadoRow
+from app.cache import get_static_cached, ttl_invalidavel
 from app.decoradores import requer_gestor_ou_admin, requer_supervisor_area
 from app.i18n import flash_t, get_translation
 from app.limiter import limiter
@@ -35,14 +36,22 @@ from app.services.contadores_uso import (
     verificar_e_incrementar_relatorio,
 )
 from app.services.dashboard_service import (
-    _filtrar_chamados_por_permissao,
     obter_contexto_admin,
     ordenar_metricas_areas,
     ordenar_metricas_supervisores,
     preparar_metricas_paginadas,
 )
-from app.services.excel_export_service import MAX_EXPORT_CHAMADOS, _safe_cell
-from app.services.filters import aplicar_filtros_dashboard_com_paginacao
+from app.services.exportacao_service import (
+    FORMATOS,
+    disparar_processamento,
+    disponivel_para_download,
+    enfileirar_exportacao,
+    exportacao_reaproveitavel,
+    filtros_do_request,
+    gerar_arquivo,
+    obter_exportacao,
+)
+from app.services.exportacao_service import mimetype as mimetype_exportacao
 from app.services.gestor_dashboard_service import obter_contexto_gestor_dashboard
 from app.services.permissions import usuario_pode_operar_chamado, usuario_pode_ver_chamado
 from app.services.permissoes_edicao_chamado import (
@@ -52,7 +61,7 @@ from app.services.permissoes_edicao_chamado import (
     montar_flags_detalhe_chamado,
 )
 from app.services.status_service import atualizar_status_chamado
-from app.utils import formatar_data_para_excel
+from app.services.upload import gerar_url_presignada
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -81,19 +90,6 @@ def _redirect_dashboard(**kwargs) -> Response:
     return redirect(url_for(_dashboard_endpoint(), **kwargs))
 
 
-def _query_chamados_escopada_por_area(user):
-    """Condições de escopo de chamados por área, quando o usuário é supervisor.
-
-    Mesmo filtro que obter_contexto_admin já aplica pro /painel — sem isso,
-    rotas que consultam chamados direto (ex.: exportações) trazem
-    chamados/métricas de áreas que não são do supervisor.
-    """
-    condicoes = []
-    if user.perfil == "supervisor" and getattr(user, "areas", None):
-        condicoes.append(ChamadoRow.supervisor_ids_com_acesso.contains([user.id]))
-    return condicoes
-
-
 def _render_dashboard() -> Response:
     """Lógica compartilhada de dashboard — chamada por admin() e painel()."""
     if request.method == "POST":
@@ -146,7 +142,12 @@ def _render_dashboard() -> Response:
     contexto = obter_contexto_admin(current_user, request.args, itens_por_pagina=itens_por_pagina)
     setores = [
         s
-        for s in get_static_cached("categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800)
+        for s in get_static_cached(
+            "categorias_setor",
+            lambda: CategoriaSetor.get_all(levantar_erro=True),
+            ttl_seconds=ttl_invalidavel(1800),
+            padrao_em_erro=[],
+        )
         if getattr(s, "ativo", True)
     ]
     return render_template("dashboard.html", **contexto, setores=setores)
@@ -234,7 +235,12 @@ def visualizar_detalhe_chamado(chamado_id: str) -> Response:
         )
         setores = [
             s
-            for s in get_static_cached("categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800)
+            for s in get_static_cached(
+                "categorias_setor",
+                lambda: CategoriaSetor.get_all(levantar_erro=True),
+                ttl_seconds=ttl_invalidavel(1800),
+                padrao_em_erro=[],
+            )
             if getattr(s, "ativo", True)
         ]
 
@@ -416,151 +422,126 @@ def visualizar_historico(chamado_id: str) -> Response:
         return _redirect_dashboard()
 
 
-@main.route("/exportar")
-@requer_supervisor_area
-@limiter.limit("10 per hour")
-def exportar() -> Response:
-    """Exporta chamados filtrados para Excel (até MAX_EXPORT_CHAMADOS)."""
+def _enviar_arquivo(arquivo, nome: str, mimetype: str) -> Response:
+    """Resposta de download em streaming do arquivo já gerado (send_file fecha o arquivo)."""
+    arquivo.seek(0, 2)
+    tamanho = arquivo.tell()
+    arquivo.seek(0)
+    resposta = send_file(
+        arquivo,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=nome,
+    )
+    resposta.content_length = tamanho
+    return resposta
+
+
+def _cota_export_esgotada(chave_erro: str) -> bool:
+    """Cobra um export da cota diária; se não houver cota, avisa e retorna True."""
     limite_export = getattr(Config, "EXPORT_EXCEL_MAX_POR_USUARIO_POR_DIA", 0) or 0
-    if limite_export > 0:
-        pode, msg = verificar_e_incrementar_export(current_user.id, limite_export)
-        if not pode:
-            if msg:
-                flash(msg, "warning")
-            flash_t("error_exporting_data", "danger")
-            return _redirect_dashboard()
+    if limite_export <= 0:
+        return False
+    pode, msg = verificar_e_incrementar_export(current_user.id, limite_export)
+    if pode:
+        return False
+    if msg:
+        flash(msg, "warning")
+    flash_t(chave_erro, "danger")
+    return True
+
+
+def _exportar(tipo: str, formato: str, chave_erro: str) -> Response:
+    """Corpo comum de /exportar e /exportar-avancado.
+
+    Com EXPORTACAO_ASSINCRONA, só enfileira (ou reaproveita) o pedido — o
+    link chega por notificação; sem ela, gera e devolve o arquivo no request.
+    Reaproveitar um pedido idêntico não consome cota: ela só é cobrada quando
+    um arquivo novo vai ser gerado.
+    """
+    filtros = filtros_do_request(request.args)
+    lang = session.get("language", "en")
     try:
-        condicoes_base = _query_chamados_escopada_por_area(current_user)
-        resultado = aplicar_filtros_dashboard_com_paginacao(
-            condicoes_base, request.args, limite=MAX_EXPORT_CHAMADOS, cursor=None
-        )
-        docs = resultado["docs"]
-        chamados = _filtrar_chamados_por_permissao(docs, current_user)
-
-        dados: list[dict[str, Any]] = []
-        for c in chamados:
-            dados.append(
-                {
-                    "Chamado": c.numero_chamado,
-                    "Categoria": c.categoria,
-                    "RL": c.rl_codigo or "-",
-                    "Tipo": c.tipo_solicitacao,
-                    "Gate": c.gate or "-",
-                    "Responsável": c.responsavel,
-                    "Solicitante": c.solicitante_nome or "-",
-                    "Área": c.area or "-",
-                    "Status": c.status,
-                    "Anexo": c.anexo or "-",
-                    "Abertura": formatar_data_para_excel(c.data_abertura),
-                    "Conclusão": formatar_data_para_excel(c.data_conclusao),
-                    "Descrição": c.descricao,
-                }
-            )
-        from openpyxl import Workbook
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Chamados"
-        if dados:
-            ws.append(list(dados[0].keys()))
-            for row in dados:
-                ws.append([_safe_cell(v) for v in row.values()])
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=f"relatorio_chamados_{ts}.xlsx",
-        )
+        if Config.EXPORTACAO_ASSINCRONA:
+            exportacao = exportacao_reaproveitavel(current_user.id, tipo, formato, filtros, lang)
+            nova = False
+            if exportacao is None:
+                if _cota_export_esgotada(chave_erro):
+                    return _redirect_dashboard()
+                exportacao, nova = enfileirar_exportacao(
+                    current_user.id, tipo, formato, filtros, lang
+                )
+            if exportacao["status"] == "pronto":
+                return redirect(url_for("main.download_exportacao", exportacao_id=exportacao["id"]))
+            if nova:
+                disparar_processamento(current_app._get_current_object())
+            flash_t("export_queued", "info")
+            return _redirect_dashboard()
+        if _cota_export_esgotada(chave_erro):
+            return _redirect_dashboard()
+        arquivo, nome, _ = gerar_arquivo(current_user, tipo, formato, filtros, lang)
+        return _enviar_arquivo(arquivo, nome, mimetype_exportacao(formato))
     except Exception as e:
-        logger.exception("Erro ao exportar: %s", e)
-        flash_t("error_exporting_data", "danger")
+        logger.exception("Erro ao exportar (%s/%s): %s", tipo, formato, e)
+        flash_t(chave_erro, "danger")
         return _redirect_dashboard()
 
 
+@main.route("/exportar")
+@requer_supervisor_area
+@limiter.limit("10 per hour")
+def exportar() -> Response:
+    """Exporta todos os chamados filtrados para Excel (ou CSV com ?formato=csv)."""
+    formato = (request.args.get("formato") or "xlsx").strip().lower()
+    if formato not in FORMATOS:
+        formato = "xlsx"
+    return _exportar("chamados", formato, "error_exporting_data")
+
+
 @main.route("/exportar-avancado")
 @requer_supervisor_area
 @limiter.limit("5 per hour")
 def exportar_avancado() -> Response:
-    """Exporta relatório completo em Excel com múltiplas abas (até MAX_EXPORT_CHAMADOS)."""
-    limite_export = getattr(Config, "EXPORT_EXCEL_MAX_POR_USUARIO_POR_DIA", 0) or 0
-    if limite_export > 0:
-        pode, msg = verificar_e_incrementar_export(current_user.id, limite_export)
-        if not pode:
-            if msg:
-                flash(msg, "warning")
-            flash_t("error_exporting_report", "danger")
-            return _redirect_dashboard()
-    try:
-        from app.services.excel_export_service import exportador_excel
-
-        # Busca chamados com filtros e permissão (limitado por MAX_EXPORT_CHAMADOS)
-        condicoes_base = _query_chamados_escopada_por_area(current_user)
-        resultado = aplicar_filtros_dashboard_com_paginacao(
-            condicoes_base, request.args, limite=MAX_EXPORT_CHAMADOS, cursor=None
-        )
-        docs = resultado["docs"]
-        chamados = _filtrar_chamados_por_permissao(docs, current_user)
-
-        # Métricas gerais/agregadas: analisador consulta a coleção inteira sem
-        # escopo de área — supervisor não-admin só pode ver métricas/nomes de
-        # supervisores da(s) própria(s) área(s), senão vaza dado de outras áreas.
-        if current_user.is_admin_or_above:
-            metricas_gerais = analisador.obter_metricas_gerais(dias=30)
-            metricas_supervisores = analisador.obter_metricas_supervisores()
-        else:
-            chamados_pre_carregados = [c.to_dict() for c in chamados]
-            metricas_gerais = analisador.obter_metricas_gerais(
-                dias=30, chamados_pre_carregados=chamados_pre_carregados
-            )
-            areas_usuario = set(getattr(current_user, "areas", None) or [])
-            metricas_supervisores = [
-                m
-                for m in analisador.obter_metricas_supervisores(
-                    chamados_pre_carregados=chamados_pre_carregados
-                )
-                if m.get("area") in areas_usuario
-            ]
+    """Exporta relatório completo em Excel com múltiplas abas."""
+    return _exportar("relatorio", "xlsx", "error_exporting_report")
 
-        # Filtros aplicados (para documentar no Excel) — chaves traduzidas no idioma da sessão
-        lang = session.get("language", "en")
-        filtros_aplicados = {}
-        if request.args.get("search"):
-            filtros_aplicados[get_translation("excel_filter_search", lang)] = request.args.get(
-                "search"
-            )
-        if request.args.get("categoria"):
-            filtros_aplicados[get_translation("category", lang)] = request.args.get("categoria")
-        if request.args.get("status"):
-            filtros_aplicados[get_translation("status", lang)] = request.args.get("status")
-        if request.args.get("responsavel"):
-            filtros_aplicados[get_translation("responsible", lang)] = request.args.get(
-                "responsavel"
-            )
 
-        # Exporta relatório
-        output = exportador_excel.exportar_relatorio_completo(
-            chamados=chamados,
-            metricas_gerais=metricas_gerais,
-            metricas_supervisores=metricas_supervisores,
-            filtros_aplicados=filtros_aplicados,
-            language=lang,
-        )
+@main.route("/exportacoes/<int:exportacao_id>/download")
+@login_required
+def download_exportacao(exportacao_id: int) -> Response:
+    """Download de uma exportação gerada em segundo plano — só o dono, só até expira_em."""
+    exportacao = obter_exportacao(exportacao_id, current_user.id)
+    if exportacao is None:
+        abort(404)
+    if not disponivel_para_download(exportacao):
+        if exportacao["status"] in ("pendente", "processando"):
+            flash_t("export_queued", "info")
+        elif exportacao["status"] == "erro":
+            flash_t("error_exporting_data", "danger")
+        else:
+            flash_t("export_link_expired", "warning")
+        return _redirect_dashboard()
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    chave = exportacao["arquivo"]
+    if chave.startswith("r2:"):
+        restante = (exportacao["expira_em"] - datetime.now(ZoneInfo("UTC"))).total_seconds()
+        url = gerar_url_presignada(chave, int(min(3600, max(60, restante))))
+        if not url:
+            logger.error("Falha ao gerar URL pré-assinada para exportação %s", exportacao_id)
+            abort(503)
+        return redirect(url)
+    if chave.startswith("local:"):
+        nome = chave[len("local:") :]
+        if not nome or secure_filename(nome) != nome:
+            abort(400)
+        return send_from_directory(
+            current_app.config["EXPORTACAO_LOCAL_DIR"],
+            nome,
             as_attachment=True,
-            download_name=f"relatorio_completo_{ts}.xlsx",
+            download_name=exportacao["nome_arquivo"],
+            mimetype=mimetype_exportacao(exportacao["formato"]),
         )
-    except Exception as e:
-        logger.exception("Erro ao exportar relatório avançado: %s", e)
-        flash_t("error_exporting_report", "danger")
-        return _redirect_dashboard()
+    abort(404)
 
 
 DIAS_PERIODO_PERMITIDOS = (7, 30, 90)
@@ -691,7 +672,12 @@ def relatorios() -> Response:
         # Áreas: lista completa (para traduções no front-end)
         setores = [
             s
-            for s in get_static_cached("categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800)
+            for s in get_static_cached(
+                "categorias_setor",
+                lambda: CategoriaSetor.get_all(levantar_erro=True),
+                ttl_seconds=ttl_invalidavel(1800),
+                padrao_em_erro=[],
+            )
             if getattr(s, "ativo", True)
         ]
 
@@ -732,7 +718,10 @@ def relatorios() -> Response:
             setores = [
                 s
                 for s in get_static_cached(
-                    "categorias_setor", CategoriaSetor.get_all, ttl_seconds=1800
+                    "categorias_setor",
+                    lambda: CategoriaSetor.get_all(levantar_erro=True),
+                    ttl_seconds=ttl_invalidavel(1800),
+                    padrao_em_erro=[],
                 )
                 if getattr(s, "ativo", True)
             ]
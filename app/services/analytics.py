@@ -37,6 +37,21 @@ _ANALYTICS_QUERY_TTL_SEC = 60  # 1 minuto
 # Limite máximo de registros em queries de analytics (protege performance/memória)
 MAX_CHAMADOS_ANALYTICS = 2000
 
+# Campos de Chamado.to_dict() lidos por obter_metricas_gerais/obter_metricas_supervisores —
+# quem passa chamados_pre_carregados de muitos chamados pode guardar só estes.
+CAMPOS_METRICAS_CHAMADO = (
+    "area",
+    "categoria",
+    "data_abertura",
+    "data_conclusao",
+    "data_em_atendimento",
+    "previsao_atendimento",
+    "prioridade",
+    "responsavel_id",
+    "sla_dias",
+    "status",
+)
+
 
 def _sla_dias_por_categoria(categoria: str, sla_dias_custom: int | None = None) -> int:
     """Retorna o prazo em dias do SLA. Se sla_dias_custom for fornecido (>0), usa-o.
@@ -936,23 +951,13 @@ class AnalisadorChamados:
         Centraliza a única query a 'chamados' para que obter_relatorio_completo possa
         distribuir o mesmo conjunto de dados para todas as funções de métricas.
         """
-        cache_key = "analytics_todos_chamados"
-        try:
-            from app.cache import cache_get
-
-            cached = cache_get(cache_key)
-            if cached is not None:
-                return cached
-        except Exception as e:
-            logger.debug("Cache indisponível (analytics): %s", e)
-        chamados = self._buscar_chamados_dicts()
-        try:
-            from app.cache import cache_set
+        from app.cache import get_cached
 
-            cache_set(cache_key, chamados, _RELATORIO_CACHE_TTL_SEC)
-        except Exception as e:
-            logger.debug("Cache indisponível (analytics): %s", e)
-        return chamados
+        # get_cached: quando a chave vence, um único worker refaz a query
+        # (os demais esperam ou recebem o valor anterior enquanto ela roda).
+        return get_cached(
+            "analytics_todos_chamados", self._buscar_chamados_dicts, _RELATORIO_CACHE_TTL_SEC
+        )
 
     # ========== RELATÓRIOS DETALHADOS ==========
 
@@ -12,12 +12,12 @@ Uso:
 """
 
 import logging
-import os
 import random
 
 from sqlalchemy import func, select
 
 from app import db as db_module
+from app.cache import cache_incr
 from app.db.models.chamado import ChamadoRow
 from app.i18n import get_translation_session
 from app.models_usuario import Usuario
@@ -51,7 +51,6 @@ class AtribuidorAutomatico:
             raise ValueError(f"Estratégia inválida: {estrategia}")
 
         self.estrategia = estrategia
-        self.contador_round_robin = {}  # Para rastrear round-robin por área
 
     def atribuir(self, area: str, categoria: str = None, prioridade: int = 1) -> dict:
         """
@@ -235,36 +234,14 @@ class AtribuidorAutomatico:
         """
         Estratégia: Distribui sequencialmente entre supervisores.
 
-        Usa Redis INCR para contador atômico cross-worker quando REDIS_URL está
-        configurada. Fallback em memória quando Redis não está disponível.
+        Contador por área em cache_incr: atômico entre workers (INCR no Redis)
+        quando REDIS_URL está configurada; sem Redis, por processo.
         """
         if not supervisores_com_carga:
             return None
 
-        n = len(supervisores_com_carga)
-        redis_url = os.getenv("REDIS_URL", "").strip()
-
-        if redis_url:
-            try:
-                import redis as redis_lib
-
-                r = redis_lib.from_url(redis_url)
-                key = f"rr_counter:{area}"
-                idx = int(r.incr(key)) % n
-                logger.debug("Round-Robin (Redis INCR): índice %s", idx)
-                return supervisores_com_carga[idx]
-            except Exception as e:
-                logger.debug(
-                    "Redis INCR falhou para round-robin, usando fallback em memória: %s", e
-                )
-
-        # Fallback: contador em memória por processo
-        if area not in self.contador_round_robin:
-            self.contador_round_robin[area] = 0
-        idx = self.contador_round_robin[area] % n
-        self.contador_round_robin[area] = (idx + 1) % n
-
-        logger.debug("Round-Robin (memória): índice %s", idx)
+        idx = (cache_incr(f"rr_counter:{area}", ttl_seconds=0) - 1) % len(supervisores_com_carga)
+        logger.debug("Round-Robin: índice %s", idx)
         return supervisores_com_carga[idx]
 
     def obter_disponibilidade(self, area: str) -> dict:
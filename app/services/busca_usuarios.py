@@ -0,0 +1,149 @@
+"""
+Busca de usuários por índice cego (blind index) sobre nome/e-mail.
+
+Com ENCRYPT_PII_AT_REST, nome e email são ciphertext Fernet: Usuario.buscar_ativos
+precisava carregar e descriptografar todo mundo para um `in` em Python a cada
+tecla do autocomplete de observadores/participantes. Aqui, cada usuário tem em
+usuarios_busca os n-gramas (2 e 3 caracteres) do nome e do e-mail, normalizados
+como em _sem_acentos (minúsculo, sem acento), passados por HMAC com
+pii_encryption.blind_index_key(). A busca calcula os mesmos tokens do termo e
+pede ao banco só os ids que têm todos eles; o chamador descriptografa esses
+candidatos e confirma a substring (n-gramas dão falso positivo, nunca falso
+negativo).
+
+O índice é mantido no save/update do usuário sempre que há chave; a leitura só
+passa a usá-lo com BUSCA_USUARIOS_INDICE_CEGO=true, depois do backfill
+(scripts/reindexar_busca_usuarios.py). Tokens de 64 bits e n-gramas curtos
+vazam, no máximo, frequência de pares/trios de letras — não o texto.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+
+from sqlalchemy import delete, func, insert, select
+
+import app.db as db_module
+from app.db.models.usuario import UsuarioRow
+from app.db.models.usuario_busca import UsuarioBuscaRow
+from app.services.pii_encryption import blind_index_key
+
+logger = logging.getLogger(__name__)
+
+TAMANHOS_NGRAMA = (2, 3)
+_TAMANHO_TOKEN = 16  # hex → 64 bits
+
+_LOTE_REINDEXACAO = 200
+
+
+def _normalizar(texto: str | None) -> str:
+    from app.models_usuario import _sem_acentos
+
+    return _sem_acentos((texto or "").strip().lower())
+
+
+def ngramas(texto: str, n: int) -> set[str]:
+    return {texto[i : i + n] for i in range(len(texto) - n + 1)}
+
+
+def _tokens(chave: bytes, gramas: set[str]) -> set[str]:
+    return {
+        hmac.new(chave, g.encode("utf-8"), hashlib.sha256).hexdigest()[:_TAMANHO_TOKEN]
+        for g in gramas
+    }
+
+
+def tokens_usuario(chave: bytes, nome: str | None, email: str | None) -> set[str]:
+    gramas: set[str] = set()
+    for texto in (_normalizar(nome), _normalizar(email)):
+        for n in TAMANHOS_NGRAMA:
+            gramas |= ngramas(texto, n)
+    return _tokens(chave, gramas)
+
+
+def tokens_busca(chave: bytes, termo: str) -> set[str] | None:
+    """Tokens que todo candidato precisa ter; None se o termo é curto demais."""
+    termo = _normalizar(termo)
+    if len(termo) < min(TAMANHOS_NGRAMA):
+        return None
+    n = max(t for t in TAMANHOS_NGRAMA if t <= len(termo))
+    return _tokens(chave, ngramas(termo, n))
+
+
+def atualizar_indice(session, usuario_id: str, nome: str | None, email: str | None) -> None:
+    """Troca os tokens do usuário, na transação de quem grava o usuário."""
+    chave = blind_index_key()
+    if chave is None:
+        return
+    # A linha em usuarios pode ser nova nesta transação (FK).
+    session.flush()
+    session.execute(delete(UsuarioBuscaRow).where(UsuarioBuscaRow.usuario_id == usuario_id))
+    tokens = tokens_usuario(chave, nome, email)
+    if tokens:
+        session.execute(
+            insert(UsuarioBuscaRow), [{"token": t, "usuario_id": usuario_id} for t in tokens]
+        )
+
+
+def indice_ativo() -> bool:
+    from config import Config
+
+    return Config.BUSCA_USUARIOS_INDICE_CEGO and blind_index_key() is not None
+
+
+def buscar_ids(termo: str) -> set[str] | None:
+    """Ids candidatos para `termo`, ou None se a busca deve usar o caminho sem índice
+    (índice desligado, sem chave ou termo de 1 caractere)."""
+    if not indice_ativo():
+        return None
+    tokens = tokens_busca(blind_index_key(), termo)
+    if tokens is None:
+        return None
+    with db_module.SessionLocal() as session:
+        ids = (
+            session.execute(
+                select(UsuarioBuscaRow.usuario_id)
+                .where(UsuarioBuscaRow.token.in_(tokens))
+                .group_by(UsuarioBuscaRow.usuario_id)
+                .having(func.count() == len(tokens))
+            )
+            .scalars()
+            .all()
+        )
+    return set(ids)
+
+
+def reindexar_todos(dry_run: bool = True) -> dict:
+    """Recalcula o índice de todos os usuários (backfill / troca de chave).
+
+    Percorre usuarios em lotes por id, descriptografando um lote por vez.
+    """
+    from app.models_usuario import Usuario
+
+    chave = blind_index_key()
+    if chave is None:
+        raise ValueError("Sem PII_BLIND_INDEX_KEY nem ENCRYPTION_KEY — nada para indexar")
+    stats = {"usuarios": 0, "tokens": 0}
+    ultimo_id = ""
+    while True:
+        with db_module.SessionLocal() as session, session.begin():
+            rows = (
+                session.execute(
+                    select(UsuarioRow)
+                    .where(UsuarioRow.id > ultimo_id)
+                    .order_by(UsuarioRow.id)
+                    .limit(_LOTE_REINDEXACAO)
+                )
+                .scalars()
+                .all()
+            )
+            for usuario in Usuario._from_rows(rows):
+                stats["usuarios"] += 1
+                stats["tokens"] += len(tokens_usuario(chave, usuario.nome, usuario.email))
+                if not dry_run:
+                    atualizar_indice(session, usuario.id, usuario.nome, usuario.email)
+        if len(rows) < _LOTE_REINDEXACAO:
+            return stats
+        ultimo_id = rows[-1].id
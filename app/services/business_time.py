@@ -165,3 +165,34 @@ def percentual_prazo_resolucao(
         return 1.0
     decorridos = minutos_uteis_entre(data_em_atendimento, agora)
     return decorridos / total_minutos
+
+
+def instante_percentual_prazo_resolucao(
+    data_em_atendimento: datetime,
+    categoria: str,
+    fracao: float,
+) -> datetime:
+    """Primeiro instante em que percentual_prazo_resolucao(...) >= fracao.
+
+    Inverso de percentual_prazo_resolucao — usado para agendar os avisos de
+    50%/80% (ver chamado_timers_service) em vez de recalcular o percentual de
+    todo chamado a cada execução. Naive/aware segue a entrada.
+    """
+    import math
+
+    from config import Config
+
+    dias = (
+        Config.SLA_DIAS_RESOLUCAO_PROJETOS
+        if categoria == "Projetos"
+        else Config.SLA_DIAS_RESOLUCAO_PADRAO
+    )
+    deadline = adicionar_dias_uteis(data_em_atendimento, dias)
+    total_minutos = minutos_uteis_entre(data_em_atendimento, deadline)
+    if total_minutos == 0:
+        return data_em_atendimento
+    alvo = math.ceil(fracao * total_minutos)
+    # +1 min: minutos_uteis_entre conta [início, fim) e adicionar_minutos_uteis
+    # devolve o próprio alvo-ésimo minuto útil — sem a folga o percentual no
+    # instante devolvido pode ficar um minuto aquém da fração.
+    return adicionar_minutos_uteis(data_em_atendimento, alvo) + timedelta(minutes=1)
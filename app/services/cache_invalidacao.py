@@ -0,0 +1,173 @@
+"""
+Barramento de invalidação do cache entre workers.
+
+O cache estático (get_static_cached) e a cópia L1 de cache_get vivem na
+memória de cada worker Gunicorn: static_cache_delete("categorias_setor") na
+edição de um setor limpava só o worker que atendeu o admin, e os demais
+seguiam servindo a lista antiga até o TTL vencer.
+
+Com CACHE_INVALIDACAO_ENABLED, cada processo sobe uma thread que escuta o
+canal CANAL e descarta localmente as chaves anunciadas; static_cache_delete
+e cache_delete publicam {tipo, chave, origem} no mesmo canal:
+
+  - com REDIS_URL → Redis pub/sub;
+  - sem Redis → LISTEN/NOTIFY do Postgres, numa conexão dedicada do pool
+    (mesma ideia da eleição de líder em scheduler_lider.py).
+
+Pub/sub não guarda mensagens: enquanto a escuta está caída, o que foi
+publicado se perde. Por isso, a cada (re)conexão o processo esvazia o próprio
+cache estático, e só com a escuta conectada (barramento_ativo) as chaves
+invalidadas por evento usam o TTL longo (cache.ttl_invalidavel).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Nome válido tanto como canal do Redis quanto como identificador do LISTEN.
+CANAL = "cache_invalidacao"
+
+TIPO_ESTATICO = "estatico"
+TIPO_L1 = "l1"
+_TIPOS = frozenset({TIPO_ESTATICO, TIPO_L1})
+
+_SQL_NOTIFY = text("SELECT pg_notify(:canal, :payload)")
+
+
+class BarramentoInvalidacao:
+    """Publica e escuta invalidações de cache no canal CANAL."""
+
+    def __init__(self, engine, *, redis_cliente=None, intervalo_segundos: float = 5.0) -> None:
+        self._engine = engine
+        self._redis = redis_cliente
+        self._intervalo = intervalo_segundos
+        # Identifica as próprias mensagens (a chave local já saiu ao publicar).
+        self.origem = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._conectado = False
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ativo(self) -> bool:
+        """True enquanto a escuta está conectada (nenhuma mensagem se perde)."""
+        return self._conectado
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="cache-invalidacao", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def publicar(self, tipo: str, chave: str) -> None:
+        """Anuncia a chave removida aos outros processos (best-effort)."""
+        payload = json.dumps({"tipo": tipo, "chave": chave, "origem": self.origem})
+        try:
+            if self._redis is not None:
+                self._redis.publish(CANAL, payload)
+            else:
+                with self._engine.begin() as conexao:
+                    conexao.execute(_SQL_NOTIFY, {"canal": CANAL, "payload": payload})
+        except Exception as exc:
+            logger.warning("Invalidação de cache: falha ao publicar %s/%s: %s", tipo, chave, exc)
+
+    def tratar(self, payload: str | bytes) -> bool:
+        """Aplica uma mensagem recebida. True se removeu algo deste processo."""
+        try:
+            msg = json.loads(payload)
+            tipo, chave = msg["tipo"], msg["chave"]
+        except (ValueError, TypeError, KeyError) as exc:
+            logger.warning("Invalidação de cache: mensagem inválida ignorada (%s)", exc)
+            return False
+        if tipo not in _TIPOS or msg.get("origem") == self.origem:
+            return False
+        from app.cache import invalidar_local
+
+        invalidar_local(tipo, chave)
+        return True
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            try:
+                if self._redis is not None:
+                    self._escutar_redis()
+                else:
+                    self._escutar_postgres()
+            except Exception as exc:
+                logger.warning("Invalidação de cache: escuta caiu (%s); reconectando.", exc)
+            finally:
+                self._conectado = False
+            self._parar.wait(self._intervalo)
+
+    def _conectou(self) -> None:
+        # O que foi publicado enquanto a escuta estava caída se perdeu.
+        from app.cache import invalidar_local
+
+        invalidar_local(TIPO_ESTATICO, None)
+        self._conectado = True
+
+    def _escutar_redis(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(CANAL)
+            self._conectou()
+            while not self._parar.is_set():
+                msg = pubsub.get_message(timeout=self._intervalo)
+                if msg and msg.get("type") == "message":
+                    self.tratar(msg["data"])
+        finally:
+            pubsub.close()
+
+    def _escutar_postgres(self) -> None:
+        conexao = self._engine.raw_connection()
+        try:
+            pg = conexao.driver_connection
+            pg.autocommit = True
+            pg.execute(f"LISTEN {CANAL}")
+            self._conectou()
+            while not self._parar.is_set():
+                for aviso in pg.notifies(timeout=self._intervalo):
+                    self.tratar(aviso.payload)
+        finally:
+            # Sessão em LISTEN/autocommit: descarta em vez de devolver ao pool.
+            conexao.invalidate()
+
+
+_barramento: BarramentoInvalidacao | None = None
+_barramento_pid: int | None = None
+
+
+def iniciar_barramento(engine, *, intervalo_segundos: float = 5.0) -> BarramentoInvalidacao:
+    """Sobe a escuta deste processo (uma vez por pid) e a registra para publicar."""
+    global _barramento, _barramento_pid
+    if _barramento is not None and _barramento_pid == os.getpid():
+        return _barramento
+    from app.cache import _get_redis
+
+    barramento = BarramentoInvalidacao(
+        engine, redis_cliente=_get_redis(), intervalo_segundos=intervalo_segundos
+    )
+    barramento.iniciar()
+    _barramento, _barramento_pid = barramento, os.getpid()
+    return barramento
+
+
+def publicar_invalidacao(tipo: str, chave: str) -> None:
+    """Publica no barramento deste processo; sem barramento, não faz nada."""
+    if _barramento is not None and _barramento_pid == os.getpid():
+        _barramento.publicar(tipo, chave)
+
+
+def barramento_ativo() -> bool:
+    return _barramento is not None and _barramento_pid == os.getpid() and _barramento.ativo
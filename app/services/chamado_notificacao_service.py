@@ -17,8 +17,9 @@ from app.services.email_templates import (
     build_email_shell,
     build_two_ctas,
 )
+from app.services.notificacao_coalescencia_service import coalescencia_ativa, enfileirar_email
 from app.services.notifications import enviar_email
-from app.services.notifications_inapp import criar_notificacao
+from app.services.notifications_inapp import criar_notificacao, criar_notificacoes_em_lote
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,82 @@ def destinatarios_do_chamado(dados_chamado: dict) -> list:
     return destinatarios
 
 
+def _criar_inapp_destinatarios(
+    destinatarios: list,
+    *,
+    chamado_id: str,
+    numero_chamado: str,
+    titulo: str,
+    tipo: str,
+    categoria: str,
+) -> None:
+    """Grava a notificação in-app (mesmo titulo/tipo) de todos os destinatários
+    de uma vez — um INSERT multi-linha em vez de uma transação por usuário."""
+    criar_notificacoes_em_lote(
+        [
+            {
+                "usuario_id": uid,
+                "chamado_id": chamado_id,
+                "numero_chamado": numero_chamado,
+                "titulo": titulo,
+                "mensagem": categoria,
+                "tipo": tipo,
+                "categoria": categoria,
+            }
+            for uid in (getattr(u, "id", None) for u in destinatarios)
+            if uid
+        ]
+    )
+
+
+def _enviar_email_fanout(
+    email: str,
+    assunto: str,
+    corpo_html: str,
+    corpo_texto: str,
+    *,
+    chamado_id: str,
+    numero_chamado: str,
+    resumo: str,
+    link: str,
+    descricao: str,
+) -> None:
+    """E-mail de fan-out para observador: passa pela janela de coalescência
+    (vários eventos do mesmo chamado viram um e-mail-resumo) quando ativa;
+    senão envia na hora, como antes. descricao nomeia o e-mail no log
+    ("cancellation", "reply"...). Enfileirado só loga o enfileiramento — o
+    resultado do envio sai no log do despacho da coalescência."""
+    if coalescencia_ativa():
+        enfileirar_email(
+            email,
+            assunto,
+            corpo_html,
+            corpo_texto,
+            chamado_id=chamado_id,
+            numero_chamado=numero_chamado,
+            resumo=resumo,
+            link=link,
+        )
+        logger.info(
+            "Fan-out e-mail (%s) queued for coalescing to %s (ticket %s)",
+            descricao,
+            email,
+            numero_chamado,
+        )
+        return
+    ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
+    if ok:
+        logger.info("Fan-out e-mail (%s) sent to %s (ticket %s)", descricao, email, numero_chamado)
+    else:
+        logger.warning(
+            "Failed to send fan-out e-mail (%s) to %s (ticket %s): %s",
+            descricao,
+            email,
+            numero_chamado,
+            err,
+        )
+
+
 def notificar_cancelamento_chamado(
     *,
     chamado_id: str,
@@ -74,52 +151,53 @@ def notificar_cancelamento_chamado(
     )
     link = _link_chamado(chamado_id)
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Chamado {numero_chamado} cancelado",
+        tipo="observador_cancelamento",
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} Cancelled",
+        "#dc2626",
+        f"<p>Ticket <strong>{escape(numero_chamado)}</strong> was <strong>cancelled</strong>"
+        f" by the requester <em>{escape(solicitante_nome)}</em>.</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("Reason", motivo),
+                ("Cancelled by", solicitante_nome),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} cancelled by {solicitante_nome}.\n"
+        f"Reason: {motivo}\nCategory: {categoria_en}" + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} Cancelled",
-                "#dc2626",
-                f"<p>Ticket <strong>{escape(numero_chamado)}</strong> was <strong>cancelled</strong>"
-                f" by the requester <em>{escape(solicitante_nome)}</em>.</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("Reason", motivo),
-                        ("Cancelled by", solicitante_nome),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} cancelled by {solicitante_nome}.\n"
-                f"Reason: {motivo}\nCategory: {categoria_en}"
-                + (f"\n\nView ticket: {link}" if link else "")
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info("Cancellation e-mail sent to %s (ticket %s)", email, numero_chamado)
-            else:
-                logger.warning(
-                    "Failed to send cancellation e-mail to %s (ticket %s): %s",
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Chamado {numero_chamado} cancelado",
-                mensagem=categoria,
-                tipo="observador_cancelamento",
-                categoria=categoria,
+                resumo=f"Cancelled by {solicitante_nome}: {motivo}",
+                link=link,
+                descricao="cancellation",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -152,53 +230,55 @@ def notificar_edicao_descricao_solicitante(
     anterior_trunc = (valor_anterior or "")[:_max_chars]
     novo_trunc = (valor_novo or "")[:_max_chars]
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Descrição editada — Chamado {numero_chamado}",
+        tipo="observador_edicao_descricao",
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — Description Edited",
+        "#2563eb",
+        f"<p>The requester <em>{escape(solicitante_nome)}</em> edited the description of ticket "
+        f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("Edited by", solicitante_nome),
+                ("Previous description", anterior_trunc),
+                ("New description", novo_trunc),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — description edited by {solicitante_nome}.\n"
+        f"Previous: {anterior_trunc}\nNew: {novo_trunc}"
+        + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — Description Edited",
-                "#2563eb",
-                f"<p>The requester <em>{escape(solicitante_nome)}</em> edited the description of ticket "
-                f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("Edited by", solicitante_nome),
-                        ("Previous description", anterior_trunc),
-                        ("New description", novo_trunc),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} — description edited by {solicitante_nome}.\n"
-                f"Previous: {anterior_trunc}\nNew: {novo_trunc}"
-                + (f"\n\nView ticket: {link}" if link else "")
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info("Description edit e-mail sent to %s (ticket %s)", email, numero_chamado)
-            else:
-                logger.warning(
-                    "Failed to send description edit e-mail to %s (ticket %s): %s",
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Descrição editada — Chamado {numero_chamado}",
-                mensagem=categoria,
-                tipo="observador_edicao_descricao",
-                categoria=categoria,
+                resumo=f"Description edited by {solicitante_nome}",
+                link=link,
+                descricao="description edit",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -225,15 +305,53 @@ def notificar_observadores_criacao(
     )
     link = _link_chamado(chamado_id)
 
+    usuarios = []
     for obs in observadores:
         uid = obs.get("usuario_id") if isinstance(obs, dict) else getattr(obs, "usuario_id", None)
         if not uid:
             continue
-
         usuario = Usuario.get_by_id(uid)
-        if not usuario:
-            continue
+        if usuario:
+            usuarios.append((uid, usuario))
+    if not usuarios:
+        return
+
+    criar_notificacoes_em_lote(
+        [
+            {
+                "usuario_id": uid,
+                "chamado_id": chamado_id,
+                "numero_chamado": numero_chamado,
+                "titulo": f"Você é observador — Chamado {numero_chamado}",
+                "mensagem": categoria,
+                "tipo": "observador_incluido",
+                "categoria": categoria,
+            }
+            for uid, _usuario in usuarios
+        ]
+    )
 
+    # Tudo menos a saudação é igual para todos os observadores: monta uma vez.
+    corpo_comum_html = (
+        f"<p>You have been added as an <strong>observer</strong> of ticket "
+        f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}) opened by "
+        f"<em>{escape(solicitante_nome)}</em>.</p>"
+        "<p>You will receive notifications about updates to this ticket.</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("Opened by", solicitante_nome),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else "")
+    )
+    corpo_texto = (
+        f"You have been added as an observer of ticket {numero_chamado} ({categoria_en})"
+        f" opened by {solicitante_nome}." + (f"\n\nView ticket: {link}" if link else "")
+    )
+
+    for uid, usuario in usuarios:
         email = getattr(usuario, "email", None)
         nome = getattr(usuario, "nome", None)
 
@@ -241,23 +359,7 @@ def notificar_observadores_criacao(
             corpo_html = build_email_shell(
                 f"Ticket {numero_chamado} — You are an observer",
                 "#7c3aed",
-                f"<p>Hello{f' {escape(nome)}' if nome else ''},</p>"
-                f"<p>You have been added as an <strong>observer</strong> of ticket "
-                f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}) opened by "
-                f"<em>{escape(solicitante_nome)}</em>.</p>"
-                "<p>You will receive notifications about updates to this ticket.</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("Opened by", solicitante_nome),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"You have been added as an observer of ticket {numero_chamado} ({categoria_en})"
-                f" opened by {solicitante_nome}." + (f"\n\nView ticket: {link}" if link else "")
+                f"<p>Hello{f' {escape(nome)}' if nome else ''},</p>" + corpo_comum_html,
             )
             ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
             if ok:
@@ -272,15 +374,6 @@ def notificar_observadores_criacao(
                     err,
                 )
 
-        criar_notificacao(
-            usuario_id=uid,
-            chamado_id=chamado_id,
-            numero_chamado=numero_chamado,
-            titulo=f"Você é observador — Chamado {numero_chamado}",
-            mensagem=categoria,
-            tipo="observador_incluido",
-            categoria=categoria,
-        )
         webpush_service.enviar_webpush_usuario(
             uid,
             titulo=assunto,
@@ -318,60 +411,55 @@ def notificar_observadores_mudanca_status(
     )
     link = _link_chamado(chamado_id)
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Chamado {numero_chamado}: {novo_status}",
+        tipo=(
+            "observador_status_concluido"
+            if novo_status == "Concluído"
+            else "observador_status_em_atendimento"
+        ),
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado}: {status_en}",
+        "#2563eb",
+        f"<p>The status of ticket <strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}) "
+        f"was updated to <strong>{escape(status_en)}</strong>.</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("New status", status_en),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = f"Ticket {numero_chamado} — status updated to {status_en}." + (
+        f"\n\nView ticket: {link}" if link else ""
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado}: {status_en}",
-                "#2563eb",
-                f"<p>The status of ticket <strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}) "
-                f"was updated to <strong>{escape(status_en)}</strong>.</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("New status", status_en),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = f"Ticket {numero_chamado} — status updated to {status_en}." + (
-                f"\n\nView ticket: {link}" if link else ""
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info(
-                    "Status %s e-mail sent to %s (ticket %s)",
-                    status_en,
-                    email,
-                    numero_chamado,
-                )
-            else:
-                logger.warning(
-                    "Failed to send status %s e-mail to %s (ticket %s): %s",
-                    status_en,
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            tipo = (
-                "observador_status_concluido"
-                if novo_status == "Concluído"
-                else "observador_status_em_atendimento"
-            )
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Chamado {numero_chamado}: {novo_status}",
-                mensagem=categoria,
-                tipo=tipo,
-                categoria=categoria,
+                resumo=f"Status updated to {status_en}",
+                link=link,
+                descricao=f"status {status_en}",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -400,53 +488,54 @@ def notificar_anexo_tardio_chamado(
     assunto = get_translation("push_subject_attachment", "en", numero=numero_chamado)
     link = _link_chamado(chamado_id)
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Novo anexo — Chamado {numero_chamado}",
+        tipo="observador_anexo_tardio",
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — New Attachment",
+        "#0891b2",
+        f"<p>The requester <em>{escape(solicitante_nome)}</em> added a new attachment to ticket "
+        f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("File", nome_arquivo),
+                ("Reason", motivo),
+                ("Added by", solicitante_nome),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — new attachment added by {solicitante_nome}.\n"
+        f"File: {nome_arquivo}\nReason: {motivo}" + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — New Attachment",
-                "#0891b2",
-                f"<p>The requester <em>{escape(solicitante_nome)}</em> added a new attachment to ticket "
-                f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("File", nome_arquivo),
-                        ("Reason", motivo),
-                        ("Added by", solicitante_nome),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} — new attachment added by {solicitante_nome}.\n"
-                f"File: {nome_arquivo}\nReason: {motivo}"
-                + (f"\n\nView ticket: {link}" if link else "")
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info("Late attachment e-mail sent to %s (ticket %s)", email, numero_chamado)
-            else:
-                logger.warning(
-                    "Failed to send late attachment e-mail to %s (ticket %s): %s",
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Novo anexo — Chamado {numero_chamado}",
-                mensagem=categoria,
-                tipo="observador_anexo_tardio",
-                categoria=categoria,
+                resumo=f"New attachment from {solicitante_nome}: {nome_arquivo}",
+                link=link,
+                descricao="late attachment",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -474,51 +563,53 @@ def notificar_resposta_solicitante_chamado(
     assunto = get_translation("push_subject_reply", "en", numero=numero_chamado)
     link = _link_chamado(chamado_id)
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Nova resposta — Chamado {numero_chamado}",
+        tipo="observador_resposta_solicitante",
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — New Reply",
+        "#0891b2",
+        f"<p>The requester <em>{escape(solicitante_nome)}</em> replied to ticket "
+        f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("Message", mensagem),
+                ("Replied by", solicitante_nome),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — new reply from {solicitante_nome}.\n"
+        f"Message: {mensagem}" + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — New Reply",
-                "#0891b2",
-                f"<p>The requester <em>{escape(solicitante_nome)}</em> replied to ticket "
-                f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("Message", mensagem),
-                        ("Replied by", solicitante_nome),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} — new reply from {solicitante_nome}.\n"
-                f"Message: {mensagem}" + (f"\n\nView ticket: {link}" if link else "")
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info("Reply e-mail sent to %s (ticket %s)", email, numero_chamado)
-            else:
-                logger.warning(
-                    "Failed to send reply e-mail to %s (ticket %s): %s",
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Nova resposta — Chamado {numero_chamado}",
-                mensagem=categoria,
-                tipo="observador_resposta_solicitante",
-                categoria=categoria,
+                resumo=f"New reply from {solicitante_nome}",
+                link=link,
+                descricao="reply",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -576,51 +667,53 @@ def notificar_resposta_supervisor_chamado(
     assunto = get_translation("push_subject_reply_supervisor", "en", numero=numero_chamado)
     link = _link_chamado(chamado_id)
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=f"Nova resposta — Chamado {numero_chamado}",
+        tipo="resposta_responsavel",
+        categoria=categoria,
+    )
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — New Reply",
+        "#0891b2",
+        f"<p>The responsible <em>{escape(respondente_nome)}</em> replied to ticket "
+        f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
+        + build_detail_table(
+            [
+                ("Ticket", numero_chamado),
+                ("Category", categoria_en),
+                ("Message", mensagem),
+                ("Replied by", respondente_nome),
+            ]
+        )
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — new reply from {respondente_nome}.\n"
+        f"Message: {mensagem}" + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — New Reply",
-                "#0891b2",
-                f"<p>The responsible <em>{escape(respondente_nome)}</em> replied to ticket "
-                f"<strong>{escape(numero_chamado)}</strong> ({escape(categoria_en)}).</p>"
-                + build_detail_table(
-                    [
-                        ("Ticket", numero_chamado),
-                        ("Category", categoria_en),
-                        ("Message", mensagem),
-                        ("Replied by", respondente_nome),
-                    ]
-                )
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} — new reply from {respondente_nome}.\n"
-                f"Message: {mensagem}" + (f"\n\nView ticket: {link}" if link else "")
-            )
-            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-            if ok:
-                logger.info("Reply e-mail sent to %s (ticket %s)", email, numero_chamado)
-            else:
-                logger.warning(
-                    "Failed to send reply e-mail to %s (ticket %s): %s",
-                    email,
-                    numero_chamado,
-                    err,
-                )
-
-        if uid:
-            criar_notificacao(
-                usuario_id=uid,
+            _enviar_email_fanout(
+                email,
+                assunto,
+                corpo_html,
+                corpo_texto,
                 chamado_id=chamado_id,
                 numero_chamado=numero_chamado,
-                titulo=f"Nova resposta — Chamado {numero_chamado}",
-                mensagem=categoria,
-                tipo="resposta_responsavel",
-                categoria=categoria,
+                resumo=f"New reply from {respondente_nome}",
+                link=link,
+                descricao="reply",
             )
+
+        if uid:
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -793,37 +886,50 @@ def notificar_decisao_previsao_atendimento(
         status="Approved" if aprovado else "Rejected",
     )
 
+    _criar_inapp_destinatarios(
+        destinatarios,
+        chamado_id=chamado_id,
+        numero_chamado=numero_chamado,
+        titulo=(
+            f"Previsão aprovada — Chamado {numero_chamado}"
+            if aprovado
+            else f"Previsão rejeitada — Chamado {numero_chamado}"
+        ),
+        tipo="previsao_atendimento_aprovada" if aprovado else "previsao_atendimento_rejeitada",
+        categoria=categoria,
+    )
+
+    cor = "#16a34a" if aprovado else "#dc2626"
+    detalhes = [
+        ("Ticket", numero_chamado),
+        ("Category", categoria_en),
+        ("Requested date", previsao_fmt),
+        ("Decided by", gestor_nome),
+    ]
+    if not aprovado and motivo_rejeicao:
+        detalhes.append(("Rejection reason", motivo_rejeicao))
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — Attendance Forecast {'Approved' if aprovado else 'Rejected'}",
+        cor,
+        f"<p>Your attendance forecast request for ticket "
+        f"<strong>{escape(numero_chamado)}</strong> was "
+        f"<strong>{'approved' if aprovado else 'rejected'}</strong> by "
+        f"<em>{escape(gestor_nome)}</em>.</p>"
+        + build_detail_table(detalhes)
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — attendance forecast request "
+        f"{'approved' if aprovado else 'rejected'} by {gestor_nome}."
+        + (f"\nReason: {motivo_rejeicao}" if not aprovado and motivo_rejeicao else "")
+        + (f"\n\nView ticket: {link}" if link else "")
+    )
+
     for usuario in destinatarios:
         email = getattr(usuario, "email", None)
         uid = getattr(usuario, "id", None)
 
         if email:
-            cor = "#16a34a" if aprovado else "#dc2626"
-            detalhes = [
-                ("Ticket", numero_chamado),
-                ("Category", categoria_en),
-                ("Requested date", previsao_fmt),
-                ("Decided by", gestor_nome),
-            ]
-            if not aprovado and motivo_rejeicao:
-                detalhes.append(("Rejection reason", motivo_rejeicao))
-            corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — Attendance Forecast "
-                f"{'Approved' if aprovado else 'Rejected'}",
-                cor,
-                f"<p>Your attendance forecast request for ticket "
-                f"<strong>{escape(numero_chamado)}</strong> was "
-                f"<strong>{'approved' if aprovado else 'rejected'}</strong> by "
-                f"<em>{escape(gestor_nome)}</em>.</p>"
-                + build_detail_table(detalhes)
-                + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-            )
-            corpo_texto = (
-                f"Ticket {numero_chamado} — attendance forecast request "
-                f"{'approved' if aprovado else 'rejected'} by {gestor_nome}."
-                + (f"\nReason: {motivo_rejeicao}" if not aprovado and motivo_rejeicao else "")
-                + (f"\n\nView ticket: {link}" if link else "")
-            )
             ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
             if ok:
                 logger.info(
@@ -840,23 +946,6 @@ def notificar_decisao_previsao_atendimento(
                 )
 
         if uid:
-            criar_notificacao(
-                usuario_id=uid,
-                chamado_id=chamado_id,
-                numero_chamado=numero_chamado,
-                titulo=(
-                    f"Previsão aprovada — Chamado {numero_chamado}"
-                    if aprovado
-                    else f"Previsão rejeitada — Chamado {numero_chamado}"
-                ),
-                mensagem=categoria,
-                tipo=(
-                    "previsao_atendimento_aprovada"
-                    if aprovado
-                    else "previsao_atendimento_rejeitada"
-                ),
-                categoria=categoria,
-            )
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -912,7 +1001,7 @@ def notificar_extensao_automatica_previsao(
     ]
 
     vistos: set = set()
-
+    destinatarios: list = []
     for usuario in (solicitante_usuario, gestor_solicitante, gestor_solicitado):
         if usuario is None:
             continue
@@ -920,46 +1009,121 @@ def notificar_extensao_automatica_previsao(
         if uid is None or uid in vistos:
             continue
         vistos.add(uid)
+        destinatarios.append(usuario)
+
+    # 5º papel: o responsável que clicou — mensagem própria com a contagem
+    # de extensões restantes, não misturada no loop genérico abaixo.
+    responsavel_id_confirmacao = (
+        getattr(responsavel_usuario, "id", None) if responsavel_usuario is not None else None
+    )
+    notificar_responsavel = (
+        responsavel_usuario is not None and responsavel_id_confirmacao not in vistos
+    )
 
+    inapp = [
+        {
+            "usuario_id": getattr(usuario, "id", None),
+            "chamado_id": chamado_id,
+            "numero_chamado": numero_chamado,
+            "titulo": f"Prazo adiado automaticamente — Chamado {numero_chamado}",
+            "mensagem": categoria,
+            "tipo": "previsao_extensao_automatica_aplicada",
+            "categoria": categoria,
+        }
+        for usuario in destinatarios
+    ]
+    if notificar_responsavel and responsavel_id_confirmacao:
+        inapp.append(
+            {
+                "usuario_id": responsavel_id_confirmacao,
+                "chamado_id": chamado_id,
+                "numero_chamado": numero_chamado,
+                "titulo": (
+                    f"Extensão automática aplicada — restam {extensoes_restantes} "
+                    f"de {extensoes_usadas + extensoes_restantes}"
+                ),
+                "mensagem": categoria,
+                "tipo": "previsao_extensao_automatica_confirmacao",
+                "categoria": categoria,
+            }
+        )
+    criar_notificacoes_em_lote(inapp)
+
+    corpo_html = build_email_shell(
+        f"Ticket {numero_chamado} — Deadline Automatically Extended",
+        "#d97706",
+        f"<p>The deadline for ticket <strong>{escape(numero_chamado)}</strong> "
+        f"({escape(categoria_en)}) was automatically extended to "
+        f"<strong>{escape(previsao_fmt)}</strong> (self-service, no manager approval "
+        "was needed for this extension).</p>"
+        + build_detail_table(detalhes)
+        + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero_chamado} — deadline automatically extended to {previsao_fmt}."
+        + (f"\n\nView ticket: {link}" if link else "")
+    )
+
+    for usuario in destinatarios:
+        uid = getattr(usuario, "id", None)
         email = getattr(usuario, "email", None)
+        if email:
+            ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
+            if ok:
+                logger.info(
+                    "Automatic extension e-mail sent to %s (ticket %s)", email, numero_chamado
+                )
+            else:
+                logger.warning(
+                    "Failed to send automatic extension e-mail to %s (ticket %s): %s",
+                    email,
+                    numero_chamado,
+                    err,
+                )
+
+        webpush_service.enviar_webpush_usuario(
+            uid,
+            titulo=assunto,
+            corpo=categoria,
+            url=link or "",
+        )
+
+    if notificar_responsavel:
+        uid = responsavel_id_confirmacao
+        email = getattr(responsavel_usuario, "email", None)
         if email:
             corpo_html = build_email_shell(
-                f"Ticket {numero_chamado} — Deadline Automatically Extended",
-                "#d97706",
-                f"<p>The deadline for ticket <strong>{escape(numero_chamado)}</strong> "
-                f"({escape(categoria_en)}) was automatically extended to "
-                f"<strong>{escape(previsao_fmt)}</strong> (self-service, no manager approval "
-                "was needed for this extension).</p>"
+                f"Ticket {numero_chamado} — Automatic Extension Applied",
+                "#16a34a",
+                f"<p>Your automatic extension for ticket "
+                f"<strong>{escape(numero_chamado)}</strong> was applied — new deadline "
+                f"<strong>{escape(previsao_fmt)}</strong>. You have "
+                f"<strong>{extensoes_restantes}</strong> automatic extension(s) left on "
+                "this ticket before a manager approval is required.</p>"
                 + build_detail_table(detalhes)
                 + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
             )
             corpo_texto = (
-                f"Ticket {numero_chamado} — deadline automatically extended to {previsao_fmt}."
+                f"Ticket {numero_chamado} — automatic extension applied, new deadline "
+                f"{previsao_fmt}. {extensoes_restantes} automatic extension(s) left."
                 + (f"\n\nView ticket: {link}" if link else "")
             )
             ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
             if ok:
                 logger.info(
-                    "Automatic extension e-mail sent to %s (ticket %s)", email, numero_chamado
+                    "Automatic extension confirmation e-mail sent to %s (ticket %s)",
+                    email,
+                    numero_chamado,
                 )
             else:
                 logger.warning(
-                    "Failed to send automatic extension e-mail to %s (ticket %s): %s",
+                    "Failed to send automatic extension confirmation e-mail to %s (ticket %s): %s",
                     email,
                     numero_chamado,
                     err,
                 )
 
         if uid:
-            criar_notificacao(
-                usuario_id=uid,
-                chamado_id=chamado_id,
-                numero_chamado=numero_chamado,
-                titulo=f"Prazo adiado automaticamente — Chamado {numero_chamado}",
-                mensagem=categoria,
-                tipo="previsao_extensao_automatica_aplicada",
-                categoria=categoria,
-            )
             webpush_service.enviar_webpush_usuario(
                 uid,
                 titulo=assunto,
@@ -967,65 +1131,6 @@ def notificar_extensao_automatica_previsao(
                 url=link or "",
             )
 
-    # 5º papel: o responsável que clicou — mensagem própria com a contagem
-    # de extensões restantes, não misturada no loop genérico acima.
-    if responsavel_usuario is not None:
-        uid = getattr(responsavel_usuario, "id", None)
-        if uid not in vistos:
-            email = getattr(responsavel_usuario, "email", None)
-            if email:
-                corpo_html = build_email_shell(
-                    f"Ticket {numero_chamado} — Automatic Extension Applied",
-                    "#16a34a",
-                    f"<p>Your automatic extension for ticket "
-                    f"<strong>{escape(numero_chamado)}</strong> was applied — new deadline "
-                    f"<strong>{escape(previsao_fmt)}</strong>. You have "
-                    f"<strong>{extensoes_restantes}</strong> automatic extension(s) left on "
-                    "this ticket before a manager approval is required.</p>"
-                    + build_detail_table(detalhes)
-                    + (build_cta_button("View ticket", link, "#2563eb") if link else ""),
-                )
-                corpo_texto = (
-                    f"Ticket {numero_chamado} — automatic extension applied, new deadline "
-                    f"{previsao_fmt}. {extensoes_restantes} automatic extension(s) left."
-                    + (f"\n\nView ticket: {link}" if link else "")
-                )
-                ok, err = enviar_email(email, assunto, corpo_html, corpo_texto, importance="normal")
-                if ok:
-                    logger.info(
-                        "Automatic extension confirmation e-mail sent to %s (ticket %s)",
-                        email,
-                        numero_chamado,
-                    )
-                else:
-                    logger.warning(
-                        "Failed to send automatic extension confirmation e-mail to %s "
-                        "(ticket %s): %s",
-                        email,
-                        numero_chamado,
-                        err,
-                    )
-
-            if uid:
-                criar_notificacao(
-                    usuario_id=uid,
-                    chamado_id=chamado_id,
-                    numero_chamado=numero_chamado,
-                    titulo=(
-                        f"Extensão automática aplicada — restam {extensoes_restantes} "
-                        f"de {extensoes_usadas + extensoes_restantes}"
-                    ),
-                    mensagem=categoria,
-                    tipo="previsao_extensao_automatica_confirmacao",
-                    categoria=categoria,
-                )
-                webpush_service.enviar_webpush_usuario(
-                    uid,
-                    titulo=assunto,
-                    corpo=categoria,
-                    url=link or "",
-                )
-
 
 # ── Helpers de disparo em thread (usados pelas rotas) ───────────────────────
 
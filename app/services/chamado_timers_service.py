@@ -0,0 +1,413 @@
+"""Tabela unificada de gatilhos temporais por chamado (chamado_timers).
+
+Escalonamento (aviso prévio + tick), avisos de 50%/80% do prazo de resolução
+e lembretes de confirmação eram todos descobertos por varredura: cada job
+relia todos os chamados abertos e recalculava "já está na hora?" em Python.
+Aqui cada chamado guarda o PRÓXIMO instante em que algo pode acontecer, um
+timer por tipo:
+
+  escalonamento         → alvo do próximo tick (ou SLA_PRE_AVISO_MINUTOS antes,
+                          se o aviso prévio daquele nível ainda não saiu),
+                          nunca antes de previsao_atendimento;
+  aviso_resolucao       → instante em que o prazo de resolução atinge 50%
+                          (ou 80%, se o de 50% já foi enviado);
+  lembrete_confirmacao  → data_conclusao + 24 h (ou + 48 h após o 1º).
+
+Os timers são recalculados a partir da linha do chamado a cada mudança de
+estado (sincronizar_timers_se_ativo, chamado pelos pontos de escrita em
+app/models.py e pelos claims CAS dos jobs), na mesma transação da escrita.
+O despachante (despachar_timers_vencidos) reivindica só os vencidos —
+WHERE due_at <= now ORDER BY due_at FOR UPDATE SKIP LOCKED — e roda os
+mesmos handlers por chamado dos jobs de varredura, que continuam revalidando
+tudo via CAS: um timer desatualizado custa uma avaliação à toa, nunca um
+envio duplicado.
+
+Digest diário e lembrete de MFA são por usuário, não por chamado — seguem
+nos próprios jobs.
+
+Desligado por padrão (CHAMADO_TIMERS_ENABLED); ver _iniciar_scheduler.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db as db_module
+from app.db.models.chamado import ChamadoRow
+from app.db.models.chamado_timer import ChamadoTimerRow
+from app.services import lembrete_confirmacao_service as lembrete
+from app.services import sla_escalacao_service as sla
+from app.services.business_time import (
+    adicionar_minutos_uteis,
+    instante_percentual_prazo_resolucao,
+    pode_enviar_notificacao_agora,
+)
+from app.services.notifications_core import _config
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+TIPO_ESCALONAMENTO = "escalonamento"
+TIPO_AVISO_RESOLUCAO = "aviso_resolucao"
+TIPO_LEMBRETE_CONFIRMACAO = "lembrete_confirmacao"
+
+_TIPOS = (TIPO_ESCALONAMENTO, TIPO_AVISO_RESOLUCAO, TIPO_LEMBRETE_CONFIRMACAO)
+
+_TZ = ZoneInfo(Config.SLA_TIMEZONE)
+
+# Timers por execução do despachante — o resto fica para o minuto seguinte.
+_LIMITE_POR_EXECUCAO = 200
+
+# Timer que continua vencido depois do handler (fora do expediente, e-mail
+# falhou, etc.) volta para a fila daqui a N minutos — a cadência do antigo
+# job de varredura — em vez de ser reavaliado a cada minuto.
+_REPROGRAMAR_MINUTOS = 10
+
+# Claim mais velho que isso é de um worker que morreu no meio: pode ser
+# reivindicado de novo.
+_CLAIM_EXPIRA_MINUTOS = 15
+
+
+def timers_ativos() -> bool:
+    return bool(_config("CHAMADO_TIMERS_ENABLED", Config.CHAMADO_TIMERS_ENABLED))
+
+
+def _como_brt(dt: datetime) -> datetime:
+    """Naive → BRT (convenção do motor de tempo útil); aware fica como está."""
+    return dt.replace(tzinfo=_TZ) if dt.tzinfo is None else dt
+
+
+def _relogio_brt(dt: datetime) -> datetime:
+    """Instante cujo relógio BRT é o relógio de `dt`, ignorando o fuso de `dt`.
+
+    O motor de escalonamento compara alvo/previsão com `agora` por
+    replace(tzinfo=None) — o timer precisa vencer exatamente quando essa
+    comparação passa a ser verdadeira no handler.
+    """
+    return dt.replace(tzinfo=None).replace(tzinfo=_TZ)
+
+
+# ---------------------------------------------------------------------------
+# Cálculo (puro, a partir da linha do chamado)
+# ---------------------------------------------------------------------------
+
+
+def _timer_escalonamento(row: ChamadoRow) -> tuple[datetime, dict] | None:
+    if row.status not in ("Aberto", "Em Atendimento"):
+        return None
+    nivel = int(row.escalacao_nivel or 0)
+    if nivel >= sla._NIVEL_MAXIMO:
+        return None
+    if nivel > 0:
+        alvo = row.escalacao_proximo_tick_em
+    elif row.data_abertura is not None:
+        alvo = sla.calcular_deadline_inicial(row.categoria or "", row.status, row.data_abertura)
+    else:
+        alvo = None
+    if alvo is None:
+        return None
+
+    nivel_alvo = nivel + 1
+    fase = "tick"
+    due = _relogio_brt(alvo)
+    if row.escalacao_pre_aviso_nivel_enviado != nivel_alvo:
+        fase = "pre_aviso"
+        due -= timedelta(minutes=Config.SLA_PRE_AVISO_MINUTOS)
+    if row.previsao_atendimento is not None:
+        due = max(due, _relogio_brt(row.previsao_atendimento))
+    return due, {"nivel_alvo": nivel_alvo, "fase": fase}
+
+
+def _timer_aviso_resolucao(row: ChamadoRow) -> tuple[datetime, dict] | None:
+    if row.status != "Em Atendimento" or not row.responsavel_id:
+        return None
+    if row.data_em_atendimento is None:
+        return None
+    if row.alerta_supervisor_50_enviado and row.alerta_supervisor_80_enviado:
+        return None
+    marco = 80 if row.alerta_supervisor_50_enviado else 50
+    due = instante_percentual_prazo_resolucao(
+        row.data_em_atendimento, row.categoria or "", marco / 100
+    )
+    return _como_brt(due), {"marco": marco}
+
+
+def _timer_lembrete_confirmacao(row: ChamadoRow) -> tuple[datetime, dict] | None:
+    if row.status != "Concluído" or row.confirmacao_solicitante != "pendente":
+        return None
+    if row.lembrete_confirmacao_2_enviado:
+        return None
+    data_conclusao = lembrete._ts_para_datetime(row.data_conclusao)
+    if data_conclusao is None:
+        return None
+    numero = 2 if row.lembrete_confirmacao_1_enviado else 1
+    horas = lembrete._LEMBRETE_2_HORAS if numero == 2 else lembrete._LEMBRETE_1_HORAS
+    return data_conclusao + timedelta(hours=horas), {"numero": numero}
+
+
+def calcular_timers(row: ChamadoRow) -> dict[str, tuple[datetime, dict]]:
+    """{tipo: (due_at, payload)} dos gatilhos ainda pendentes do chamado."""
+    timers: dict[str, tuple[datetime, dict]] = {}
+    for tipo, calcular in (
+        (TIPO_ESCALONAMENTO, _timer_escalonamento),
+        (TIPO_AVISO_RESOLUCAO, _timer_aviso_resolucao),
+        (TIPO_LEMBRETE_CONFIRMACAO, _timer_lembrete_confirmacao),
+    ):
+        timer = calcular(row)
+        if timer is not None:
+            timers[tipo] = timer
+    return timers
+
+
+# ---------------------------------------------------------------------------
+# Sincronização (mesma transação da escrita no chamado)
+# ---------------------------------------------------------------------------
+
+
+def _gravar_timers(session, chamado_id: int, row: ChamadoRow | None) -> None:
+    desejados = calcular_timers(row) if row is not None else {}
+    session.execute(
+        delete(ChamadoTimerRow).where(
+            ChamadoTimerRow.chamado_id == chamado_id,
+            ChamadoTimerRow.tipo.not_in(list(desejados)),
+        )
+    )
+    for tipo, (due_at, payload) in desejados.items():
+        stmt = insert(ChamadoTimerRow).values(
+            chamado_id=chamado_id,
+            tipo=tipo,
+            due_at=due_at,
+            prazo_calculado=due_at,
+            payload=payload,
+        )
+        # Compara com o prazo calculado, não com due_at: timer cujo prazo não
+        # mudou não é reescrito — preserva um claim em andamento e o adiamento
+        # do despachante quando o chamado muda em campos que não afetam o prazo.
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_chamado_timer_tipo",
+            set_={
+                "due_at": stmt.excluded.due_at,
+                "prazo_calculado": stmt.excluded.prazo_calculado,
+                "payload": stmt.excluded.payload,
+                "claimed_by": None,
+                "claimed_at": None,
+                "atualizado_em": func.now(),
+            },
+            where=or_(
+                func.coalesce(ChamadoTimerRow.prazo_calculado, ChamadoTimerRow.due_at)
+                != stmt.excluded.prazo_calculado,
+                ChamadoTimerRow.payload != stmt.excluded.payload,
+            ),
+        )
+        session.execute(stmt)
+
+
+def sincronizar_timers(session, chamado_id: int) -> None:
+    """Recalcula os timers do chamado a partir do estado atual da linha
+    (incluindo alterações ainda não commitadas da própria sessão)."""
+    session.flush()
+    row = session.execute(
+        select(ChamadoRow)
+        .where(ChamadoRow.id == chamado_id)
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    _gravar_timers(session, chamado_id, row)
+
+
+def sincronizar_timers_se_ativo(session, chamado_id: int | None) -> None:
+    """Gancho dos pontos de escrita em chamados. Em savepoint: falha aqui é
+    logada e não desfaz a escrita do chamado — o timer é reconstruído pela
+    reconciliação (reconstruir_timers)."""
+    if not chamado_id or not timers_ativos():
+        return
+    try:
+        with session.begin_nested():
+            sincronizar_timers(session, int(chamado_id))
+    except Exception as exc:
+        logger.warning("Timers: falha ao sincronizar chamado %s: %s", chamado_id, exc)
+
+
+def reconstruir_timers() -> dict:
+    """Reconciliação: recalcula os timers de todos os chamados que ainda podem
+    ter gatilho pendente (lotes keyset, sem teto). Cobre chamados anteriores à
+    ativação e qualquer escrita que tenha escapado dos ganchos."""
+    stats = {"chamados": 0, "erros": 0}
+    filtros = (
+        or_(
+            ChamadoRow.status.in_(("Aberto", "Em Atendimento")),
+            and_(
+                ChamadoRow.status == "Concluído",
+                ChamadoRow.confirmacao_solicitante == "pendente",
+            ),
+        ),
+    )
+    try:
+        for row in sla._iterar_chamados_em_lotes(*filtros):
+            stats["chamados"] += 1
+            try:
+                with db_module.SessionLocal() as session, session.begin():
+                    _gravar_timers(session, row.id, row)
+            except Exception as exc:
+                logger.exception("Timers: erro ao reconstruir chamado %s: %s", row.id, exc)
+                stats["erros"] += 1
+    except Exception as exc:
+        logger.exception("Timers: erro ao consultar chamados para reconstrução: %s", exc)
+        stats["erros"] += 1
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Despachante
+# ---------------------------------------------------------------------------
+
+
+def _identificador_worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _reivindicar_vencidos(agora: datetime, limite: int, worker: str) -> list[tuple[int, str]]:
+    expirado = agora - timedelta(minutes=_CLAIM_EXPIRA_MINUTOS)
+    with db_module.SessionLocal() as session, session.begin():
+        vencidos = session.execute(
+            select(ChamadoTimerRow.id, ChamadoTimerRow.chamado_id, ChamadoTimerRow.tipo)
+            .where(
+                ChamadoTimerRow.due_at <= agora,
+                or_(
+                    ChamadoTimerRow.claimed_by.is_(None),
+                    ChamadoTimerRow.claimed_at < expirado,
+                ),
+            )
+            .order_by(ChamadoTimerRow.due_at)
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if vencidos:
+            session.execute(
+                update(ChamadoTimerRow)
+                .where(ChamadoTimerRow.id.in_([v.id for v in vencidos]))
+                .values(claimed_by=worker, claimed_at=agora)
+                .execution_options(synchronize_session=False)
+            )
+    return [(v.chamado_id, v.tipo) for v in vencidos]
+
+
+def _proxima_tentativa(tipo: str, row: ChamadoRow | None, agora: datetime) -> datetime:
+    """Próximo due_at de um timer que o handler não conseguiu resolver."""
+    proxima = agora + timedelta(minutes=_REPROGRAMAR_MINUTOS)
+    respeita_expediente = tipo == TIPO_AVISO_RESOLUCAO or (
+        tipo == TIPO_ESCALONAMENTO and (row is None or row.categoria != "AOG")
+    )
+    if respeita_expediente and not pode_enviar_notificacao_agora(agora):
+        # Fora do expediente não adianta tentar de 10 em 10 min: volta no
+        # primeiro minuto útil.
+        proxima = max(proxima, _como_brt(adicionar_minutos_uteis(agora, 1)))
+    return proxima
+
+
+def _ressincronizar_e_liberar(
+    chamado_id: int, row: ChamadoRow | None, agora: datetime, worker: str
+) -> int:
+    """Recalcula os timers do chamado depois dos handlers, libera os claims
+    deste worker e adia os que continuam vencidos. Retorna quantos adiou.
+
+    O adiamento mexe só em due_at; prazo_calculado fica, e uma escrita
+    posterior no chamado só desfaz o adiamento se mudar o prazo."""
+    adiados = 0
+    with db_module.SessionLocal() as session, session.begin():
+        sincronizar_timers(session, chamado_id)
+        ainda_meus = session.execute(
+            select(ChamadoTimerRow).where(
+                ChamadoTimerRow.chamado_id == chamado_id,
+                ChamadoTimerRow.claimed_by == worker,
+            )
+        ).scalars()
+        for timer in ainda_meus:
+            if timer.due_at <= agora:
+                timer.due_at = _proxima_tentativa(timer.tipo, row, agora)
+                adiados += 1
+            timer.claimed_by = None
+            timer.claimed_at = None
+    return adiados
+
+
+def despachar_timers_vencidos(
+    agora: datetime | None = None, limite: int = _LIMITE_POR_EXECUCAO
+) -> dict:
+    """Reivindica os timers vencidos (até `limite`) e roda o handler de cada
+    tipo sobre o chamado — os mesmos de processar_escalonamento,
+    processar_avisos_resolucao e processar_lembretes_confirmacao.
+
+    Args:
+        agora: Instante de referência (naive → BRT). None = now().
+
+    Returns:
+        dict com: vencidos, reprogramados, erros e um Counter por tipo com os
+        contadores do respectivo handler.
+    """
+    agora = _como_brt(agora) if agora is not None else datetime.now(_TZ)
+    stats: dict = {
+        "vencidos": 0,
+        "reprogramados": 0,
+        "erros": 0,
+        **{tipo: Counter() for tipo in _TIPOS},
+    }
+    worker = _identificador_worker()
+
+    try:
+        vencidos = _reivindicar_vencidos(agora, limite, worker)
+    except Exception as exc:
+        logger.exception("Timers: erro ao reivindicar vencidos: %s", exc)
+        stats["erros"] += 1
+        return stats
+    if not vencidos:
+        return stats
+    stats["vencidos"] = len(vencidos)
+
+    por_chamado: dict[int, list[str]] = defaultdict(list)
+    for chamado_id, tipo in vencidos:
+        por_chamado[chamado_id].append(tipo)
+    with db_module.SessionLocal() as session:
+        rows = {
+            row.id: row
+            for row in session.execute(
+                select(ChamadoRow).where(ChamadoRow.id.in_(list(por_chamado)))
+            ).scalars()
+        }
+
+    mapas: tuple[dict, dict] | None = None
+    for chamado_id, tipos in por_chamado.items():
+        row = rows.get(chamado_id)
+        for tipo in sorted(tipos, key=_TIPOS.index):
+            if row is None:
+                continue
+            try:
+                if tipo == TIPO_ESCALONAMENTO:
+                    if mapas is None:
+                        mapas = (
+                            sla._construir_mapa_gestor_setor(),
+                            sla._construir_mapa_niveis_superiores(),
+                        )
+                    sla._processar_chamado_escalonamento(row, agora, stats[tipo], *mapas)
+                elif tipo == TIPO_AVISO_RESOLUCAO:
+                    sla._processar_aviso_resolucao(row, agora, stats[tipo])
+                elif tipo == TIPO_LEMBRETE_CONFIRMACAO:
+                    lembrete._processar_chamado(row, agora, stats[tipo])
+            except Exception as exc:
+                logger.exception("Timers: erro no %s do chamado %s: %s", tipo, chamado_id, exc)
+                stats["erros"] += 1
+        try:
+            stats["reprogramados"] += _ressincronizar_e_liberar(chamado_id, row, agora, worker)
+        except Exception as exc:
+            logger.exception("Timers: erro ao ressincronizar chamado %s: %s", chamado_id, exc)
+            stats["erros"] += 1
+
+    return stats
@@ -22,7 +22,7 @@ from app.services.notifications import (
     notificar_aprovador_novo_chamado,
     notificar_setores_adicionais_chamado,
 )
-from app.services.notifications_inapp import criar_notificacao
+from app.services.notifications_inapp import criar_notificacoes_em_lote
 from app.services.notify_retry import executar_com_retry
 from app.services.permissions import calcular_supervisor_ids_com_acesso
 from app.services.upload import salvar_anexo
@@ -481,17 +481,22 @@ def criar_chamado(
                             url_chamado = (
                                 f"{base_url}/chamado/{chamado_id}/historico" if base_url else None
                             )
+                            criar_notificacoes_em_lote(
+                                [
+                                    {
+                                        "usuario_id": destinatario_id,
+                                        "chamado_id": chamado_id,
+                                        "numero_chamado": numero_chamado,
+                                        "titulo": titulo_notif,
+                                        "mensagem": mensagem_notif,
+                                        "tipo": "novo_chamado",
+                                        "categoria": categoria or "",
+                                        "solicitante_nome": solicitante_nome,
+                                    }
+                                    for destinatario_id in destinatarios_inapp
+                                ]
+                            )
                             for destinatario_id in destinatarios_inapp:
-                                criar_notificacao(
-                                    usuario_id=destinatario_id,
-                                    chamado_id=chamado_id,
-                                    numero_chamado=numero_chamado,
-                                    titulo=titulo_notif,
-                                    mensagem=mensagem_notif,
-                                    tipo="novo_chamado",
-                                    categoria=categoria or "",
-                                    solicitante_nome=solicitante_nome,
-                                )
                                 enviar_webpush_usuario(
                                     destinatario_id,
                                     titulo=titulo_notif,
@@ -11,7 +11,7 @@ from typing import Any
 from sqlalchemy import func, select
 
 from app import db as db_module
-from app.cache import get_static_cached
+from app.cache import get_static_cached, ttl_invalidavel
 from app.db.models.chamado import ChamadoRow
 from app.db.models.historico import HistoricoRow
 from app.models import Chamado
@@ -265,7 +265,12 @@ def obter_contexto_admin(
 
     for c in chamados_ordenados:
         c.sla_info = obter_sla_para_exibicao(c)
-    gates = get_static_cached("categorias_gate", CategoriaGate.get_all, ttl_seconds=1800)
+    gates = get_static_cached(
+        "categorias_gate",
+        lambda: CategoriaGate.get_all(levantar_erro=True),
+        ttl_seconds=ttl_invalidavel(1800),
+        padrao_em_erro=[],
+    )
     lista_gates = sorted([g.nome_pt for g in gates])
     total_chamados = len(chamados_ordenados)
     total_paginas = (
@@ -11,6 +11,14 @@ Gatilho por PESSOA, não por chamado: dispara 24h depois da abertura do
 chamado pendente mais antigo dela (se nunca recebeu digest), e depois se
 repete a cada 24h enquanto ela continuar com chamados abertos. O job
 APScheduler chama processar_digest_diario() a cada 30 minutos.
+
+Tudo que depende de cada chamado — % do TAT consumido, grupo, ordenação e
+a elegibilidade da pessoa — sai de UMA consulta (_consulta_digest): o
+deadline é derivado em SQL com a mesma regra de calcular_deadline_inicial
+(não há coluna persistida; o calendário útil é só seg–sex, sem feriados,
+então o N-ésimo dia útil é aritmética de datas). O envio vai em lote
+(notificar_digests_diarios) e o estado de todos os enviados é gravado num
+único upsert.
 """
 
 from __future__ import annotations
@@ -19,14 +27,14 @@ import logging
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import select
+from sqlalchemy import Date, DateTime, Float, Integer, case, cast, extract, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app import db as db_module
 from app.db.models.apoio import DigestDiarioUsuarioRow
 from app.db.models.chamado import ChamadoRow
 from app.models import Chamado
-from app.services.notifications import notificar_digest_diario
-from app.services.sla_escalacao_service import calcular_deadline_inicial
+from app.services.notifications import notificar_digests_diarios
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -38,125 +46,182 @@ _PRIORIDADE_CATEGORIA: dict[str, int] = {"AOG": 0, "Projetos": 1}
 _PRIORIDADE_PADRAO = 2
 
 
-def _prioridade_categoria(categoria: str) -> int:
-    return _PRIORIDADE_CATEGORIA.get(categoria, _PRIORIDADE_PADRAO)
-
-
 def _naive(dt: datetime) -> datetime:
     return dt.replace(tzinfo=None) if dt.tzinfo is not None else dt
 
 
-def _percentual_tat_consumido(
-    categoria: str, status: str, data_abertura: datetime, agora: datetime
-) -> float:
-    """% do TAT consumido — reaproveita o mesmo cálculo de deadline do motor
-    de escalonamento unificado, só pra decidir o agrupamento do digest (não
-    grava nada, é derivado on-the-fly)."""
-    deadline = calcular_deadline_inicial(categoria, status, data_abertura)
-    total = (_naive(deadline) - _naive(data_abertura)).total_seconds()
-    if total <= 0:
-        return 1.0
-    decorrido = (_naive(agora) - _naive(data_abertura)).total_seconds()
-    return max(0.0, decorrido / total)
+def _dias_corridos_ate_n_util(dia_semana, n: int):
+    """Dias corridos do 1º dia útil (seg=1..sex=5) até o N-ésimo — semanas
+    cheias de 7 dias mais o resto, pulando o fim de semana se ele cair no
+    meio. Mesmo resultado do laço de adicionar_dias_uteis."""
+    k = max(n, 1) - 1
+    semanas, resto = divmod(k, 5)
+    return semanas * 7 + resto + case((dia_semana + resto > 5, 2), else_=0)
+
+
+def _percentual_tat_sql(agora_naive: datetime):
+    """% do TAT consumido em SQL, espelho de calcular_deadline_inicial.
+
+    Mantém a convenção "relógio de parede naive" do restante do motor: a
+    abertura e o agora são comparados sem fuso (abertura no fuso da sessão),
+    e o deadline em dias úteis é o N-ésimo dia útil às SLA_HORARIO_FIM no
+    fuso do SLA.
+    """
+    abertura = cast(ChamadoRow.data_abertura, DateTime())
+    dia = cast(func.timezone(Config.SLA_TIMEZONE, ChamadoRow.data_abertura), Date())
+    dia_semana = cast(extract("isodow", dia), Integer())
+    fim_de_semana = dia_semana > 5
+    primeiro_util = dia + case((fim_de_semana, 8 - dia_semana), else_=0)
+    semana_util = case((fim_de_semana, 1), else_=dia_semana)
+
+    dias = case(
+        (
+            ChamadoRow.categoria == "Projetos",
+            _dias_corridos_ate_n_util(semana_util, Config.SLA_DIAS_RESOLUCAO_PROJETOS),
+        ),
+        else_=_dias_corridos_ate_n_util(semana_util, Config.SLA_DIAS_RESOLUCAO_PADRAO),
+    )
+    h, m = map(int, Config.SLA_HORARIO_FIM.split(":"))
+    fim_expediente = literal(timedelta(hours=h, minutes=m))
+    deadline_util = cast(primeiro_util + dias, DateTime()) + fim_expediente
+
+    deadline_aog = abertura + case(
+        (
+            ChamadoRow.status == "Aberto",
+            literal(timedelta(hours=Config.SLA_AOG_CLAIM_HORAS)),
+        ),
+        else_=literal(timedelta(hours=Config.SLA_AOG_TAT_HORAS)),
+    )
+    deadline = case((ChamadoRow.categoria == "AOG", deadline_aog), else_=deadline_util)
+
+    total = extract("epoch", deadline - abertura)
+    decorrido = extract("epoch", literal(agora_naive, DateTime()) - abertura)
+    return cast(
+        case((total <= 0, 1.0), else_=func.greatest(0, decorrido / total)),
+        Float(),
+    )
+
+
+def _consulta_digest(agora_naive: datetime):
+    """Chamados de todas as pessoas com digest vencido, já com % do TAT,
+    grupo e na ordem do e-mail (pessoa, grupo, prioridade, urgência)."""
+    mais_antigo = func.min(cast(ChamadoRow.data_abertura, DateTime())).over(
+        partition_by=ChamadoRow.responsavel_id
+    )
+    base = (
+        select(
+            ChamadoRow.id.label("chamado_id"),
+            _percentual_tat_sql(agora_naive).label("pct"),
+            mais_antigo.label("mais_antigo"),
+        )
+        .where(
+            ChamadoRow.status.in_(("Aberto", "Em Atendimento")),
+            ChamadoRow.responsavel_id.isnot(None),
+        )
+        .cte("digest_base")
+    )
+    ultimo_envio = cast(DigestDiarioUsuarioRow.ultimo_envio_em, DateTime())
+    vencido = base.c.pct >= _LIMIAR_PERTO_DE_VENCER
+    prioridade = case(
+        *((ChamadoRow.categoria == cat, p) for cat, p in _PRIORIDADE_CATEGORIA.items()),
+        else_=_PRIORIDADE_PADRAO,
+    )
+    return (
+        select(ChamadoRow, base.c.pct, vencido.label("vencido"))
+        .join(base, base.c.chamado_id == ChamadoRow.id)
+        .outerjoin(
+            DigestDiarioUsuarioRow,
+            DigestDiarioUsuarioRow.usuario_id == ChamadoRow.responsavel_id,
+        )
+        .where(func.coalesce(ultimo_envio, base.c.mais_antigo) <= agora_naive - _JANELA_DIGEST)
+        .order_by(
+            ChamadoRow.responsavel_id,
+            vencido.desc(),
+            prioridade,
+            base.c.pct.desc(),
+            ChamadoRow.id,
+        )
+    )
 
 
 def processar_digest_diario(agora: datetime | None = None) -> dict:
     """Processa o digest diário pra todos os responsáveis elegíveis.
 
     Returns:
-        dict com contadores: usuarios_processados, digests_enviados, erros
+        dict com contadores: usuarios_processados (pessoas com digest
+        vencido nesta passada), digests_enviados, erros
     """
     if agora is None:
         agora = datetime.now(ZoneInfo(Config.SLA_TIMEZONE))
+    agora_naive = _naive(agora)
 
     stats: dict = {"usuarios_processados": 0, "digests_enviados": 0, "erros": 0}
 
     try:
         with db_module.SessionLocal() as session:
-            stmt = select(ChamadoRow).where(
-                ChamadoRow.status.in_(("Aberto", "Em Atendimento")),
-                ChamadoRow.responsavel_id.isnot(None),
-            )
-            rows = session.execute(stmt).scalars().all()
+            linhas = session.execute(_consulta_digest(agora_naive)).all()
+            por_usuario: dict[str, dict] = {}
+            for row, pct, vencido in linhas:
+                grupos = por_usuario.setdefault(
+                    row.responsavel_id, {"vencidos_ou_perto": [], "abertos": []}
+                )
+                chamado = Chamado._from_row(row)
+                item = {**chamado.to_dict(), "id": chamado.id, "_pct_tat": pct}
+                grupos["vencidos_ou_perto" if vencido else "abertos"].append(item)
     except Exception as exc:
         logger.exception("Digest diário: erro ao consultar chamados: %s", exc)
         stats["erros"] += 1
         return stats
 
-    por_usuario: dict[str, list[ChamadoRow]] = {}
-    for row in rows:
-        por_usuario.setdefault(row.responsavel_id, []).append(row)
-
-    for usuario_id, chamados_rows in por_usuario.items():
-        stats["usuarios_processados"] += 1
-        try:
-            if _processar_usuario(usuario_id, chamados_rows, agora):
-                stats["digests_enviados"] += 1
-        except Exception as exc:
-            logger.exception("Digest diário: erro ao processar usuário %s: %s", usuario_id, exc)
-            stats["erros"] += 1
+    stats["usuarios_processados"] = len(por_usuario)
+    if not por_usuario:
+        return stats
 
-    return stats
+    from app.models_usuario import Usuario
 
+    usuarios = Usuario.get_by_ids(list(por_usuario))
+    digests: list[dict] = []
+    for usuario_id, grupos in por_usuario.items():
+        usuario = usuarios.get(usuario_id)
+        email_dest = (getattr(usuario, "email", None) or "").strip() if usuario else ""
+        if not email_dest:
+            logger.warning("Digest diário: usuário %s sem e-mail cadastrado; pulado.", usuario_id)
+            continue
+        digests.append({"usuario_id": usuario_id, "email_dest": email_dest, **grupos})
+
+    if not digests:
+        return stats
 
-def _processar_usuario(usuario_id: str, chamados_rows: list[ChamadoRow], agora: datetime) -> bool:
-    agora_naive = _naive(agora)
-    mais_antigo_naive = min(_naive(row.data_abertura) for row in chamados_rows)
+    try:
+        enviados = notificar_digests_diarios(digests)
+    except Exception as exc:
+        logger.exception("Digest diário: erro ao enviar lote de %d digests: %s", len(digests), exc)
+        stats["erros"] += len(digests)
+        return stats
 
-    with db_module.SessionLocal() as session:
-        estado = session.get(DigestDiarioUsuarioRow, usuario_id)
-        ultimo_envio = estado.ultimo_envio_em if estado else None
+    ids_enviados = [d["usuario_id"] for d, ok in zip(digests, enviados, strict=True) if ok]
+    stats["digests_enviados"] = len(ids_enviados)
+    stats["erros"] += len(digests) - len(ids_enviados)
 
-    if ultimo_envio is not None:
-        elegivel = agora_naive - _naive(ultimo_envio) >= _JANELA_DIGEST
-    else:
-        elegivel = agora_naive - mais_antigo_naive >= _JANELA_DIGEST
+    try:
+        _registrar_envios(ids_enviados, agora_naive)
+    except Exception as exc:
+        logger.exception("Digest diário: erro ao gravar último envio: %s", exc)
+        stats["erros"] += 1
 
-    if not elegivel:
-        return False
+    return stats
 
-    from app.models_usuario import Usuario
 
-    usuario = Usuario.get_by_id(usuario_id)
-    email_dest = (getattr(usuario, "email", None) or "").strip() if usuario else ""
-    if not email_dest:
-        logger.warning("Digest diário: usuário %s sem e-mail cadastrado; pulado.", usuario_id)
-        return False
-
-    grupos = _ordenar_e_agrupar(chamados_rows, agora)
-    notificar_digest_diario(
-        usuario_id=usuario_id,
-        email_dest=email_dest,
-        vencidos_ou_perto=grupos["vencidos_ou_perto"],
-        abertos=grupos["abertos"],
+def _registrar_envios(usuario_ids: list[str], agora_naive: datetime) -> None:
+    """Grava ultimo_envio_em de todos os digests enviados num único upsert."""
+    if not usuario_ids:
+        return
+    stmt = pg_insert(DigestDiarioUsuarioRow).values(
+        [{"usuario_id": uid, "ultimo_envio_em": agora_naive} for uid in usuario_ids]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DigestDiarioUsuarioRow.usuario_id],
+        set_={"ultimo_envio_em": stmt.excluded.ultimo_envio_em},
     )
-
     with db_module.SessionLocal() as session, session.begin():
-        estado = session.get(DigestDiarioUsuarioRow, usuario_id)
-        if estado is None:
-            session.add(DigestDiarioUsuarioRow(usuario_id=usuario_id, ultimo_envio_em=agora_naive))
-        else:
-            estado.ultimo_envio_em = agora_naive
-
-    return True
-
-
-def _ordenar_e_agrupar(chamados_rows: list[ChamadoRow], agora: datetime) -> dict:
-    vencidos_ou_perto: list[dict] = []
-    abertos: list[dict] = []
-
-    for row in chamados_rows:
-        chamado = Chamado._from_row(row)
-        data = chamado.to_dict()
-        pct = _percentual_tat_consumido(
-            data["categoria"], data["status"], data["data_abertura"], agora
-        )
-        item = {**data, "id": chamado.id, "_pct_tat": pct}
-        (vencidos_ou_perto if pct >= _LIMIAR_PERTO_DE_VENCER else abertos).append(item)
-
-    def _chave_ordenacao(item: dict) -> tuple:
-        return (_prioridade_categoria(item["categoria"]), -item["_pct_tat"])
-
-    vencidos_ou_perto.sort(key=_chave_ordenacao)
-    abertos.sort(key=_chave_ordenacao)
-    return {"vencidos_ou_perto": vencidos_ou_perto, "abertos": abertos}
+        session.execute(stmt)
@@ -0,0 +1,212 @@
+"""
+Diretório de usuários em memória por worker, atualizado incrementalmente.
+
+Usuario.get_all (dashboard de admin, métricas de supervisores, buscar_ativos,
+página de usuários, warmup) lia e descriptografava a tabela usuarios inteira a
+cada chamada. O diretório carrega tudo uma vez e, a cada consulta depois de
+CACHE_DIRETORIO_USUARIOS_SEGUNDOS, busca só as linhas com
+atualizado_em > última vista (idx_usuarios_atualizado_em) — PII descriptografada
+só para quem mudou. Mantém índices por área, perfil e nivel_gestao, de modo que
+get_supervisores_por_area e construir_mapa_gestor_setor viram consultas em
+memória.
+
+Detalhes:
+  - atualizado_em vem do banco (onupdate do UsuarioRow); a busca volta
+    MARGEM_SEGUNDOS na marca d'água para pegar transações que gravaram antes
+    dela mas só commitaram depois. Linha já vista com o mesmo atualizado_em é
+    ignorada (sem descriptografar de novo).
+  - Exclusões não deixam linha para trás: cada atualização também lê só os ids
+    (barato, sem PII) e descarta quem sumiu.
+  - Escritas do próprio worker (Usuario.save/update/delete) marcam o diretório
+    como desatualizado, e a próxima consulta já atualiza; nos outros workers a
+    defasagem máxima é o intervalo.
+
+Os objetos Usuario devolvidos são compartilhados entre requests (como no
+get_static_cached("usuarios_all")): não mutar.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+import app.db as db_module
+from app.db.models.usuario import UsuarioRow
+
+logger = logging.getLogger(__name__)
+
+MARGEM_SEGUNDOS = 60
+
+
+def _chave_nome(usuario) -> str:
+    return (usuario.nome or "").lower()
+
+
+class DiretorioUsuarios:
+    """Usuários por id + índices por área, perfil e nivel_gestao."""
+
+    def __init__(self, *, intervalo_segundos: float) -> None:
+        self._intervalo = intervalo_segundos
+        self._lock = threading.Lock()
+        self._usuarios: dict = {}
+        self._atualizado_em: dict[str, datetime | None] = {}
+        self._por_area: dict[str, set[str]] = {}
+        self._por_perfil: dict[str, set[str]] = {}
+        self._por_nivel: dict[str, set[str]] = {}
+        self._marca_dagua: datetime | None = None
+        self._carregado = False
+        self._proxima_atualizacao = 0.0
+        self._ordenados: list | None = None
+        self.versao = 0
+
+    # ── Atualização ──────────────────────────────────────────────────────────
+
+    def marcar_desatualizado(self) -> None:
+        """A próxima consulta atualiza (escrita feita neste worker)."""
+        self._proxima_atualizacao = 0.0
+
+    def atualizar(self) -> bool:
+        """Carrega (1ª vez) ou aplica as mudanças desde a última marca d'água.
+
+        Retorna True se algo mudou. Falha numa atualização incremental é
+        logada e o diretório segue servindo o que já tem; falha na carga
+        inicial propaga (quem chama cai no caminho direto do banco).
+        """
+        with self._lock:
+            if self._carregado and time.monotonic() < self._proxima_atualizacao:
+                return False
+            try:
+                mudou = self._atualizar()
+            except Exception:
+                if not self._carregado:
+                    raise
+                logger.warning("Diretório de usuários: atualização falhou", exc_info=True)
+                mudou = False
+            self._proxima_atualizacao = time.monotonic() + self._intervalo
+            return mudou
+
+    def _atualizar(self) -> bool:
+        from app.models_usuario import Usuario
+
+        consulta = select(UsuarioRow)
+        if self._marca_dagua is not None:
+            desde = self._marca_dagua - timedelta(seconds=MARGEM_SEGUNDOS)
+            consulta = consulta.where(UsuarioRow.atualizado_em > desde)
+        # Sessão própria, fora do scoped_session: pode rodar no meio da
+        # transação de quem chamou (ver Usuario.get_supervisores_por_area), que
+        # não pode ser fechada nem ficar com transação autoiniciada por nós.
+        with db_module.SessionLocal.session_factory() as session:
+            rows = [
+                row
+                for row in session.execute(consulta).scalars().all()
+                if row.id not in self._atualizado_em
+                or self._atualizado_em[row.id] != row.atualizado_em
+            ]
+            removidos: set[str] = set()
+            if self._carregado:
+                ids = set(session.execute(select(UsuarioRow.id)).scalars().all())
+                removidos = set(self._usuarios) - ids
+
+        for usuario_id in removidos:
+            self._remover(usuario_id)
+        for row, usuario in zip(rows, Usuario._from_rows(rows), strict=True):
+            self._remover(row.id)
+            self._usuarios[row.id] = usuario
+            self._atualizado_em[row.id] = row.atualizado_em
+            self._indexar(usuario)
+            if row.atualizado_em is not None and (
+                self._marca_dagua is None or row.atualizado_em > self._marca_dagua
+            ):
+                self._marca_dagua = row.atualizado_em
+
+        self._carregado = True
+        if not rows and not removidos:
+            return False
+        self._ordenados = None
+        self.versao += 1
+        logger.debug(
+            "Diretório de usuários v%d: %d atualizado(s), %d removido(s)",
+            self.versao,
+            len(rows),
+            len(removidos),
+        )
+        return True
+
+    def _indexar(self, usuario) -> None:
+        for area in usuario.areas or []:
+            self._por_area.setdefault(area, set()).add(usuario.id)
+        self._por_perfil.setdefault(usuario.perfil, set()).add(usuario.id)
+        if usuario.nivel_gestao:
+            self._por_nivel.setdefault(usuario.nivel_gestao, set()).add(usuario.id)
+
+    def _remover(self, usuario_id: str) -> None:
+        usuario = self._usuarios.pop(usuario_id, None)
+        self._atualizado_em.pop(usuario_id, None)
+        if usuario is None:
+            return
+        for indice, chaves in (
+            (self._por_area, usuario.areas or []),
+            (self._por_perfil, [usuario.perfil]),
+            (self._por_nivel, [usuario.nivel_gestao] if usuario.nivel_gestao else []),
+        ):
+            for chave in chaves:
+                ids = indice.get(chave)
+                if ids is not None:
+                    ids.discard(usuario_id)
+                    if not ids:
+                        del indice[chave]
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+
+    def _selecionar(self, ids) -> list:
+        return sorted((self._usuarios[i] for i in ids), key=_chave_nome)
+
+    def todos(self) -> list:
+        """Todos os usuários, ordenados por nome (lista nova a cada chamada)."""
+        self.atualizar()
+        with self._lock:
+            if self._ordenados is None:
+                self._ordenados = sorted(self._usuarios.values(), key=_chave_nome)
+            return list(self._ordenados)
+
+    def por_area(self, area: str) -> list:
+        self.atualizar()
+        with self._lock:
+            return self._selecionar(self._por_area.get(area, ()))
+
+    def por_perfil(self, *perfis: str) -> list:
+        self.atualizar()
+        with self._lock:
+            return self._selecionar(set().union(*(self._por_perfil.get(p, ()) for p in perfis)))
+
+    def por_nivel_gestao(self, *niveis: str) -> list:
+        self.atualizar()
+        with self._lock:
+            return self._selecionar(set().union(*(self._por_nivel.get(n, ()) for n in niveis)))
+
+
+_diretorio: DiretorioUsuarios | None = None
+_diretorio_pid: int | None = None
+
+
+def obter_diretorio() -> DiretorioUsuarios | None:
+    """Diretório deste processo; None se desligado (intervalo 0) ou sem banco."""
+    global _diretorio, _diretorio_pid
+    from config import Config
+
+    if Config.CACHE_DIRETORIO_USUARIOS_SEGUNDOS <= 0 or db_module.SessionLocal is None:
+        return None
+    if _diretorio is None or _diretorio_pid != os.getpid():
+        _diretorio = DiretorioUsuarios(intervalo_segundos=Config.CACHE_DIRETORIO_USUARIOS_SEGUNDOS)
+        _diretorio_pid = os.getpid()
+    return _diretorio
+
+
+def marcar_diretorio_desatualizado() -> None:
+    if _diretorio is not None and _diretorio_pid == os.getpid():
+        _diretorio.marcar_desatualizado()
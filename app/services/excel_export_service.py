@@ -22,46 +22,50 @@ formatação profissional, estilos, e análises.
    - Estatísticas por categoria/supervisor
    - Gráficos de tendência (pode ser adicionado com openpyxl)
 
-**Uso Básico:**
+**Streaming:**
 
-```python
-from app.services.excel_export_service import gerar_relatorio_excel
+Os dois exportadores usam o modo `write_only` do openpyxl: cada aba é escrita
+linha a linha num arquivo temporário próprio, e o .xlsx final é montado num
+`SpooledTemporaryFile` (memória até SPOOL_MAX_BYTES, disco a partir daí).
+Os chamados chegam por qualquer iterável — na prática o gerador de
+`filters.iterar_chamados_filtrados`, que lê do Postgres por cursor do lado
+do servidor — e são percorridos uma única vez. Assim a exportação não tem
+teto de linhas e o uso de memória do worker não cresce com o relatório.
 
-# Obter lista de chamados (usar MAX_EXPORT_CHAMADOS para limitar o tamanho do relatório)
-chamados = db.collection('chamados').limit(MAX_EXPORT_CHAMADOS).stream()
+**Uso Básico:**
 
-# Gerar Excel
-excel_bytes = gerar_relatorio_excel(
-    chamados=list(chamados),
-    tipo='completo',  # ou 'basico', 'analise'
-    titulo='Relatório de Chamados - Fevereiro 2026'
-)
+```python
+from app.services.excel_export_service import exportar_chamados_xlsx
 
-# Enviar como download
-response.data = excel_bytes
-response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-response.headers['Content-Disposition'] = 'attachment; filename=chamados.xlsx'
-return response
+arquivo = exportar_chamados_xlsx(chamados)  # iterável de Chamado
+return send_file(arquivo, mimetype=MIMETYPE_XLSX, as_attachment=True,
+                 download_name='chamados.xlsx')
 ```
 
 **Formatos Disponíveis:**
-- `completo`: Todas as colunas e análises
-- `basico`: Colunas essenciais apenas
-- `analise`: Foco em histórico e duração
+- `exportar_chamados_xlsx`: uma aba, colunas essenciais (rota /exportar)
+- `exportar_chamados_csv`: as mesmas colunas em CSV (/exportar?formato=csv)
+- `exportador_excel.exportar_relatorio_completo`: resumo, detalhes,
+  performance, status e categorias (rota /exportar-avancado)
 """
 
+import csv
 import io
 import logging
+import tempfile
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import IO, Any
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
 
 from app.i18n import get_translated_category, get_translated_sector, get_translated_status
 from app.i18n import get_translation as t
+from app.utils import formatar_data_para_excel
 
 logger = logging.getLogger(__name__)
 
@@ -69,8 +73,11 @@ logger = logging.getLogger(__name__)
 # o rótulo traduzido (t('no_category_label')) só é aplicado na hora de escrever a célula.
 _SEM_CATEGORIA = "Sem Categoria"
 
-# Limite de chamados na exportação — mantém o relatório em tamanho razoável.
-MAX_EXPORT_CHAMADOS = 100
+MIMETYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MIMETYPE_CSV = "text/csv"
+
+# Até este tamanho o .xlsx gerado fica em memória; acima, vai para disco.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 # Chars que iniciam fórmulas em Excel/LibreOffice — prefixar com ' para neutralizar
 _FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
@@ -127,6 +134,94 @@ class ConfiguradorExcel:
     ALINHAMENTO_RIGHT = Alignment(horizontal="right", vertical="center", wrap_text=True)
 
 
+def _salvar(wb: Workbook) -> IO[bytes]:
+    """Grava o workbook num arquivo temporário e devolve-o posicionado no início."""
+    # Fechado por quem consome (send_file fecha ao fim da resposta).
+    arquivo = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, suffix=".xlsx")  # noqa: SIM115
+    try:
+        wb.save(arquivo)
+    except Exception:
+        arquivo.close()
+        raise
+    arquivo.seek(0)
+    return arquivo
+
+
+def _avaliar(valor: Any) -> Any:
+    """Métricas podem vir prontas ou como callable (calculadas depois do streaming)."""
+    return valor() if callable(valor) else valor
+
+
+# Colunas do /exportar — rótulo fixo (pt_BR) e extrator a partir do Chamado.
+_COLUNAS_EXPORTACAO: tuple[tuple[str, Callable[[Any], Any]], ...] = (
+    ("Chamado", lambda c: c.numero_chamado),
+    ("Categoria", lambda c: c.categoria),
+    ("RL", lambda c: c.rl_codigo or "-"),
+    ("Tipo", lambda c: c.tipo_solicitacao),
+    ("Gate", lambda c: c.gate or "-"),
+    ("Responsável", lambda c: c.responsavel),
+    ("Solicitante", lambda c: c.solicitante_nome or "-"),
+    ("Área", lambda c: c.area or "-"),
+    ("Status", lambda c: c.status),
+    ("Anexo", lambda c: c.anexo or "-"),
+    ("Abertura", lambda c: formatar_data_para_excel(c.data_abertura)),
+    ("Conclusão", lambda c: formatar_data_para_excel(c.data_conclusao)),
+    ("Descrição", lambda c: c.descricao),
+)
+
+
+def exportar_chamados_xlsx(chamados: Iterable[Any]) -> IO[bytes]:
+    """Planilha simples (uma aba "Chamados") escrita em streaming.
+
+    `chamados` é percorrido uma vez; nenhuma linha fica retida depois de escrita.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Chamados")
+    ws.append([titulo for titulo, _ in _COLUNAS_EXPORTACAO])
+    for chamado in chamados:
+        ws.append([_safe_cell(extrair(chamado)) for _, extrair in _COLUNAS_EXPORTACAO])
+    return _salvar(wb)
+
+
+def exportar_chamados_csv(chamados: Iterable[Any]) -> IO[bytes]:
+    """Mesmas colunas de exportar_chamados_xlsx, em CSV UTF-8 com BOM (o Excel
+    reconhece a codificação ao abrir). Também escrito em streaming."""
+    arquivo = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, suffix=".csv")  # noqa: SIM115
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    try:
+        escritor = csv.writer(texto)
+        escritor.writerow([titulo for titulo, _ in _COLUNAS_EXPORTACAO])
+        for chamado in chamados:
+            escritor.writerow([_safe_cell(extrair(chamado)) for _, extrair in _COLUNAS_EXPORTACAO])
+        texto.flush()
+    except Exception:
+        texto.close()
+        raise
+    texto.detach()
+    arquivo.seek(0)
+    return arquivo
+
+
+class _Contagem:
+    """Agregados das abas de análise, acumulados enquanto os chamados são escritos."""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.por_status: dict[str, int] = {}
+        self.por_categoria: dict[str, int] = {}
+        self.status_por_categoria: dict[str, dict[str, int]] = {}
+
+    def adicionar(self, chamado: Any) -> None:
+        # Chaves canônicas do banco — tradução só na hora de exibir
+        status_raw = chamado.status
+        cat = chamado.categoria or _SEM_CATEGORIA
+        self.total += 1
+        self.por_status[status_raw] = self.por_status.get(status_raw, 0) + 1
+        self.por_categoria[cat] = self.por_categoria.get(cat, 0) + 1
+        status_cat = self.status_por_categoria.setdefault(cat, {})
+        status_cat[status_raw] = status_cat.get(status_raw, 0) + 1
+
+
 class ExportadorExcelAvancado:
     """Exportador profissional de relatórios em Excel"""
 
@@ -135,79 +230,176 @@ class ExportadorExcelAvancado:
 
     def exportar_relatorio_completo(
         self,
-        chamados: list[Any],
-        metricas_gerais: dict[str, Any],
-        metricas_supervisores: list[dict[str, Any]],
+        chamados: Iterable[Any],
+        metricas_gerais: dict[str, Any] | Callable[[], dict[str, Any]],
+        metricas_supervisores: list[dict[str, Any]] | Callable[[], list[dict[str, Any]]],
         filtros_aplicados: dict[str, str],
         language: str = "pt_BR",
-    ) -> io.BytesIO:
-        """Exporta relatório completo com múltiplas abas, no idioma informado."""
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove sheet padrão
-
-        # Cria abas
-        self._aba_resumo_executivo(wb, metricas_gerais, filtros_aplicados, language)
-        self._aba_chamados_detalhados(wb, chamados, language)
-        self._aba_performance_supervisores(wb, metricas_supervisores, language)
-        self._aba_analise_status(wb, chamados, language)
-        self._aba_analise_categorias(wb, chamados, language)
-
-        # Salva em bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output
+    ) -> IO[bytes]:
+        """Exporta relatório completo com múltiplas abas, no idioma informado.
+
+        `chamados` é percorrido uma única vez: cada chamado vira uma linha da
+        aba de detalhes e entra nas contagens das abas de status/categorias.
+        As métricas podem ser callables sem argumentos — são avaliadas só
+        depois de percorrer os chamados (ex.: métricas calculadas sobre os
+        próprios chamados exportados).
+        """
+        wb = Workbook(write_only=True)
+
+        # Abas na ordem final; write_only escreve cada uma no próprio arquivo
+        # temporário, então o resumo pode ser preenchido por último.
+        ws_resumo = self._nova_aba(wb, f"📊 {t('excel_sheet_summary', language)}", "1F4E78")
+        ws_chamados = self._nova_aba(wb, f"📋 {t('excel_sheet_tickets', language)}", "4472C4")
+        ws_performance = self._nova_aba(
+            wb, f"👥 {t('excel_sheet_performance', language)}", "70AD47"
+        )
+        ws_status = self._nova_aba(wb, f"📊 {t('status', language)}", "F79646")
+        ws_categorias = self._nova_aba(wb, f"🏷️ {t('nav_categories', language)}", "9966FF")
+
+        contagem = self._aba_chamados_detalhados(ws_chamados, chamados, language)
+        self._aba_resumo_executivo(
+            ws_resumo, _avaliar(metricas_gerais), filtros_aplicados, language
+        )
+        self._aba_performance_supervisores(
+            ws_performance, _avaliar(metricas_supervisores), language
+        )
+        self._aba_analise_status(ws_status, contagem, language)
+        self._aba_analise_categorias(ws_categorias, contagem, language)
+
+        return _salvar(wb)
+
+    @staticmethod
+    def _nova_aba(wb: Workbook, titulo: str, cor: str):
+        ws = wb.create_sheet(titulo)
+        ws.sheet_properties.tabColor = cor
+        return ws
+
+    def _celula(
+        self,
+        ws,
+        valor: Any,
+        *,
+        fonte: Font | None = None,
+        preenchimento: PatternFill | None = None,
+        alinhamento: Alignment | None = None,
+        borda: Border | None = None,
+    ) -> WriteOnlyCell:
+        """Célula estilizada para append em aba write_only."""
+        cell = WriteOnlyCell(ws, value=valor)
+        if fonte is not None:
+            cell.font = fonte
+        if preenchimento is not None:
+            cell.fill = preenchimento
+        if alinhamento is not None:
+            cell.alignment = alinhamento
+        if borda is not None:
+            cell.border = borda
+        return cell
+
+    def _linha_tabela(self, ws, linha: int, valores: list[Any], alinhamentos: list) -> list:
+        """Linha de dados com borda, fonte normal e cor alternada nas linhas pares."""
+        preenchimento = self.config.PREENCHIMENTO_LINHA_ALT if linha % 2 == 0 else None
+        return [
+            self._celula(
+                ws,
+                valor,
+                fonte=self.config.FONTE_NORMAL,
+                preenchimento=preenchimento,
+                alinhamento=alinhamento,
+                borda=self.config.BORDA_PADRAO,
+            )
+            for valor, alinhamento in zip(valores, alinhamentos, strict=True)
+        ]
+
+    def _cabecalho(self, ws, titulos: list[str]) -> list:
+        return [
+            self._celula(
+                ws,
+                titulo,
+                fonte=self.config.FONTE_HEADER,
+                preenchimento=self.config.PREENCHIMENTO_HEADER,
+                alinhamento=self.config.ALINHAMENTO_CENTER,
+                borda=self.config.BORDA_PADRAO,
+            )
+            for titulo in titulos
+        ]
+
+    def _titulo_aba(self, ws, titulo: str, ultima_coluna: str) -> None:
+        """Linha 1: título com fundo verde, mesclado até `ultima_coluna`."""
+        ws.append(
+            [
+                self._celula(
+                    ws,
+                    titulo,
+                    fonte=self.config.FONTE_TITULO,
+                    preenchimento=self.config.PREENCHIMENTO_TITULO,
+                )
+            ]
+        )
+        ws.merged_cells.add(f"A1:{ultima_coluna}1")
 
     def _aba_resumo_executivo(
         self,
-        wb: Workbook,
+        ws,
         metricas: dict[str, Any],
         filtros: dict[str, str],
         language: str,
     ) -> None:
-        """Cria aba de resumo executivo com KPIs"""
-        ws = wb.create_sheet(f"📊 {t('excel_sheet_summary', language)}", 0)
-        ws.sheet_properties.tabColor = "1F4E78"
-
+        """Preenche a aba de resumo executivo com KPIs"""
         # Configurar larguras das colunas
         ws.column_dimensions["A"].width = 35
         ws.column_dimensions["B"].width = 25
         ws.column_dimensions["C"].width = 25
+        ws.row_dimensions[1].height = 25
 
         # Título
-        ws["A1"] = t("excel_report_title", language)
-        ws["A1"].font = self.config.FONTE_TITULO
-        ws["A1"].fill = self.config.PREENCHIMENTO_TITULO
-        ws["A1"].alignment = self.config.ALINHAMENTO_CENTER
-        ws.merge_cells("A1:C1")
-        ws.row_dimensions[1].height = 25
+        ws.append(
+            [
+                self._celula(
+                    ws,
+                    t("excel_report_title", language),
+                    fonte=self.config.FONTE_TITULO,
+                    preenchimento=self.config.PREENCHIMENTO_TITULO,
+                    alinhamento=self.config.ALINHAMENTO_CENTER,
+                )
+            ]
+        )
+        ws.merged_cells.add("A1:C1")
 
         # Data de geração
         agora = datetime.now().strftime("%d/%m/%Y %H:%M")
-        ws["A2"] = t("excel_generated_on", language, datetime=agora)
-        ws["A2"].font = Font(name="Calibri", size=9, italic=True)
-        ws.merge_cells("A2:C2")
+        ws.append(
+            [
+                self._celula(
+                    ws,
+                    t("excel_generated_on", language, datetime=agora),
+                    fonte=Font(name="Calibri", size=9, italic=True),
+                )
+            ]
+        )
+        ws.merged_cells.add("A2:C2")
+        linha = 3
 
         # Filtros aplicados
         if filtros:
-            ws["A3"] = t("excel_filters_applied", language)
-            ws["A3"].font = self.config.FONTE_SUBTITULO
-            linha = 4
+            ws.append(
+                [
+                    self._celula(
+                        ws, t("excel_filters_applied", language), fonte=self.config.FONTE_SUBTITULO
+                    )
+                ]
+            )
+            linha += 1
             for chave, valor in filtros.items():
-                ws[f"A{linha}"] = f"  • {chave}: {valor}"
-                ws[f"A{linha}"].font = self.config.FONTE_NORMAL
+                ws.append(
+                    [self._celula(ws, f"  • {chave}: {valor}", fonte=self.config.FONTE_NORMAL)]
+                )
                 linha += 1
-            linha += 1
-        else:
-            linha = 4
+        ws.append([])
+        linha += 1
 
         # KPIs Principais
-        ws[f"A{linha}"] = t("excel_main_indicators", language)
-        ws[f"A{linha}"].font = self.config.FONTE_SUBTITULO
-        ws[f"A{linha}"].fill = self.config.PREENCHIMENTO_HEADER
-        ws.merge_cells(f"A{linha}:C{linha}")
-
-        linha += 1
+        linha = self._secao(ws, linha, t("excel_main_indicators", language))
 
         # Dados de KPI
         kpis = [
@@ -224,53 +416,52 @@ class ExportadorExcelAvancado:
                 f"{metricas.get('tempo_medio_resolucao_horas', 0):.1f}h",
             ),
         ]
-
         for chave, valor in kpis:
-            ws[f"A{linha}"] = chave
-            ws[f"A{linha}"].font = self.config.FONTE_NORMAL
-            ws[f"B{linha}"] = valor
-            ws[f"B{linha}"].font = Font(name="Calibri", size=10, bold=True)
-            ws[f"B{linha}"].alignment = self.config.ALINHAMENTO_RIGHT
-
-            # Adiciona borda
-            for col in ["A", "B", "C"]:
-                ws[f"{col}{linha}"].border = self.config.BORDA_PADRAO
-
-            # Alternancia de cor
-            if linha % 2 == 0:
-                for col in ["A", "B", "C"]:
-                    ws[f"{col}{linha}"].fill = self.config.PREENCHIMENTO_LINHA_ALT
-
+            celulas = self._linha_tabela(
+                ws,
+                linha,
+                [chave, valor, None],
+                [None, self.config.ALINHAMENTO_RIGHT, None],
+            )
+            celulas[1].font = Font(name="Calibri", size=10, bold=True)
+            ws.append(celulas)
             linha += 1
 
         # Distribuição por prioridade
+        ws.append([])
+        ws.append([])
         linha += 2
-        ws[f"A{linha}"] = t("distribution_by_priority", language).upper()
-        ws[f"A{linha}"].font = self.config.FONTE_SUBTITULO
-        ws[f"A{linha}"].fill = self.config.PREENCHIMENTO_HEADER
-        ws.merge_cells(f"A{linha}:C{linha}")
+        linha = self._secao(ws, linha, t("distribution_by_priority", language).upper())
 
-        linha += 1
         distribuicao = metricas.get("distribuicao_prioridade", {})
         for prioridade, quantidade in distribuicao.items():
-            ws[f"A{linha}"] = t("excel_priority_n", language, priority=prioridade)
-            ws[f"B{linha}"] = quantidade
-            ws[f"B{linha}"].alignment = self.config.ALINHAMENTO_RIGHT
-
-            for col in ["A", "B", "C"]:
-                ws[f"{col}{linha}"].border = self.config.BORDA_PADRAO
-
-            if linha % 2 == 0:
-                for col in ["A", "B", "C"]:
-                    ws[f"{col}{linha}"].fill = self.config.PREENCHIMENTO_LINHA_ALT
-
+            ws.append(
+                self._linha_tabela(
+                    ws,
+                    linha,
+                    [t("excel_priority_n", language, priority=prioridade), quantidade, None],
+                    [None, self.config.ALINHAMENTO_RIGHT, None],
+                )
+            )
             linha += 1
 
-    def _aba_chamados_detalhados(self, wb: Workbook, chamados: list[Any], language: str) -> None:
-        """Cria aba com lista detalhada de chamados"""
-        ws = wb.create_sheet(f"📋 {t('excel_sheet_tickets', language)}", 1)
-        ws.sheet_properties.tabColor = "4472C4"
+    def _secao(self, ws, linha: int, titulo: str) -> int:
+        """Cabeçalho de seção do resumo (mesclado A:C); retorna a próxima linha."""
+        ws.append(
+            [
+                self._celula(
+                    ws,
+                    titulo,
+                    fonte=self.config.FONTE_SUBTITULO,
+                    preenchimento=self.config.PREENCHIMENTO_HEADER,
+                )
+            ]
+        )
+        ws.merged_cells.add(f"A{linha}:C{linha}")
+        return linha + 1
 
+    def _aba_chamados_detalhados(self, ws, chamados: Iterable[Any], language: str) -> _Contagem:
+        """Escreve a lista detalhada de chamados e devolve as contagens por status/categoria"""
         # Colunas
         colunas = [
             (t("excel_col_ticket", language), 15),
@@ -286,22 +477,26 @@ class ExportadorExcelAvancado:
             (t("impact_label", language), 10),
         ]
 
-        # Header
-        for col_num, (titulo, largura) in enumerate(colunas, 1):
-            col_letter = get_column_letter(col_num)
-            ws.column_dimensions[col_letter].width = largura
-
-            cell = ws.cell(row=1, column=col_num, value=titulo)
-            cell.font = self.config.FONTE_HEADER
-            cell.fill = self.config.PREENCHIMENTO_HEADER
-            cell.alignment = self.config.ALINHAMENTO_CENTER
-            cell.border = self.config.BORDA_PADRAO
-
+        for col_num, (_, largura) in enumerate(colunas, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = largura
         ws.row_dimensions[1].height = 20
         ws.freeze_panes = "A2"
 
+        # Header
+        ws.append(self._cabecalho(ws, [titulo for titulo, _ in colunas]))
+
+        # Cor do status (compara o valor canônico do banco, não o rótulo traduzido)
+        fontes_status = {
+            "Concluído": Font(name="Calibri", size=10, color="70AD47", bold=True),
+            "Aberto": Font(name="Calibri", size=10, color="C65911", bold=True),
+            "Em Atendimento": Font(name="Calibri", size=10, color="4472C4", bold=True),
+        }
+        alinhamentos = [self.config.ALINHAMENTO_LEFT] * len(colunas)
+
         # Dados
+        contagem = _Contagem()
         for numero_linha, chamado in enumerate(chamados, 2):
+            contagem.adicionar(chamado)
             status_raw = chamado.status
             dados_linha = [
                 chamado.numero_chamado,
@@ -316,33 +511,18 @@ class ExportadorExcelAvancado:
                 chamado.data_conclusao_formatada(),
                 ", ".join(chamado.impacto) if chamado.impacto else "-",
             ]
-
-            for col_num, valor in enumerate(dados_linha, 1):
-                cell = ws.cell(row=numero_linha, column=col_num, value=_safe_cell(valor))
-                cell.font = self.config.FONTE_NORMAL
-                cell.alignment = self.config.ALINHAMENTO_LEFT
-                cell.border = self.config.BORDA_PADRAO
-
-                # Alternancia de cor
-                if numero_linha % 2 == 0:
-                    cell.fill = self.config.PREENCHIMENTO_LINHA_ALT
-
-                # Colorir status (compara o valor canônico do banco, não o rótulo traduzido)
-                if col_num == 4:  # Status
-                    if status_raw == "Concluído":
-                        cell.font = Font(name="Calibri", size=10, color="70AD47", bold=True)
-                    elif status_raw == "Aberto":
-                        cell.font = Font(name="Calibri", size=10, color="C65911", bold=True)
-                    elif status_raw == "Em Atendimento":
-                        cell.font = Font(name="Calibri", size=10, color="4472C4", bold=True)
+            celulas = self._linha_tabela(
+                ws, numero_linha, [_safe_cell(v) for v in dados_linha], alinhamentos
+            )
+            if status_raw in fontes_status:
+                celulas[3].font = fontes_status[status_raw]
+            ws.append(celulas)
+        return contagem
 
     def _aba_performance_supervisores(
-        self, wb: Workbook, supervisores: list[dict[str, Any]], language: str
+        self, ws, supervisores: list[dict[str, Any]], language: str
     ) -> None:
-        """Cria aba de performance de supervisores"""
-        ws = wb.create_sheet(f"👥 {t('excel_sheet_performance', language)}", 2)
-        ws.sheet_properties.tabColor = "70AD47"
-
+        """Preenche a aba de performance de supervisores"""
         # Colunas
         colunas = [
             (t("supervisor", language), 18),
@@ -353,23 +533,19 @@ class ExportadorExcelAvancado:
             (t("avg_time_hours_label", language), 14),
         ]
 
-        for col_num, (titulo, largura) in enumerate(colunas, 1):
-            col_letter = get_column_letter(col_num)
-            ws.column_dimensions[col_letter].width = largura
-
-            cell = ws.cell(row=1, column=col_num, value=titulo)
-            cell.font = self.config.FONTE_HEADER
-            cell.fill = self.config.PREENCHIMENTO_HEADER
-            cell.alignment = self.config.ALINHAMENTO_CENTER
-            cell.border = self.config.BORDA_PADRAO
-
+        for col_num, (_, largura) in enumerate(colunas, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = largura
         ws.row_dimensions[1].height = 20
         ws.freeze_panes = "A2"
 
+        ws.append(self._cabecalho(ws, [titulo for titulo, _ in colunas]))
+
         # Dados ordenados por taxa de resolução (decrescente)
         supervisores_ordenados = sorted(
             supervisores, key=lambda x: x.get("taxa_resolucao", 0), reverse=True
         )
+        # Nome à esquerda, números à direita
+        alinhamentos = [self.config.ALINHAMENTO_LEFT] + [self.config.ALINHAMENTO_RIGHT] * 5
 
         for numero_linha, sup in enumerate(supervisores_ordenados, 2):
             dados_linha = [
@@ -380,143 +556,92 @@ class ExportadorExcelAvancado:
                 round(sup.get("taxa_resolucao", 0), 1),
                 round(sup.get("tempo_medio_resolucao", 0), 1),
             ]
+            ws.append(
+                self._linha_tabela(
+                    ws, numero_linha, [_safe_cell(v) for v in dados_linha], alinhamentos
+                )
+            )
 
-            for col_num, valor in enumerate(dados_linha, 1):
-                cell = ws.cell(row=numero_linha, column=col_num, value=_safe_cell(valor))
-                cell.font = self.config.FONTE_NORMAL
-                cell.border = self.config.BORDA_PADRAO
-
-                # Alternancia de cor
-                if numero_linha % 2 == 0:
-                    cell.fill = self.config.PREENCHIMENTO_LINHA_ALT
-
-                # Alinhar números à direita
-                if col_num > 1:
-                    cell.alignment = self.config.ALINHAMENTO_RIGHT
-                else:
-                    cell.alignment = self.config.ALINHAMENTO_LEFT
-
-    def _aba_analise_status(self, wb: Workbook, chamados: list[Any], language: str) -> None:
-        """Cria aba de análise por status"""
-        ws = wb.create_sheet(f"📊 {t('status', language)}", 3)
-        ws.sheet_properties.tabColor = "F79646"
-
-        # Agrupar por status (chave canônica do banco — tradução só na hora de exibir)
-        status_counts = {}
-
-        for chamado in chamados:
-            status_raw = chamado.status
-            status_counts[status_raw] = status_counts.get(status_raw, 0) + 1
-
-        # Header
-        ws["A1"] = t("status_analysis_title", language).upper()
-        ws["A1"].font = self.config.FONTE_TITULO
-        ws["A1"].fill = self.config.PREENCHIMENTO_TITULO
-        ws.merge_cells("A1:C1")
-
-        ws["A2"] = t("status", language)
-        ws["B2"] = t("quantity_label", language)
-        ws["C2"] = t("percentage_label", language)
-
-        for col in ["A", "B", "C"]:
-            ws[f"{col}2"].font = self.config.FONTE_HEADER
-            ws[f"{col}2"].fill = self.config.PREENCHIMENTO_HEADER
-            ws[f"{col}2"].alignment = self.config.ALINHAMENTO_CENTER
-            ws[f"{col}2"].border = self.config.BORDA_PADRAO
-
+    def _aba_analise_status(self, ws, contagem: _Contagem, language: str) -> None:
+        """Preenche a aba de análise por status"""
         ws.column_dimensions["A"].width = 20
         ws.column_dimensions["B"].width = 12
         ws.column_dimensions["C"].width = 12
 
-        total = len(chamados)
-        linha = 3
-
-        for status_raw, quantidade in sorted(status_counts.items()):
-            percentual = (quantidade / total * 100) if total > 0 else 0
-
-            ws[f"A{linha}"] = get_translated_status(status_raw, language)
-            ws[f"B{linha}"] = quantidade
-            ws[f"C{linha}"] = f"{percentual:.1f}%"
-
-            for col in ["A", "B", "C"]:
-                ws[f"{col}{linha}"].border = self.config.BORDA_PADRAO
-                ws[f"{col}{linha}"].font = self.config.FONTE_NORMAL
-
-                if linha % 2 == 0:
-                    ws[f"{col}{linha}"].fill = self.config.PREENCHIMENTO_LINHA_ALT
-
-            # Alinhar números
-            ws[f"B{linha}"].alignment = self.config.ALINHAMENTO_RIGHT
-            ws[f"C{linha}"].alignment = self.config.ALINHAMENTO_RIGHT
-
-            linha += 1
-
-    def _aba_analise_categorias(self, wb: Workbook, chamados: list[Any], language: str) -> None:
-        """Cria aba de análise por categoria"""
-        ws = wb.create_sheet(f"🏷️ {t('nav_categories', language)}", 4)
-        ws.sheet_properties.tabColor = "9966FF"
-
-        # Agrupar por categoria (chave canônica do banco — tradução só na hora de exibir)
-        categoria_counts = {}
-        categoria_status = {}
-
-        for chamado in chamados:
-            cat = chamado.categoria or _SEM_CATEGORIA
-            categoria_counts[cat] = categoria_counts.get(cat, 0) + 1
-
-            if cat not in categoria_status:
-                categoria_status[cat] = {}
-
-            status_raw = chamado.status
-            categoria_status[cat][status_raw] = categoria_status[cat].get(status_raw, 0) + 1
-
         # Header
-        ws["A1"] = t("category_analysis_title", language).upper()
-        ws["A1"].font = self.config.FONTE_TITULO
-        ws["A1"].fill = self.config.PREENCHIMENTO_TITULO
-        ws.merge_cells("A1:E1")
+        self._titulo_aba(ws, t("status_analysis_title", language).upper(), "C")
+        ws.append(
+            self._cabecalho(
+                ws,
+                [
+                    t("status", language),
+                    t("quantity_label", language),
+                    t("percentage_label", language),
+                ],
+            )
+        )
 
-        ws["A2"] = t("category", language)
-        ws["B2"] = t("total", language)
-        ws["C2"] = t("open_tickets", language)
-        ws["D2"] = t("in_progress", language)
-        ws["E2"] = t("completed_tickets", language)
+        total = contagem.total
+        alinhamentos = [None, self.config.ALINHAMENTO_RIGHT, self.config.ALINHAMENTO_RIGHT]
 
-        for col in ["A", "B", "C", "D", "E"]:
-            ws[f"{col}2"].font = self.config.FONTE_HEADER
-            ws[f"{col}2"].fill = self.config.PREENCHIMENTO_HEADER
-            ws[f"{col}2"].alignment = self.config.ALINHAMENTO_CENTER
-            ws[f"{col}2"].border = self.config.BORDA_PADRAO
+        for linha, (status_raw, quantidade) in enumerate(sorted(contagem.por_status.items()), 3):
+            percentual = (quantidade / total * 100) if total > 0 else 0
+            ws.append(
+                self._linha_tabela(
+                    ws,
+                    linha,
+                    [
+                        get_translated_status(status_raw, language),
+                        quantidade,
+                        f"{percentual:.1f}%",
+                    ],
+                    alinhamentos,
+                )
+            )
 
+    def _aba_analise_categorias(self, ws, contagem: _Contagem, language: str) -> None:
+        """Preenche a aba de análise por categoria"""
         for col in ["A", "B", "C", "D", "E"]:
             ws.column_dimensions[col].width = 15
 
-        linha = 3
+        # Header
+        self._titulo_aba(ws, t("category_analysis_title", language).upper(), "E")
+        ws.append(
+            self._cabecalho(
+                ws,
+                [
+                    t("category", language),
+                    t("total", language),
+                    t("open_tickets", language),
+                    t("in_progress", language),
+                    t("completed_tickets", language),
+                ],
+            )
+        )
 
-        for categoria in sorted(categoria_counts.keys()):
+        alinhamentos = [None] + [self.config.ALINHAMENTO_RIGHT] * 4
+
+        for linha, categoria in enumerate(sorted(contagem.por_categoria), 3):
             rotulo_categoria = (
                 t("no_category_label", language)
                 if categoria == _SEM_CATEGORIA
                 else get_translated_category(categoria, language)
             )
-            ws[f"A{linha}"] = rotulo_categoria
-            ws[f"B{linha}"] = categoria_counts[categoria]
-            ws[f"C{linha}"] = categoria_status[categoria].get("Aberto", 0)
-            ws[f"D{linha}"] = categoria_status[categoria].get("Em Atendimento", 0)
-            ws[f"E{linha}"] = categoria_status[categoria].get("Concluído", 0)
-
-            for col in ["A", "B", "C", "D", "E"]:
-                ws[f"{col}{linha}"].border = self.config.BORDA_PADRAO
-                ws[f"{col}{linha}"].font = self.config.FONTE_NORMAL
-
-                if linha % 2 == 0:
-                    ws[f"{col}{linha}"].fill = self.config.PREENCHIMENTO_LINHA_ALT
-
-                # Alinhar números
-                if col != "A":
-                    ws[f"{col}{linha}"].alignment = self.config.ALINHAMENTO_RIGHT
-
-            linha += 1
+            por_status = contagem.status_por_categoria[categoria]
+            ws.append(
+                self._linha_tabela(
+                    ws,
+                    linha,
+                    [
+                        rotulo_categoria,
+                        contagem.por_categoria[categoria],
+                        por_status.get("Aberto", 0),
+                        por_status.get("Em Atendimento", 0),
+                        por_status.get("Concluído", 0),
+                    ],
+                    alinhamentos,
+                )
+            )
 
 
 # Instância global
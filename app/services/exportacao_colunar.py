@@ -0,0 +1,237 @@
+"""
+Exportação colunar de chamados para BI (GET /api/export/chamados).
+
+CSV sempre; Parquet quando o pyarrow está instalado (dependência opcional,
+fora do requirements.txt — sem ele a rota responde 501 para formato=parquet).
+
+Mesmo caminho de leitura das planilhas (exportacao_service): escopo de área
+do supervisor e filtros do dashboard no SQL, cursor do lado do servidor
+(filters.iterar_chamados_filtrados, yield_per) e permissão de leitura aplicada
+por lote. Cada lote vira um pedaço da resposta (CSV) ou um row group (Parquet)
+e é descartado — a memória do worker fica no tamanho de um lote, qualquer
+que seja o número de linhas.
+
+Falha no meio do arquivo (transmitir) é re-levantada depois do log: o
+servidor derruba a conexão sem o chunk final, e o cliente vê erro em vez de
+um CSV curto ou de um Parquet sem rodapé com cara de arquivo completo.
+
+Colunas: `colunas=` (separadas por vírgula) escolhe entre COLUNAS_EXPORTAVEIS,
+na ordem pedida; sem o parâmetro, COLUNAS_PADRAO. Período: `de`/`ate`
+(AAAA-MM-DD, inclusivos) sobre data_abertura, no fuso SLA_TIMEZONE. Datas
+saem em UTC — ISO 8601 no CSV, timestamp com fuso no Parquet.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from app.db.models.chamado import ChamadoRow
+from app.services.dashboard_service import _filtrar_chamados_por_permissao
+from app.services.excel_export_service import _safe_cell
+from app.services.exportacao_service import condicoes_escopo
+from app.services.filters import iterar_chamados_filtrados
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ("csv", "parquet")
+MIMETYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# Nome da coluna → tipo ("inteiro", "texto" ou "data"); a ordem é a do padrão.
+COLUNAS_EXPORTAVEIS: dict[str, str] = {
+    "id": "inteiro",
+    "numero_chamado": "texto",
+    "categoria": "texto",
+    "tipo_solicitacao": "texto",
+    "rl_codigo": "texto",
+    "gate": "texto",
+    "area": "texto",
+    "status": "texto",
+    "prioridade": "inteiro",
+    "responsavel": "texto",
+    "responsavel_id": "texto",
+    "solicitante_id": "texto",
+    "solicitante_nome": "texto",
+    "sla_dias": "inteiro",
+    "data_abertura": "data",
+    "data_em_atendimento": "data",
+    "previsao_atendimento": "data",
+    "data_conclusao": "data",
+    "data_cancelamento": "data",
+    "descricao": "texto",
+}
+# Texto livre (descricao) só quando pedido explicitamente.
+COLUNAS_PADRAO = tuple(c for c in COLUNAS_EXPORTAVEIS if c != "descricao")
+
+
+def colunas_pedidas(parametro: str | None) -> tuple[str, ...]:
+    """Colunas do parâmetro `colunas`, validadas. ValueError com a primeira desconhecida."""
+    if not parametro or not parametro.strip():
+        return COLUNAS_PADRAO
+    colunas = []
+    for nome in parametro.split(","):
+        nome = nome.strip()
+        if not nome or nome in colunas:
+            continue
+        if nome not in COLUNAS_EXPORTAVEIS:
+            raise ValueError(f"coluna desconhecida: {nome}")
+        colunas.append(nome)
+    if not colunas:
+        raise ValueError("nenhuma coluna selecionada")
+    return tuple(colunas)
+
+
+def _data(parametro: str | None, nome: str) -> date | None:
+    if not parametro or not parametro.strip():
+        return None
+    try:
+        return date.fromisoformat(parametro.strip())
+    except ValueError:
+        raise ValueError(f"data inválida em '{nome}' (use AAAA-MM-DD)") from None
+
+
+def condicoes_periodo(de: str | None, ate: str | None) -> list[Any]:
+    """Condições sobre data_abertura para o intervalo [de, ate], dias no fuso SLA_TIMEZONE."""
+    from config import Config
+
+    inicio, fim = _data(de, "de"), _data(ate, "ate")
+    if inicio and fim and inicio > fim:
+        raise ValueError("'de' depois de 'ate'")
+    fuso = ZoneInfo(Config.SLA_TIMEZONE)
+    condicoes = []
+    if inicio:
+        condicoes.append(ChamadoRow.data_abertura >= datetime.combine(inicio, time(), fuso))
+    if fim:
+        limite = datetime.combine(fim + timedelta(days=1), time(), fuso)
+        condicoes.append(ChamadoRow.data_abertura < limite)
+    return condicoes
+
+
+def lotes_permitidos(
+    user, filtros: dict[str, str], condicoes_extra: list[Any]
+) -> Iterator[list[Any]]:
+    """Lotes de Chamado no escopo e com permissão de leitura do usuário."""
+    condicoes = [*condicoes_escopo(user), *condicoes_extra]
+    for lote in iterar_chamados_filtrados(condicoes, filtros):
+        permitidos = _filtrar_chamados_por_permissao(lote, user)
+        if permitidos:
+            yield permitidos
+
+
+def _valor(chamado: Any, coluna: str) -> Any:
+    valor = getattr(chamado, coluna, None)
+    tipo = COLUNAS_EXPORTAVEIS[coluna]
+    if valor is None or valor == "":
+        return None
+    if tipo == "inteiro":
+        return int(valor)
+    if tipo == "data":
+        if not isinstance(valor, datetime):
+            return None
+        return valor.astimezone(UTC) if valor.tzinfo else valor.replace(tzinfo=UTC)
+    return str(valor)
+
+
+def transmitir(pedacos: Iterator[bytes], formato: str) -> Iterator[bytes]:
+    """Repassa os pedaços da resposta; exceção no meio é logada e re-levantada
+    (nunca termina o corpo normalmente depois de uma falha)."""
+    try:
+        yield from pedacos
+    except Exception:
+        logger.exception("Exportação BI (%s) interrompida no meio do arquivo", formato)
+        raise
+
+
+# ── CSV ──────────────────────────────────────────────────────────────────────
+
+
+def _texto_csv(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    # Quem abre o CSV no Excel não executa fórmula vinda do chamado.
+    return _safe_cell(valor)
+
+
+def gerar_csv(lotes: Iterable[list[Any]], colunas: tuple[str, ...]) -> Iterator[bytes]:
+    """Cabeçalho e depois um pedaço por lote (UTF-8, sem BOM)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def _drenar() -> bytes:
+        pedaco = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return pedaco
+
+    escritor.writerow(colunas)
+    yield _drenar()
+    for lote in lotes:
+        for chamado in lote:
+            escritor.writerow([_texto_csv(_valor(chamado, c)) for c in colunas])
+        yield _drenar()
+
+
+# ── Parquet ──────────────────────────────────────────────────────────────────
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None, None
+    return pa, pq
+
+
+def parquet_disponivel() -> bool:
+    return _pyarrow()[0] is not None
+
+
+class _SaidaDrenavel(io.RawIOBase):
+    """Destino do ParquetWriter que acumula os bytes até a próxima drenagem."""
+
+    def __init__(self) -> None:
+        self._pendente = bytearray()
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._pendente += dados
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def drenar(self) -> bytes:
+        pedaco = bytes(self._pendente)
+        self._pendente.clear()
+        return pedaco
+
+
+def gerar_parquet(lotes: Iterable[list[Any]], colunas: tuple[str, ...]) -> Iterator[bytes]:
+    """Um row group por lote; o rodapé (metadados) sai no último pedaço."""
+    pa, pq = _pyarrow()
+    if pa is None:
+        raise RuntimeError("pyarrow não instalado")
+    tipos = {"inteiro": pa.int64(), "texto": pa.string(), "data": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(c, tipos[COLUNAS_EXPORTAVEIS[c]]) for c in colunas])
+    saida = _SaidaDrenavel()
+    writer = pq.ParquetWriter(saida, schema)
+    try:
+        for lote in lotes:
+            dados = {c: [_valor(chamado, c) for chamado in lote] for c in colunas}
+            writer.write_table(pa.Table.from_pydict(dados, schema=schema))
+            pedaco = saida.drenar()
+            if pedaco:
+                yield pedaco
+    finally:
+        writer.close()
+    yield saida.drenar()
@@ -0,0 +1,601 @@
+"""
+Exportações de chamados (/exportar, /exportar-avancado), síncronas ou em fila.
+
+gerar_arquivo monta o arquivo (planilha de chamados em XLSX/CSV ou relatório
+completo em XLSX) a partir dos filtros do dashboard, com o mesmo escopo da
+tela: condições de área do supervisor no SQL e permissão de leitura por
+chamado. É o que as rotas chamam direto com EXPORTACAO_ASSINCRONA desligada.
+
+Com a fila ligada, a rota só grava o pedido em exportacoes e responde — a
+montagem de um relatório grande prendia um worker gunicorn do começo ao fim.
+O arquivo é gerado fora do request:
+
+  - logo em seguida, por uma thread do próprio processo
+    (EXPORTACAO_THREADS_POR_PROCESSO, limitadas por semáforo), e
+  - pelo job "exportacoes" do scheduler, a cada minuto: pega o que as threads
+    não pegaram (worker reiniciado, semáforo cheio) e apaga os vencidos.
+
+Os dois reivindicam pedidos com FOR UPDATE SKIP LOCKED, então cada pedido é
+gerado uma vez; "processando" há mais de _PROCESSAMENTO_ABANDONADO volta
+para a fila (até MAX_TENTATIVAS). O arquivo vai para o backend dos anexos
+(upload.salvar_arquivo_gerado) e o usuário recebe uma notificação in-app com
+o link /exportacoes/<id>/download, válido até expira_em.
+
+Dedupe por chave (usuário, tipo, formato, filtros): pedido idêntico com outro
+na fila cai no mesmo registro (índice único parcial uq_exportacoes_chave_ativa);
+até EXPORTACAO_JANELA_REUSO_MINUTOS depois de pronto, recebe o arquivo já
+gerado. O usuário é relido do banco na geração — quem perdeu o perfil entre o
+pedido e a geração recebe erro, não o arquivo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import IO, Any
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from werkzeug.utils import secure_filename
+
+from app import db as db_module
+from app.db.models.chamado import ChamadoRow
+from app.db.models.exportacao import ExportacaoRow
+from app.i18n import get_translation
+from app.services.analytics import CAMPOS_METRICAS_CHAMADO, analisador
+from app.services.dashboard_service import _filtrar_chamados_por_permissao
+from app.services.excel_export_service import (
+    MIMETYPE_CSV,
+    MIMETYPE_XLSX,
+    exportar_chamados_csv,
+    exportar_chamados_xlsx,
+)
+from app.services.filters import iterar_chamados_filtrados
+
+logger = logging.getLogger(__name__)
+
+TIPOS = ("chamados", "relatorio")
+FORMATOS = ("xlsx", "csv")
+# Parâmetros do dashboard que mudam o conteúdo da exportação (filters.py).
+FILTROS_EXPORTACAO = ("search", "status", "gate", "categoria", "responsavel", "rl_codigo")
+PERFIS_EXPORTACAO = ("supervisor", "admin", "admin_global")
+
+_STATUS_ATIVOS = ("pendente", "processando")
+_MIMETYPES = {"xlsx": MIMETYPE_XLSX, "csv": MIMETYPE_CSV}
+_PREFIXO_NOME = {"chamados": "relatorio_chamados", "relatorio": "relatorio_completo"}
+
+MAX_TENTATIVAS = 3
+# "processando" além disso é dado como abandonado (worker morto no meio).
+_PROCESSAMENTO_ABANDONADO = timedelta(minutes=30)
+# Registros concluídos ficam esse tempo para o histórico e são apagados.
+_RETENCAO = timedelta(days=30)
+_LOTE_LIMPEZA = 200
+
+
+# ── Geração ──────────────────────────────────────────────────────────────────
+
+
+def condicoes_escopo(user) -> list[Any]:
+    """Condições de escopo de chamados por área, quando o usuário é supervisor.
+
+    Mesmo filtro que obter_contexto_admin já aplica pro /painel — sem isso, a
+    exportação traria chamados/métricas de áreas que não são do supervisor.
+    """
+    condicoes = []
+    if user.perfil == "supervisor" and getattr(user, "areas", None):
+        condicoes.append(ChamadoRow.supervisor_ids_com_acesso.contains([user.id]))
+    return condicoes
+
+
+def filtros_do_request(args) -> dict[str, str]:
+    """Só os filtros que mudam o resultado, sem vazios — base da chave de dedupe."""
+    filtros = {}
+    for nome in FILTROS_EXPORTACAO:
+        valor = (args.get(nome) or "").strip()
+        if valor:
+            filtros[nome] = valor
+    return filtros
+
+
+def _chamados_permitidos(lotes: Iterable[list[Any]], user) -> Iterator[Any]:
+    """Achata os lotes de iterar_chamados_filtrados aplicando a permissão de leitura."""
+    for lote in lotes:
+        yield from _filtrar_chamados_por_permissao(lote, user)
+
+
+def _acumular_para_metricas(chamados: Iterable[Any], destino: list[dict]) -> Iterator[Any]:
+    """Repassa os chamados guardando só os campos que as métricas usam."""
+    for c in chamados:
+        dados = c.to_dict()
+        destino.append({campo: dados.get(campo) for campo in CAMPOS_METRICAS_CHAMADO})
+        yield c
+
+
+class _Contador:
+    """Iterável que conta os itens conforme o exportador os consome."""
+
+    def __init__(self, itens: Iterable[Any]) -> None:
+        self._itens = itens
+        self.total = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for item in self._itens:
+            self.total += 1
+            yield item
+
+
+def _filtros_aplicados(filtros: dict[str, str], idioma: str) -> dict[str, str]:
+    """Filtros para documentar no relatório, com rótulos no idioma pedido."""
+    rotulos = {
+        "search": "excel_filter_search",
+        "categoria": "category",
+        "status": "status",
+        "responsavel": "responsible",
+    }
+    return {
+        get_translation(chave, idioma): filtros[nome]
+        for nome, chave in rotulos.items()
+        if filtros.get(nome)
+    }
+
+
+def _relatorio_completo(user, chamados: Iterable[Any], filtros: dict, idioma: str) -> IO[bytes]:
+    from app.services.excel_export_service import exportador_excel
+
+    # Métricas gerais/agregadas: analisador consulta a coleção inteira sem
+    # escopo de área — supervisor não-admin só pode ver métricas/nomes de
+    # supervisores da(s) própria(s) área(s), senão vaza dado de outras áreas.
+    if user.is_admin_or_above:
+        metricas_gerais = analisador.obter_metricas_gerais(dias=30)
+        metricas_supervisores = analisador.obter_metricas_supervisores()
+    else:
+        # Calculadas sobre os próprios chamados exportados, depois que o
+        # exportador os percorrer (callables avaliados no fim).
+        chamados_pre_carregados: list[dict] = []
+        chamados = _acumular_para_metricas(chamados, chamados_pre_carregados)
+        metricas_gerais = partial(
+            analisador.obter_metricas_gerais,
+            dias=30,
+            chamados_pre_carregados=chamados_pre_carregados,
+        )
+        areas_usuario = set(getattr(user, "areas", None) or [])
+
+        def metricas_supervisores() -> list[dict[str, Any]]:
+            return [
+                m
+                for m in analisador.obter_metricas_supervisores(
+                    chamados_pre_carregados=chamados_pre_carregados
+                )
+                if m.get("area") in areas_usuario
+            ]
+
+    return exportador_excel.exportar_relatorio_completo(
+        chamados=chamados,
+        metricas_gerais=metricas_gerais,
+        metricas_supervisores=metricas_supervisores,
+        filtros_aplicados=_filtros_aplicados(filtros, idioma),
+        language=idioma,
+    )
+
+
+def gerar_arquivo(
+    user, tipo: str, formato: str, filtros: dict[str, str], idioma: str
+) -> tuple[IO[bytes], str, int]:
+    """Monta a exportação em streaming. Retorna (arquivo no início, nome, linhas).
+
+    O relatório completo (várias abas) só existe em XLSX.
+    """
+    if tipo not in TIPOS or formato not in FORMATOS:
+        raise ValueError(f"exportação inválida: {tipo}/{formato}")
+    if tipo == "relatorio" and formato != "xlsx":
+        raise ValueError("o relatório completo só é gerado em xlsx")
+
+    lotes = iterar_chamados_filtrados(condicoes_escopo(user), filtros)
+    chamados = _Contador(_chamados_permitidos(lotes, user))
+    if tipo == "relatorio":
+        arquivo = _relatorio_completo(user, chamados, filtros, idioma)
+    elif formato == "csv":
+        arquivo = exportar_chamados_csv(chamados)
+    else:
+        arquivo = exportar_chamados_xlsx(chamados)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return arquivo, f"{_PREFIXO_NOME[tipo]}_{ts}.{formato}", chamados.total
+
+
+def mimetype(formato: str) -> str:
+    return _MIMETYPES[formato]
+
+
+# ── Fila ─────────────────────────────────────────────────────────────────────
+
+
+def _executor() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def chave_exportacao(usuario_id: str, tipo: str, formato: str, parametros: dict) -> str:
+    bruto = json.dumps([usuario_id, tipo, formato, parametros], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+def _serializar(row: ExportacaoRow) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "usuario_id": row.usuario_id,
+        "tipo": row.tipo,
+        "formato": row.formato,
+        "parametros": dict(row.parametros or {}),
+        "status": row.status,
+        "tentativas": row.tentativas,
+        "arquivo": row.arquivo,
+        "nome_arquivo": row.nome_arquivo,
+        "tamanho_bytes": row.tamanho_bytes,
+        "linhas": row.linhas,
+        "erro": row.erro,
+        "criado_em": row.criado_em,
+        "concluido_em": row.concluido_em,
+        "expira_em": row.expira_em,
+    }
+
+
+def _buscar_reaproveitavel(session, chave: str) -> ExportacaoRow | None:
+    from config import Config
+
+    agora = datetime.now(UTC)
+    janela = timedelta(minutes=max(0, Config.EXPORTACAO_JANELA_REUSO_MINUTOS))
+    reaproveitavel = or_(
+        ExportacaoRow.status.in_(_STATUS_ATIVOS),
+        and_(
+            ExportacaoRow.status == "pronto",
+            ExportacaoRow.concluido_em >= agora - janela,
+            ExportacaoRow.expira_em > agora,
+        ),
+    )
+    return session.execute(
+        select(ExportacaoRow)
+        .where(ExportacaoRow.chave == chave, reaproveitavel)
+        .order_by(ExportacaoRow.criado_em.desc())
+        .limit(1)
+    ).scalar()
+
+
+def exportacao_reaproveitavel(
+    usuario_id: str, tipo: str, formato: str, filtros: dict[str, str], idioma: str
+) -> dict[str, Any] | None:
+    """Pedido idêntico já na fila ou pronto dentro da janela de reuso, se houver.
+
+    A rota consulta isto antes de cobrar a cota diária de exportação: reaproveitar
+    um pedido não gera arquivo novo e não deve consumir cota.
+    """
+    if tipo not in TIPOS or formato not in FORMATOS:
+        return None
+    chave = chave_exportacao(usuario_id, tipo, formato, {"filtros": filtros, "idioma": idioma})
+    with db_module.SessionLocal() as session:
+        existente = _buscar_reaproveitavel(session, chave)
+        return _serializar(existente) if existente is not None else None
+
+
+def enfileirar_exportacao(
+    usuario_id: str, tipo: str, formato: str, filtros: dict[str, str], idioma: str
+) -> tuple[dict[str, Any], bool]:
+    """Grava o pedido ou devolve o equivalente que já existe.
+
+    Retorna (exportação, nova). Não é nova quando há pedido idêntico na fila
+    ou pronto há menos de EXPORTACAO_JANELA_REUSO_MINUTOS (e ainda válido) —
+    nesse caso status "pronto" permite redirecionar direto ao download.
+    """
+    if tipo not in TIPOS or formato not in FORMATOS:
+        raise ValueError(f"exportação inválida: {tipo}/{formato}")
+    parametros = {"filtros": filtros, "idioma": idioma}
+    chave = chave_exportacao(usuario_id, tipo, formato, parametros)
+    ativa = (ExportacaoRow.chave == chave, ExportacaoRow.status.in_(_STATUS_ATIVOS))
+
+    with db_module.SessionLocal() as session, session.begin():
+        existente = _buscar_reaproveitavel(session, chave)
+        if existente is not None:
+            return _serializar(existente), False
+        # Duas tentativas: o pedido que causou o conflito pode terminar entre
+        # o INSERT e o SELECT.
+        for _ in range(2):
+            nova_id = session.execute(
+                pg_insert(ExportacaoRow)
+                .values(
+                    usuario_id=usuario_id,
+                    tipo=tipo,
+                    formato=formato,
+                    parametros=parametros,
+                    chave=chave,
+                    status="pendente",
+                    tentativas=0,
+                )
+                .on_conflict_do_nothing(
+                    index_elements=["chave"],
+                    index_where=ExportacaoRow.status.in_(_STATUS_ATIVOS),
+                )
+                .returning(ExportacaoRow.id)
+            ).scalar()
+            if nova_id is not None:
+                return _serializar(session.get(ExportacaoRow, nova_id)), True
+            existente = session.execute(select(ExportacaoRow).where(*ativa)).scalar()
+            if existente is not None:
+                return _serializar(existente), False
+    raise RuntimeError("não foi possível enfileirar a exportação")
+
+
+def _marcar_esgotadas(session, agora: datetime) -> list[dict]:
+    """Abandonadas que já gastaram as tentativas viram erro (não voltam à fila)."""
+    rows = session.execute(
+        update(ExportacaoRow)
+        .where(
+            ExportacaoRow.status == "processando",
+            ExportacaoRow.iniciado_em < agora - _PROCESSAMENTO_ABANDONADO,
+            ExportacaoRow.tentativas >= MAX_TENTATIVAS,
+        )
+        .values(status="erro", erro="abandonada: não terminou no prazo", concluido_em=agora)
+        .returning(ExportacaoRow.id, ExportacaoRow.usuario_id, ExportacaoRow.parametros)
+    ).all()
+    return [{"id": r.id, "usuario_id": r.usuario_id, "parametros": r.parametros} for r in rows]
+
+
+def reivindicar_proxima() -> dict[str, Any] | None:
+    """Passa o pedido mais antigo da fila para "processando" e o devolve (ou None).
+
+    SKIP LOCKED: threads e workers concorrentes pegam pedidos diferentes.
+    """
+    agora = datetime.now(UTC)
+    with db_module.SessionLocal() as session, session.begin():
+        esgotadas = _marcar_esgotadas(session, agora)
+        row = session.execute(
+            select(ExportacaoRow)
+            .where(
+                or_(
+                    ExportacaoRow.status == "pendente",
+                    and_(
+                        ExportacaoRow.status == "processando",
+                        ExportacaoRow.iniciado_em < agora - _PROCESSAMENTO_ABANDONADO,
+                    ),
+                )
+            )
+            .order_by(ExportacaoRow.criado_em, ExportacaoRow.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if row is not None:
+            row.status = "processando"
+            row.tentativas += 1
+            row.iniciado_em = agora
+            row.executor = _executor()
+            dados = _serializar(row)
+        else:
+            dados = None
+    for esgotada in esgotadas:
+        _notificar(esgotada, pronta=False)
+    return dados
+
+
+def _concluir(exportacao: dict, **valores) -> bool:
+    """Grava o desfecho — só se o pedido ainda é desta tentativa (não foi
+    reivindicado de novo por ter passado do prazo)."""
+    with db_module.SessionLocal() as session, session.begin():
+        return bool(
+            session.execute(
+                update(ExportacaoRow)
+                .where(
+                    ExportacaoRow.id == exportacao["id"],
+                    ExportacaoRow.status == "processando",
+                    ExportacaoRow.tentativas == exportacao["tentativas"],
+                )
+                .values(concluido_em=datetime.now(UTC), **valores)
+            ).rowcount
+        )
+
+
+def link_download(exportacao_id: int) -> str:
+    # Caminho fixo: a notificação é criada fora de request (sem url_for).
+    return f"/exportacoes/{exportacao_id}/download"
+
+
+def _notificar(exportacao: dict, *, pronta: bool) -> None:
+    from app.services.notifications_inapp import criar_notificacao_com_link
+
+    parametros = exportacao.get("parametros") or {}
+    idioma = parametros.get("idioma") or "pt_BR"
+    arquivo = exportacao.get("nome_arquivo") or get_translation("export_default_name", idioma)
+    if pronta:
+        expira = exportacao["expira_em"].astimezone().strftime("%d/%m/%Y %H:%M")
+        titulo = get_translation("export_ready_title", idioma)
+        mensagem = get_translation("export_ready_message", idioma, arquivo=arquivo, expira=expira)
+        tipo = "exportacao_pronta"
+    else:
+        titulo = get_translation("export_failed_title", idioma)
+        mensagem = get_translation("export_failed_message", idioma, arquivo=arquivo)
+        tipo = "exportacao_erro"
+    criar_notificacao_com_link(
+        usuario_id=exportacao["usuario_id"],
+        titulo=titulo,
+        mensagem=mensagem,
+        tipo=tipo,
+        link=link_download(exportacao["id"]),
+    )
+
+
+def _tamanho(arquivo: IO[bytes]) -> int:
+    arquivo.seek(0, 2)
+    tamanho = arquivo.tell()
+    arquivo.seek(0)
+    return tamanho
+
+
+def processar_exportacao(exportacao: dict[str, Any]) -> bool:
+    """Gera e grava o arquivo de um pedido já reivindicado; notifica o usuário.
+
+    Precisa de app context (armazenamento lê current_app.config). Retorna
+    True se o arquivo ficou pronto.
+    """
+    from app.models_usuario import Usuario
+    from app.services.upload import remover_arquivo_gerado, salvar_arquivo_gerado
+    from config import Config
+
+    parametros = exportacao.get("parametros") or {}
+    chave_arquivo = None
+    try:
+        user = Usuario.get_by_id(exportacao["usuario_id"])
+        if user is None or user.perfil not in PERFIS_EXPORTACAO:
+            raise PermissionError("usuário sem permissão de exportar")
+        arquivo, nome, linhas = gerar_arquivo(
+            user,
+            exportacao["tipo"],
+            exportacao["formato"],
+            parametros.get("filtros") or {},
+            parametros.get("idioma") or "pt_BR",
+        )
+        with arquivo:
+            tamanho = _tamanho(arquivo)
+            chave_arquivo = salvar_arquivo_gerado(
+                arquivo,
+                secure_filename(f"{exportacao['id']}_{nome}"),
+                mimetype(exportacao["formato"]),
+            )
+        if not chave_arquivo:
+            raise RuntimeError("nenhum armazenamento disponível para o arquivo")
+    except Exception as exc:
+        logger.exception("Exportação %s falhou: %s", exportacao["id"], exc)
+        if _concluir(exportacao, status="erro", erro=f"{type(exc).__name__}: {exc}"):
+            _notificar(exportacao, pronta=False)
+        return False
+
+    expira_em = datetime.now(UTC) + timedelta(hours=Config.EXPORTACAO_TTL_HORAS)
+    concluida = _concluir(
+        exportacao,
+        status="pronto",
+        arquivo=chave_arquivo,
+        nome_arquivo=nome,
+        tamanho_bytes=tamanho,
+        linhas=linhas,
+        erro=None,
+        expira_em=expira_em,
+    )
+    if not concluida:
+        # Outra tentativa assumiu o pedido nesse meio-tempo: ela é quem conclui.
+        remover_arquivo_gerado(chave_arquivo)
+        return False
+    logger.info(
+        "Exportação %s pronta: %s (%d linhas, %d bytes)", exportacao["id"], nome, linhas, tamanho
+    )
+    _notificar({**exportacao, "nome_arquivo": nome, "expira_em": expira_em}, pronta=True)
+    return True
+
+
+def processar_pendentes(max_exportacoes: int | None = None) -> dict[str, int]:
+    """Esvazia a fila (ou processa até max_exportacoes). Precisa de app context."""
+    resultado = {"processados": 0, "prontos": 0, "erros": 0}
+    while max_exportacoes is None or resultado["processados"] < max_exportacoes:
+        exportacao = reivindicar_proxima()
+        if exportacao is None:
+            break
+        resultado["processados"] += 1
+        if processar_exportacao(exportacao):
+            resultado["prontos"] += 1
+        else:
+            resultado["erros"] += 1
+    return resultado
+
+
+def limpar_expiradas() -> dict[str, int]:
+    """Apaga os arquivos vencidos (status "expirado") e os registros além da retenção."""
+    from app.services.upload import remover_arquivo_gerado
+
+    agora = datetime.now(UTC)
+    with db_module.SessionLocal() as session:
+        vencidas = session.execute(
+            select(ExportacaoRow.id, ExportacaoRow.arquivo)
+            .where(ExportacaoRow.status == "pronto", ExportacaoRow.expira_em <= agora)
+            .limit(_LOTE_LIMPEZA)
+        ).all()
+    removidos = 0
+    for exportacao_id, arquivo in vencidas:
+        if arquivo and not remover_arquivo_gerado(arquivo):
+            continue
+        with db_module.SessionLocal() as session, session.begin():
+            session.execute(
+                update(ExportacaoRow)
+                .where(ExportacaoRow.id == exportacao_id)
+                .values(status="expirado", arquivo=None)
+            )
+        removidos += 1
+    with db_module.SessionLocal() as session, session.begin():
+        apagados = session.execute(
+            delete(ExportacaoRow).where(
+                ExportacaoRow.status.in_(("expirado", "erro")),
+                ExportacaoRow.criado_em < agora - _RETENCAO,
+            )
+        ).rowcount
+    return {"arquivos_removidos": removidos, "registros_apagados": apagados or 0}
+
+
+def obter_exportacao(exportacao_id: int, usuario_id: str) -> dict[str, Any] | None:
+    """Pedido do próprio usuário (None se não existe ou é de outra pessoa)."""
+    with db_module.SessionLocal() as session:
+        row = session.get(ExportacaoRow, exportacao_id)
+        if row is None or row.usuario_id != usuario_id:
+            return None
+        return _serializar(row)
+
+
+def disponivel_para_download(exportacao: dict[str, Any]) -> bool:
+    expira_em = exportacao.get("expira_em")
+    return (
+        exportacao.get("status") == "pronto"
+        and bool(exportacao.get("arquivo"))
+        and expira_em is not None
+        and expira_em > datetime.now(UTC)
+    )
+
+
+# ── Threads do processo ──────────────────────────────────────────────────────
+
+_semaforo: threading.BoundedSemaphore | None = None
+_semaforo_pid: int | None = None
+
+
+def _obter_semaforo(limite: int) -> threading.BoundedSemaphore:
+    global _semaforo, _semaforo_pid
+    if _semaforo is None or _semaforo_pid != os.getpid():
+        _semaforo = threading.BoundedSemaphore(limite)
+        _semaforo_pid = os.getpid()
+    return _semaforo
+
+
+def disparar_processamento(app) -> bool:
+    """Processa a fila numa thread deste worker, se houver vaga no semáforo.
+
+    Sem vaga (ou EXPORTACAO_THREADS_POR_PROCESSO=0), o pedido espera o job
+    do scheduler. Retorna True se disparou.
+    """
+    from config import Config
+
+    limite = Config.EXPORTACAO_THREADS_POR_PROCESSO
+    if limite <= 0:
+        return False
+    semaforo = _obter_semaforo(limite)
+    if not semaforo.acquire(blocking=False):
+        return False
+
+    def _run():
+        try:
+            with app.app_context():
+                processar_pendentes()
+        except Exception as exc:
+            logger.exception("Thread de exportações falhou: %s", exc)
+        finally:
+            semaforo.release()
+
+    threading.Thread(target=_run, daemon=True, name="exportacoes").start()
+    return True
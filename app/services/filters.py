@@ -44,6 +44,7 @@ if resultado['tem_proxima']:
 """
 
 import logging
+from collections.abc import Iterator
 from typing import Any
 
 from sqlalchemy import and_, or_, select
@@ -53,6 +54,9 @@ from app.db.models.chamado import ChamadoRow
 
 logger = logging.getLogger(__name__)
 
+# Linhas por ida ao cursor em iterar_chamados_filtrados (exportações).
+LOTE_STREAMING = 500
+
 
 def _construir_condicoes_filtro(
     args: dict[str, Any],
@@ -229,6 +233,52 @@ def aplicar_filtros_dashboard_com_paginacao(
         }
 
 
+def iterar_chamados_filtrados(
+    condicoes_base: list[Any],
+    args: dict[str, Any],
+    lote: int | None = None,
+) -> Iterator[list[Any]]:
+    """
+    Todos os chamados que casam com os filtros, em lotes, na ordem do dashboard.
+
+    Para exportação: sem limite e sem materializar o resultado — a consulta
+    roda num cursor do lado do servidor (yield_per → stream_results; no
+    psycopg, um cursor nomeado) e cada lote de até `lote` linhas é convertido
+    em Chamado, passa pela busca em memória e é entregue antes de o próximo
+    ser lido. A sessão fica aberta enquanto o gerador é consumido — e é uma
+    sessão própria, fora do scoped_session da thread: quem consome os lotes
+    (ex.: _filtrar_chamados_por_permissao → Usuario.get_by_ids) abre e fecha
+    o SessionLocal() da thread, e fechar a sessão do cursor nomeado o mata.
+
+    Args:
+        condicoes_base: condições SQL de escopo (mesmo papel que em
+            aplicar_filtros_dashboard_com_paginacao).
+        args: Argumentos da URL (mesmos filtros do dashboard).
+        lote: Linhas buscadas por vez do cursor (padrão LOTE_STREAMING).
+
+    Yields:
+        Listas de Chamado (lotes vazios pela busca são pulados).
+    """
+    from app.models import Chamado
+
+    condicoes_extra, _, _, _ = _construir_condicoes_filtro(args)
+    search = args.get("search")
+    stmt = (
+        select(ChamadoRow)
+        .where(*condicoes_base, *condicoes_extra)
+        .order_by(ChamadoRow.data_abertura.desc(), ChamadoRow.id.desc())
+        .execution_options(yield_per=lote or LOTE_STREAMING)
+    )
+    session = db_module.SessionLocal.session_factory()
+    try:
+        for rows in session.execute(stmt).scalars().partitions():
+            chamados = _aplicar_busca_em_memoria([Chamado._from_row(r) for r in rows], search)
+            if chamados:
+                yield chamados
+    finally:
+        session.close()
+
+
 def aplicar_filtros_dashboard(condicoes_base: list[Any], args: dict[str, Any]) -> list[Any]:
     """
     Função legada mantida para compatibilidade — sem cursor (começa do início).
@@ -5,6 +5,7 @@ from sqlalchemy import select, update
 
 from app import db as db_module
 from app.db.models.usuario import UsuarioRow
+from app.models_usuario import Usuario
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +102,7 @@ class GamificationService:
                 usuario_row.exp_semanal += pontos
                 usuario_row.level = novo_level
                 usuario_row.conquistas = conquistas_atuais + novas_conquistas
+            Usuario.invalidar_cache_sessao(usuario_id)
 
             logger.info(
                 "Usuário %s ganhou %s EXP (%s). Novo nível: %s.",
@@ -7,7 +7,7 @@ sem banco configurado).
 
 import logging
 
-from app.cache import get_static_cached
+from app.cache import get_static_cached, ttl_invalidavel
 from app.gates_config import GATE_SUBETAPAS, todos_valores_gate_validos
 from app.models_categorias import CategoriaGate
 
@@ -40,21 +40,22 @@ def is_gate_valido(valor: str) -> bool:
     """Retorna True se valor == 'N/A' ou existe gate ativo com nome_pt == valor.
 
     Fallback: allowlist estática de GATE_SUBETAPAS se a tabela estiver vazia ou com erro.
-    Resultado é cacheado 5 min para evitar leitura no banco a cada validação.
+    Resultado é cacheado 5 min (horas com o barramento de invalidação de
+    cache conectado) para evitar leitura no banco a cada validação.
     """
     if valor == "N/A":
         return True
 
     def _fetch() -> frozenset[str]:
-        try:
-            gates = CategoriaGate.get_all_ativos()
-            if gates:
-                return frozenset(g.nome_pt for g in gates)
-        except Exception as e:
-            logger.warning("Erro ao validar gate no banco, usando fallback estático: %s", e)
-        return frozenset()
-
-    gate_names = get_static_cached(_GATES_VALIDOS_CACHE_KEY, _fetch, ttl_seconds=_GATES_VALIDOS_TTL)
+        return frozenset(g.nome_pt for g in CategoriaGate.get_all_ativos(levantar_erro=True))
+
+    # Falha do banco cai na allowlist estática sem ficar em cache.
+    gate_names = get_static_cached(
+        _GATES_VALIDOS_CACHE_KEY,
+        _fetch,
+        ttl_seconds=ttl_invalidavel(_GATES_VALIDOS_TTL),
+        padrao_em_erro=frozenset(),
+    )
     if gate_names:
         return valor in gate_names
     return valor in todos_valores_gate_validos()
@@ -28,6 +28,22 @@ NIVEL_PARA_CHAVE_GESTOR: dict[int, str] = {
 NIVEIS_GESTAO_SUPERIORES = ("gerente_producao", "assistente_gm", "gm")
 
 
+def _usuarios_com_nivel_gestao(*niveis: str) -> list:
+    """Usuários com nivel_gestao em `niveis`, em ordem de nome.
+
+    Com o diretório em memória ligado, é uma consulta ao índice por
+    nivel_gestao; senão, filtra o get_all cacheado.
+    """
+    from app.models_usuario import Usuario
+    from app.services.diretorio_usuarios import obter_diretorio
+
+    diretorio = obter_diretorio()
+    if diretorio is not None:
+        return diretorio.por_nivel_gestao(*niveis)
+    usuarios = get_static_cached("sla_gestores_usuarios", Usuario.get_all, ttl_seconds=300)
+    return [u for u in usuarios if getattr(u, "nivel_gestao", None) in niveis]
+
+
 def construir_mapa_gestor_setor() -> dict[str, str]:
     """Monta {nome_setor: email} uma vez por execução do job (evita N leituras).
 
@@ -38,14 +54,9 @@ def construir_mapa_gestor_setor() -> dict[str, str]:
     duas pessoas cobrirem a mesma área (config inconsistente), mantém a
     primeira encontrada e loga warning — não é motivo para travar o job.
     """
-    from app.models_usuario import Usuario
-
     try:
         mapa: dict[str, str] = {}
-        usuarios = get_static_cached("sla_gestores_usuarios", Usuario.get_all, ttl_seconds=300)
-        for usuario in usuarios:
-            if getattr(usuario, "nivel_gestao", None) != "gestor_setor":
-                continue
+        for usuario in _usuarios_com_nivel_gestao("gestor_setor"):
             if not getattr(usuario, "ativo", True) or not getattr(usuario, "email", None):
                 continue
             for area in usuario.areas or []:
@@ -73,16 +84,11 @@ def construir_mapa_niveis_superiores() -> dict[str, str]:
     no mesmo nível, mantém a primeira encontrada (ordem alfabética por e-mail)
     e loga warning — não é motivo para travar o job.
     """
-    from app.models_usuario import Usuario
-
     try:
         mapa: dict[str, str] = {}
         candidatos: dict[str, list[str]] = {nivel: [] for nivel in NIVEIS_GESTAO_SUPERIORES}
-        usuarios = get_static_cached("sla_gestores_usuarios", Usuario.get_all, ttl_seconds=300)
-        for usuario in usuarios:
-            nivel = getattr(usuario, "nivel_gestao", None)
-            if nivel not in NIVEIS_GESTAO_SUPERIORES:
-                continue
+        for usuario in _usuarios_com_nivel_gestao(*NIVEIS_GESTAO_SUPERIORES):
+            nivel = usuario.nivel_gestao
             if not getattr(usuario, "ativo", True) or not getattr(usuario, "email", None):
                 continue
             candidatos[nivel].append(usuario.email)
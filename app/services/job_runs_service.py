@@ -0,0 +1,510 @@
+"""
+Telemetria dos jobs agendados: histórico em job_runs e resumo para o admin.
+
+Os jobs de app/__init__.py (_job_sla_escalacao, _job_digest_diario, ...)
+devolvem dicts de contadores que antes só iam para o log. executar_job_com_lock
+(scheduler_lock.py) agora roda cada job através de executar_com_telemetria,
+que grava uma linha por execução:
+
+  - início, fim e duração;
+  - atraso: quanto o início ficou depois do disparo agendado pelo gatilho
+    (fila do APScheduler, worker ocupado, failover do líder);
+  - processados / ações / erros extraídos do dict de resultado (_resumir);
+  - executor: host:pid do worker que detinha o lock.
+
+resumo_jobs agrega o histórico por job (média, p95 e máximo da duração,
+tendência diária, últimas execuções) e marca alerta_sobreposicao quando a
+duração chega a JOB_RUNS_ALERTA_FRACAO_INTERVALO do intervalo do gatilho —
+o aviso vem antes de uma execução começar a atropelar a seguinte
+(max_instances=1 faria o APScheduler simplesmente pular disparos).
+
+enfileirar_job é o modo assíncrono do cron HTTP: grava a execução "em
+andamento" (fim nulo) antes de rodar o job numa thread e devolve o id para
+consulta (obter_execucao). O índice único parcial uq_job_runs_em_andamento
+faz disparos simultâneos caírem na execução que já está na fila — em
+qualquer worker, sem depender de Redis.
+
+Falha ao gravar telemetria nunca derruba o job: é logada e, numa execução
+enfileirada, a linha é fechada só com o desfecho (sucesso/falha) — nunca
+fica aberta para depois virar "pulado".
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Integer, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db as db_module
+from app.db.models.job_run import JobRunRow
+
+logger = logging.getLogger(__name__)
+
+# Chaves de "itens examinados" nos dicts de resultado dos jobs — a primeira
+# encontrada num nível vale por aquele nível inteiro (o despachante de timers
+# tem "vencidos" no topo e "processados" por tipo dentro: contar os dois
+# dobraria o total).
+_CHAVES_PROCESSADOS = (
+    "processados",
+    "usuarios_processados",
+    "vencidos",
+    "chamados",
+    "total_chamados",
+)
+# Contadores que não são ação executada (nem erro): entram no resultado
+# gravado, mas ficam fora da soma de ações.
+_PREFIXOS_NAO_ACAO = ("pulados", "ignorados", "adiados", "reprogramados", "total_")
+
+# Execução enfileirada que não terminou nesse prazo é dada como abandonada
+# (worker reiniciado no meio) e deixa de bloquear novos disparos.
+_EXECUCAO_ABANDONADA = timedelta(minutes=30)
+
+# Janela para achar o último disparo de gatilhos cron (os crons daqui são
+# semanais).
+_JANELA_CRON = timedelta(days=8)
+
+
+def _executor() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _somar_processados(resultado: dict) -> int:
+    for chave in _CHAVES_PROCESSADOS:
+        valor = resultado.get(chave)
+        if isinstance(valor, int) and not isinstance(valor, bool):
+            return valor
+    return sum(_somar_processados(v) for v in resultado.values() if isinstance(v, dict))
+
+
+def _somar_contadores(resultado: dict) -> tuple[int, int]:
+    """(ações, erros) somados em todos os níveis do dict."""
+    acoes = erros = 0
+    for chave, valor in resultado.items():
+        if isinstance(valor, dict):
+            a, e = _somar_contadores(valor)
+            acoes += a
+            erros += e
+        elif not isinstance(valor, int) or isinstance(valor, bool):
+            continue
+        elif chave == "erros":
+            erros += valor
+        elif chave in _CHAVES_PROCESSADOS or chave.startswith(_PREFIXOS_NAO_ACAO):
+            continue
+        else:
+            acoes += valor
+    return acoes, erros
+
+
+def _resumir(resultado: Any) -> tuple[int, int, int]:
+    """(processados, ações, erros) a partir do retorno de um job."""
+    if not isinstance(resultado, dict):
+        return 0, 0, 0
+    acoes, erros = _somar_contadores(resultado)
+    return _somar_processados(resultado), acoes, erros
+
+
+def _serializar(resultado: Any) -> dict | None:
+    """Resultado em forma gravável em JSONB (Counter, datetime, bool solto...)."""
+    if resultado is None:
+        return None
+    if not isinstance(resultado, dict):
+        resultado = {"retorno": resultado}
+    return json.loads(json.dumps(resultado, default=str))
+
+
+def disparo_agendado(gatilho, agora: datetime) -> tuple[datetime | None, float | None]:
+    """(último disparo ≤ agora, intervalo do gatilho em segundos).
+
+    IntervalTrigger: aritmética direta sobre start_date/interval. CronTrigger
+    (e demais): percorre os disparos da última semana — o intervalo é a
+    distância entre o último disparo e o seguinte.
+    """
+    if gatilho is None:
+        return None, None
+    intervalo = getattr(gatilho, "interval", None)
+    inicio = getattr(gatilho, "start_date", None)
+    if isinstance(intervalo, timedelta) and inicio is not None and intervalo:
+        if agora < inicio:
+            return None, intervalo.total_seconds()
+        return inicio + ((agora - inicio) // intervalo) * intervalo, intervalo.total_seconds()
+
+    anterior = None
+    proximo = gatilho.get_next_fire_time(None, agora - _JANELA_CRON)
+    while proximo is not None and proximo <= agora:
+        anterior = proximo
+        proximo = gatilho.get_next_fire_time(anterior, anterior + timedelta(microseconds=1))
+    if anterior is None or proximo is None:
+        return anterior, None
+    return anterior, (proximo - anterior).total_seconds()
+
+
+def registrar_execucao(
+    nome_job: str,
+    *,
+    inicio: datetime,
+    fim: datetime,
+    duracao_ms: int,
+    resultado: Any = None,
+    erro: str | None = None,
+    agendado_para: datetime | None = None,
+    intervalo_segundos: float | None = None,
+    execucao_id: int | None = None,
+) -> None:
+    """Grava uma linha em job_runs — ou completa a execução enfileirada
+    `execucao_id`. Erros (de banco ou ao serializar o resultado) são logados,
+    nunca propagados; na execução enfileirada, caem em _fechar_so_desfecho."""
+    try:
+        processados, acoes, erros = _resumir(resultado)
+        atraso_ms = None
+        if agendado_para is not None:
+            atraso_ms = max(0, int((inicio - agendado_para).total_seconds() * 1000))
+        campos = {
+            "inicio": inicio,
+            "fim": fim,
+            "duracao_ms": duracao_ms,
+            "agendado_para": agendado_para,
+            "atraso_ms": atraso_ms,
+            "intervalo_segundos": intervalo_segundos,
+            "processados": processados,
+            "acoes": acoes,
+            "erros": erros + (1 if erro else 0),
+            "sucesso": erro is None,
+            "executor": _executor(),
+            "erro": erro,
+            "resultado": _serializar(resultado),
+        }
+        with db_module.SessionLocal() as session, session.begin():
+            if execucao_id is None:
+                session.add(JobRunRow(job=nome_job, **campos))
+            else:
+                session.execute(
+                    update(JobRunRow).where(JobRunRow.id == execucao_id).values(**campos)
+                )
+    except Exception as exc:
+        logger.warning("Telemetria do job '%s' não gravada: %s", nome_job, exc)
+        if execucao_id is not None:
+            _fechar_so_desfecho(nome_job, execucao_id, fim, duracao_ms, erro)
+
+
+def _fechar_so_desfecho(
+    nome_job: str, execucao_id: int, fim: datetime, duracao_ms: int, erro: str | None
+) -> None:
+    """Fecha a execução enfileirada com o desfecho real do job, sem contadores
+    nem resultado — o chamador que faz polling vê sucesso/falha em vez de
+    "em_andamento" até expirar."""
+    try:
+        with db_module.SessionLocal() as session, session.begin():
+            session.execute(
+                update(JobRunRow)
+                .where(JobRunRow.id == execucao_id, JobRunRow.fim.is_(None))
+                .values(
+                    fim=fim,
+                    duracao_ms=duracao_ms,
+                    erros=1 if erro else 0,
+                    sucesso=erro is None,
+                    erro=erro,
+                    resultado={"telemetria": "não gravada"},
+                )
+            )
+    except Exception as exc:
+        logger.warning("Execução %s do job '%s' não fechada: %s", execucao_id, nome_job, exc)
+
+
+def executar_com_telemetria(
+    app, nome_job: str, fn_job, *, gatilho=None, execucao_id: int | None = None
+) -> Any:
+    """Roda fn_job, grava a execução em job_runs e devolve o resultado.
+
+    Com `execucao_id` (execução enfileirada por enfileirar_job), completa a
+    linha já existente — gravada mesmo com JOB_RUNS_ENABLED desligado, já que
+    é por ela que o chamador acompanha o resultado.
+
+    Exceção de fn_job é logada e registrada como falha — não propaga (o
+    APScheduler só a logaria de novo, e o lock Redis não deve tratá-la como
+    falha de lock).
+    """
+    inicio = datetime.now(UTC)
+    agendado_para, intervalo = disparo_agendado(gatilho, inicio)
+    t0 = time.perf_counter()
+    resultado = None
+    erro = None
+    try:
+        resultado = fn_job()
+    except Exception as exc:
+        logger.exception("Erro no job '%s': %s", nome_job, exc)
+        erro = f"{type(exc).__name__}: {exc}"
+    duracao_ms = int((time.perf_counter() - t0) * 1000)
+
+    if execucao_id is not None or app.config.get("JOB_RUNS_ENABLED"):
+        registrar_execucao(
+            nome_job,
+            inicio=inicio,
+            fim=datetime.now(UTC),
+            duracao_ms=duracao_ms,
+            resultado=resultado,
+            erro=erro,
+            agendado_para=agendado_para,
+            intervalo_segundos=intervalo,
+            execucao_id=execucao_id,
+        )
+    return resultado
+
+
+def _reservar_execucao(nome_job: str) -> tuple[int, bool]:
+    """(id, nova): insere a execução em andamento ou devolve a que já existe."""
+    agora = datetime.now(UTC)
+    em_andamento = (JobRunRow.job == nome_job, JobRunRow.fim.is_(None))
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(
+            update(JobRunRow)
+            .where(*em_andamento, JobRunRow.inicio < agora - _EXECUCAO_ABANDONADA)
+            .values(
+                fim=agora,
+                duracao_ms=cast(func.extract("epoch", agora - JobRunRow.inicio) * 1000, Integer),
+                sucesso=False,
+                erros=1,
+                erro="abandonada: não terminou no prazo",
+            )
+        )
+        # Duas tentativas: a execução que causou o conflito pode terminar
+        # entre o INSERT e o SELECT.
+        for _ in range(2):
+            execucao_id = session.execute(
+                pg_insert(JobRunRow)
+                .values(
+                    job=nome_job,
+                    inicio=agora,
+                    processados=0,
+                    acoes=0,
+                    erros=0,
+                    executor=_executor(),
+                )
+                .on_conflict_do_nothing(index_elements=["job"], index_where=JobRunRow.fim.is_(None))
+                .returning(JobRunRow.id)
+            ).scalar()
+            if execucao_id is not None:
+                return execucao_id, True
+            existente = session.execute(select(JobRunRow.id).where(*em_andamento)).scalar()
+            if existente is not None:
+                return existente, False
+    raise RuntimeError(f"não foi possível reservar execução do job '{nome_job}'")
+
+
+def _finalizar_pulada(execucao_id: int) -> None:
+    """Fecha a execução que não chegou a rodar (lock com outro worker)."""
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(
+            update(JobRunRow)
+            .where(JobRunRow.id == execucao_id, JobRunRow.fim.is_(None))
+            .values(fim=datetime.now(UTC), duracao_ms=0, resultado={"pulado": "lock ocupado"})
+        )
+
+
+def enfileirar_job(app, nome_job: str, fn_job) -> tuple[int, bool]:
+    """Reserva uma execução de `nome_job` e roda fn_job numa thread.
+
+    Devolve (id da execução, nova). Se já houver execução em andamento do
+    mesmo job, devolve o id dela com nova=False e não dispara outra. fn_job
+    roda fora do request: precisa abrir o próprio app context.
+    """
+    execucao_id, nova = _reservar_execucao(nome_job)
+    if not nova:
+        return execucao_id, False
+
+    rodou = False
+
+    def _fn_job():
+        nonlocal rodou
+        rodou = True
+        return fn_job()
+
+    def _run():
+        from app.services.scheduler_lock import executar_job_com_lock
+
+        try:
+            executar_job_com_lock(app, nome_job, _fn_job, execucao_id=execucao_id)
+            # Só lock ocupado é "pulado": se o job rodou, o desfecho já foi
+            # gravado por registrar_execucao (mesmo com a telemetria falhando).
+            if not rodou:
+                _finalizar_pulada(execucao_id)
+        except Exception as exc:
+            logger.exception(
+                "Execução enfileirada %s de '%s' falhou: %s", execucao_id, nome_job, exc
+            )
+
+    threading.Thread(target=_run, daemon=True, name=f"job-{nome_job}-{execucao_id}").start()
+    return execucao_id, True
+
+
+def _status(row: JobRunRow) -> str:
+    if row.fim is None:
+        return "em_andamento"
+    if row.sucesso is None:
+        return "pulado"
+    return "sucesso" if row.sucesso else "falha"
+
+
+def obter_execucao(execucao_id: int, nome_job: str | None = None) -> dict | None:
+    """Estado de uma execução (para polling), ou None se não existir."""
+    with db_module.SessionLocal() as session:
+        row = session.get(JobRunRow, execucao_id)
+        if row is None or (nome_job is not None and row.job != nome_job):
+            return None
+        return {
+            "id": row.id,
+            "job": row.job,
+            "status": _status(row),
+            "inicio": row.inicio.isoformat(),
+            "fim": row.fim.isoformat() if row.fim else None,
+            "duracao_ms": row.duracao_ms,
+            "processados": row.processados,
+            "acoes": row.acoes,
+            "erros": row.erros,
+            "executor": row.executor,
+            "erro": row.erro,
+            "resultado": row.resultado,
+        }
+
+
+def limpar_execucoes_antigas(dias: int = 30) -> dict:
+    """Remove execuções com início há mais de `dias` dias."""
+    corte = datetime.now(UTC) - timedelta(days=dias)
+    try:
+        with db_module.SessionLocal() as session, session.begin():
+            removidos = session.execute(delete(JobRunRow).where(JobRunRow.inicio < corte)).rowcount
+    except Exception as exc:
+        logger.exception("Erro ao limpar job_runs antigos: %s", exc)
+        return {"removidos": 0, "erros": 1}
+    return {"removidos": removidos, "erros": 0}
+
+
+def _ms(valor) -> int | None:
+    return None if valor is None else int(round(valor))
+
+
+def resumo_jobs(dias: int = 7, *, ultimas: int = 10, fracao_alerta: float = 0.8) -> list[dict]:
+    """Tendência e alerta de sobreposição por job, a partir de job_runs.
+
+    Para cada job com execução concluída nos últimos `dias` (em andamento e
+    puladas ficam de fora): agregados de duração
+    (média, p95, máximo) e atraso, erros e falhas, tendência por dia e as
+    `ultimas` execuções. alerta_sobreposicao liga quando p95 ou máximo da
+    duração passa de fracao_alerta × menor intervalo registrado do gatilho.
+    """
+    desde = datetime.now(UTC) - timedelta(days=dias)
+    dia = func.date_trunc("day", JobRunRow.inicio).label("dia")
+
+    with db_module.SessionLocal() as session:
+        agregados = session.execute(
+            select(
+                JobRunRow.job,
+                func.count().label("execucoes"),
+                func.count().filter(JobRunRow.sucesso.is_(False)).label("falhas"),
+                func.sum(JobRunRow.erros).label("erros"),
+                func.sum(JobRunRow.processados).label("processados"),
+                func.sum(JobRunRow.acoes).label("acoes"),
+                func.avg(JobRunRow.duracao_ms).label("duracao_media"),
+                func.percentile_cont(0.95).within_group(JobRunRow.duracao_ms).label("duracao_p95"),
+                func.max(JobRunRow.duracao_ms).label("duracao_max"),
+                func.avg(JobRunRow.atraso_ms).label("atraso_medio"),
+                func.max(JobRunRow.atraso_ms).label("atraso_max"),
+                func.min(JobRunRow.intervalo_segundos).label("intervalo_segundos"),
+                func.max(JobRunRow.inicio).label("ultima_execucao"),
+            )
+            .where(JobRunRow.inicio >= desde, JobRunRow.sucesso.isnot(None))
+            .group_by(JobRunRow.job)
+            .order_by(JobRunRow.job)
+        ).all()
+
+        tendencia: dict[str, list[dict]] = {}
+        for row in session.execute(
+            select(
+                JobRunRow.job,
+                dia,
+                func.count().label("execucoes"),
+                func.avg(JobRunRow.duracao_ms).label("duracao_media"),
+                func.max(JobRunRow.duracao_ms).label("duracao_max"),
+                func.sum(JobRunRow.erros).label("erros"),
+            )
+            .where(JobRunRow.inicio >= desde, JobRunRow.sucesso.isnot(None))
+            .group_by(JobRunRow.job, dia)
+            .order_by(JobRunRow.job, dia)
+        ):
+            tendencia.setdefault(row.job, []).append(
+                {
+                    "dia": row.dia.date().isoformat(),
+                    "execucoes": row.execucoes,
+                    "duracao_media_ms": _ms(row.duracao_media),
+                    "duracao_max_ms": row.duracao_max,
+                    "erros": int(row.erros or 0),
+                }
+            )
+
+        posicao = (
+            func.row_number()
+            .over(partition_by=JobRunRow.job, order_by=JobRunRow.inicio.desc())
+            .label("posicao")
+        )
+        recentes = (
+            select(JobRunRow, posicao)
+            .where(JobRunRow.inicio >= desde, JobRunRow.sucesso.isnot(None))
+            .subquery("recentes")
+        )
+        ultimas_por_job: dict[str, list[dict]] = {}
+        for row in session.execute(
+            select(recentes)
+            .where(recentes.c.posicao <= ultimas)
+            .order_by(recentes.c.job, recentes.c.inicio.desc())
+        ):
+            ultimas_por_job.setdefault(row.job, []).append(
+                {
+                    "inicio": row.inicio.isoformat(),
+                    "duracao_ms": row.duracao_ms,
+                    "atraso_ms": row.atraso_ms,
+                    "processados": row.processados,
+                    "acoes": row.acoes,
+                    "erros": row.erros,
+                    "sucesso": row.sucesso,
+                    "executor": row.executor,
+                    "erro": row.erro,
+                }
+            )
+
+    resumo = []
+    for row in agregados:
+        intervalo_ms = row.intervalo_segundos * 1000 if row.intervalo_segundos else None
+        uso = round(row.duracao_max / intervalo_ms, 3) if intervalo_ms else None
+        alerta = bool(
+            intervalo_ms
+            and max(row.duracao_p95 or 0, row.duracao_max or 0) >= fracao_alerta * intervalo_ms
+        )
+        resumo.append(
+            {
+                "job": row.job,
+                "execucoes": row.execucoes,
+                "falhas": row.falhas,
+                "erros": int(row.erros or 0),
+                "processados": int(row.processados or 0),
+                "acoes": int(row.acoes or 0),
+                "duracao_media_ms": _ms(row.duracao_media),
+                "duracao_p95_ms": _ms(row.duracao_p95),
+                "duracao_max_ms": row.duracao_max,
+                "atraso_medio_ms": _ms(row.atraso_medio),
+                "atraso_max_ms": row.atraso_max,
+                "intervalo_segundos": row.intervalo_segundos,
+                "uso_intervalo": uso,
+                "alerta_sobreposicao": alerta,
+                "ultima_execucao": row.ultima_execucao.isoformat(),
+                "tendencia": tendencia.get(row.job, []),
+                "ultimas": ultimas_por_job.get(row.job, []),
+            }
+        )
+    return resumo
@@ -16,6 +16,7 @@ from sqlalchemy import select, update
 
 from app import db as db_module
 from app.db.models.chamado import ChamadoRow
+from app.models import _sincronizar_timers
 from app.models_historico import Historico
 from app.models_usuario import Usuario
 from app.services.notifications import notificar_solicitante_lembrete_confirmacao
@@ -93,7 +94,10 @@ def _claim_lembrete(chamado_id: int, numero: int) -> bool:
     if numero == 2:
         stmt = stmt.where(ChamadoRow.lembrete_confirmacao_1_enviado.is_(True))
     with db_module.SessionLocal() as session, session.begin():
-        return session.execute(stmt).scalar_one_or_none() is not None
+        venceu = session.execute(stmt).scalar_one_or_none() is not None
+        if venceu:
+            _sincronizar_timers(session, chamado_id)
+        return venceu
 
 
 def _liberar_lembrete(chamado_id: int, numero: int) -> None:
@@ -109,6 +113,7 @@ def _liberar_lembrete(chamado_id: int, numero: int) -> None:
             )
             .values({campo.key: False})
         )
+        _sincronizar_timers(session, chamado_id)
 
 
 def processar_lembretes_confirmacao(agora: datetime | None = None) -> dict:
@@ -6,7 +6,7 @@ Mantém histórico de tentativas falhas por IP/email.
 import logging
 from datetime import datetime
 
-from app.cache import cache_delete, cache_get, cache_set
+from app.cache import cache_delete, cache_get, cache_get_many, cache_incr, cache_set
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +45,9 @@ class LoginAttemptTracker:
         Returns:
             Novo contador após incremento
         """
-        cache_key = f"login_attempt:{identifier}"
-        count = LoginAttemptTracker.get_attempt_count(identifier)
-        new_count = count + 1
-
-        # Se ainda não existe, define com TTL; se existe, atualiza
-        cache_set(cache_key, new_count, ttl_seconds=ATTEMPT_WINDOW)
-
-        return new_count
+        # Atômico (tentativas paralelas não se perdem) e a janela de
+        # ATTEMPT_WINDOW conta da 1ª falha — novas falhas não a renovam.
+        return cache_incr(f"login_attempt:{identifier}", ATTEMPT_WINDOW)
 
     @staticmethod
     def is_locked_out(identifier: str) -> bool:
@@ -107,6 +102,8 @@ class LoginAttemptTracker:
             ip_address: Endereço IP do cliente
             reason: Motivo da falha (credenciais inválidas, conta bloqueada, etc)
         """
+        # Os dois contadores numa só ida ao Redis (MGET).
+        contadores = cache_get_many([f"login_attempt:{ip_address}", f"login_attempt:{email}"])
         logger.warning(
             "Falha de login",
             extra={
@@ -114,8 +111,8 @@ class LoginAttemptTracker:
                 "ip_address": ip_address,
                 "reason": reason,
                 "timestamp": datetime.now().isoformat(),
-                "attempts_for_ip": LoginAttemptTracker.get_attempt_count(ip_address),
-                "attempts_for_email": LoginAttemptTracker.get_attempt_count(email),
+                "attempts_for_ip": contadores.get(f"login_attempt:{ip_address}", 0),
+                "attempts_for_email": contadores.get(f"login_attempt:{email}", 0),
             },
         )
 
@@ -0,0 +1,231 @@
+"""
+Coalescência de e-mails de fan-out por destinatário.
+
+Um chamado editado três vezes em um minuto gerava três e-mails para cada
+observador (mudança de status, edição de descrição, anexo...). Aqui os
+e-mails pendentes ficam agrupados por (destinatário, chamado, canal) durante
+uma janela curta (NOTIFY_COALESCE_WINDOW_SECONDS, no máximo
+_JANELA_MAX_SEGUNDOS):
+
+  - 1 evento na janela  → envia o e-mail original, sem alteração;
+  - N eventos na janela → envia UM e-mail-resumo com a lista de eventos.
+
+Uma única thread despachante por processo envia cada chave quando a janela
+dela vence — o número de threads não cresce com o volume de chaves.
+
+O buffer é em memória, por processo (cada worker coalesce o que ele mesmo
+disparou) — perder a coalescência entre workers só custa um e-mail a mais.
+Janela de perda: no shutdown normal os pendentes são despachados (atexit);
+se o processo morre sem shutdown (SIGKILL, OOM), os e-mails ainda na janela
+— no máximo os dos últimos _JANELA_MAX_SEGUNDOS — se perdem. A notificação
+in-app e o web push do mesmo evento não passam por aqui e não se perdem.
+Com janela 0 (padrão fora de produção e em testes), envia na hora.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any
+
+from flask import current_app
+
+from app.services.email_templates import build_cta_button, build_email_shell
+from app.services.notifications import enviar_email
+from app.services.notifications_core import _config
+
+logger = logging.getLogger(__name__)
+
+_CANAL_EMAIL = "email"
+# Teto da janela: limita o que um processo morto sem shutdown pode perder.
+_JANELA_MAX_SEGUNDOS = 300.0
+
+
+@dataclass
+class _EventoEmail:
+    assunto: str
+    corpo_html: str
+    corpo_texto: str | None
+    resumo: str
+    importance: str
+
+
+@dataclass
+class _Pendente:
+    app: Any
+    destinatario: str
+    numero_chamado: str
+    link: str
+    prazo: float = 0.0  # time.monotonic() em que a janela da chave vence
+    eventos: list[_EventoEmail] = field(default_factory=list)
+
+
+_lock = threading.Lock()
+_tem_pendente = threading.Condition(_lock)
+_pendentes: dict[tuple[str, str, str], _Pendente] = {}
+_despachante: threading.Thread | None = None
+
+
+def _janela_segundos() -> float:
+    try:
+        janela = float(_config("NOTIFY_COALESCE_WINDOW_SECONDS", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return min(max(0.0, janela), _JANELA_MAX_SEGUNDOS)
+
+
+def coalescencia_ativa() -> bool:
+    """True quando há janela configurada e app context para o despacho usar."""
+    if _janela_segundos() <= 0:
+        return False
+    try:
+        current_app._get_current_object()
+    except RuntimeError:
+        return False
+    return True
+
+
+def enfileirar_email(
+    destinatario: str,
+    assunto: str,
+    corpo_html: str,
+    corpo_texto: str | None = None,
+    *,
+    chamado_id: str,
+    numero_chamado: str,
+    resumo: str,
+    link: str = "",
+    importance: str = "normal",
+) -> None:
+    """Coloca o e-mail na janela de (destinatário, chamado); o primeiro evento
+    da chave marca o prazo em que a thread despachante envia tudo.
+
+    Pressupõe coalescencia_ativa() — quem chama decide entre enfileirar e
+    enviar direto. Só enfileira: o resultado do envio sai no log do despacho.
+    """
+    app = current_app._get_current_object()
+    chave = (destinatario.strip().lower(), str(chamado_id), _CANAL_EMAIL)
+    evento = _EventoEmail(assunto, corpo_html, corpo_texto, resumo, importance)
+    with _tem_pendente:
+        pendente = _pendentes.get(chave)
+        if pendente is None:
+            pendente = _Pendente(
+                app=app,
+                destinatario=destinatario,
+                numero_chamado=numero_chamado,
+                link=link,
+                prazo=time.monotonic() + _janela_segundos(),
+            )
+            _pendentes[chave] = pendente
+            _garantir_despachante()
+            _tem_pendente.notify()
+        pendente.eventos.append(evento)
+        if link:
+            pendente.link = link
+
+
+def _garantir_despachante() -> None:
+    """Sobe a thread despachante se ainda não existe (chamar com _lock)."""
+    global _despachante
+    if _despachante is None or not _despachante.is_alive():
+        _despachante = threading.Thread(
+            target=_loop_despachante, name="coalescencia-email", daemon=True
+        )
+        _despachante.start()
+
+
+def _proximas_vencidas() -> list[tuple[tuple[str, str, str], _Pendente]]:
+    """Espera até alguma janela vencer e tira do buffer as chaves vencidas."""
+    with _tem_pendente:
+        while True:
+            agora = time.monotonic()
+            vencidas = [chave for chave, p in _pendentes.items() if p.prazo <= agora]
+            if vencidas:
+                return [(chave, _pendentes.pop(chave)) for chave in vencidas]
+            proximo = min((p.prazo for p in _pendentes.values()), default=None)
+            _tem_pendente.wait(None if proximo is None else proximo - agora)
+
+
+def _loop_despachante() -> None:
+    while True:
+        for chave, pendente in _proximas_vencidas():
+            _despachar(chave, pendente)
+
+
+def _montar_resumo(pendente: _Pendente) -> tuple[str, str, str, str]:
+    """(assunto, corpo_html, corpo_texto, importance) do e-mail-resumo."""
+    n = len(pendente.eventos)
+    numero = pendente.numero_chamado
+    assunto = f"Ticket {numero}: {n} updates"
+    itens_html = "".join(f"<li>{escape(ev.resumo)}</li>" for ev in pendente.eventos)
+    corpo_html = build_email_shell(
+        f"Ticket {numero}: {n} updates",
+        "#2563eb",
+        f"<p>Ticket <strong>{escape(numero)}</strong> received {n} updates in the last few"
+        f" moments:</p><ul>{itens_html}</ul>"
+        + (build_cta_button("View ticket", pendente.link, "#2563eb") if pendente.link else ""),
+    )
+    corpo_texto = (
+        f"Ticket {numero} received {n} updates:\n"
+        + "\n".join(f"- {ev.resumo}" for ev in pendente.eventos)
+        + (f"\n\nView ticket: {pendente.link}" if pendente.link else "")
+    )
+    importance = "high" if any(ev.importance == "high" for ev in pendente.eventos) else "normal"
+    return assunto, corpo_html, corpo_texto, importance
+
+
+def _enviar_pendente(pendente: _Pendente) -> None:
+    if len(pendente.eventos) == 1:
+        ev = pendente.eventos[0]
+        assunto, corpo_html, corpo_texto, importance = (
+            ev.assunto,
+            ev.corpo_html,
+            ev.corpo_texto,
+            ev.importance,
+        )
+    else:
+        assunto, corpo_html, corpo_texto, importance = _montar_resumo(pendente)
+    ok, err = enviar_email(
+        pendente.destinatario, assunto, corpo_html, corpo_texto, importance=importance
+    )
+    if ok:
+        logger.info(
+            "Coalesced e-mail (%d event(s)) sent to %s (ticket %s)",
+            len(pendente.eventos),
+            pendente.destinatario,
+            pendente.numero_chamado,
+        )
+    else:
+        logger.warning(
+            "Failed to send coalesced e-mail to %s (ticket %s): %s",
+            pendente.destinatario,
+            pendente.numero_chamado,
+            err,
+        )
+
+
+def _despachar(chave: tuple[str, str, str], pendente: _Pendente) -> None:
+    if not pendente.eventos:
+        return
+    try:
+        with pendente.app.app_context():
+            _enviar_pendente(pendente)
+    except Exception as e:
+        logger.exception("Erro ao despachar e-mail coalescido para %s: %s", chave[0], e)
+
+
+def despachar_pendentes() -> int:
+    """Envia imediatamente tudo que está no buffer (shutdown / testes). Retorna quantos."""
+    with _lock:
+        pendentes = list(_pendentes.items())
+        _pendentes.clear()
+    for chave, pendente in pendentes:
+        _despachar(chave, pendente)
+    return len(pendentes)
+
+
+atexit.register(despachar_pendentes)
@@ -41,12 +41,14 @@ from app.services.notifications_core import (
     _tsl,
     _tst,
     enviar_email,
+    enviar_emails_em_lote,
     resolver_importance,
 )
 from app.services.notifications_escalonamento import (
     notificar_abertura_aog_todos_gestores,
     notificar_aviso_resolucao_supervisor,
     notificar_digest_diario,
+    notificar_digests_diarios,
     notificar_escalada_gerencial,
     notificar_pre_aviso_escalonamento,
 )
@@ -75,6 +77,7 @@ __all__ = [
     "_tsl",
     "_tst",
     "enviar_email",
+    "enviar_emails_em_lote",
     "resolver_importance",
     "notificar_admins_novo_usuario_sso",
     "notificar_lembrete_mfa_pendente",
@@ -85,6 +88,7 @@ __all__ = [
     "notificar_abertura_aog_todos_gestores",
     "notificar_aviso_resolucao_supervisor",
     "notificar_digest_diario",
+    "notificar_digests_diarios",
     "notificar_escalada_gerencial",
     "notificar_pre_aviso_escalonamento",
     "notificar_aprovador_novo_chamado",
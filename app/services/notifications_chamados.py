@@ -314,49 +314,49 @@ def notificar_setores_adicionais_chamado(
                 if u and u.id and u.id not in usuarios_unicos:
                     usuarios_unicos[u.id] = u
 
+    assunto = f"Ticket {numero_chamado}: your department has been included"
+    detalhes_html = build_detail_table(
+        [
+            ("Number", numero_chamado),
+            ("Category", cat_d),
+            ("Type", tipo_d),
+            ("Requester", solicitante_nome),
+            ("Added by", quem_adicionou_nome),
+            ("Departments added", setores_str_d),
+        ]
+    )
+    summary_html = (
+        f'<p style="margin: 12px 0;">{escape(resumo_truncado)}</p>' if resumo_truncado else ""
+    )
+
+    ctas = []
+    if link:
+        ctas.append(("View ticket history", link, "#2563eb"))
+    if link_dash:
+        ctas.append(("View sector tickets", link_dash, "#6b7280"))
+    botoes_html = build_two_ctas(ctas) if ctas else ""
+
+    corpo_html = build_email_shell(
+        header_title="Ticket: your department has been included",
+        header_color="#2563eb",
+        body_html=(
+            f"<p>Hello, ticket <strong>{escape(numero_chamado)}</strong> "
+            f"included your department, added by <strong>{escape(quem_adicionou_nome)}</strong>.</p>"
+            + detalhes_html
+            + summary_html
+            + botoes_html
+        ),
+    )
+    corpo_texto = (
+        f"Number: {numero_chamado}\nRequester: {solicitante_nome}\n"
+        f"Added by: {quem_adicionou_nome}\nDepartments: {setores_str_d}"
+    )
+
     for usuario in usuarios_unicos.values():
         email = getattr(usuario, "email", None)
         if not email or not str(email).strip():
             continue
 
-        assunto = f"Ticket {numero_chamado}: your department has been included"
-        detalhes_html = build_detail_table(
-            [
-                ("Number", numero_chamado),
-                ("Category", cat_d),
-                ("Type", tipo_d),
-                ("Requester", solicitante_nome),
-                ("Added by", quem_adicionou_nome),
-                ("Departments added", setores_str_d),
-            ]
-        )
-        summary_html = (
-            f'<p style="margin: 12px 0;">{escape(resumo_truncado)}</p>' if resumo_truncado else ""
-        )
-
-        ctas = []
-        if link:
-            ctas.append(("View ticket history", link, "#2563eb"))
-        if link_dash:
-            ctas.append(("View sector tickets", link_dash, "#6b7280"))
-        botoes_html = build_two_ctas(ctas) if ctas else ""
-
-        corpo_html = build_email_shell(
-            header_title="Ticket: your department has been included",
-            header_color="#2563eb",
-            body_html=(
-                f"<p>Hello, ticket <strong>{escape(numero_chamado)}</strong> "
-                f"included your department, added by <strong>{escape(quem_adicionou_nome)}</strong>.</p>"
-                + detalhes_html
-                + summary_html
-                + botoes_html
-            ),
-        )
-        corpo_texto = (
-            f"Number: {numero_chamado}\nRequester: {solicitante_nome}\n"
-            f"Added by: {quem_adicionou_nome}\nDepartments: {setores_str_d}"
-        )
-
         ok, err = enviar_email(email.strip(), assunto, corpo_html, corpo_texto, importance="normal")
         if ok:
             logger.info(
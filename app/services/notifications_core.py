@@ -13,6 +13,7 @@ Required environment variables:
 
 import logging
 import os
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -118,17 +119,8 @@ def _prefixar_assunto_high(assunto: str, contexto: str) -> str:
     return assunto
 
 
-def _enviar_via_graph(
-    destinatario: str,
-    assunto: str,
-    corpo_html: str,
-    corpo_texto: str | None,
-    from_addr: str,
-    importance: str = "normal",
-) -> tuple:
-    """Send e-mail via Microsoft Graph API (client credentials)."""
-    import json
-
+def _graph_credenciais(from_addr: str) -> tuple:
+    """Credenciais e hosts do Graph. Returns (dict, None) or (None, error)."""
     tenant_id = os.getenv("GRAPH_TENANT_ID", "").strip()
     client_id = os.getenv("GRAPH_CLIENT_ID", "").strip()
     client_secret = os.getenv("GRAPH_CLIENT_SECRET", "").strip()
@@ -136,17 +128,38 @@ def _enviar_via_graph(
 
     if not all([tenant_id, client_id, client_secret, sender_email]):
         return (
-            False,
+            None,
             "Incomplete configuration: set GRAPH_TENANT_ID, GRAPH_CLIENT_ID, "
             "GRAPH_CLIENT_SECRET and GRAPH_SENDER_EMAIL",
         )
 
-    token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
-    token_data = urllib.parse.urlencode(
+    # Bases sobrescrevíveis só para apontar aos simuladores locais de carga
+    # (scripts/qa/simuladores); em produção ficam vazias e valem os hosts reais.
+    login_base = os.getenv("GRAPH_LOGIN_BASE_URL", "").strip().rstrip("/")
+    api_base = os.getenv("GRAPH_API_BASE_URL", "").strip().rstrip("/")
+    return (
         {
-            "grant_type": "client_credentials",
+            "tenant_id": tenant_id,
             "client_id": client_id,
             "client_secret": client_secret,
+            "sender_email": sender_email,
+            "login_base": login_base or "https://login.microsoftonline.com",
+            "api_base": api_base or "https://graph.microsoft.com",
+        },
+        None,
+    )
+
+
+def _obter_token_graph(cred: dict, contexto: str) -> tuple:
+    """Token OAuth2 (client credentials). Returns (token, None) or (None, error)."""
+    import json
+
+    token_url = f"{cred['login_base']}/{cred['tenant_id']}/oauth2/v2.0/token"
+    token_data = urllib.parse.urlencode(
+        {
+            "grant_type": "client_credentials",
+            "client_id": cred["client_id"],
+            "client_secret": cred["client_secret"],
             "scope": "https://graph.microsoft.com/.default",
         }
     ).encode("utf-8")
@@ -159,29 +172,56 @@ def _enviar_via_graph(
             if not access_token:
                 err = f"Token not obtained: {list(token_resp.keys())}"
                 logger.warning(err)
-                return (False, err)
+                return (None, err)
+            return (access_token, None)
     except urllib.error.HTTPError as e:
         body = e.read().decode("utf-8", errors="replace")[:300]
         err = f"Graph token HTTP {e.code}: {body}"
         logger.warning("Failed to obtain Graph token: %s", err)
-        return (False, err)
+        return (None, err)
     except Exception as e:
-        logger.exception("Failed to obtain Graph token for %s: %s", destinatario, e)
-        return (False, f"OAuth2 token failure: {e}")
+        logger.exception("Failed to obtain Graph token for %s: %s", contexto, e)
+        return (None, f"OAuth2 token failure: {e}")
+
+
+def _mensagem_graph(destinatario: str, assunto: str, corpo_html: str, importance: str) -> dict:
+    """Corpo JSON do sendMail — o mesmo no envio avulso e em cada item do $batch."""
+    return {
+        "message": {
+            "subject": assunto,
+            "body": {"contentType": "HTML", "content": corpo_html},
+            "toRecipients": [{"emailAddress": {"address": destinatario}}],
+            "importance": importance,
+        },
+        "saveToSentItems": False,
+    }
 
-    payload = json.dumps(
-        {
-            "message": {
-                "subject": assunto,
-                "body": {"contentType": "HTML", "content": corpo_html},
-                "toRecipients": [{"emailAddress": {"address": destinatario}}],
-                "importance": importance,
-            },
-            "saveToSentItems": False,
-        }
-    ).encode("utf-8")
 
-    send_url = f"https://graph.microsoft.com/v1.0/users/{urllib.parse.quote(sender_email)}/sendMail"
+def _enviar_via_graph(
+    destinatario: str,
+    assunto: str,
+    corpo_html: str,
+    corpo_texto: str | None,
+    from_addr: str,
+    importance: str = "normal",
+) -> tuple:
+    """Send e-mail via Microsoft Graph API (client credentials)."""
+    import json
+
+    cred, err = _graph_credenciais(from_addr)
+    if cred is None:
+        return (False, err)
+
+    access_token, err = _obter_token_graph(cred, destinatario)
+    if access_token is None:
+        return (False, err)
+
+    payload = json.dumps(_mensagem_graph(destinatario, assunto, corpo_html, importance)).encode(
+        "utf-8"
+    )
+
+    sender = urllib.parse.quote(cred["sender_email"])
+    send_url = f"{cred['api_base']}/v1.0/users/{sender}/sendMail"
     req_send = urllib.request.Request(
         send_url,
         data=payload,
@@ -245,6 +285,157 @@ def enviar_email(
     )
 
 
+# Itens por POST /$batch. O Graph aceita até 20, mas executa os itens em
+# paralelo e o Outlook só admite 4 requisições simultâneas por caixa — como
+# todo sendMail sai da mesma caixa (GRAPH_SENDER_EMAIL), um lote de 20 volta
+# com a maior parte dos itens em 429.
+_GRAPH_LOTE_MAX = 4
+# Rodadas de envio para itens que voltaram 429 (a primeira incluída) e teto,
+# em segundos, da espera pedida pelo Retry-After de cada rodada.
+_GRAPH_TENTATIVAS_429 = 3
+_GRAPH_RETRY_AFTER_MAX = 30.0
+_GRAPH_RETRY_AFTER_PADRAO = 5.0
+
+
+def _retry_after(resposta: dict) -> float:
+    """Segundos pedidos pelo Retry-After de um item do $batch (padrão se ausente)."""
+    headers = {str(k).lower(): v for k, v in (resposta.get("headers") or {}).items()}
+    try:
+        return max(0.0, float(headers["retry-after"]))
+    except (KeyError, TypeError, ValueError):
+        return _GRAPH_RETRY_AFTER_PADRAO
+
+
+def _enviar_lote_graph(
+    itens: list[tuple[int, dict]], cred: dict, token: str
+) -> tuple[dict, dict[int, float]]:
+    """Um POST /$batch com até _GRAPH_LOTE_MAX sendMail.
+
+    Returns ({indice: (ok, err)}, {indice: retry_after}) — o segundo dict lista
+    os itens que voltaram 429, com a espera pedida pelo Graph.
+    """
+    import json
+
+    sender = urllib.parse.quote(cred["sender_email"])
+    payload = json.dumps(
+        {
+            "requests": [
+                {
+                    "id": str(indice),
+                    "method": "POST",
+                    "url": f"/users/{sender}/sendMail",
+                    "headers": {"Content-Type": "application/json"},
+                    "body": mensagem,
+                }
+                for indice, mensagem in itens
+            ]
+        }
+    ).encode("utf-8")
+    req = urllib.request.Request(
+        f"{cred['api_base']}/v1.0/$batch",
+        data=payload,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:  # nosec B310
+            respostas = json.loads(resp.read().decode("utf-8")).get("responses") or []
+    except urllib.error.HTTPError as e:
+        body = e.read().decode("utf-8", errors="replace")[:300]
+        err = f"Graph $batch HTTP {e.code}: {body}"
+        logger.warning("Graph $batch failed (%d messages): %s", len(itens), err)
+        return {indice: (False, err) for indice, _ in itens}, {}
+    except Exception as e:
+        logger.exception("Failed to send Graph $batch (%d messages): %s", len(itens), e)
+        return {indice: (False, str(e)) for indice, _ in itens}, {}
+
+    resultados: dict = {indice: (False, "Graph $batch: no response") for indice, _ in itens}
+    adiados: dict[int, float] = {}
+    for resposta in respostas:
+        try:
+            indice = int(resposta.get("id"))
+        except (TypeError, ValueError):
+            continue
+        status = resposta.get("status")
+        if status == 202:
+            resultados[indice] = (True, None)
+        else:
+            body = json.dumps(resposta.get("body"))[:300]
+            resultados[indice] = (False, f"Graph sendMail HTTP {status}: {body}")
+            if status == 429:
+                adiados[indice] = _retry_after(resposta)
+    return resultados, adiados
+
+
+def enviar_emails_em_lote(mensagens: list[dict]) -> list[tuple]:
+    """Envia vários e-mails com um único token e JSON batching do Graph.
+
+    Cada mensagem é um dict com os argumentos de enviar_email (destinatario,
+    assunto, corpo_html, corpo_texto, importance). Devolve, na mesma ordem,
+    (True, None) ou (False, erro) por mensagem — a mesma semântica de
+    enviar_email, inclusive a supressão em TESTING/NOTIFY_EMAIL_ENABLED=false.
+    Falha de um item não derruba os demais; falha do token ou do $batch marca
+    todos os itens afetados. Itens que voltam 429 são reenviados depois do
+    Retry-After, até _GRAPH_TENTATIVAS_429 rodadas.
+    """
+    resultados: list[tuple] = [(False, None)] * len(mensagens)
+    pendentes: list[tuple[int, dict]] = []
+    permitido = _email_envio_permitido()
+
+    for indice, msg in enumerate(mensagens):
+        destinatario = (msg.get("destinatario") or "").strip()
+        importance = msg.get("importance", "normal")
+        if importance not in _VALID_IMPORTANCE:
+            logger.warning("Invalid importance '%s'; falling back to 'normal'", importance)
+            importance = "normal"
+        if not destinatario:
+            logger.warning("Notification skipped: empty recipient")
+            continue
+        if not permitido:
+            motivo = "TESTING" if _config("TESTING") else "NOTIFY_EMAIL_ENABLED=false"
+            logger.info(
+                "E-mail suppressed (%s): %s — %s", motivo, destinatario, msg["assunto"][:80]
+            )
+            resultados[indice] = (True, None)
+            continue
+        pendentes.append(
+            (indice, _mensagem_graph(destinatario, msg["assunto"], msg["corpo_html"], importance))
+        )
+
+    if not pendentes:
+        return resultados
+
+    from_addr = os.getenv("GRAPH_SENDER_EMAIL", "").strip() or "noreply@localhost"
+    cred, err = _graph_credenciais(from_addr)
+    token = None
+    if cred is not None:
+        token, err = _obter_token_graph(cred, f"{len(pendentes)} messages")
+    if token is None:
+        for indice, _ in pendentes:
+            resultados[indice] = (False, err)
+        return resultados
+
+    fila = pendentes
+    for rodada in range(1, _GRAPH_TENTATIVAS_429 + 1):
+        adiados: dict[int, float] = {}
+        for inicio in range(0, len(fila), _GRAPH_LOTE_MAX):
+            resultados_lote, adiados_lote = _enviar_lote_graph(
+                fila[inicio : inicio + _GRAPH_LOTE_MAX], cred, token
+            )
+            for indice, resultado in resultados_lote.items():
+                resultados[indice] = resultado
+            adiados.update(adiados_lote)
+        if not adiados or rodada == _GRAPH_TENTATIVAS_429:
+            break
+        espera = min(max(adiados.values()), _GRAPH_RETRY_AFTER_MAX)
+        logger.info("Graph $batch throttled (%d messages); retrying in %.0fs", len(adiados), espera)
+        time.sleep(espera)
+        fila = [(indice, mensagem) for indice, mensagem in pendentes if indice in adiados]
+    enviados = sum(1 for ok, _ in resultados if ok)
+    logger.info("E-mails sent via Graph $batch: %d/%d", enviados, len(pendentes))
+    return resultados
+
+
 def _base_url() -> str:
     base = (_config("APP_BASE_URL") or os.getenv("APP_BASE_URL") or "").strip()
     if not base:
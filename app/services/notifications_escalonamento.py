@@ -11,6 +11,7 @@ from app.services.notifications_core import (
     _tc,
     _ts,
     enviar_email,
+    enviar_emails_em_lote,
     resolver_importance,
 )
 
@@ -510,22 +511,11 @@ def _tabela_digest(itens: list[dict]) -> str:
     )
 
 
-def notificar_digest_diario(
-    usuario_id: str,
-    email_dest: str,
-    vencidos_ou_perto: list[dict],
-    abertos: list[dict],
-) -> None:
-    """E-mail diário-resumo de TODOS os chamados abertos/em atendimento de um
-    responsável, agrupados em "Overdue / near deadline" e "Open" — cada grupo
-    já vem ordenado por prioridade de categoria (AOG > Projetos > demais) e
-    urgência, feito por quem monta as listas (digest_diario_service.py).
-
-    Diferente do aviso prévio (notificar_pre_aviso_escalonamento, sobre 1
-    chamado específico prestes a escalar), este é uma visão geral periódica —
-    as duas coexistem. Inglês hardcoded, mesmo padrão dos demais e-mails
-    desta família.
-    """
+def _email_digest_diario(
+    email_dest: str, vencidos_ou_perto: list[dict], abertos: list[dict]
+) -> dict:
+    """Monta o e-mail do digest (argumentos de enviar_email) — compartilhado
+    entre o envio avulso e o envio em lote do job."""
     link_dash = _link_dashboard()
     link_meus_pendentes = f"{link_dash}?meus_pendentes=1" if link_dash else ""
     total = len(vencidos_ou_perto) + len(abertos)
@@ -549,16 +539,64 @@ def notificar_digest_diario(
             )
         ),
     )
-    corpo_texto = f"Daily digest: {total} open ticket(s) assigned to you."
+    return {
+        "destinatario": email_dest,
+        "assunto": assunto,
+        "corpo_html": corpo_html,
+        "corpo_texto": f"Daily digest: {total} open ticket(s) assigned to you.",
+        "importance": resolver_importance("digest_diario"),
+    }
+
+
+def notificar_digest_diario(
+    usuario_id: str,
+    email_dest: str,
+    vencidos_ou_perto: list[dict],
+    abertos: list[dict],
+) -> None:
+    """E-mail diário-resumo de TODOS os chamados abertos/em atendimento de um
+    responsável, agrupados em "Overdue / near deadline" e "Open" — cada grupo
+    já vem ordenado por prioridade de categoria (AOG > Projetos > demais) e
+    urgência, feito por quem monta as listas (digest_diario_service.py).
 
+    Diferente do aviso prévio (notificar_pre_aviso_escalonamento, sobre 1
+    chamado específico prestes a escalar), este é uma visão geral periódica —
+    as duas coexistem. Inglês hardcoded, mesmo padrão dos demais e-mails
+    desta família.
+    """
+    msg = _email_digest_diario(email_dest, vencidos_ou_perto, abertos)
     ok, err = enviar_email(
-        email_dest,
-        assunto,
-        corpo_html,
-        corpo_texto,
-        importance=resolver_importance("digest_diario"),
+        msg["destinatario"],
+        msg["assunto"],
+        msg["corpo_html"],
+        msg["corpo_texto"],
+        importance=msg["importance"],
     )
     if ok:
         logger.info("Digest diário enviado pra %s (usuário %s)", email_dest, usuario_id)
     else:
         logger.warning("Falha ao enviar digest diário pra %s: %s", email_dest, err)
+
+
+def notificar_digests_diarios(digests: list[dict]) -> list[bool]:
+    """Versão em lote de notificar_digest_diario, usada pelo job: cada item
+    traz usuario_id, email_dest, vencidos_ou_perto e abertos. Um token e um
+    $batch do Graph a cada _GRAPH_LOTE_MAX e-mails (enviar_emails_em_lote) em vez de um
+    token + sendMail por responsável. Devolve, na mesma ordem, se cada digest
+    saiu — quem chama só grava o envio dos que deram certo.
+    """
+    mensagens = [
+        _email_digest_diario(d["email_dest"], d["vencidos_ou_perto"], d["abertos"]) for d in digests
+    ]
+    enviados: list[bool] = []
+    for digest, (ok, err) in zip(digests, enviar_emails_em_lote(mensagens), strict=True):
+        if ok:
+            logger.info(
+                "Digest diário enviado pra %s (usuário %s)",
+                digest["email_dest"],
+                digest["usuario_id"],
+            )
+        else:
+            logger.warning("Falha ao enviar digest diário pra %s: %s", digest["email_dest"], err)
+        enviados.append(ok)
+    return enviados
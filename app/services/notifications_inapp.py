@@ -7,7 +7,7 @@ import logging
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, select, update
+from sqlalchemy import func, insert, select, update
 
 from app import db as db_module
 from app.db.models.notificacao import NotificacaoRow
@@ -331,6 +331,96 @@ def criar_notificacao(
         return None
 
 
+def criar_notificacao_com_link(
+    usuario_id: str,
+    titulo: str,
+    mensagem: str,
+    tipo: str,
+    link: str,
+) -> int | None:
+    """
+    Cria uma notificação in-app sem chamado (ex.: exportação pronta), que no
+    sino abre `link` em vez do histórico do chamado. O texto é gravado já no
+    idioma do usuário — localizar_notificacao não conhece esses tipos e o
+    devolve sem alteração.
+    Retorna o id do registro criado ou None em caso de erro.
+    """
+    if not usuario_id or not link:
+        return None
+    try:
+        with db_module.SessionLocal() as session, session.begin():
+            row = NotificacaoRow(
+                usuario_id=usuario_id,
+                titulo=titulo,
+                mensagem=mensagem,
+                tipo=tipo,
+                link=link,
+                lida=False,
+            )
+            session.add(row)
+            session.flush()
+            notificacao_id = row.id
+        logger.debug("Notificação in-app criada: usuario=%s, link=%s", usuario_id, link)
+        return notificacao_id
+    except Exception as e:
+        logger.exception("Erro ao criar notificação in-app: %s", e)
+        return None
+
+
+def criar_notificacoes_em_lote(notificacoes: list[dict[str, Any]]) -> list[int]:
+    """
+    Cria várias notificações in-app numa única transação — um único INSERT
+    multi-linha com RETURNING, em vez de uma sessão + commit por destinatário
+    (fan-out de observadores, participantes, supervisores do grupo).
+
+    Cada item aceita as mesmas chaves de criar_notificacao (usuario_id,
+    chamado_id, numero_chamado, titulo, mensagem, tipo, categoria,
+    solicitante_nome). Itens sem usuario_id/chamado_id ou com chamado_id
+    inválido são descartados, igual a criar_notificacao.
+
+    Não há contador de não lidas materializado: contar_nao_lidas é um COUNT
+    sobre idx_notificacoes_usuario_lida, então as linhas inseridas aqui já
+    aparecem no badge do sino sem nenhum passo extra.
+
+    Retorna os ids criados, na ordem dos itens válidos ([] em caso de erro).
+    """
+    linhas: list[dict[str, Any]] = []
+    for item in notificacoes or []:
+        usuario_id = item.get("usuario_id")
+        chamado_id = item.get("chamado_id")
+        if not usuario_id or not chamado_id:
+            continue
+        try:
+            cid = int(chamado_id)
+        except (TypeError, ValueError):
+            logger.warning("chamado_id inválido ignorado no lote de notificações: %s", chamado_id)
+            continue
+        linhas.append(
+            {
+                "usuario_id": usuario_id,
+                "chamado_id": cid,
+                "numero_chamado": item.get("numero_chamado"),
+                "titulo": item.get("titulo") or "",
+                "mensagem": item.get("mensagem") or "",
+                "tipo": item.get("tipo") or "novo_chamado",
+                "categoria": item.get("categoria") or None,
+                "solicitante_nome": item.get("solicitante_nome") or None,
+                "lida": False,
+            }
+        )
+    if not linhas:
+        return []
+    try:
+        stmt = insert(NotificacaoRow).returning(NotificacaoRow.id, sort_by_parameter_order=True)
+        with db_module.SessionLocal() as session, session.begin():
+            ids = list(session.scalars(stmt, linhas))
+        logger.debug("Notificações in-app criadas em lote: %s", len(ids))
+        return ids
+    except Exception as e:
+        logger.exception("Erro ao criar notificações in-app em lote: %s", e)
+        return []
+
+
 def _serializar_row(row: NotificacaoRow) -> dict[str, Any]:
     """Serializa uma NotificacaoRow para dict JSON-safe."""
     ts = row.data_criacao
@@ -344,6 +434,7 @@ def _serializar_row(row: NotificacaoRow) -> dict[str, Any]:
         "tipo": row.tipo,
         "categoria": row.categoria,
         "solicitante_nome": row.solicitante_nome,
+        "link": row.link,
         "lida": row.lida,
         "data_criacao": ts.isoformat() if isinstance(ts, datetime) else None,
     }
@@ -357,7 +448,8 @@ def listar_para_usuario(
 ) -> list[dict[str, Any]]:
     """
     Lista notificações do usuário, mais recentes primeiro.
-    Retorna lista de dicts com id, chamado_id, numero_chamado, titulo, mensagem, lida, data_criacao.
+    Retorna lista de dicts com id, chamado_id, numero_chamado, titulo, mensagem, link, lida,
+    data_criacao.
     Quando language é fornecido, aplica localização dinâmica ao titulo/mensagem de cada notificação.
     """
     if not usuario_id:
@@ -4,6 +4,7 @@ import logging
 
 from app import db as db_module
 from app.db.models.usuario import UsuarioRow
+from app.models_usuario import Usuario
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ def avancar_passo(user_id: str, passo: int) -> bool:
             if row is None:
                 return False
             row.onboarding_passo = passo
+        Usuario.invalidar_cache_sessao(user_id)
         return True
     except Exception as e:
         logger.exception("Erro ao avançar passo de onboarding para usuário %s: %s", user_id, e)
@@ -39,6 +41,7 @@ def concluir_onboarding(user_id: str, perfil: str) -> bool:
                 vistos.append(perfil)
             row.onboarding_perfis_vistos = vistos
             row.onboarding_passo = 0
+        Usuario.invalidar_cache_sessao(user_id)
         return True
     except Exception as e:
         logger.exception("Erro ao concluir onboarding para usuário %s: %s", user_id, e)
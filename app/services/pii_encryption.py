@@ -9,14 +9,23 @@ Formato armazenado nos campos `nome` e `email` quando ativado:
 Docs Firestore sem prefixo são tratados como legado (plaintext) para compatibilidade
 retroativa durante migração parcial.
 
+Rotação: a chave nova vai em ENCRYPTION_KEY e as anteriores em
+ENCRYPTION_KEYS_ANTERIORES (separadas por vírgula); o MultiFernet decifra com
+qualquer uma e cifra sempre com a atual. O chaveiro é montado uma vez por
+versão dessa configuração, e os carregamentos em lote (Usuario.get_all etc.)
+usam maybe_decrypt_many para ler a configuração uma vez por lote, não por campo.
+
 Não logar ENCRYPTION_KEY nem plaintext de PII.
 """
 
 from __future__ import annotations
 
+import functools
 import hashlib
+import hmac
 import logging
 import os
+from collections.abc import Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -33,44 +42,111 @@ def _get_flask_config() -> dict | None:
         return None
 
 
-def _encryption_key_configured() -> bool:
-    """True se ENCRYPTION_KEY está definida (Flask config ou env)."""
+def _ler_config() -> tuple[bool, str, tuple[str, ...]]:
+    """(ENCRYPT_PII_AT_REST, ENCRYPTION_KEY, ENCRYPTION_KEYS_ANTERIORES) — Flask config ou env."""
     config = _get_flask_config()
     if config is not None:
+        enabled = bool(config.get("ENCRYPT_PII_AT_REST", False))
         key = config.get("ENCRYPTION_KEY", "")
+        anteriores = config.get("ENCRYPTION_KEYS_ANTERIORES", "")
     else:
+        enabled = os.getenv("ENCRYPT_PII_AT_REST", "false").lower() in ("true", "1", "yes")
         key = os.getenv("ENCRYPTION_KEY", "")
-    return bool(key)
+        anteriores = os.getenv("ENCRYPTION_KEYS_ANTERIORES", "")
+    return enabled, key, tuple(k.strip() for k in (anteriores or "").split(",") if k.strip())
+
+
+def _encryption_key_configured() -> bool:
+    """True se ENCRYPTION_KEY está definida (Flask config ou env)."""
+    return bool(_ler_config()[1])
 
 
 def is_pii_encryption_enabled() -> bool:
     """True se ENCRYPT_PII_AT_REST=true e ENCRYPTION_KEY está definida."""
-    config = _get_flask_config()
-    if config is not None:
-        enabled = config.get("ENCRYPT_PII_AT_REST", False)
-    else:
-        enabled = os.getenv("ENCRYPT_PII_AT_REST", "false").lower() in ("true", "1", "yes")
-    return bool(enabled) and _encryption_key_configured()
+    enabled, key, _ = _ler_config()
+    return enabled and bool(key)
 
 
-def _get_fernet():
-    """Retorna instância Fernet configurada. Levanta ValueError se key inválida."""
-    config = _get_flask_config()
-    if config is not None:
-        key = config.get("ENCRYPTION_KEY", "")
-    else:
-        key = os.getenv("ENCRYPTION_KEY", "")
+class ChaveiroPII:
+    """MultiFernet da chave atual + chaves anteriores (rotação).
+
+    Cifra sempre com a chave atual; decifra com qualquer uma delas. Não
+    instanciar por campo: use _chaveiro(), que guarda uma instância por versão
+    da configuração de chaves.
+    """
+
+    def __init__(self, key: str, anteriores: tuple[str, ...] = ()) -> None:
+        from cryptography.fernet import Fernet, MultiFernet
+
+        try:
+            atual = Fernet(key.encode("ascii") if isinstance(key, str) else key)
+        except Exception as exc:
+            raise ValueError(f"ENCRYPTION_KEY inválida: {exc}") from exc
+        try:
+            antigas = [Fernet(k.encode("ascii")) for k in anteriores]
+        except Exception as exc:
+            raise ValueError(f"ENCRYPTION_KEYS_ANTERIORES inválida: {exc}") from exc
+        self.atual = atual
+        self.fernet = MultiFernet([atual, *antigas])
+
+    def cifrar(self, plaintext: str) -> str:
+        token = self.fernet.encrypt(plaintext.encode("utf-8")).decode("ascii")
+        return f"{_FERNET_PREFIX}{token}"
+
+    def decifrar(self, stored: str) -> str:
+        if not stored.startswith(_FERNET_PREFIX):
+            return stored
+        token = stored[len(_FERNET_PREFIX) :]
+        return self.fernet.decrypt(token.encode("ascii")).decode("utf-8")
+
+    def rotacionar(self, stored: str) -> str:
+        """Recifra com a chave atual um valor cifrado com qualquer chave do chaveiro.
+
+        Legado plaintext é cifrado; valor já na chave atual ganha token novo.
+        """
+        if not stored.startswith(_FERNET_PREFIX):
+            return self.cifrar(stored)
+        token = stored[len(_FERNET_PREFIX) :]
+        return f"{_FERNET_PREFIX}{self.fernet.rotate(token.encode('ascii')).decode('ascii')}"
 
+
+@functools.lru_cache(maxsize=8)
+def _chaveiro(key: str, anteriores: tuple[str, ...] = ()) -> ChaveiroPII:
+    """Uma instância por (chave atual, chaves anteriores); ValueError não é cacheado."""
+    return ChaveiroPII(key, anteriores)
+
+
+def _chaveiro_configurado() -> ChaveiroPII:
+    """Chaveiro da configuração atual. Levanta ValueError se key ausente ou inválida."""
+    _, key, anteriores = _ler_config()
     if not key:
         raise ValueError("ENCRYPTION_KEY não configurada; não é possível criptografar PII")
+    return _chaveiro(key, anteriores)
 
-    from cryptography.fernet import Fernet
 
-    try:
-        raw = key.encode("ascii") if isinstance(key, str) else key
-        return Fernet(raw)
-    except Exception as exc:
-        raise ValueError(f"ENCRYPTION_KEY inválida: {exc}") from exc
+def _get_fernet():
+    """Retorna o MultiFernet configurado. Levanta ValueError se key inválida."""
+    return _chaveiro_configurado().fernet
+
+
+def blind_index_key() -> bytes | None:
+    """Chave HMAC do índice cego da busca de usuários (app/services/busca_usuarios.py).
+
+    PII_BLIND_INDEX_KEY quando definida; senão derivada de ENCRYPTION_KEY (outro
+    domínio, nunca a própria chave Fernet) — nesse caso, rotacionar a
+    ENCRYPTION_KEY exige reindexar. None se nenhuma das duas existe.
+    """
+    config = _get_flask_config()
+    if config is not None:
+        chave = config.get("PII_BLIND_INDEX_KEY", "")
+    else:
+        chave = os.getenv("PII_BLIND_INDEX_KEY", "")
+    if chave:
+        return chave.encode("utf-8")
+    key = _ler_config()[1]
+    if not key:
+        return None
+    return hmac.new(key.encode("utf-8"), b"usuarios_busca:v1", hashlib.sha256).digest()
 
 
 def email_lookup_hash(email: str) -> str:
@@ -81,9 +157,7 @@ def email_lookup_hash(email: str) -> str:
 
 def encrypt_field(plaintext: str) -> str:
     """Criptografa campo PII. Retorna 'fernet:v1:<token>'."""
-    f = _get_fernet()
-    token = f.encrypt(plaintext.encode("utf-8")).decode("ascii")
-    return f"{_FERNET_PREFIX}{token}"
+    return _chaveiro_configurado().cifrar(plaintext)
 
 
 def decrypt_field(ciphertext: str) -> str:
@@ -94,9 +168,27 @@ def decrypt_field(ciphertext: str) -> str:
     """
     if not ciphertext.startswith(_FERNET_PREFIX):
         return ciphertext
-    token = ciphertext[len(_FERNET_PREFIX) :]
-    f = _get_fernet()
-    return f.decrypt(token.encode("ascii")).decode("utf-8")
+    return _chaveiro_configurado().decifrar(ciphertext)
+
+
+def rotate_field(stored: str) -> str:
+    """Recifra valor PII com a chave atual (ENCRYPTION_KEY) — rotação de chave."""
+    return _chaveiro_configurado().rotacionar(stored)
+
+
+def encrypt_many(plaintexts: Iterable[str]) -> list[str]:
+    """encrypt_field em lote: lê a configuração e resolve o chaveiro uma vez."""
+    chaveiro = _chaveiro_configurado()
+    return [chaveiro.cifrar(p) for p in plaintexts]
+
+
+def decrypt_many(ciphertexts: Iterable[str]) -> list[str]:
+    """decrypt_field em lote (legado sem prefixo passa as-is)."""
+    valores = list(ciphertexts)
+    if not any(v.startswith(_FERNET_PREFIX) for v in valores):
+        return valores
+    chaveiro = _chaveiro_configurado()
+    return [chaveiro.decifrar(v) for v in valores]
 
 
 def maybe_encrypt(plaintext: str) -> str:
@@ -106,6 +198,13 @@ def maybe_encrypt(plaintext: str) -> str:
     return encrypt_field(plaintext)
 
 
+def maybe_encrypt_many(plaintexts: Iterable[str]) -> list[str]:
+    """maybe_encrypt em lote."""
+    if not is_pii_encryption_enabled():
+        return list(plaintexts)
+    return encrypt_many(plaintexts)
+
+
 def maybe_decrypt(stored: str) -> str:
     """Descriptografa valor Fernet quando possível; legado plaintext passa as-is.
 
@@ -113,12 +212,38 @@ def maybe_decrypt(stored: str) -> str:
     ENCRYPTION_KEY está configurada (docs migrados com flag ainda false / app
     sem reinício após migração).
     """
-    if not stored.startswith(_FERNET_PREFIX):
-        return stored
-    if is_pii_encryption_enabled() or _encryption_key_configured():
+    return maybe_decrypt_many([stored])[0]
+
+
+def maybe_decrypt_many(stored: Iterable[str]) -> list[str]:
+    """maybe_decrypt em lote — usado pelos carregamentos em massa de Usuario.
+
+    Valor que não descriptografa (chave errada, token corrompido) volta como
+    está, igual a maybe_decrypt; as falhas saem num único warning.
+    """
+    valores = list(stored)
+    if not any(v.startswith(_FERNET_PREFIX) for v in valores):
+        return valores
+    _, key, anteriores = _ler_config()
+    if not key:
+        return valores
+    try:
+        chaveiro = _chaveiro(key, anteriores)
+    except ValueError as exc:
+        logger.warning("Falha ao descriptografar campo PII (valor omitido): %s", exc)
+        return valores
+    resultado = []
+    falhas = 0
+    ultimo_erro: Exception | None = None
+    for valor in valores:
         try:
-            return decrypt_field(stored)
+            resultado.append(chaveiro.decifrar(valor))
         except Exception as exc:
-            logger.warning("Falha ao descriptografar campo PII (valor omitido): %s", exc)
-            return stored
-    return stored
+            falhas += 1
+            ultimo_erro = exc
+            resultado.append(valor)
+    if falhas:
+        logger.warning(
+            "Falha ao descriptografar %d campo(s) PII (valores omitidos): %s", falhas, ultimo_erro
+        )
+    return resultado
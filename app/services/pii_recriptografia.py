@@ -0,0 +1,322 @@
+"""
+Job de criptografia / rotação de chave da PII de usuários (nome, email, mfa_secret).
+
+Serve aos dois casos com a mesma decisão por campo (decidir_atualizacao):
+  - criptografia inicial: plaintext legado → fernet:v1 com a ENCRYPTION_KEY;
+  - rotação: token de uma chave de ENCRYPTION_KEYS_ANTERIORES → recifrado com
+    a atual (MultiFernet.rotate). Token que já abre com a atual fica como está.
+email_lookup_hash é conferido/preenchido de passagem.
+
+Execução (executar):
+  - usuarios é lido em lotes por id (keyset: WHERE id > :ultimo ORDER BY id),
+    nunca com OFFSET nem com a tabela inteira em memória;
+  - o trabalho Fernet de cada lote vai para um ProcessPoolExecutor (a leitura
+    do próximo lote e a gravação do anterior seguem no processo principal);
+  - cada UPDATE é um compare-and-swap: só grava se email/nome/mfa_secret ainda
+    são os valores lidos. Se o app alterou o usuário no meio, conta conflito e
+    segue — rodar de novo pega o que faltou, já que a decisão é idempotente;
+  - os UPDATEs do lote e o avanço de pii_recriptografia_progresso.ultimo_id
+    commitam juntos: uma execução morta no meio retoma do último lote gravado;
+    rodar de novo uma execução concluída faz uma passada nova desde o início.
+
+estimar (dry-run) passa uma amostra pelo mesmo pipeline sem gravar nada e
+extrapola a vazão para a tabela inteira.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select, update
+
+import app.db as db_module
+from app.db.models.pii_recriptografia import PiiRecriptografiaRow
+from app.db.models.usuario import UsuarioRow
+from app.services.pii_encryption import (
+    _FERNET_PREFIX,
+    ChaveiroPII,
+    _chaveiro,
+    _ler_config,
+    email_lookup_hash,
+)
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_CIFRADOS = ("email", "nome", "mfa_secret")
+_COLUNAS = (
+    UsuarioRow.id,
+    UsuarioRow.email,
+    UsuarioRow.nome,
+    UsuarioRow.mfa_secret,
+    UsuarioRow.email_lookup_hash,
+)
+
+LOTE_PADRAO = 500
+
+
+def _recifrar(valor: str, chaveiro: ChaveiroPII) -> tuple[str, str | None]:
+    """(plaintext, novo valor armazenado ou None se já está na chave atual)."""
+    if not valor.startswith(_FERNET_PREFIX):
+        return valor, chaveiro.cifrar(valor)
+    token = valor[len(_FERNET_PREFIX) :].encode("ascii")
+    try:
+        return chaveiro.atual.decrypt(token).decode("utf-8"), None
+    except Exception:
+        pass
+    # Levanta InvalidToken se nenhuma chave do chaveiro abre o valor.
+    claro = chaveiro.fernet.decrypt(token).decode("utf-8")
+    return claro, f"{_FERNET_PREFIX}{chaveiro.fernet.rotate(token).decode('ascii')}"
+
+
+def decidir_atualizacao(dados: dict, chaveiro: ChaveiroPII) -> dict | None:
+    """Pure function — campos a gravar para deixar o usuário na chave atual (ou None).
+
+    Cobre os estados que a migração encontra:
+      - tudo na chave atual + hash certo → None (nada a fazer);
+      - plaintext → criptografa e grava o hash;
+      - cifrado na chave atual sem hash → só o hash (sem recriptografar);
+      - cifrado com chave anterior → rotaciona.
+    Email vazio → None. Valor que nenhuma chave abre → InvalidToken.
+    """
+    if not dados.get("email"):
+        return None
+    novos: dict = {}
+    email_claro = ""
+    for campo in CAMPOS_CIFRADOS:
+        valor = dados.get(campo) or ""
+        if not valor:
+            continue
+        claro, novo = _recifrar(valor, chaveiro)
+        if novo is not None:
+            novos[campo] = novo
+        if campo == "email":
+            email_claro = claro
+    hash_email = email_lookup_hash(email_claro)
+    if dados.get("email_lookup_hash") != hash_email:
+        novos["email_lookup_hash"] = hash_email
+    return novos or None
+
+
+def processar_lote(key: str, anteriores: tuple[str, ...], linhas: list[tuple]) -> dict:
+    """Trabalho de um lote — roda no processo do pool (argumentos picklable).
+
+    Retorna {"atualizacoes": [(id, antigos, novos)], "erros": [(id, msg)]}.
+    """
+    chaveiro = _chaveiro(key, anteriores)
+    atualizacoes = []
+    erros = []
+    for usuario_id, email, nome, mfa_secret, hash_email in linhas:
+        antigos = {"email": email, "nome": nome, "mfa_secret": mfa_secret}
+        try:
+            novos = decidir_atualizacao({**antigos, "email_lookup_hash": hash_email}, chaveiro)
+        except Exception as exc:
+            erros.append((usuario_id, type(exc).__name__))
+            continue
+        if novos:
+            atualizacoes.append((usuario_id, antigos, novos))
+    return {"atualizacoes": atualizacoes, "erros": erros}
+
+
+class _ExecutorLocal:
+    """Mesma interface do ProcessPoolExecutor, no próprio processo (workers <= 1)."""
+
+    def submit(self, fn, *args) -> Future:
+        futuro: Future = Future()
+        try:
+            futuro.set_result(fn(*args))
+        except Exception as exc:
+            futuro.set_exception(exc)
+        return futuro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+def _executor(workers: int):
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else _ExecutorLocal()
+
+
+def _chaves() -> tuple[str, tuple[str, ...]]:
+    _, key, anteriores = _ler_config()
+    if not key:
+        raise ValueError("ENCRYPTION_KEY não configurada; não é possível criptografar PII")
+    _chaveiro(key, anteriores)  # valida antes de abrir o pool
+    return key, anteriores
+
+
+def execucao_padrao(key: str) -> str:
+    """Nome da execução derivado da chave: mesma chave retoma, chave nova começa do zero."""
+    return "chave-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+def _ler_lote(ultimo_id: str, lote: int) -> list[tuple]:
+    with db_module.SessionLocal() as session:
+        return [
+            tuple(linha)
+            for linha in session.execute(
+                select(*_COLUNAS)
+                .where(UsuarioRow.id > ultimo_id)
+                .order_by(UsuarioRow.id)
+                .limit(lote)
+            )
+        ]
+
+
+def _lotes(executor, key, anteriores, ultimo_id: str, lote: int, em_voo: int):
+    """Gera (ultimo_id_do_lote, n_linhas, resultado) na ordem dos ids, mantendo até
+    `em_voo` lotes no pool enquanto o chamador grava os anteriores."""
+    pendentes: deque = deque()
+    esgotado = False
+    while True:
+        while not esgotado and len(pendentes) < em_voo:
+            linhas = _ler_lote(ultimo_id, lote)
+            if not linhas:
+                esgotado = True
+                break
+            ultimo_id = linhas[-1][0]
+            pendentes.append(
+                (ultimo_id, len(linhas), executor.submit(processar_lote, key, anteriores, linhas))
+            )
+            if len(linhas) < lote:
+                esgotado = True
+        if not pendentes:
+            return
+        fim_lote, n, futuro = pendentes.popleft()
+        yield fim_lote, n, futuro.result()
+
+
+def _gravar_lote(execucao: str, fim_lote: str, n: int, resultado: dict) -> dict:
+    """CAS de cada usuário + checkpoint, numa transação só."""
+    atualizados = conflitos = 0
+    with db_module.SessionLocal() as session, session.begin():
+        for usuario_id, antigos, novos in resultado["atualizacoes"]:
+            gravou = session.execute(
+                update(UsuarioRow)
+                .where(
+                    UsuarioRow.id == usuario_id,
+                    UsuarioRow.email == antigos["email"],
+                    UsuarioRow.nome == antigos["nome"],
+                    UsuarioRow.mfa_secret.is_not_distinct_from(antigos["mfa_secret"]),
+                )
+                .values(**novos)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if gravou:
+                atualizados += 1
+            else:
+                conflitos += 1
+        progresso = session.get(PiiRecriptografiaRow, execucao, with_for_update=True)
+        progresso.ultimo_id = fim_lote
+        progresso.processados += n
+        progresso.atualizados += atualizados
+        progresso.conflitos += conflitos
+        progresso.erros += len(resultado["erros"])
+        progresso.atualizado_em = datetime.now(UTC)
+    for usuario_id, erro in resultado["erros"]:
+        logger.warning("PII: usuário %s não pôde ser descriptografado (%s)", usuario_id, erro)
+    return {"atualizados": atualizados, "conflitos": conflitos}
+
+
+def _progresso_dict(progresso: PiiRecriptografiaRow) -> dict:
+    return {
+        "execucao": progresso.execucao,
+        "ultimo_id": progresso.ultimo_id,
+        "processados": progresso.processados,
+        "atualizados": progresso.atualizados,
+        "conflitos": progresso.conflitos,
+        "erros": progresso.erros,
+        "concluido": progresso.concluido_em is not None,
+    }
+
+
+def executar(
+    *,
+    execucao: str | None = None,
+    lote: int = LOTE_PADRAO,
+    workers: int | None = None,
+    reiniciar: bool = False,
+    max_lotes: int | None = None,
+) -> dict:
+    """Criptografa/rotaciona todos os usuários, retomando do checkpoint de `execucao`.
+
+    Só execução inacabada é retomada; uma já concluída (ou `reiniciar`)
+    recomeça do primeiro id com os contadores zerados.
+    max_lotes interrompe depois de N lotes gravados (o resto fica para a
+    próxima chamada). Retorna os contadores acumulados da execução.
+    """
+    key, anteriores = _chaves()
+    execucao = execucao or execucao_padrao(key)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    with db_module.SessionLocal() as session, session.begin():
+        progresso = session.get(PiiRecriptografiaRow, execucao)
+        # Execução concluída não é retomada: começa uma passada nova, que pega
+        # usuários gravados em plaintext depois dela (e os conflitos dela).
+        if progresso is not None and (reiniciar or progresso.concluido_em is not None):
+            session.delete(progresso)
+            session.flush()
+            progresso = None
+        if progresso is None:
+            progresso = PiiRecriptografiaRow(
+                execucao=execucao, ultimo_id="", processados=0, atualizados=0, conflitos=0, erros=0
+            )
+            session.add(progresso)
+        ultimo_id = progresso.ultimo_id
+
+    gravados = 0
+    interrompido = False
+    with _executor(workers) as executor:
+        for fim_lote, n, resultado in _lotes(
+            executor, key, anteriores, ultimo_id, lote, em_voo=max(1, workers) * 2
+        ):
+            _gravar_lote(execucao, fim_lote, n, resultado)
+            gravados += 1
+            logger.info("PII: execução %s — lote até %s gravado", execucao, fim_lote)
+            if max_lotes is not None and gravados >= max_lotes:
+                interrompido = True
+                break
+
+    with db_module.SessionLocal() as session, session.begin():
+        progresso = session.get(PiiRecriptografiaRow, execucao)
+        if not interrompido:
+            progresso.concluido_em = datetime.now(UTC)
+        return _progresso_dict(progresso)
+
+
+def estimar(*, lote: int = LOTE_PADRAO, workers: int | None = None, amostra: int = 2000) -> dict:
+    """Dry-run: processa até `amostra` usuários sem gravar e extrapola a vazão."""
+    key, anteriores = _chaves()
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    with db_module.SessionLocal() as session:
+        total = session.execute(select(func.count()).select_from(UsuarioRow)).scalar_one()
+
+    processados = precisam = erros = 0
+    inicio = time.perf_counter()
+    with _executor(workers) as executor:
+        for _, n, resultado in _lotes(
+            executor, key, anteriores, "", min(lote, amostra), em_voo=max(1, workers) * 2
+        ):
+            processados += n
+            precisam += len(resultado["atualizacoes"])
+            erros += len(resultado["erros"])
+            if processados >= amostra:
+                break
+    segundos = time.perf_counter() - inicio
+    por_segundo = processados / segundos if segundos > 0 else 0.0
+    return {
+        "total": total,
+        "amostra": processados,
+        "precisam_atualizar": precisam,
+        "erros": erros,
+        "usuarios_por_segundo": round(por_segundo, 1),
+        "estimativa_segundos": round(total / por_segundo, 1) if por_segundo else None,
+    }
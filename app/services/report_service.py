@@ -4,20 +4,28 @@ Serviço de Relatórios Semanais.
 Toda sexta-feira às 10h (BRT) o APScheduler chama `enviar_relatorio_semanal()`.
 A função busca chamados abertos/atrasados e envia e-mails diretamente para
 cada supervisor e admin via Microsoft Graph API.
+
+Os chamados passam uma vez por montar_snapshot (índices por responsável e por
+área, contagens e tabelas HTML já renderizadas), que é gravado em
+relatorios_semanais antes do primeiro envio. Cada público monta o e-mail com
+os fragmentos do snapshot; quem recebeu fica registrado, e o job de reenvio
+(reenviar_relatorio_semanal) refaz só os envios que falharam, do mesmo
+snapshot.
 """
 
 import logging
 from collections import defaultdict
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from html import escape
 from typing import Any
 from zoneinfo import ZoneInfo
 
 import pytz
-from sqlalchemy import select
+from sqlalchemy import and_, delete, func, or_, select, update
 
 from app import db as db_module
 from app.db.models.chamado import ChamadoRow
+from app.db.models.relatorio_semanal import RelatorioSemanalRow
 from app.i18n import get_translated_category, get_translated_sector, get_translated_status
 from app.models import Chamado
 from app.models_historico import Historico
@@ -227,45 +235,54 @@ def _tabela_html(chamados: list[dict[str, Any]], link_base: str) -> str:
     )
 
 
+def _linha_texto(c: dict[str, Any]) -> str:
+    return (
+        f"  {c['numero']} | {c['categoria']} | {c['solicitante']} | "
+        f"{c['data_abertura_fmt']} ({c['dias_aberto']}d)"
+    )
+
+
+def _botao_dashboard(link: str) -> str:
+    return (
+        f'<a href="{link}" style="background:#2563eb;color:white;padding:10px 20px;'
+        f'text-decoration:none;border-radius:6px;display:inline-block;margin-top:20px;">Open dashboard</a>'
+        if link
+        else ""
+    )
+
+
 def _corpo_supervisor(
     nome: str,
-    chamados: list[dict[str, Any]],
+    fragmento: dict[str, Any],
     link_dash: str,
-    link_base: str,
     data_ref: str,
 ) -> tuple[str, str]:
-    """Retorna (html, texto) do relatório para um supervisor."""
-    atrasados = [c for c in chamados if c["atrasado"]]
-    outros = [c for c in chamados if not c["atrasado"]]
+    """Retorna (html, texto) do relatório para um supervisor, a partir do
+    fragmento dele no snapshot (ver _fragmento_responsavel)."""
+    n_atrasados = fragmento["atrasados"]
+    n_outros = fragmento["total"] - n_atrasados
 
     secoes = ""
-    if atrasados:
+    if n_atrasados:
         secoes += (
-            f'<h3 style="color:#dc2626;margin:24px 0 4px;">Overdue ({len(atrasados)})</h3>'
+            f'<h3 style="color:#dc2626;margin:24px 0 4px;">Overdue ({n_atrasados})</h3>'
             '<p style="color:#6b7280;font-size:11px;margin:0 0 8px;">SLA exceeded — default: Projects 2 days / others 3 days (tickets with custom SLA apply their own deadline)</p>'
-            + _tabela_html(atrasados, link_base)
+            + fragmento["html_atrasados"]
         )
-    if outros:
+    if n_outros:
         secoes += (
-            f'<h3 style="color:#2563eb;margin:24px 0 4px;">Open / In Progress ({len(outros)})</h3>'
-            + _tabela_html(outros, link_base)
+            f'<h3 style="color:#2563eb;margin:24px 0 4px;">Open / In Progress ({n_outros})</h3>'
+            + fragmento["html_outros"]
         )
 
-    btn = (
-        f'<a href="{link_dash}" style="background:#2563eb;color:white;padding:10px 20px;'
-        f'text-decoration:none;border-radius:6px;display:inline-block;margin-top:20px;">Open dashboard</a>'
-        if link_dash
-        else ""
-    )
-
     html = (
         '<div style="font-family:Arial,sans-serif;max-width:760px;">'
         f'<h2 style="color:#111827;">Weekly Report — {data_ref}</h2>'
         f"<p>Hello, <strong>{nome}</strong>.</p>"
-        f"<p><strong>Total:</strong> {len(chamados)} &nbsp;|&nbsp; "
-        f'<span style="color:#dc2626;">Overdue: {len(atrasados)}</span> &nbsp;|&nbsp; '
-        f"Others: {len(outros)}</p>"
-        f"{secoes}{btn}"
+        f"<p><strong>Total:</strong> {fragmento['total']} &nbsp;|&nbsp; "
+        f'<span style="color:#dc2626;">Overdue: {n_atrasados}</span> &nbsp;|&nbsp; '
+        f"Others: {n_outros}</p>"
+        f"{secoes}{_botao_dashboard(link_dash)}"
         '<p style="margin-top:24px;color:#9ca3af;font-size:11px;"><em>Andon</em></p>'
         "</div>"
     )
@@ -273,30 +290,273 @@ def _corpo_supervisor(
     linhas = [
         f"Weekly Report — {data_ref}",
         f"Hello, {nome}.",
-        f"Total: {len(chamados)} | Overdue: {len(atrasados)} | Others: {len(outros)}",
+        f"Total: {fragmento['total']} | Overdue: {n_atrasados} | Others: {n_outros}",
         "",
     ]
-    if atrasados:
+    if n_atrasados:
         linhas.append("== OVERDUE ==")
-        for c in atrasados:
-            linhas.append(
-                f"  {c['numero']} | {c['categoria']} | {c['solicitante']} | {c['data_abertura_fmt']} ({c['dias_aberto']}d)"
-            )
-    if outros:
+        linhas.extend(fragmento["texto_atrasados"])
+    if n_outros:
         linhas.append("== OPEN / IN PROGRESS ==")
-        for c in outros:
-            linhas.append(
-                f"  {c['numero']} | {c['categoria']} | {c['solicitante']} | {c['data_abertura_fmt']} ({c['dias_aberto']}d)"
-            )
+        linhas.extend(fragmento["texto_outros"])
 
     return html, "\n".join(linhas)
 
 
+NIVEL_LABEL_EN = {
+    "gerente_producao": "Production Manager",
+    "assistente_gm": "Assistant GM",
+    "gm": "GM",
+}
+
+
+def _cards_resumo_html(
+    total: int,
+    atrasados: int,
+    num_setores: int,
+    setor_critico: str | None,
+    cancelados: int = 0,
+) -> str:
+    """Tira estatística (cartões) usada no topo do resumo pros níveis
+    superiores: total aberto, total atrasado, nº de setores, setor com mais
+    chamados atrasados e cancelados na semana."""
+
+    def _card(valor: str, rotulo: str, bg: str, cor_valor: str) -> str:
+        return (
+            f'<td style="background:{bg};border-radius:8px;padding:14px 10px;text-align:center;">'
+            f'<div style="font-size:22px;font-weight:700;color:{cor_valor};line-height:1.2;">{valor}</div>'
+            f'<div style="font-size:11px;color:#6b7280;margin-top:2px;">{rotulo}</div>'
+            "</td>"
+        )
+
+    return (
+        '<table style="width:100%;border-collapse:separate;border-spacing:8px 0;margin:16px 0 8px;">'
+        "<tr>"
+        + _card(str(total), "Total open", "#f3f4f6", "#111827")
+        + _card(str(atrasados), "Overdue", "#fef2f2", "#dc2626")
+        + _card(str(cancelados), "Cancelled", "#fef2f2", "#dc2626")
+        + _card(str(num_setores), "Sectors", "#f3f4f6", "#111827")
+        + _card(
+            escape(setor_critico) if setor_critico else "—", "Most critical", "#fffbeb", "#d97706"
+        )
+        + "</tr></table>"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Snapshot do relatório
+# ---------------------------------------------------------------------------
+
+STATUS_ENVIANDO = "enviando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_COM_FALHAS = "com_falhas"
+
+# Reenvio (reenviar_relatorio_semanal): só snapshots recentes, com limite de
+# tentativas; "enviando" parado há mais que ENVIO_ABANDONADO é dado como morto
+# no meio (worker reiniciado) e também entra.
+MAX_TENTATIVAS_REENVIO = 5
+JANELA_REENVIO = timedelta(days=6)
+ENVIO_ABANDONADO = timedelta(minutes=30)
+RETENCAO_SNAPSHOTS = timedelta(weeks=8)
+
+
+def _fragmento_responsavel(chamados: list[dict[str, Any]], link_base: str) -> dict[str, Any]:
+    atrasados = [c for c in chamados if c["atrasado"]]
+    outros = [c for c in chamados if not c["atrasado"]]
+    return {
+        "total": len(chamados),
+        "atrasados": len(atrasados),
+        "html_atrasados": _tabela_html(atrasados, link_base) if atrasados else "",
+        "html_outros": _tabela_html(outros, link_base) if outros else "",
+        "texto_atrasados": [_linha_texto(c) for c in atrasados],
+        "texto_outros": [_linha_texto(c) for c in outros],
+    }
+
+
+def montar_snapshot(
+    chamados: list[dict[str, Any]],
+    cancelados: list[dict[str, Any]],
+    data_ref: str,
+    link_base: str,
+    link_dash: str,
+) -> dict[str, Any]:
+    """Uma passada sobre os chamados: índices por responsável e por área,
+    contagens e as tabelas HTML de cada recorte, renderizadas uma vez só.
+
+    A tabela de uma área serve ao gestor_setor e à seção da área no resumo dos
+    níveis superiores; a de atrasados de todas as áreas, ao resumo dos admins.
+    O resultado é JSON puro — vai inteiro para relatorios_semanais.snapshot.
+    """
+    por_responsavel: dict[str, list] = defaultdict(list)
+    por_area: dict[str, list] = defaultdict(list)
+    for c in chamados:
+        por_responsavel[c["responsavel_id"]].append(c)
+        por_area[c.get("area") or ""].append(c)
+    sem_responsavel = por_responsavel.pop("", [])
+    atrasados = [c for c in chamados if c["atrasado"]]
+
+    return {
+        "data_ref": data_ref,
+        "link_base": link_base,
+        "link_dash": link_dash,
+        "total_chamados": len(chamados),
+        "total_atrasados": len(atrasados),
+        "sem_responsavel": {
+            "total": len(sem_responsavel),
+            "atrasados": sum(1 for c in sem_responsavel if c["atrasado"]),
+        },
+        "por_responsavel": {
+            rid: _fragmento_responsavel(lista, link_base) for rid, lista in por_responsavel.items()
+        },
+        "por_area": {
+            area: {
+                "total": len(lista),
+                "atrasados": sum(1 for c in lista if c["atrasado"]),
+                "html": _tabela_html(lista, link_base),
+            }
+            for area, lista in por_area.items()
+        },
+        "html_atrasados": _tabela_html(atrasados, link_base) if atrasados else "",
+        "cancelados": {
+            "total": len(cancelados),
+            "html": _tabela_html(cancelados, link_base) if cancelados else "",
+        },
+    }
+
+
+def _carregar_snapshot(dia: date) -> tuple[int, dict[str, Any], list[str]] | None:
+    try:
+        with db_module.SessionLocal() as session:
+            row = session.execute(
+                select(RelatorioSemanalRow).where(RelatorioSemanalRow.data_ref == dia)
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+            return row.id, row.snapshot, list(row.entregues)
+    except Exception as exc:
+        logger.exception("Erro ao carregar snapshot do relatório semanal: %s", exc)
+        return None
+
+
+def _gravar_snapshot(dia: date, snapshot: dict[str, Any]) -> int | None:
+    """Grava o snapshot do dia (e apaga os antigos). None se o banco falhar —
+    o relatório sai do mesmo jeito, só não dá para reenviar depois."""
+    try:
+        with db_module.SessionLocal() as session, session.begin():
+            session.execute(
+                delete(RelatorioSemanalRow).where(
+                    RelatorioSemanalRow.data_ref < dia - RETENCAO_SNAPSHOTS
+                )
+            )
+            row = RelatorioSemanalRow(
+                data_ref=dia, snapshot=snapshot, status=STATUS_ENVIANDO, tentativas=0
+            )
+            session.add(row)
+            session.flush()
+            return row.id
+    except Exception as exc:
+        logger.exception("Erro ao gravar snapshot do relatório semanal: %s", exc)
+        return None
+
+
+def _snapshot_para_reenvio() -> tuple[int, dict[str, Any], list[str]] | None:
+    agora = datetime.now(UTC)
+    try:
+        with db_module.SessionLocal() as session:
+            row = session.execute(
+                select(RelatorioSemanalRow)
+                .where(
+                    RelatorioSemanalRow.data_ref >= _agora_brasilia().date() - JANELA_REENVIO,
+                    RelatorioSemanalRow.tentativas < MAX_TENTATIVAS_REENVIO,
+                    or_(
+                        RelatorioSemanalRow.status == STATUS_COM_FALHAS,
+                        and_(
+                            RelatorioSemanalRow.status == STATUS_ENVIANDO,
+                            func.coalesce(
+                                RelatorioSemanalRow.atualizado_em, RelatorioSemanalRow.criado_em
+                            )
+                            < agora - ENVIO_ABANDONADO,
+                        ),
+                    ),
+                )
+                .order_by(RelatorioSemanalRow.data_ref.desc())
+                .limit(1)
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+            return row.id, row.snapshot, list(row.entregues)
+    except Exception as exc:
+        logger.exception("Erro ao buscar relatório semanal para reenvio: %s", exc)
+        return None
+
+
+class _Entrega:
+    """Destinatários de um snapshot: pula quem já recebeu e grava cada entrega
+    assim que sai, para um reenvio não repetir e-mail."""
+
+    def __init__(self, relatorio_id: int | None, entregues: list[str]) -> None:
+        self.relatorio_id = relatorio_id
+        self.entregues = set(entregues)
+        self.falhas = 0
+
+    def pendente(self, chave: str) -> bool:
+        return chave not in self.entregues
+
+    def registrar(self, chave: str, ok: bool) -> None:
+        if not ok:
+            self.falhas += 1
+            return
+        self.entregues.add(chave)
+        if self.relatorio_id is None:
+            return
+        try:
+            with db_module.SessionLocal() as session, session.begin():
+                session.execute(
+                    update(RelatorioSemanalRow)
+                    .where(RelatorioSemanalRow.id == self.relatorio_id)
+                    .values(
+                        entregues=RelatorioSemanalRow.entregues.op("||")(
+                            func.jsonb_build_array(chave)
+                        ),
+                        atualizado_em=datetime.now(UTC),
+                    )
+                )
+        except Exception as exc:
+            logger.warning("Entrega %s do relatório semanal não registrada: %s", chave, exc)
+
+    def concluir(self) -> None:
+        if self.relatorio_id is None:
+            return
+        try:
+            with db_module.SessionLocal() as session, session.begin():
+                session.execute(
+                    update(RelatorioSemanalRow)
+                    .where(RelatorioSemanalRow.id == self.relatorio_id)
+                    .values(
+                        status=STATUS_COM_FALHAS if self.falhas else STATUS_CONCLUIDO,
+                        tentativas=RelatorioSemanalRow.tentativas + 1,
+                        atualizado_em=datetime.now(UTC),
+                    )
+                )
+        except Exception as exc:
+            logger.warning("Status do relatório semanal %s não gravado: %s", self.relatorio_id, exc)
+
+
 # ---------------------------------------------------------------------------
 # Ponto de entrada
 # ---------------------------------------------------------------------------
 
 
+def _resultado_vazio() -> dict[str, Any]:
+    return {
+        "enviados": 0,
+        "ignorados": 0,
+        "erros": 0,
+        "total_chamados": 0,
+        "total_atrasados": 0,
+    }
+
+
 def enviar_relatorio_semanal() -> dict[str, Any]:
     """
     Busca chamados abertos/atrasados e envia um e-mail por supervisor direto via
@@ -307,44 +567,78 @@ def enviar_relatorio_semanal() -> dict[str, Any]:
     (`nivel_gestao == "gestor_setor"`) recebem um resumo consolidado só da
     própria área, via `_enviar_resumo_gestores_area`.
 
-    Retorna dict: enviados, ignorados, erros, total_chamados, total_atrasados.
+    Os chamados viram primeiro um snapshot (montar_snapshot), gravado em
+    relatorios_semanais; todos os e-mails saem dele. Rodar de novo no mesmo
+    dia reaproveita o snapshot e só envia para quem ainda não recebeu.
+
+    Retorna dict: enviados, ignorados, erros, total_chamados, total_atrasados
+    (mais reenvio_pendente: algum envio, de qualquer público, falhou).
     """
-    data_ref = _agora_brasilia().strftime("%d/%m/%Y")
-    link_base = _base_url()
-    link_dash = _link_dashboard()
+    dia = _agora_brasilia().date()
+    salvo = _carregar_snapshot(dia)
+    if salvo is not None:
+        relatorio_id, snapshot, entregues = salvo
+        logger.info(
+            "Relatório semanal de %s já montado (id=%s); enviando só o que falta.",
+            snapshot["data_ref"],
+            relatorio_id,
+        )
+        return _enviar_snapshot(_Entrega(relatorio_id, entregues), snapshot)
 
     chamados = buscar_chamados_abertos()
-    total_chamados = len(chamados)
     total_atrasados = sum(1 for c in chamados if c["atrasado"])
-
     logger.info(
         "Relatório semanal: %d abertos, %d atrasados",
-        total_chamados,
+        len(chamados),
         total_atrasados,
     )
 
     if not chamados:
         logger.info("Nenhum chamado aberto; relatório semanal não enviado.")
-        return {
-            "enviados": 0,
-            "ignorados": 0,
-            "erros": 0,
-            "total_chamados": 0,
-            "total_atrasados": 0,
-        }
-
-    grupos: dict[str, list] = defaultdict(list)
-    for c in chamados:
-        grupos[c["responsavel_id"]].append(c)
+        return _resultado_vazio()
+
+    snapshot = montar_snapshot(
+        chamados,
+        buscar_chamados_cancelados_semana(),
+        _agora_brasilia().strftime("%d/%m/%Y"),
+        _base_url(),
+        _link_dashboard(),
+    )
+    return _enviar_snapshot(_Entrega(_gravar_snapshot(dia, snapshot), []), snapshot)
 
-    ids_responsaveis = [rid for rid in grupos if rid]
-    supervisores_map = Usuario.get_by_ids(ids_responsaveis)
 
-    enviados = ignorados = erros = 0
+def reenviar_relatorio_semanal() -> dict[str, Any]:
+    """Refaz, a partir do snapshot gravado, os envios que falharam no último
+    relatório semanal — sem consultar chamados nem renderizar tabelas de novo.
 
-    for responsavel_id, lista in grupos.items():
-        if not responsavel_id:
-            ignorados += len(lista)
+    Sem relatório pendente (ou com MAX_TENTATIVAS_REENVIO esgotadas), não faz nada.
+    """
+    salvo = _snapshot_para_reenvio()
+    if salvo is None:
+        return _resultado_vazio()
+    relatorio_id, snapshot, entregues = salvo
+    logger.info(
+        "Reenviando relatório semanal de %s (id=%s, %d já entregues)",
+        snapshot["data_ref"],
+        relatorio_id,
+        len(entregues),
+    )
+    return _enviar_snapshot(_Entrega(relatorio_id, entregues), snapshot)
+
+
+def _enviar_snapshot(entrega: _Entrega, snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Envia o relatório de cada público a partir do snapshot."""
+    data_ref = snapshot["data_ref"]
+    por_responsavel = snapshot["por_responsavel"]
+    supervisores_map = Usuario.get_by_ids(list(por_responsavel))
+
+    enviados = erros = 0
+    ignorados = snapshot["sem_responsavel"]["total"]
+    assunto = f"Weekly ticket report — {data_ref}"
+
+    for responsavel_id, fragmento in por_responsavel.items():
+        chave = f"responsavel:{responsavel_id}"
+        if not entrega.pendente(chave):
             continue
 
         supervisor = supervisores_map.get(responsavel_id)
@@ -355,46 +649,45 @@ def enviar_relatorio_semanal() -> dict[str, Any]:
             logger.warning(
                 "Supervisor %s sem e-mail cadastrado; relatório ignorado.", responsavel_id
             )
-            ignorados += len(lista)
+            ignorados += fragmento["total"]
             continue
 
         email_sup = supervisor.email.strip()
         nome = supervisor.nome or email_sup
-        assunto = f"Weekly ticket report — {data_ref}"
 
-        html, texto = _corpo_supervisor(nome, lista, link_dash, link_base, data_ref)
+        html, texto = _corpo_supervisor(nome, fragmento, snapshot["link_dash"], data_ref)
         ok, err = enviar_email(email_sup, assunto, html, texto, importance="low")
+        entrega.registrar(chave, ok)
         if ok:
             enviados += 1
             logger.info(
                 "Relatório semanal enviado para supervisor %s (%d chamados)",
                 email_sup,
-                len(lista),
+                fragmento["total"],
             )
         else:
             erros += 1
             logger.warning("Falha ao enviar relatório para supervisor %s: %s", email_sup, err)
 
-    _enviar_resumo_admins(chamados, grupos, supervisores_map, data_ref, link_dash, link_base)
-    _enviar_resumo_gestores_area(chamados, data_ref, link_dash, link_base)
-    _enviar_resumo_niveis_superiores(chamados, data_ref, link_base)
+    _enviar_resumo_admins(snapshot, supervisores_map, entrega)
+    _enviar_resumo_gestores_area(snapshot, entrega)
+    _enviar_resumo_niveis_superiores(snapshot, entrega)
+    entrega.concluir()
 
     return {
         "enviados": enviados,
         "ignorados": ignorados,
         "erros": erros,
-        "total_chamados": total_chamados,
-        "total_atrasados": total_atrasados,
+        "total_chamados": snapshot["total_chamados"],
+        "total_atrasados": snapshot["total_atrasados"],
+        "reenvio_pendente": entrega.falhas > 0,
     }
 
 
 def _enviar_resumo_admins(
-    chamados: list[dict[str, Any]],
-    grupos: dict[str, list],
+    snapshot: dict[str, Any],
     supervisores_map: dict[str, Any],
-    data_ref: str,
-    link_dash: str,
-    link_base: str,
+    entrega: _Entrega,
 ) -> None:
     """Envia resumo consolidado para cada admin (e admin_global) diretamente.
 
@@ -414,21 +707,34 @@ def _enviar_resumo_admins(
         logger.warning("Não foi possível obter admins: %s", exc)
         return
 
+    admins = [a for a in admins if entrega.pendente(f"admin:{a.id}")]
     if not admins:
         return
 
-    atrasados = [c for c in chamados if c["atrasado"]]
+    contagens = [
+        (
+            str(getattr(supervisores_map.get(rid), "nome", None) or rid),
+            fragmento["total"],
+            fragmento["atrasados"],
+        )
+        for rid, fragmento in snapshot["por_responsavel"].items()
+    ]
+    if snapshot["sem_responsavel"]["total"]:
+        contagens.append(
+            (
+                "No assignee",
+                snapshot["sem_responsavel"]["total"],
+                snapshot["sem_responsavel"]["atrasados"],
+            )
+        )
 
     linhas_sup = []
-    for resp_id, lista in sorted(grupos.items(), key=lambda x: -len(x[1])):
-        sup = supervisores_map.get(resp_id) if resp_id else None
-        nome_sup = (sup.nome if sup else None) or resp_id or "No assignee"
-        n_atras = sum(1 for c in lista if c["atrasado"])
+    for nome_sup, total, n_atras in sorted(contagens, key=lambda x: (-x[1], x[0])):
         cor = "#dc2626" if n_atras else "#16a34a"
         linhas_sup.append(
             "<tr>"
-            f'<td style="padding:6px 10px;border-bottom:1px solid #e5e7eb;font-size:12px;">{nome_sup}</td>'
-            f'<td style="padding:6px 10px;border-bottom:1px solid #e5e7eb;font-size:12px;">{len(lista)}</td>'
+            f'<td style="padding:6px 10px;border-bottom:1px solid #e5e7eb;font-size:12px;">{escape(nome_sup)}</td>'
+            f'<td style="padding:6px 10px;border-bottom:1px solid #e5e7eb;font-size:12px;">{total}</td>'
             f'<td style="padding:6px 10px;border-bottom:1px solid #e5e7eb;font-size:12px;color:{cor};font-weight:600;">{n_atras}</td>'
             "</tr>"
         )
@@ -442,47 +748,34 @@ def _enviar_resumo_admins(
         "</tr>" + "".join(linhas_sup) + "</table>"
     )
 
-    btn = (
-        f'<a href="{link_dash}" style="background:#2563eb;color:white;padding:10px 20px;'
-        f'text-decoration:none;border-radius:6px;display:inline-block;margin-top:20px;">Open dashboard</a>'
-        if link_dash
-        else ""
-    )
-
+    data_ref = snapshot["data_ref"]
+    total_atrasados = snapshot["total_atrasados"]
     html_admin = (
         '<div style="font-family:Arial,sans-serif;max-width:760px;">'
         f'<h2 style="color:#111827;">Weekly Summary — {data_ref}</h2>'
-        f"<p><strong>Total open:</strong> {len(chamados)} &nbsp;|&nbsp; "
-        f'<span style="color:#dc2626;"><strong>Overdue:</strong> {len(atrasados)}</span></p>'
+        f"<p><strong>Total open:</strong> {snapshot['total_chamados']} &nbsp;|&nbsp; "
+        f'<span style="color:#dc2626;"><strong>Overdue:</strong> {total_atrasados}</span></p>'
         '<h3 style="margin-top:20px;">By assignee</h3>'
         f"{tabela_sup}"
-        f'<h3 style="color:#dc2626;margin-top:24px;">Overdue tickets ({len(atrasados)})</h3>'
-        + (
-            _tabela_html(atrasados, link_base)
-            if atrasados
-            else '<p style="color:#6b7280;">None.</p>'
-        )
-        + f"{btn}"
-        '<p style="margin-top:24px;color:#9ca3af;font-size:11px;"><em>Andon</em></p>'
+        f'<h3 style="color:#dc2626;margin-top:24px;">Overdue tickets ({total_atrasados})</h3>'
+        + (snapshot["html_atrasados"] or '<p style="color:#6b7280;">None.</p>')
+        + _botao_dashboard(snapshot["link_dash"])
+        + '<p style="margin-top:24px;color:#9ca3af;font-size:11px;"><em>Andon</em></p>'
         "</div>"
     )
 
+    assunto = f"Weekly consolidated report — {data_ref}"
     for admin in admins:
         email_admin = admin.email.strip()
-        assunto = f"Weekly consolidated report — {data_ref}"
         ok, err = enviar_email(email_admin, assunto, html_admin, importance="low")
+        entrega.registrar(f"admin:{admin.id}", ok)
         if ok:
             logger.info("Resumo semanal enviado para admin %s", email_admin)
         else:
             logger.warning("Falha ao enviar resumo para admin %s: %s", email_admin, err)
 
 
-def _enviar_resumo_gestores_area(
-    chamados: list[dict[str, Any]],
-    data_ref: str,
-    link_dash: str,
-    link_base: str,
-) -> None:
+def _enviar_resumo_gestores_area(snapshot: dict[str, Any], entrega: _Entrega) -> None:
     """Envia resumo consolidado (só da própria área) para cada gestor_setor.
 
     Achado da auditoria 2026-08-06: o relatório semanal só chegava ao
@@ -495,41 +788,33 @@ def _enviar_resumo_gestores_area(
     if not mapa_gestor_setor:
         return
 
-    por_area: dict[str, list] = defaultdict(list)
-    for c in chamados:
-        por_area[c.get("area") or ""].append(c)
-
-    for area, lista in por_area.items():
+    data_ref = snapshot["data_ref"]
+    for area, fragmento in snapshot["por_area"].items():
         email_gestor = mapa_gestor_setor.get(area)
-        if not email_gestor:
+        chave = f"area:{area}"
+        if not email_gestor or not entrega.pendente(chave):
             continue
 
         area_en = get_translated_sector(area, "en") if area else area
-        atrasados = [c for c in lista if c["atrasado"]]
         html = (
             '<div style="font-family:Arial,sans-serif;max-width:760px;">'
             f'<h2 style="color:#111827;">Weekly Area Report — {escape(area_en)} — {data_ref}</h2>'
-            f"<p><strong>Total open:</strong> {len(lista)} &nbsp;|&nbsp; "
-            f'<span style="color:#dc2626;"><strong>Overdue:</strong> {len(atrasados)}</span></p>'
-            + _tabela_html(lista, link_base)
-            + (
-                f'<a href="{link_dash}" style="background:#2563eb;color:white;padding:10px 20px;'
-                f'text-decoration:none;border-radius:6px;display:inline-block;margin-top:20px;">'
-                f"Open dashboard</a>"
-                if link_dash
-                else ""
-            )
+            f"<p><strong>Total open:</strong> {fragmento['total']} &nbsp;|&nbsp; "
+            f'<span style="color:#dc2626;"><strong>Overdue:</strong> {fragmento["atrasados"]}</span></p>'
+            + fragmento["html"]
+            + _botao_dashboard(snapshot["link_dash"])
             + '<p style="margin-top:24px;color:#9ca3af;font-size:11px;"><em>Andon</em></p>'
             "</div>"
         )
         assunto = f"Weekly area report — {area_en} — {data_ref}"
         ok, err = enviar_email(email_gestor, assunto, html, importance="low")
+        entrega.registrar(chave, ok)
         if ok:
             logger.info(
                 "Relatório semanal (área) enviado para gestor_setor %s (%s, %d chamados)",
                 email_gestor,
                 area,
-                len(lista),
+                fragmento["total"],
             )
         else:
             logger.warning(
@@ -537,51 +822,7 @@ def _enviar_resumo_gestores_area(
             )
 
 
-NIVEL_LABEL_EN = {
-    "gerente_producao": "Production Manager",
-    "assistente_gm": "Assistant GM",
-    "gm": "GM",
-}
-
-
-def _cards_resumo_html(
-    total: int,
-    atrasados: int,
-    num_setores: int,
-    setor_critico: str | None,
-    cancelados: int = 0,
-) -> str:
-    """Tira estatística (cartões) usada no topo do resumo pros níveis
-    superiores: total aberto, total atrasado, nº de setores, setor com mais
-    chamados atrasados e cancelados na semana."""
-
-    def _card(valor: str, rotulo: str, bg: str, cor_valor: str) -> str:
-        return (
-            f'<td style="background:{bg};border-radius:8px;padding:14px 10px;text-align:center;">'
-            f'<div style="font-size:22px;font-weight:700;color:{cor_valor};line-height:1.2;">{valor}</div>'
-            f'<div style="font-size:11px;color:#6b7280;margin-top:2px;">{rotulo}</div>'
-            "</td>"
-        )
-
-    return (
-        '<table style="width:100%;border-collapse:separate;border-spacing:8px 0;margin:16px 0 8px;">'
-        "<tr>"
-        + _card(str(total), "Total open", "#f3f4f6", "#111827")
-        + _card(str(atrasados), "Overdue", "#fef2f2", "#dc2626")
-        + _card(str(cancelados), "Cancelled", "#fef2f2", "#dc2626")
-        + _card(str(num_setores), "Sectors", "#f3f4f6", "#111827")
-        + _card(
-            escape(setor_critico) if setor_critico else "—", "Most critical", "#fffbeb", "#d97706"
-        )
-        + "</tr></table>"
-    )
-
-
-def _enviar_resumo_niveis_superiores(
-    chamados: list[dict[str, Any]],
-    data_ref: str,
-    link_base: str,
-) -> None:
+def _enviar_resumo_niveis_superiores(snapshot: dict[str, Any], entrega: _Entrega) -> None:
     """Envia resumo consolidado de todas as áreas, quebrado por setor no mesmo
     e-mail, para cada nivel_gestao company-wide (gerente_producao, assistente_gm,
     gm). Reusa a mesma fonte de verdade de e-mails de gestor
@@ -589,68 +830,66 @@ def _enviar_resumo_niveis_superiores(
     pela escalação de SLA, em vez de duplicar essa lógica. Sem ninguém cadastrado
     num nível, não envia nada pra esse nível.
     """
-    mapa_niveis = construir_mapa_niveis_superiores()
+    mapa_niveis = {
+        nivel: email
+        for nivel, email in construir_mapa_niveis_superiores().items()
+        if entrega.pendente(f"nivel:{nivel}")
+    }
     if not mapa_niveis:
         return
 
-    por_area: dict[str, list] = defaultdict(list)
-    for c in chamados:
-        por_area[c.get("area") or ""].append(c)
-
     areas_ordenadas = sorted(
-        por_area.items(),
+        snapshot["por_area"].items(),
         key=lambda item: get_translated_sector(item[0], "en") if item[0] else item[0],
     )
 
     secoes = ""
-    total_atrasados = 0
     setor_critico = None
     max_atrasados_setor = 0
-    for area, lista in areas_ordenadas:
+    for area, fragmento in areas_ordenadas:
         area_en = get_translated_sector(area, "en") if area else "No sector"
-        atrasados_area = sum(1 for c in lista if c["atrasado"])
-        total_atrasados += atrasados_area
+        atrasados_area = fragmento["atrasados"]
         if atrasados_area > max_atrasados_setor:
             max_atrasados_setor = atrasados_area
             setor_critico = area_en
         secoes += (
             '<div style="background:#111827;color:white;padding:8px 12px;'
             'border-radius:6px 6px 0 0;margin-top:24px;font-size:13px;">'
-            f"<strong>{escape(area_en)}</strong> — {len(lista)} open"
+            f"<strong>{escape(area_en)}</strong> — {fragmento['total']} open"
             + (
                 f' &nbsp;·&nbsp; <span style="color:#fca5a5;">{atrasados_area} overdue</span>'
                 if atrasados_area
                 else ""
             )
             + "</div>"
-            + _tabela_html(lista, link_base)
+            + fragmento["html"]
         )
 
-    cancelados = buscar_chamados_cancelados_semana()
+    cancelados = snapshot["cancelados"]
     secao_cancelados = ""
-    if cancelados:
+    if cancelados["total"]:
         secao_cancelados = (
             '<div style="background:#dc2626;color:white;padding:8px 12px;'
             'border-radius:6px 6px 0 0;margin-top:24px;font-size:13px;">'
-            f"<strong>Cancelled this week</strong> — {len(cancelados)}"
-            "</div>" + _tabela_html(cancelados, link_base)
+            f"<strong>Cancelled this week</strong> — {cancelados['total']}"
+            "</div>" + cancelados["html"]
         )
 
     cards = _cards_resumo_html(
-        len(chamados), total_atrasados, len(por_area), setor_critico, len(cancelados)
+        snapshot["total_chamados"],
+        snapshot["total_atrasados"],
+        len(snapshot["por_area"]),
+        setor_critico,
+        cancelados["total"],
     )
 
     # /admin exige perfil supervisor/admin/admin_global (@requer_supervisor_area) —
     # um gerente_producao/assistente_gm/gm "puro" não tem acesso lá. O painel
     # gerencial (@requer_gestor_ou_admin) é a rota que eles realmente enxergam.
-    link_gestor_dashboard = f"{link_base}/gestor/dashboard" if link_base else ""
-    btn = (
-        f'<a href="{link_gestor_dashboard}" style="background:#2563eb;color:white;padding:10px 20px;'
-        f'text-decoration:none;border-radius:6px;display:inline-block;margin-top:20px;">Open dashboard</a>'
-        if link_gestor_dashboard
-        else ""
-    )
+    link_base = snapshot["link_base"]
+    btn = _botao_dashboard(f"{link_base}/gestor/dashboard" if link_base else "")
 
+    data_ref = snapshot["data_ref"]
     assunto = f"Weekly report — All sectors — {data_ref}"
 
     for nivel, email_gestor in mapa_niveis.items():
@@ -672,6 +911,7 @@ def _enviar_resumo_niveis_superiores(
         )
 
         ok, err = enviar_email(email_gestor, assunto, html, importance="low")
+        entrega.registrar(f"nivel:{nivel}", ok)
         if ok:
             logger.info(
                 "Relatório semanal (todas as áreas) enviado para %s (%s)",
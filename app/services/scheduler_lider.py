@@ -0,0 +1,135 @@
+"""
+Eleição de líder do APScheduler via advisory lock do Postgres.
+
+Cada worker Gunicorn cria o próprio BackgroundScheduler (_iniciar_scheduler em
+app/__init__.py). Sem eleição, todos acordam em todo tick e dependem do lock
+Redis por job (scheduler_lock) para não duplicar envio — e, sem Redis, todos
+rodam todos os jobs.
+
+Com SCHEDULER_ELEICAO_LIDER ligado, o scheduler de cada worker sobe PAUSADO
+(APScheduler pausado não acorda: não há próximo disparo para esperar) e uma
+thread candidata tenta pg_try_advisory_lock numa conexão dedicada do pool:
+
+  - venceu → retoma o scheduler e segura a conexão; a cada
+    SCHEDULER_LIDER_INTERVALO_SEGUNDOS confere que ela (e com ela o lock de
+    sessão) continua viva;
+  - perdeu → devolve a conexão ao pool e tenta de novo no próximo intervalo.
+
+Failover: o lock de sessão é liberado pelo próprio Postgres quando a conexão
+do líder cai (processo morto, rede, restart do banco) — o próximo candidato a
+pegá-lo retoma o seu scheduler. O líder que perde a conexão pausa o scheduler
+antes de voltar a ser candidato.
+
+Isso NÃO garante um líder só. O líder só descobre que perdeu a sessão na
+próxima renovação, e o Postgres pode já ter soltado o lock para outro
+candidato (ex.: backend encerrado, rede partida). Até pausar, o líder antigo
+continua disparando jobs, e pause() não interrompe job em curso. Dois
+schedulers podem ficar ativos juntos por até SCHEDULER_LIDER_INTERVALO_SEGUNDOS
+mais a duração do job que estiver rodando. Por isso todo job continua passando
+pelo lock Redis por job (scheduler_lock.executar_job_com_lock). Sem REDIS_URL,
+nessa janela um job pode rodar em dobro.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Chave fixa (bigint) do advisory lock — única por banco, ou seja, por implantação.
+CHAVE_LOCK_LIDER = 0x416E646F6E536368  # "AndonSch"
+
+_SQL_TENTAR = text("SELECT pg_try_advisory_lock(:chave)")
+_SQL_LIBERAR = text("SELECT pg_advisory_unlock(:chave)")
+
+
+class EleicaoLider:
+    """Mantém `scheduler` rodando só enquanto este processo detém o lock."""
+
+    def __init__(self, engine, scheduler, *, intervalo_segundos: float = 30.0) -> None:
+        self._engine = engine
+        self._scheduler = scheduler
+        self._intervalo = intervalo_segundos
+        self._conexao = None
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def lider(self) -> bool:
+        return self._conexao is not None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="scheduler-eleicao", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        """Encerra a candidatura e libera o lock (shutdown do worker)."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._abdicar(liberar=True)
+
+    def passo(self) -> None:
+        """Uma rodada: líder renova, candidato tenta assumir."""
+        try:
+            if self.lider:
+                self._renovar()
+            else:
+                self._tentar_assumir()
+        except Exception as exc:
+            logger.warning("Eleição do scheduler: falha na rodada: %s", exc)
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            self.passo()
+            self._parar.wait(self._intervalo)
+
+    def _tentar_assumir(self) -> None:
+        conexao = self._engine.connect()
+        try:
+            venceu = bool(conexao.execute(_SQL_TENTAR, {"chave": CHAVE_LOCK_LIDER}).scalar())
+            # Lock é de sessão: sobrevive ao commit; o commit só evita deixar
+            # a conexão "idle in transaction" enquanto for líder.
+            conexao.commit()
+        except Exception:
+            conexao.close()
+            raise
+        if not venceu:
+            conexao.close()
+            return
+        self._conexao = conexao
+        self._scheduler.resume()
+        logger.info("Eleição do scheduler: este worker assumiu a liderança.")
+
+    def _renovar(self) -> None:
+        try:
+            self._conexao.execute(text("SELECT 1"))
+            self._conexao.commit()
+        except Exception as exc:
+            logger.warning("Eleição do scheduler: conexão do líder perdida (%s); pausando.", exc)
+            self._abdicar(liberar=False)
+
+    def _abdicar(self, *, liberar: bool) -> None:
+        conexao, self._conexao = self._conexao, None
+        if conexao is None:
+            return
+        try:
+            self._scheduler.pause()
+        except Exception as exc:
+            logger.debug("Eleição do scheduler: pause falhou: %s", exc)
+        if not liberar:
+            # Conexão morta: descarta em vez de devolver ao pool — o Postgres já
+            # liberou o lock ao perder a sessão.
+            conexao.invalidate()
+            return
+        try:
+            conexao.execute(_SQL_LIBERAR, {"chave": CHAVE_LOCK_LIDER})
+            conexao.commit()
+        except Exception as exc:
+            logger.debug("Eleição do scheduler: unlock falhou: %s", exc)
+            conexao.invalidate()
+            return
+        conexao.close()
@@ -5,40 +5,71 @@ Garante que em implantações multi-worker (Gunicorn, Cloud Run) apenas um
 processo execute cada job por vez, evitando e-mails duplicados.
 
 Sem REDIS_URL configurada, o job executa diretamente (modo dev/single-worker).
+
+Com SCHEDULER_ELEICAO_LIDER só o worker líder chega aqui (scheduler_lider.py);
+o lock por job fica como segunda barreira (ex.: janela de failover).
 """
 
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Um cliente (e seu pool de conexões) por URL, reaproveitado entre ticks —
+# antes cada execução de job abria um cliente novo.
+_clientes: dict[str, object] = {}
+_clientes_lock = threading.Lock()
+
+
+def _cliente_redis(redis_url: str):
+    import redis
+
+    with _clientes_lock:
+        cliente = _clientes.get(redis_url)
+        if cliente is None:
+            cliente = _clientes[redis_url] = redis.from_url(redis_url)
+        return cliente
 
-def executar_job_com_lock(app, nome_job: str, fn_job) -> None:
+
+def executar_job_com_lock(app, nome_job: str, fn_job, *, gatilho=None, execucao_id=None):
     """Executa fn_job em apenas um worker por vez quando REDIS_URL está configurada.
 
     Sem REDIS_URL → executa diretamente (single-worker / dev).
     Com Redis → adquire lock não-bloqueante; outros workers pulam o job.
+
+    Toda execução passa por job_runs_service.executar_com_telemetria (histórico
+    em job_runs; `gatilho` é o trigger APScheduler, para medir o atraso sobre o
+    disparo agendado; `execucao_id`, a execução reservada por enfileirar_job).
+    Exceção do job é registrada lá e não propaga — por isso o `except
+    Exception` abaixo só vê falha do próprio lock. Devolve o resultado do job,
+    ou None se outro worker o detinha.
     """
+    from app.services.job_runs_service import executar_com_telemetria
+
+    def _executar():
+        return executar_com_telemetria(
+            app, nome_job, fn_job, gatilho=gatilho, execucao_id=execucao_id
+        )
+
     redis_url = (app.config.get("REDIS_URL") or os.getenv("REDIS_URL", "")).strip()
     if not redis_url:
-        fn_job()
-        return
+        return _executar()
 
     try:
-        import redis
         from redis.exceptions import LockError
     except ImportError:
         logger.warning("redis-py não instalado; executando job '%s' sem lock.", nome_job)
-        fn_job()
-        return
+        return _executar()
 
     lock_key = f"scheduler_lock:{nome_job}"
     try:
-        r = redis.from_url(redis_url)
+        r = _cliente_redis(redis_url)
         with r.lock(lock_key, timeout=300, blocking_timeout=0):
-            fn_job()
+            return _executar()
     except LockError:
         logger.debug("Job '%s' já em execução em outro worker, pulando.", nome_job)
+        return None
     except Exception as exc:
         logger.exception("Erro ao adquirir lock para job '%s': %s", nome_job, exc)
-        fn_job()
+        return _executar()
@@ -30,14 +30,17 @@ Decisão de design (sem gestor cadastrado):
 from __future__ import annotations
 
 import logging
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import select, update
+from flask import current_app
+from sqlalchemy import or_, select, update
 
 from app import db as db_module
 from app.db.models.chamado import ChamadoRow
-from app.models import Chamado
+from app.models import Chamado, _sincronizar_timers
 from app.models_historico import Historico
 from app.services.business_time import (
     adicionar_dias_uteis,
@@ -68,6 +71,11 @@ logger = logging.getLogger(__name__)
 
 _NIVEL_MAXIMO = 4
 
+# Tamanho de cada lote keyset (ORDER BY id) dos scans do job. Não é teto: os
+# lotes se sucedem até esgotar os elegíveis — o antigo .limit(500) sem ORDER BY
+# deixava chamados de fora para sempre quando havia mais de 500 abertos.
+_TAMANHO_LOTE = 500
+
 # Ator de Histórico para ações disparadas pelo job de escalonamento (sem
 # usuário humano envolvido) — ver app/models_historico.py (usuario_id sem
 # FK, mesmo padrão de responsavel_id/solicitante_id em Chamado).
@@ -81,7 +89,93 @@ def _claim_cas(chamado_id: int, precondicoes: dict, alteracoes: dict) -> bool:
         stmt = stmt.where(getattr(ChamadoRow, campo) == esperado)
     stmt = stmt.values(**alteracoes).returning(ChamadoRow.id)
     with db_module.SessionLocal() as session, session.begin():
-        return session.execute(stmt).scalar_one_or_none() is not None
+        venceu = session.execute(stmt).scalar_one_or_none() is not None
+        if venceu:
+            _sincronizar_timers(session, chamado_id)
+        return venceu
+
+
+def _iterar_chamados_em_lotes(*filtros):
+    """Percorre todos os ChamadoRow que casam com `filtros`, em lotes keyset
+    (id > último id visto, ORDER BY id LIMIT _TAMANHO_LOTE).
+
+    Cada lote é lido numa sessão curta, fechada antes de o chamador processar
+    as linhas — o processamento faz CAS, e-mail e Histórico por chamado, e
+    manter um cursor aberto durante esse I/O prenderia uma conexão do pool
+    (e um snapshot) pela execução inteira do job. Chamados que mudam de estado
+    no meio do scan são revalidados pelo _claim_cas de qualquer forma.
+    """
+    ultimo_id = 0
+    while True:
+        stmt = (
+            select(ChamadoRow)
+            .where(*filtros, ChamadoRow.id > ultimo_id)
+            .order_by(ChamadoRow.id)
+            .limit(_TAMANHO_LOTE)
+        )
+        with db_module.SessionLocal() as session:
+            lote = session.execute(stmt).scalars().all()
+        yield from lote
+        if len(lote) < _TAMANHO_LOTE:
+            return
+        ultimo_id = lote[-1].id
+
+
+def _concorrencia() -> int:
+    try:
+        return max(1, int(current_app.config.get("SLA_ESCALACAO_CONCORRENCIA", 1)))
+    except RuntimeError:
+        return max(1, Config.SLA_ESCALACAO_CONCORRENCIA)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _processar_em_paralelo(rows, processar, stats: dict, concorrencia: int) -> None:
+    """Roda `processar(row, stats_do_chamado)` para cada linha num pool de até
+    `concorrencia` threads, com no máximo 2x isso em voo (o iterador de lotes
+    não é materializado inteiro).
+
+    Cada chamado recebe seu próprio Counter, somado a `stats` só na thread
+    chamadora conforme os futures terminam — os handlers fazem
+    `stats[k] += 1`, que não é atômico entre threads. A segurança entre
+    threads (e entre workers) de cada tick continua sendo o _claim_cas.
+    Cada thread abre o próprio app context: SessionLocal é scoped por thread
+    e o teardown do contexto devolve a conexão ao pool.
+    """
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        app = None
+
+    def _tarefa(row) -> Counter:
+        parcial: Counter = Counter()
+        if app is None:
+            processar(row, parcial)
+        else:
+            with app.app_context():
+                processar(row, parcial)
+        return parcial
+
+    def _coletar(concluidos) -> None:
+        for futuro in concluidos:
+            try:
+                parcial = futuro.result()
+            except Exception as exc:
+                logger.exception("Escalonamento: erro ao processar chamado: %s", exc)
+                stats["erros"] += 1
+                continue
+            for chave, valor in parcial.items():
+                stats[chave] = stats.get(chave, 0) + valor
+
+    em_voo: set = set()
+    with ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix="sla") as pool:
+        for row in rows:
+            if len(em_voo) >= 2 * concorrencia:
+                concluidos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                _coletar(concluidos)
+            em_voo.add(pool.submit(_tarefa, row))
+        concluidos, _ = wait(em_voo)
+        _coletar(concluidos)
 
 
 def calcular_deadline_inicial(categoria: str, status: str, data_abertura: datetime) -> datetime:
@@ -126,7 +220,9 @@ def processar_escalonamento(agora: datetime | None = None) -> dict:
     unificado (substitui as antigas Escada A + Escada B).
 
     Consulta chamados com status IN ('Aberto', 'Em Atendimento') e
-    escalacao_nivel < 4. Para cada chamado elegível: dispara aviso prévio
+    escalacao_nivel < 4 — todos, em lotes keyset (_iterar_chamados_em_lotes),
+    descartando em SQL os de nível >= 1 cujo próximo tick ainda está longe.
+    Para cada chamado elegível: dispara aviso prévio
     quando o próximo tick cai dentro da janela de SLA_PRE_AVISO_MINUTOS (uma
     vez por nível-alvo); dispara o tick de escalonamento em si quando o
     prazo vence, incrementando um nível por vez.
@@ -135,6 +231,10 @@ def processar_escalonamento(agora: datetime | None = None) -> dict:
     Projetos (adiado, não perdido, se fora da janela); AOG ignora a janela e
     dispara 24/7.
 
+    Com SLA_ESCALACAO_CONCORRENCIA > 1 os chamados são avaliados num pool de
+    threads (_processar_em_paralelo) — um e-mail lento no Graph não atrasa o
+    tick dos chamados seguintes.
+
     Args:
         agora: Instante de referência (naive → tratado como BRT). None = now().
 
@@ -158,31 +258,43 @@ def processar_escalonamento(agora: datetime | None = None) -> dict:
     mapa_gestor_setor = _construir_mapa_gestor_setor()
     mapa_niveis_superiores = _construir_mapa_niveis_superiores()
 
-    try:
-        with db_module.SessionLocal() as session:
-            stmt = (
-                select(ChamadoRow)
-                .where(
-                    ChamadoRow.status.in_(("Aberto", "Em Atendimento")),
-                    ChamadoRow.escalacao_nivel < _NIVEL_MAXIMO,
-                )
-                .limit(500)
-            )
-            rows = session.execute(stmt).scalars().all()
-    except Exception as exc:
-        logger.exception("Escalonamento: erro ao consultar chamados: %s", exc)
-        stats["erros"] += 1
-        return stats
+    # Só chamados com algo a fazer AGORA: no nível 0 o alvo é recalculado em
+    # Python (depende de dias úteis/status), mas a partir do nível 1 o próximo
+    # tick está persistido — se ele cai depois da janela de aviso prévio, não
+    # há pré-aviso nem tick a disparar nesta execução.
+    horizonte = agora.replace(tzinfo=None) + timedelta(minutes=Config.SLA_PRE_AVISO_MINUTOS)
+    filtros = (
+        ChamadoRow.status.in_(("Aberto", "Em Atendimento")),
+        ChamadoRow.escalacao_nivel < _NIVEL_MAXIMO,
+        or_(
+            ChamadoRow.escalacao_nivel == 0,
+            ChamadoRow.escalacao_proximo_tick_em.is_(None),
+            ChamadoRow.escalacao_proximo_tick_em <= horizonte,
+        ),
+    )
 
-    for row in rows:
-        stats["processados"] += 1
+    def _processar(row: ChamadoRow, stats_chamado: dict) -> None:
+        stats_chamado["processados"] += 1
         try:
             _processar_chamado_escalonamento(
-                row, agora, stats, mapa_gestor_setor, mapa_niveis_superiores
+                row, agora, stats_chamado, mapa_gestor_setor, mapa_niveis_superiores
             )
         except Exception as exc:
             logger.exception("Escalonamento: erro ao processar chamado %s: %s", row.id, exc)
-            stats["erros"] += 1
+            stats_chamado["erros"] += 1
+
+    concorrencia = _concorrencia()
+    try:
+        if concorrencia == 1:
+            for row in _iterar_chamados_em_lotes(*filtros):
+                _processar(row, stats)
+        else:
+            _processar_em_paralelo(
+                _iterar_chamados_em_lotes(*filtros), _processar, stats, concorrencia
+            )
+    except Exception as exc:
+        logger.exception("Escalonamento: erro ao consultar chamados: %s", exc)
+        stats["erros"] += 1
 
     return stats
 
@@ -393,7 +505,8 @@ def _enviar_pre_aviso(
 def processar_avisos_resolucao(agora: datetime | None = None) -> dict:
     """Envia avisos de 50% e 80% do prazo de resolução para chamados Em Atendimento.
 
-    Consulta chamados com status == 'Em Atendimento' e verifica o percentual do SLA
+    Consulta (em lotes keyset, sem teto) chamados com status == 'Em Atendimento'
+    que ainda têm algum dos dois avisos pendente e verifica o percentual do SLA
     de resolução consumido. Se atingiu 50% e ainda não foi notificado, envia aviso.
     Idem para 80%. Cada aviso é enviado no máximo uma vez por chamado.
 
@@ -421,22 +534,26 @@ def processar_avisos_resolucao(agora: datetime | None = None) -> dict:
         "pulados_fora_janela": 0,
     }
 
+    # Chamados com os dois avisos já enviados não têm mais nada a receber.
+    filtros = (
+        ChamadoRow.status == "Em Atendimento",
+        or_(
+            ChamadoRow.alerta_supervisor_50_enviado.is_(False),
+            ChamadoRow.alerta_supervisor_80_enviado.is_(False),
+        ),
+    )
+
     try:
-        with db_module.SessionLocal() as session:
-            stmt = select(ChamadoRow).where(ChamadoRow.status == "Em Atendimento").limit(500)
-            rows = session.execute(stmt).scalars().all()
+        for row in _iterar_chamados_em_lotes(*filtros):
+            stats["processados"] += 1
+            try:
+                _processar_aviso_resolucao(row, agora, stats)
+            except Exception as exc:
+                logger.exception("Avisos resolução: erro ao processar chamado %s: %s", row.id, exc)
+                stats["erros"] += 1
     except Exception as exc:
         logger.exception("Avisos resolução: erro ao consultar chamados: %s", exc)
         stats["erros"] += 1
-        return stats
-
-    for row in rows:
-        stats["processados"] += 1
-        try:
-            _processar_aviso_resolucao(row, agora, stats)
-        except Exception as exc:
-            logger.exception("Avisos resolução: erro ao processar chamado %s: %s", row.id, exc)
-            stats["erros"] += 1
 
     return stats
 
@@ -5,12 +5,16 @@ Prioridade em produção:
   1. Disco local (quando ANEXO_STORAGE_BACKEND=local, Fase 1 on-premise)
   2. Cloudflare R2 (quando R2_ACCOUNT_ID et al. estão configurados)
   3. Disco local (apenas em desenvolvimento, sem R2 configurado)
+
+Arquivos gerados pelo sistema (exportações) seguem a mesma cascata com
+destino próprio: salvar_arquivo_gerado / remover_arquivo_gerado.
 """
 
 import logging
 import os
+import shutil
 from datetime import datetime
-from typing import Any
+from typing import IO, Any
 
 from flask import current_app
 from werkzeug.utils import secure_filename
@@ -228,3 +232,98 @@ def salvar_anexo(arquivo: Any) -> str | None:
         arquivo.stream.seek(0)
     arquivo.save(caminho_completo)
     return nome_final
+
+
+def _gravar_gerado_local(arquivo: IO[bytes], nome_final: str) -> str | None:
+    """Grava em EXPORTACAO_LOCAL_DIR. Retorna 'local:<nome_final>' ou None em falha."""
+    pasta = current_app.config.get("EXPORTACAO_LOCAL_DIR")
+    if not pasta:
+        return None
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        arquivo.seek(0)
+        with open(os.path.join(pasta, nome_final), "wb") as destino:
+            shutil.copyfileobj(arquivo, destino)
+        return f"local:{nome_final}"
+    except OSError as e:
+        logger.warning(
+            "Falha ao gravar arquivo gerado em disco local (%s): %s - %s",
+            nome_final,
+            type(e).__name__,
+            e,
+            exc_info=True,
+        )
+        return None
+
+
+def _gravar_gerado_r2(arquivo: IO[bytes], nome_final: str, content_type: str) -> str | None:
+    """Envia ao R2 sob exportacoes/. Retorna 'r2:exportacoes/<nome_final>' ou None."""
+    s3, bucket, _ = _get_r2_client()
+    if not s3 or not bucket:
+        return None
+    key = f"exportacoes/{nome_final}"
+    try:
+        arquivo.seek(0)
+        s3.upload_fileobj(arquivo, bucket, key, ExtraArgs={"ContentType": content_type})
+        return f"r2:{key}"
+    except Exception as e:
+        logger.warning(
+            "Falha ao enviar arquivo gerado para R2 (%s): %s - %s",
+            nome_final,
+            type(e).__name__,
+            e,
+            exc_info=True,
+        )
+        return None
+
+
+def salvar_arquivo_gerado(arquivo: IO[bytes], nome_final: str, content_type: str) -> str | None:
+    """
+    Grava um arquivo gerado pelo sistema no backend dos anexos, com a mesma
+    cascata de salvar_anexo: local (ANEXO_STORAGE_BACKEND=local) → R2 → local
+    só fora de produção. O disco usado é EXPORTACAO_LOCAL_DIR, fora de
+    app/static — o arquivo só sai pela rota autenticada de download.
+
+    `nome_final` já deve ser seguro (secure_filename). Retorna
+    'local:<nome>' / 'r2:exportacoes/<nome>', ou None se nada gravou.
+    """
+    if current_app.config.get("ANEXO_STORAGE_BACKEND") == "local":
+        chave = _gravar_gerado_local(arquivo, nome_final)
+        if chave:
+            return chave
+        logger.warning(
+            "ANEXO_STORAGE_BACKEND=local falhou ao gravar %s; tentando fallback R2.", nome_final
+        )
+
+    chave = _gravar_gerado_r2(arquivo, nome_final, content_type)
+    if chave:
+        return chave
+
+    if current_app.config.get("ENV") == "production":
+        logger.error("Nenhum armazenamento disponível em produção; %s não foi gravado.", nome_final)
+        return None
+    return _gravar_gerado_local(arquivo, nome_final)
+
+
+def remover_arquivo_gerado(chave: str) -> bool:
+    """Apaga um arquivo gravado por salvar_arquivo_gerado. Retorna True se removeu
+    (ou se já não existia); falhas são logadas, nunca propagadas."""
+    try:
+        if chave.startswith("local:"):
+            nome = secure_filename(chave[len("local:") :])
+            pasta = current_app.config.get("EXPORTACAO_LOCAL_DIR")
+            if not nome or not pasta:
+                return False
+            caminho = os.path.join(pasta, nome)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            return True
+        if chave.startswith("r2:"):
+            s3, bucket, _ = _get_r2_client()
+            if not s3 or not bucket:
+                return False
+            s3.delete_object(Bucket=bucket, Key=chave[len("r2:") :])
+            return True
+    except Exception as e:
+        logger.warning("Falha ao remover arquivo gerado (%s): %s - %s", chave, type(e).__name__, e)
+    return False
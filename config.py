@@ -301,6 +301,13 @@ class Config:
     NOTIFY_EMAIL_ENABLED = _to_bool(
         os.getenv("NOTIFY_EMAIL_ENABLED"), default=(_env == "production")
     )
+    # Janela (segundos) de coalescência dos e-mails de fan-out para observadores
+    # (app/services/notificacao_coalescencia_service.py): eventos do mesmo chamado
+    # para o mesmo destinatário dentro da janela viram um único e-mail-resumo.
+    # 0 = envia na hora (padrão fora de produção).
+    NOTIFY_COALESCE_WINDOW_SECONDS = int(
+        os.getenv("NOTIFY_COALESCE_WINDOW_SECONDS", "60" if _env == "production" else "0")
+    )
 
     # MyMemory Translation API (opcional — aumenta limite de 5k para 10k chars/dia)
     # Cadastre em mymemory.translated.net e defina MYMEMORY_EMAIL nas variáveis de ambiente
@@ -326,6 +333,13 @@ class Config:
     # Criptografia de PII em repouso (LGPD). Gere chave: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
     ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "").strip()
     ENCRYPT_PII_AT_REST = os.getenv("ENCRYPT_PII_AT_REST", "false").lower() in ("true", "1", "yes")
+    # Rotação: chaves Fernet antigas (separadas por vírgula), só para descriptografar.
+    ENCRYPTION_KEYS_ANTERIORES = os.getenv("ENCRYPTION_KEYS_ANTERIORES", "").strip()
+    # Índice cego da busca de usuários (app/services/busca_usuarios.py): chave HMAC
+    # própria (vazia = derivada da ENCRYPTION_KEY). A busca só usa o índice com
+    # BUSCA_USUARIOS_INDICE_CEGO=true, depois de scripts/reindexar_busca_usuarios.py.
+    PII_BLIND_INDEX_KEY = os.getenv("PII_BLIND_INDEX_KEY", "").strip()
+    BUSCA_USUARIOS_INDICE_CEGO = _to_bool(os.getenv("BUSCA_USUARIOS_INDICE_CEGO"), default=False)
 
     # Limite por usuário (relatórios/export): 0 = desativado. Ex.: 10 para máx 10 atualizações/export por usuário por dia.
     RELATORIO_MAX_POR_USUARIO_POR_DIA = int(os.getenv("RELATORIO_MAX_POR_USUARIO_POR_DIA", "0"))
@@ -333,6 +347,26 @@ class Config:
         os.getenv("EXPORT_EXCEL_MAX_POR_USUARIO_POR_DIA", "0")
     )
 
+    # Exportações em segundo plano (app/services/exportacao_service.py): /exportar e
+    # /exportar-avancado só enfileiram o pedido; o arquivo é gerado por thread do
+    # próprio processo (até EXPORTACAO_THREADS_POR_PROCESSO simultâneas; 0 = só o
+    # job do scheduler, a cada minuto) e o link chega por notificação in-app,
+    # válido por EXPORTACAO_TTL_HORAS. Pedido idêntico dentro da janela de reuso
+    # devolve o arquivo já gerado. Desligado em testes (exportação síncrona).
+    EXPORTACAO_ASSINCRONA = _to_bool(
+        os.getenv("EXPORTACAO_ASSINCRONA"), default=(_env != "testing")
+    )
+    EXPORTACAO_THREADS_POR_PROCESSO = int(
+        os.getenv("EXPORTACAO_THREADS_POR_PROCESSO", "0" if _env == "testing" else "1")
+    )
+    EXPORTACAO_TTL_HORAS = int(os.getenv("EXPORTACAO_TTL_HORAS", "24"))
+    EXPORTACAO_JANELA_REUSO_MINUTOS = int(os.getenv("EXPORTACAO_JANELA_REUSO_MINUTOS", "10"))
+    # Disco dos arquivos gerados quando o backend é local (ou fallback de dev).
+    # Nunca dentro de app/static: o download passa pela rota autenticada.
+    EXPORTACAO_LOCAL_DIR = os.getenv("EXPORTACAO_LOCAL_DIR", "").strip() or os.path.join(
+        basedir, "instance", "exportacoes"
+    )
+
     # Logging: nível (DEBUG, INFO, WARNING, ERROR). Em produção use INFO ou WARNING.
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
     # Rotação do arquivo de log: tamanho máximo por arquivo (bytes) e número de backups
@@ -367,3 +401,96 @@ class Config:
 
     # Aviso prévio ao responsável, antes de cada tick de escalonamento.
     SLA_PRE_AVISO_MINUTOS = int(os.getenv("SLA_PRE_AVISO_MINUTOS", "30"))
+
+    # Chamados avaliados em paralelo por execução do motor de escalonamento
+    # (cada tick espera e-mail/push/in-app). Teto de chamadas simultâneas ao
+    # Graph e de conexões do pool do Postgres (5 + 10 overflow) usadas pelo job.
+    # 1 = sequencial (padrão fora de produção; a sessão de teste não é thread-safe).
+    SLA_ESCALACAO_CONCORRENCIA = int(
+        os.getenv("SLA_ESCALACAO_CONCORRENCIA", "4" if _env == "production" else "1")
+    )
+
+    # Eleição de líder do APScheduler (app/services/scheduler_lider.py): com
+    # vários workers Gunicorn, só o que detém o advisory lock do Postgres roda
+    # os jobs; os demais mantêm o scheduler pausado. Ligado em produção.
+    SCHEDULER_ELEICAO_LIDER = _to_bool(
+        os.getenv("SCHEDULER_ELEICAO_LIDER"), default=(_env == "production")
+    )
+    # Intervalo (s) em que o candidato tenta o lock e o líder confere a conexão
+    # — também o tempo máximo sem líder após a queda do atual.
+    SCHEDULER_LIDER_INTERVALO_SEGUNDOS = float(
+        os.getenv("SCHEDULER_LIDER_INTERVALO_SEGUNDOS", "30")
+    )
+
+    # Telemetria dos jobs agendados em job_runs (app/services/job_runs_service.py):
+    # duração, atraso sobre o disparo agendado e contadores de cada execução,
+    # resumidos em GET /api/admin/jobs. Desligada em testes: job exercitado sem
+    # a fixture db_session gravaria direto no banco de teste.
+    JOB_RUNS_ENABLED = _to_bool(os.getenv("JOB_RUNS_ENABLED"), default=(_env != "testing"))
+    # Execuções mais antigas que isso saem na limpeza semanal (domingo 02h00).
+    JOB_RUNS_RETENCAO_DIAS = int(os.getenv("JOB_RUNS_RETENCAO_DIAS", "30"))
+    # Fração do intervalo do gatilho a partir da qual a duração (p95 ou máxima)
+    # acende alerta_sobreposicao no resumo.
+    JOB_RUNS_ALERTA_FRACAO_INTERVALO = float(os.getenv("JOB_RUNS_ALERTA_FRACAO_INTERVALO", "0.8"))
+
+    # Cache L1 em memória (app/cache.py), na frente do Redis opcional: teto de
+    # entradas e de MB por processo (LRU), limites por namespace no formato
+    # "ns=entradas[:mb],..." (entradas 0 = namespace fora do L1), TTL máximo
+    # da cópia local quando há Redis e intervalo da varredura de vencidos
+    # (0 desliga a thread; as entradas ainda vencem na leitura). Desligada em
+    # testes: vários deles trocam threading.Thread por uma versão síncrona.
+    CACHE_L1_MAX_ENTRADAS = int(os.getenv("CACHE_L1_MAX_ENTRADAS", "10000"))
+    CACHE_L1_MAX_MB = float(os.getenv("CACHE_L1_MAX_MB", "64"))
+    CACHE_L1_NAMESPACES = os.getenv("CACHE_L1_NAMESPACES", "status_counts=5000:16")
+    CACHE_L1_TTL_COM_REDIS_SEGUNDOS = float(os.getenv("CACHE_L1_TTL_COM_REDIS_SEGUNDOS", "5"))
+    CACHE_L1_VARREDURA_SEGUNDOS = float(
+        os.getenv("CACHE_L1_VARREDURA_SEGUNDOS", "0" if _env == "testing" else "60")
+    )
+    CACHE_ESTATICO_MAX_ENTRADAS = int(os.getenv("CACHE_ESTATICO_MAX_ENTRADAS", "1000"))
+    # Carregadores do cache (get_cached/get_static_cached): depois do TTL, por
+    # quanto tempo o valor antigo ainda é servido enquanto um único recálculo
+    # roda em background (0 em testes: revalidação fora da fixture db_session),
+    # e quanto um worker espera o outro que detém o lock da chave no Redis.
+    CACHE_STALE_SEGUNDOS = float(
+        os.getenv("CACHE_STALE_SEGUNDOS", "0" if _env == "testing" else "120")
+    )
+    CACHE_LOCK_ESPERA_SEGUNDOS = float(os.getenv("CACHE_LOCK_ESPERA_SEGUNDOS", "10"))
+    # Formato dos valores no Redis: "msgpack" (datetime/date/Decimal voltam com
+    # o tipo original) ou "json" (default=str). A leitura reconhece os dois.
+    CACHE_SERIALIZADOR = os.getenv("CACHE_SERIALIZADOR", "msgpack").strip().lower()
+    # Barramento de invalidação entre workers (app/services/cache_invalidacao.py):
+    # static_cache_delete/cache_delete avisam os outros processos via Redis
+    # pub/sub (ou LISTEN/NOTIFY do Postgres, sem Redis). Com o barramento
+    # conectado, as chaves estáticas invalidadas por evento (categorias) vivem
+    # CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS. Desligado em testes (thread de
+    # escuta presa a uma conexão fora da fixture db_session).
+    CACHE_INVALIDACAO_ENABLED = _to_bool(
+        os.getenv("CACHE_INVALIDACAO_ENABLED"), default=(_env != "testing")
+    )
+    CACHE_INVALIDACAO_RECONEXAO_SEGUNDOS = float(
+        os.getenv("CACHE_INVALIDACAO_RECONEXAO_SEGUNDOS", "5")
+    )
+    CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS = int(
+        os.getenv("CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS", "21600")
+    )
+    # Usuário autenticado em memória por worker (user_loader do Flask-Login):
+    # invalidado por Usuario.save/update/delete (e nos outros workers pelo
+    # barramento); o TTL só limita a defasagem se o barramento estiver fora.
+    # 0 desliga — em testes, que trocam Usuario.get_by_id a cada request.
+    CACHE_USUARIO_SESSAO_SEGUNDOS = float(
+        os.getenv("CACHE_USUARIO_SESSAO_SEGUNDOS", "0" if _env == "testing" else "60")
+    )
+
+    # Diretório de usuários em memória (app/services/diretorio_usuarios.py):
+    # intervalo mínimo entre atualizações incrementais por atualizado_em. Escritas
+    # do próprio worker forçam a atualização na consulta seguinte. 0 desliga — em
+    # testes, que isolam cada caso por savepoint e trocam Usuario.get_all.
+    CACHE_DIRETORIO_USUARIOS_SEGUNDOS = float(
+        os.getenv("CACHE_DIRETORIO_USUARIOS_SEGUNDOS", "0" if _env == "testing" else "15")
+    )
+
+    # Gatilhos temporais por chamado em chamado_timers (escalonamento, avisos
+    # 50%/80%, lembretes de confirmação — ver chamado_timers_service.py): um
+    # despachante a cada minuto processa só os timers vencidos, no lugar das
+    # varreduras de sla_escalacao/lembrete_confirmacao. Desligado por padrão.
+    CHAMADO_TIMERS_ENABLED = _to_bool(os.getenv("CHAMADO_TIMERS_ENABLED"), default=False)
@@ -1,35 +1,36 @@
 """
-Migração Onda 4 — criptografia Fernet dos campos PII (`nome`, `email`) em usuários.
+Criptografia Fernet da PII de usuários (`nome`, `email`, `mfa_secret`) e rotação
+de ENCRYPTION_KEY — Onda 4 (LGPD), agora sobre o PostgreSQL.
 
-Converte documentos com nome/email em plaintext para:
-  - `email`: fernet:v1:<token>
-  - `nome`:  fernet:v1:<token>
-  - `email_lookup_hash`: sha256(email.strip().lower()) em hex
+O trabalho fica em app/services/pii_recriptografia.py: lotes por id, pool de
+processos para o Fernet, UPDATE compare-and-swap por usuário e checkpoint em
+pii_recriptografia_progresso. Idempotente e retomável: matar o processo e
+rodar de novo continua do último lote gravado; depois de concluída, rodar de
+novo faz uma passada nova (pega usuários gravados em plaintext no meio-tempo).
 
-Idempotente: pula docs que já têm email_lookup_hash e email com prefixo fernet:v1:.
+Dois usos:
+  - Criptografia inicial: plaintext → fernet:v1 + email_lookup_hash.
+  - Rotação de chave: chave nova em ENCRYPTION_KEY, antiga(s) em
+    ENCRYPTION_KEYS_ANTERIORES. O app já lê com as duas durante a rotação;
+    ao terminar, remova a antiga de ENCRYPTION_KEYS_ANTERIORES.
 
 Flags:
-  --dry-run   (padrão) Lista o que seria feito, sem gravar nada.
-  --apply     Executa as alterações no Firestore.
-
-ORDEM OBRIGATÓRIA antes de --apply em produção:
-  1. Criar índice Firestore em `email_lookup_hash` (single-field, ASC).
-     Ver firestore.indexes.json, ADR-001 e docs/DEPLOYMENT_PLAN.md §Criptografia PII.
-  2. Fazer backup dos dados (Firestore export).
-  3. Rodar dry-run para confirmar contagem.
-  4. Aplicar migração com --apply (app pode estar rodando; dual-read garante compatibilidade).
-  5. Smoke test: tentar login com usuário migrado.
-  6. Somente após 100% dos docs migrados: definir ENCRYPT_PII_AT_REST=true e reiniciar app.
-
-Exige ENCRYPT_PII_AT_REST=true e ENCRYPTION_KEY válida no ambiente ao rodar --apply.
+  --dry-run     (padrão) Processa uma amostra sem gravar e estima o tempo total.
+  --apply       Grava. Exige ENCRYPT_PII_AT_REST=true e ENCRYPTION_KEY válida.
+  --lote N      Usuários por lote (padrão 500).
+  --workers N   Processos do pool (padrão: nº de CPUs; 1 = sem pool).
+  --amostra N   Tamanho da amostra do dry-run (padrão 2000).
+  --execucao X  Nome da execução (padrão: derivado da ENCRYPTION_KEY).
+  --reiniciar   Descarta o checkpoint da execução e começa do zero.
 
 Uso:
   python scripts/migrations/migrar_pii_criptografia.py            # dry-run
-  python scripts/migrations/migrar_pii_criptografia.py --apply    # executa
+  python scripts/migrations/migrar_pii_criptografia.py --apply    # executa / retoma
 """
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 
@@ -37,59 +38,9 @@ ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)
 os.chdir(ROOT)
 sys.path.insert(0, ROOT)
 
-from app.services.pii_encryption import email_lookup_hash as _pii_email_hash  # noqa: E402
-from scripts.migrations._migration_utils import _commit_batch, _iter_collection_paginated  # noqa: E402
-
-_FERNET_PREFIX = "fernet:v1:"
-
-
-def _decide_migration_update(data: dict, fernet) -> dict | None:
-    """Pure function — decide o que atualizar (ou None para pular).
-
-    Trata 3 estados:
-      (a) prefix + hash    → None (já migrado, skip)
-      (b) prefix + sem hash → apenas adiciona email_lookup_hash (sem re-criptografar)
-      (c) plaintext        → criptografa email + nome + adiciona hash
-
-    Email vazio → None (skip).
-    """
-    email = data.get("email") or ""
-    nome = data.get("nome") or ""
-    has_hash = bool(data.get("email_lookup_hash"))
-    has_prefix = isinstance(email, str) and email.startswith(_FERNET_PREFIX)
-
-    if not email:
-        return None
-
-    # Já migrado completamente
-    if has_prefix and has_hash:
-        return None
-
-    # Parcialmente migrado: criptografado mas sem hash — apenas adiciona hash
-    if has_prefix:
-        token = email[len(_FERNET_PREFIX) :]
-        try:
-            plaintext_email = fernet.decrypt(token.encode("ascii")).decode("utf-8")
-        except Exception as exc:
-            raise ValueError(
-                f"Não foi possível descriptografar email para gerar hash: {exc}"
-            ) from exc
-        return {"email_lookup_hash": _pii_email_hash(plaintext_email)}
-
-    # Plaintext sem hash — migração completa
-    email_enc = _FERNET_PREFIX + fernet.encrypt(email.encode("utf-8")).decode("ascii")
-    nome_enc = (
-        (_FERNET_PREFIX + fernet.encrypt(nome.encode("utf-8")).decode("ascii")) if nome else nome
-    )
-    return {
-        "email": email_enc,
-        "nome": nome_enc,
-        "email_lookup_hash": _pii_email_hash(email),
-    }
-
 
-def _check_env() -> tuple[str, object]:
-    """Valida ambiente e retorna (ENCRYPTION_KEY, Fernet instance). Falha se inválido."""
+def _check_env() -> None:
+    """Falha cedo (exit 1) se o ambiente não permite --apply."""
     encrypt_pii = os.getenv("ENCRYPT_PII_AT_REST", "false").lower() in ("true", "1", "yes")
     if not encrypt_pii:
         print(
@@ -97,148 +48,102 @@ def _check_env() -> tuple[str, object]:
             "\nDefina ENCRYPT_PII_AT_REST=true e ENCRYPTION_KEY antes de rodar --apply."
         )
         sys.exit(1)
-
-    key = os.getenv("ENCRYPTION_KEY", "").strip()
-    if not key:
+    if not os.getenv("ENCRYPTION_KEY", "").strip():
         print(
             "\n[ERRO] ENCRYPTION_KEY não está definida."
             "\nGere com: python scripts/gerar_chave_criptografia.py"
         )
         sys.exit(1)
 
-    try:
-        from cryptography.fernet import Fernet
-
-        f = Fernet(key.encode("ascii"))
-        return key, f
-    except Exception as exc:
-        print(f"\n[ERRO] ENCRYPTION_KEY inválida: {exc}")
-        sys.exit(1)
-
-
-def _init_firebase() -> None:
-    import firebase_admin
-    from firebase_admin import credentials
-
-    try:
-        firebase_admin.get_app()
-    except ValueError:
-        cred_path = os.path.join(ROOT, "credentials.json")
-        if not os.path.exists(cred_path):
-            raise FileNotFoundError(f"credentials.json não encontrado em: {cred_path}") from None
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-
 
-def migrar(db, fernet, dry_run: bool) -> dict:
-    prefix_label = "[DRY-RUN]" if dry_run else "[APPLY]"
-    processados = 0
-    atualizados = 0
-    pulados = 0
-    erros = 0
-    pending: list = []
-
-    print("\n=== usuarios — criptografia PII (nome + email) ===")
-
-    for doc in _iter_collection_paginated(db.collection("usuarios")):
-        processados += 1
-        data = doc.to_dict()
-        email_raw = data.get("email", "")
-
-        try:
-            update = _decide_migration_update(data, fernet)
-        except Exception as exc:
-            print(f"  [ERRO] doc={doc.id}: {exc}")
-            erros += 1
-            continue
-
-        if update is None:
-            if not email_raw:
-                print(f"  [WARN] doc={doc.id} — campo email vazio, pulando")
-            else:
-                print(f"  [SKIP] doc={doc.id} — já migrado")
-            pulados += 1
-            continue
-
-        keys_updating = list(update.keys())
-        print(f"  {prefix_label} doc={doc.id} email={email_raw!r} -> atualizar {keys_updating}")
-
-        if not dry_run:
-            pending.append((doc.reference, update))
-        atualizados += 1
-
-    if not dry_run and pending:
-        _commit_batch(db, pending)
-
-    stats = {
-        "processados": processados,
-        "atualizados": atualizados,
-        "pulados": pulados,
-        "erros": erros,
-    }
-    print(
-        f"\n  Processados: {processados} | Atualizados: {atualizados} "
-        f"| Pulados: {pulados} | Erros: {erros}"
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Criptografa / rotaciona a PII de usuários (retomável)."
     )
-    if erros > 0:
-        print(f"\n  ⚠️  {erros} documento(s) com erro — revise antes de --apply em produção.")
-    return stats
+    parser.add_argument("--apply", action="store_true", default=False)
+    parser.add_argument("--dry-run", action="store_true", default=False)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--amostra", type=int, default=2000)
+    parser.add_argument("--execucao", default=None)
+    parser.add_argument("--reiniciar", action="store_true", default=False)
+    return parser.parse_args(argv)
 
 
-def main() -> None:
-    dry_run = "--apply" not in sys.argv
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    dry_run = not args.apply
 
     print("=" * 60)
     print(f"  migrar_pii_criptografia.py  |  modo: {'DRY-RUN' if dry_run else 'APPLY'}")
     print("=" * 60)
 
-    if dry_run:
-        print("\n  Use --apply para executar as alterações no Firestore.")
-        print(
-            "  Pré-requisitos OBRIGATÓRIOS antes de --apply em produção:\n"
-            "    1. Criar índice Firestore em email_lookup_hash (single-field, ASC)\n"
-            "       firestore.indexes.json já tem a entrada — deploy: firebase deploy --only firestore:indexes\n"
-            "    2. Fazer backup dos dados (Firestore export)\n"
-            "    3. Confirmar contagem com dry-run\n"
-            "    4. Aplicar migração (app pode continuar rodando durante migração)\n"
-            "    5. Somente após 100% migrado: ativar ENCRYPT_PII_AT_REST=true e reiniciar\n"
-        )
-        # Em dry-run não precisa de ENCRYPTION_KEY real — apenas lista
-        _init_firebase()
-        from firebase_admin import firestore as fs
-
-        db = fs.client()
-
-        class _FakeFernet:
-            def encrypt(self, data):
-                return b"<seria_criptografado>"
-
-            def decrypt(self, token):
-                return b"<plaintext_simulado>"
+    if not dry_run:
+        _check_env()
 
-        migrar(db, _FakeFernet(), dry_run=True)
-    else:
-        _, fernet = _check_env()
-        _init_firebase()
-        from firebase_admin import firestore as fs
+    from app import create_app
 
-        db = fs.client()
-        migrar(db, fernet, dry_run=False)
+    app = create_app()
+    with app.app_context():
+        from app.services import pii_recriptografia
 
-    print(
-        "\n=== Concluído"
-        + (" (nenhuma alteração gravada)" if dry_run else " (alterações gravadas)")
-        + " ==="
-    )
+        try:
+            if dry_run:
+                stats = pii_recriptografia.estimar(
+                    lote=args.lote, workers=args.workers, amostra=args.amostra
+                )
+            else:
+                stats = pii_recriptografia.executar(
+                    execucao=args.execucao,
+                    lote=args.lote,
+                    workers=args.workers,
+                    reiniciar=args.reiniciar,
+                )
+        except ValueError as exc:
+            print(f"\n[ERRO] {exc}")
+            sys.exit(1)
+
+        if dry_run:
+            print(
+                f"\n  Usuários: {stats['total']} | Amostra: {stats['amostra']} "
+                f"| Precisam atualizar: {stats['precisam_atualizar']} | Erros: {stats['erros']}"
+            )
+            print(
+                f"  Vazão: {stats['usuarios_por_segundo']} usuários/s "
+                f"| Estimativa total: {stats['estimativa_segundos']} s"
+            )
+            print("\n  Use --apply para gravar (retomável; pode rodar com o app no ar).")
+            return
 
-    if not dry_run:
         print(
-            "\n  Próximo passo: smoke test de login com um usuário migrado."
-            "\n  Se login falhar, verifique se ENCRYPTION_KEY usada no --apply"
-            "\n  é a mesma configurada no servidor."
-            "\n"
-            "\n  Quando 100% dos docs migrados: ative ENCRYPT_PII_AT_REST=true e reinicie a app."
+            f"\n  Execução: {stats['execucao']} | Processados: {stats['processados']} "
+            f"| Atualizados: {stats['atualizados']} | Conflitos: {stats['conflitos']} "
+            f"| Erros: {stats['erros']}"
         )
+        if stats["conflitos"]:
+            print(
+                "  Conflitos = usuários alterados pelo app durante o job;"
+                " rode de novo para pegá-los."
+            )
+        if stats["erros"]:
+            print(
+                "  ⚠️  Há usuários que nenhuma chave abre — confira ENCRYPTION_KEYS_ANTERIORES."
+            )
+
+        if not app.config.get("PII_BLIND_INDEX_KEY"):
+            # Chave do índice de busca derivada da ENCRYPTION_KEY: muda junto.
+            from app.services.busca_usuarios import reindexar_todos
+
+            indice = reindexar_todos(dry_run=False)
+            print(f"  Índice de busca recalculado: {indice['usuarios']} usuários.")
+
+    print("\n=== Concluído (alterações gravadas) ===")
+    print(
+        "\n  Próximo passo: smoke test de login com um usuário migrado."
+        "\n  Criptografia inicial: ative ENCRYPT_PII_AT_REST=true no servidor e reinicie."
+        "\n  Rotação: quando um novo dry-run mostrar 'Precisam atualizar: 0',"
+        " remova a chave antiga de ENCRYPTION_KEYS_ANTERIORES."
+    )
 
 
 if __name__ == "__main__":
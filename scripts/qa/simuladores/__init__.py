@@ -0,0 +1,31 @@
+"""
+Simuladores locais dos serviços externos de notificação/tradução, para teste
+de carga sem tocar em Microsoft Graph, push services reais ou LibreTranslate.
+
+- servidores.py — apps Flask falsos (Graph token/sendMail, endpoint Web Push,
+  LibreTranslate /translate) com latência, taxa de erro e 429 configuráveis.
+- harness.py    — dispara enviar_email / enviar_webpush_usuario /
+  traduzir_varios contra os simuladores em uma taxa alvo e reporta vazão e
+  percentis de latência.
+
+Uso:
+  python -m scripts.qa.simuladores.harness --alvo email --taxa 50 --duracao 20
+"""
+
+from scripts.qa.simuladores.servidores import (
+    Falhas,
+    ServidorLocal,
+    criar_app_graph,
+    criar_app_libretranslate,
+    criar_app_push,
+    iniciar_servidor,
+)
+
+__all__ = [
+    "Falhas",
+    "ServidorLocal",
+    "criar_app_graph",
+    "criar_app_libretranslate",
+    "criar_app_push",
+    "iniciar_servidor",
+]
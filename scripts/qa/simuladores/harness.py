@@ -0,0 +1,291 @@
+"""
+Harness de vazão para notificações e tradução contra os simuladores locais.
+
+Sobe o simulador do alvo escolhido, aponta o app para ele e dispara chamadas
+numa taxa alvo (req/s) durante N segundos, com um pool de threads — o mesmo
+formato de concorrência do gunicorn (1 worker, várias threads). Ao final
+imprime vazão alcançada, sucesso/falha e percentis de latência (p50/p90/p99),
+além do que o simulador de fato recebeu (inclui 429/503 injetados).
+
+Alvos:
+  email   → app.services.notifications.enviar_email (Graph token + sendMail)
+  webpush → app.services.webpush_service.enviar_webpush_usuario
+            (inscrições falsas apontando pro simulador; sem tocar no banco)
+  traducao → app.services.traducao_conteudo_service.traduzir_varios
+            (cache Postgres desligado: toda chamada vai ao simulador)
+
+Uso:
+  python scripts/qa/simuladores/harness.py --alvo email --taxa 50 --duracao 20 \\
+      --latencia-ms 80 --jitter-ms 40 --taxa-429 0.02 --taxa-erro 0.01
+  python scripts/qa/simuladores/harness.py --alvo traducao --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from unittest.mock import patch
+
+_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+os.environ.setdefault("FLASK_ENV", "testing")
+
+from scripts.qa.simuladores.servidores import (  # noqa: E402
+    Falhas,
+    ServidorLocal,
+    criar_app_graph,
+    criar_app_libretranslate,
+    criar_app_push,
+    iniciar_servidor,
+)
+
+ALVOS = ("email", "webpush", "traducao")
+
+
+@dataclass
+class Relatorio:
+    alvo: str
+    taxa_alvo: float
+    duracao_segundos: float
+    disparos: int
+    sucessos: int
+    falhas: int
+    vazao_por_segundo: float
+    latencia_p50_ms: float
+    latencia_p90_ms: float
+    latencia_p99_ms: float
+    latencia_max_ms: float
+    recebido_pelo_simulador: dict[str, int]
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por rank mais próximo (p em 0..100); 0.0 para lista vazia."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    idx = max(0, min(len(ordenados) - 1, round(p / 100.0 * len(ordenados)) - 1))
+    return ordenados[idx]
+
+
+def _b64url(dados: bytes) -> str:
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+
+def _chaves_push_falsas() -> tuple[dict[str, str], str]:
+    """(keys p256dh/auth de um "navegador", chave VAPID privada) geradas na
+    hora — pywebpush cifra de verdade o payload, então precisam ser válidas."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    navegador = ec.generate_private_key(ec.SECP256R1())
+    p256dh = navegador.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    vapid = ec.generate_private_key(ec.SECP256R1())
+    vapid_raw = vapid.private_numbers().private_value.to_bytes(32, "big")
+    return {"p256dh": _b64url(p256dh), "auth": _b64url(os.urandom(16))}, _b64url(vapid_raw)
+
+
+def _preparar_alvo(
+    alvo: str, app, servidor: ServidorLocal, pilha: ExitStack
+) -> Callable[[int], bool]:
+    """Configura app/env para o simulador e devolve a função de um disparo."""
+    if alvo == "email":
+        from app.services.notifications import enviar_email
+
+        pilha.enter_context(
+            patch.dict(
+                os.environ,
+                {
+                    "GRAPH_TENANT_ID": "tenant-simulado",
+                    "GRAPH_CLIENT_ID": "client-simulado",
+                    "GRAPH_CLIENT_SECRET": "segredo-simulado",
+                    "GRAPH_SENDER_EMAIL": "andon@simulado.local",
+                    "GRAPH_LOGIN_BASE_URL": servidor.url,
+                    "GRAPH_API_BASE_URL": servidor.url,
+                },
+            )
+        )
+        app.config["TESTING"] = False
+        app.config["NOTIFY_EMAIL_ENABLED"] = True
+
+        def disparo(i: int) -> bool:
+            ok, _err = enviar_email(
+                f"destino{i % 50}@simulado.local",
+                f"Carga #{i}",
+                "<p>harness</p>",
+                "harness",
+            )
+            return bool(ok)
+
+        return disparo
+
+    if alvo == "webpush":
+        from app.services import webpush_service
+
+        keys, vapid_privada = _chaves_push_falsas()
+        app.config["VAPID_PRIVATE_KEY"] = vapid_privada
+        inscricoes = [
+            {"doc_id": n, "endpoint": f"{servidor.url}/push/disp{n}", "keys": keys}
+            for n in range(2)
+        ]
+        pilha.enter_context(
+            patch.object(webpush_service, "obter_inscricoes", return_value=inscricoes)
+        )
+
+        def disparo(i: int) -> bool:
+            return webpush_service.enviar_webpush_usuario(
+                f"usuario_{i % 50}", titulo=f"Carga #{i}", corpo="harness", url=""
+            ) == len(inscricoes)
+
+        return disparo
+
+    from app.services import traducao_conteudo_service as tcs
+
+    app.config["LIBRETRANSLATE_ENABLED"] = True
+    app.config["LIBRETRANSLATE_URL"] = servidor.url
+    app.config["LIBRETRANSLATE_BATCH_BUDGET_SECONDS"] = None
+    pilha.enter_context(patch.object(tcs, "_buscar_cache", return_value={}))
+    pilha.enter_context(patch.object(tcs, "_persistir_cache"))
+
+    def disparo(i: int) -> bool:
+        textos = [f"Texto de carga {i} item {k}" for k in range(3)]
+        resultado = tcs.traduzir_varios(textos, "en")
+        return all(r.get("traduzido") for r in resultado.values())
+
+    return disparo
+
+
+def _criar_servidor(alvo: str, falhas: Falhas) -> ServidorLocal:
+    fabrica = {
+        "email": criar_app_graph,
+        "webpush": criar_app_push,
+        "traducao": criar_app_libretranslate,
+    }[alvo]
+    return iniciar_servidor(fabrica(falhas))
+
+
+def executar(
+    alvo: str,
+    *,
+    taxa: float,
+    duracao: float,
+    concorrencia: int,
+    falhas: Falhas,
+    app=None,
+) -> Relatorio:
+    """Dispara `taxa` chamadas/s por `duracao` s e mede cada uma."""
+    if alvo not in ALVOS:
+        raise ValueError(f"alvo inválido: {alvo!r} (use {', '.join(ALVOS)})")
+    if app is None:
+        from app import create_app
+
+        app = create_app()
+        app.config["APP_BASE_URL"] = ""
+
+    servidor = _criar_servidor(alvo, falhas)
+    latencias: list[float] = []
+    resultados = {"ok": 0, "falha": 0}
+    lock = threading.Lock()
+
+    def medir(disparo: Callable[[int], bool], i: int) -> None:
+        with app.app_context():
+            inicio = time.perf_counter()
+            try:
+                ok = disparo(i)
+            except Exception:
+                ok = False
+            decorrido = (time.perf_counter() - inicio) * 1000.0
+        with lock:
+            latencias.append(decorrido)
+            resultados["ok" if ok else "falha"] += 1
+
+    try:
+        with ExitStack() as pilha:
+            disparo = _preparar_alvo(alvo, app, servidor, pilha)
+            total = max(1, int(taxa * duracao))
+            intervalo = 1.0 / taxa if taxa > 0 else 0.0
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+                for i in range(total):
+                    # Pacing em malha aberta: agenda pelo relógio, não pelo
+                    # término da anterior — atraso do alvo vira fila, não pausa.
+                    atraso = inicio + i * intervalo - time.perf_counter()
+                    if atraso > 0:
+                        time.sleep(atraso)
+                    pool.submit(medir, disparo, i)
+            decorrido = time.perf_counter() - inicio
+    finally:
+        servidor.parar()
+
+    return Relatorio(
+        alvo=alvo,
+        taxa_alvo=taxa,
+        duracao_segundos=round(decorrido, 3),
+        disparos=len(latencias),
+        sucessos=resultados["ok"],
+        falhas=resultados["falha"],
+        vazao_por_segundo=round(len(latencias) / decorrido, 2) if decorrido else 0.0,
+        latencia_p50_ms=round(percentil(latencias, 50), 2),
+        latencia_p90_ms=round(percentil(latencias, 90), 2),
+        latencia_p99_ms=round(percentil(latencias, 99), 2),
+        latencia_max_ms=round(max(latencias, default=0.0), 2),
+        recebido_pelo_simulador=dict(servidor.contadores),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Harness de vazão contra simuladores locais")
+    parser.add_argument("--alvo", choices=ALVOS, default="email")
+    parser.add_argument("--taxa", type=float, default=20.0, help="Disparos por segundo")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Threads do pool")
+    parser.add_argument("--latencia-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de 503")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração de 429")
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Saída JSON em vez de tabela")
+    args = parser.parse_args()
+
+    # Uma linha de access log por requisição do simulador afoga o relatório.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    relatorio = executar(
+        args.alvo,
+        taxa=args.taxa,
+        duracao=args.duracao,
+        concorrencia=args.concorrencia,
+        falhas=Falhas(
+            latencia_ms=args.latencia_ms,
+            jitter_ms=args.jitter_ms,
+            taxa_erro=args.taxa_erro,
+            taxa_429=args.taxa_429,
+            semente=args.semente,
+        ),
+    )
+
+    if args.json:
+        print(json.dumps(asdict(relatorio), indent=2, ensure_ascii=False))
+    else:
+        for campo, valor in asdict(relatorio).items():
+            print(f"{campo:<26} {valor}")
+    return 0 if relatorio.falhas == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Servidores falsos (Flask + werkzeug, em thread) para Graph, Web Push e
+LibreTranslate.
+
+Cada app recebe um Falhas que controla, por requisição:
+  - latência base + jitter (ms);
+  - taxa_429: fração das requisições que voltam 429 com Retry-After;
+  - taxa_erro: fração que volta 503 (erro transitório do provedor).
+
+Os contadores (total, por status) ficam em app.config["CONTADORES"] para o
+harness conferir o que de fato chegou no "provedor".
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+
+@dataclass
+class Falhas:
+    latencia_ms: float = 0.0
+    jitter_ms: float = 0.0
+    taxa_erro: float = 0.0
+    taxa_429: float = 0.0
+    retry_after_segundos: int = 1
+    semente: int | None = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.semente)
+
+    def sortear(self) -> tuple[float, int | None]:
+        """(segundos de espera, status de falha ou None) para uma requisição."""
+        with self._lock:
+            espera = max(0.0, self.latencia_ms + self._rng.uniform(-1, 1) * self.jitter_ms)
+            r = self._rng.random()
+        if r < self.taxa_429:
+            return espera / 1000.0, 429
+        if r < self.taxa_429 + self.taxa_erro:
+            return espera / 1000.0, 503
+        return espera / 1000.0, None
+
+
+def _novo_app(nome: str, falhas: Falhas) -> Flask:
+    app = Flask(nome)
+    app.config["FALHAS"] = falhas
+    app.config["CONTADORES"] = Counter()
+    app.config["CONTADORES_LOCK"] = threading.Lock()
+    return app
+
+
+def _contar(app: Flask, chave: str) -> None:
+    with app.config["CONTADORES_LOCK"]:
+        app.config["CONTADORES"][chave] += 1
+
+
+def _aplicar_falhas(app: Flask, rota: str):
+    """Dorme a latência sorteada; devolve a resposta de falha, se houver."""
+    falhas: Falhas = app.config["FALHAS"]
+    espera, status = falhas.sortear()
+    if espera:
+        time.sleep(espera)
+    _contar(app, f"{rota}:{status or 'ok'}")
+    if status == 429:
+        resp = jsonify({"error": {"code": "TooManyRequests", "message": "throttled"}})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(falhas.retry_after_segundos)
+        return resp
+    if status == 503:
+        resp = jsonify({"error": {"code": "ServiceUnavailable", "message": "simulado"}})
+        resp.status_code = 503
+        return resp
+    return None
+
+
+def criar_app_graph(falhas: Falhas | None = None) -> Flask:
+    """Token endpoint (login.microsoftonline.com) + sendMail e $batch
+    (graph.microsoft.com).
+
+    Aponte o app com GRAPH_LOGIN_BASE_URL e GRAPH_API_BASE_URL para a URL
+    deste servidor — os dois caminhos convivem no mesmo app.
+    """
+    app = _novo_app("graph_simulado", falhas or Falhas())
+
+    @app.post("/<tenant>/oauth2/v2.0/token")
+    def token(tenant: str):
+        falha = _aplicar_falhas(app, "token")
+        if falha is not None:
+            return falha
+        return jsonify(
+            {"token_type": "Bearer", "expires_in": 3599, "access_token": f"fake-{tenant}"}
+        )
+
+    @app.post("/v1.0/users/<remetente>/sendMail")
+    def send_mail(remetente: str):
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            _contar(app, "sendMail:401")
+            return jsonify({"error": {"code": "InvalidAuthenticationToken"}}), 401
+        falha = _aplicar_falhas(app, "sendMail")
+        if falha is not None:
+            return falha
+        corpo = request.get_json(silent=True) or {}
+        if not corpo.get("message", {}).get("toRecipients"):
+            return jsonify({"error": {"code": "ErrorInvalidRecipients"}}), 400
+        return "", 202
+
+    @app.post("/v1.0/$batch")
+    def batch():
+        """JSON batching: até 20 sendMail por chamada; as falhas sorteadas
+        valem por item (status dentro de "responses"), como no Graph real."""
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            _contar(app, "batch:401")
+            return jsonify({"error": {"code": "InvalidAuthenticationToken"}}), 401
+        itens = (request.get_json(silent=True) or {}).get("requests") or []
+        if not 0 < len(itens) <= 20:
+            return jsonify({"error": {"code": "BadRequest"}}), 400
+        respostas = []
+        for item in itens:
+            falha = _aplicar_falhas(app, "sendMail")
+            if falha is not None:
+                respostas.append(
+                    {"id": item.get("id"), "status": falha.status_code, "body": falha.get_json()}
+                )
+            elif not (item.get("body") or {}).get("message", {}).get("toRecipients"):
+                erro = {"error": {"code": "ErrorInvalidRecipients"}}
+                respostas.append({"id": item.get("id"), "status": 400, "body": erro})
+            else:
+                respostas.append({"id": item.get("id"), "status": 202, "body": None})
+        return jsonify({"responses": respostas})
+
+    return app
+
+
+def criar_app_push(falhas: Falhas | None = None) -> Flask:
+    """Endpoint de push service (FCM/Mozilla autopush): aceita POST cifrado
+    em /push/<id> e responde 201. O id "expirado-*" devolve 410 para
+    exercitar a limpeza de inscrições."""
+    app = _novo_app("push_simulado", falhas or Falhas())
+
+    @app.post("/push/<assinatura>")
+    def push(assinatura: str):
+        if assinatura.startswith("expirado"):
+            _contar(app, "push:410")
+            return "", 410
+        falha = _aplicar_falhas(app, "push")
+        if falha is not None:
+            return falha
+        return "", 201
+
+    return app
+
+
+def criar_app_libretranslate(falhas: Falhas | None = None) -> Flask:
+    """POST /translate no formato do LibreTranslate (q string, source=auto).
+
+    "Traduz" prefixando o idioma destino, e detecta o idioma de origem como
+    "pt" — suficiente para o fluxo de traduzir_varios seguir adiante."""
+    app = _novo_app("libretranslate_simulado", falhas or Falhas())
+
+    @app.post("/translate")
+    def translate():
+        falha = _aplicar_falhas(app, "translate")
+        if falha is not None:
+            return falha
+        corpo = request.get_json(silent=True) or {}
+        texto = corpo.get("q")
+        if not isinstance(texto, str):
+            return jsonify({"error": "q deve ser string"}), 400
+        alvo = corpo.get("target", "en")
+        return jsonify(
+            {
+                "translatedText": f"[{alvo}] {texto}",
+                "detectedLanguage": {"confidence": 90.0, "language": "pt"},
+            }
+        )
+
+    return app
+
+
+@dataclass
+class ServidorLocal:
+    app: Flask
+    url: str
+    _servidor: object = field(repr=False)
+    _thread: threading.Thread = field(repr=False)
+
+    @property
+    def contadores(self) -> Counter:
+        return self.app.config["CONTADORES"]
+
+    def parar(self) -> None:
+        self._servidor.shutdown()
+        self._thread.join(timeout=5)
+
+
+def iniciar_servidor(app: Flask, host: str = "127.0.0.1", porta: int = 0) -> ServidorLocal:
+    """Sobe o app em thread (werkzeug multi-thread); porta 0 = porta livre."""
+    servidor = make_server(host, porta, app, threaded=True)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    return ServidorLocal(
+        app=app,
+        url=f"http://{host}:{servidor.server_port}",
+        _servidor=servidor,
+        _thread=thread,
+    )
@@ -0,0 +1,56 @@
+"""Backfill / recálculo do índice cego da busca de usuários (usuarios_busca).
+
+Necessário uma vez antes de ligar BUSCA_USUARIOS_INDICE_CEGO=true, e de novo
+sempre que PII_BLIND_INDEX_KEY (ou a ENCRYPTION_KEY, se a chave do índice for
+derivada dela) mudar. Por padrão roda em modo dry-run: apenas conta.
+
+Uso:
+    python scripts/reindexar_busca_usuarios.py            # dry-run (só conta)
+    python scripts/reindexar_busca_usuarios.py --apply    # grava o índice
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recalcula o índice cego (usuarios_busca) de todos os usuários."
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        default=False,
+        help="Grava o índice (padrão: dry-run)",
+    )
+    args = parser.parse_args()
+
+    dry_run = not args.apply
+    if dry_run:
+        logger.info("Modo DRY-RUN — nada será gravado.")
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        from app.services.busca_usuarios import reindexar_todos
+
+        try:
+            stats = reindexar_todos(dry_run=dry_run)
+        except ValueError as exc:
+            print(f"[ERRO] {exc}")
+            sys.exit(1)
+
+    prefixo = "[DRY-RUN] " if dry_run else ""
+    print(f"{prefixo}Usuários: {stats['usuarios']} | Tokens: {stats['tokens']}")
+
+
+if __name__ == "__main__":
+    main()
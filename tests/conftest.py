@@ -352,3 +352,37 @@ def db_session(db_engine, monkeypatch, app):
     test_session_factory.remove()
     trans.rollback()
     connection.close()
+
+
+@pytest.fixture
+def db_sem_savepoint(db_engine, app):
+    """Banco de teste SEM o savepoint de db_session: o código usa o SessionLocal
+    real do app (cada sessão com a sua conexão, commits de verdade).
+
+    Para o que depende de sessões de verdade — ex.: o cursor nomeado de
+    filters.iterar_chamados_filtrados, que o savepoint de db_session esconde
+    (todas as sessões dividem uma conexão só). Apaga no fim os chamados,
+    exportações, notificações e usuários criados durante o teste.
+    """
+    from sqlalchemy import delete, func, select
+
+    from app import db as db_module
+    from app.db.models.chamado import ChamadoRow
+    from app.db.models.exportacao import ExportacaoRow
+    from app.db.models.notificacao import NotificacaoRow
+    from app.db.models.usuario import UsuarioRow
+
+    with db_module.SessionLocal.session_factory() as session:
+        ultimo_chamado = session.scalar(select(func.max(ChamadoRow.id))) or 0
+        ultima_exportacao = session.scalar(select(func.max(ExportacaoRow.id))) or 0
+        ultima_notificacao = session.scalar(select(func.max(NotificacaoRow.id))) or 0
+        usuarios = set(session.scalars(select(UsuarioRow.id)))
+
+    yield
+
+    db_module.SessionLocal.remove()
+    with db_module.SessionLocal.session_factory() as session, session.begin():
+        session.execute(delete(ChamadoRow).where(ChamadoRow.id > ultimo_chamado))
+        session.execute(delete(NotificacaoRow).where(NotificacaoRow.id > ultima_notificacao))
+        session.execute(delete(ExportacaoRow).where(ExportacaoRow.id > ultima_exportacao))
+        session.execute(delete(UsuarioRow).where(UsuarioRow.id.not_in(usuarios)))
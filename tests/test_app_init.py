@@ -195,8 +195,8 @@ def test_iniciar_scheduler_import_error_loga_warning(app):
     # Sem raise → o except ImportError foi tratado corretamente
 
 
-def test_iniciar_scheduler_registra_sete_jobs(app):
-    """_iniciar_scheduler registra 7 jobs no scheduler e chama scheduler.start()."""
+def test_iniciar_scheduler_registra_oito_jobs(app):
+    """_iniciar_scheduler registra 8 jobs no scheduler e chama scheduler.start()."""
     from app import _iniciar_scheduler
 
     mock_sched = MagicMock()
@@ -211,8 +211,9 @@ def test_iniciar_scheduler_registra_sete_jobs(app):
     ):
         _iniciar_scheduler(app)
 
-    assert len(add_job_calls) == 7
+    assert len(add_job_calls) == 8
     assert "relatorio_semanal" in add_job_calls
+    assert "relatorio_semanal_reenvio" in add_job_calls
     assert "sla_escalacao" in add_job_calls
     assert "digest_diario" in add_job_calls
     assert "reset_ranking_semanal" in add_job_calls
@@ -223,6 +224,57 @@ def test_iniciar_scheduler_registra_sete_jobs(app):
     mock_sched.start.assert_called_once()
 
 
+def test_todo_job_passa_pelo_lock_por_job(app):
+    """A eleição de líder admite sobreposição no failover (scheduler_lider.py):
+    todo job registrado continua disparando via executar_job_com_lock."""
+    from app import _iniciar_scheduler
+
+    mock_sched = MagicMock()
+    disparos = {}
+    mock_sched.add_job = lambda fn, **kwargs: disparos.setdefault(kwargs["id"], fn)
+
+    with (
+        patch("apscheduler.schedulers.background.BackgroundScheduler", return_value=mock_sched),
+        patch("app.services.scheduler_lock.executar_job_com_lock") as mock_lock,
+        patch("atexit.register"),
+        patch("pytz.timezone"),
+    ):
+        _iniciar_scheduler(app)
+        for disparar in disparos.values():
+            disparar()
+
+    assert sorted(c.args[1] for c in mock_lock.call_args_list) == sorted(disparos)
+
+
+def test_iniciar_scheduler_com_timers_troca_varreduras_pelo_despachante(app):
+    """CHAMADO_TIMERS_ENABLED: sla_escalacao/lembrete_confirmacao dão lugar ao
+    despachante de timers + reconciliação; jobs por usuário continuam."""
+    from app import _iniciar_scheduler
+
+    mock_sched = MagicMock()
+    add_job_calls = []
+    mock_sched.add_job = lambda fn, **kwargs: add_job_calls.append(kwargs.get("id"))
+    app.config["CHAMADO_TIMERS_ENABLED"] = True
+
+    try:
+        with (
+            patch("apscheduler.schedulers.background.BackgroundScheduler", return_value=mock_sched),
+            patch("app.services.scheduler_lock.executar_job_com_lock"),
+            patch("atexit.register"),
+            patch("pytz.timezone"),
+        ):
+            _iniciar_scheduler(app)
+    finally:
+        app.config["CHAMADO_TIMERS_ENABLED"] = False
+
+    assert "chamado_timers" in add_job_calls
+    assert "chamado_timers_reconciliacao" in add_job_calls
+    assert "sla_escalacao" not in add_job_calls
+    assert "lembrete_confirmacao" not in add_job_calls
+    assert "digest_diario" in add_job_calls
+    assert "lembrete_mfa_pendente" in add_job_calls
+
+
 def _capturar_jobs_scheduler(app):
     """Executa _iniciar_scheduler com mock e retorna {job_id: fn_job} via executar_job_com_lock."""
     from app import _iniciar_scheduler
@@ -238,8 +290,12 @@ def _capturar_jobs_scheduler(app):
 
     mock_sched.add_job = mock_add_job
 
-    def fake_executar(a, nome, fn):
-        capturado[nome] = fn
+    def fake_executar(a, nome, fn, **_kwargs):
+        # Mantém o embrulho de telemetria real: é ele que captura e loga a
+        # exceção do job (JOB_RUNS_ENABLED desligado em teste: nada é gravado).
+        from app.services.job_runs_service import executar_com_telemetria
+
+        capturado[nome] = lambda: executar_com_telemetria(a, nome, fn)
 
     with (
         patch("apscheduler.schedulers.background.BackgroundScheduler", return_value=mock_sched),
@@ -264,7 +320,7 @@ def test_job_relatorio_executa_sem_excecao(app):
 
 
 def test_job_relatorio_excecao_logada(app):
-    """_job_relatorio captura exceção e loga via app.logger.exception."""
+    """_job_relatorio: exceção logada pelo embrulho de telemetria, sem propagar."""
     jobs = _capturar_jobs_scheduler(app)
     with patch(
         "app.services.report_service.enviar_relatorio_semanal",
@@ -292,7 +348,7 @@ def test_job_sla_escalacao_executa(app):
 
 
 def test_job_sla_escalacao_excecao_logada(app):
-    """_job_sla_escalacao captura exceção e não propaga."""
+    """_job_sla_escalacao: exceção não propaga (embrulho de telemetria)."""
     jobs = _capturar_jobs_scheduler(app)
     with (
         patch(
@@ -316,7 +372,7 @@ def test_job_digest_diario_executa(app):
 
 
 def test_job_digest_diario_excecao_logada(app):
-    """_job_digest_diario captura exceção e não propaga."""
+    """_job_digest_diario: exceção não propaga (embrulho de telemetria)."""
     jobs = _capturar_jobs_scheduler(app)
     with patch(
         "app.services.digest_diario_service.processar_digest_diario",
@@ -336,7 +392,7 @@ def test_job_reset_ranking_executa(app):
 
 
 def test_job_reset_ranking_excecao_logada(app):
-    """_job_reset_ranking captura exceção e não propaga."""
+    """_job_reset_ranking: exceção não propaga (embrulho de telemetria)."""
     jobs = _capturar_jobs_scheduler(app)
     with patch(
         "app.services.gamification_service.GamificationService.resetar_ranking_semanal",
@@ -353,7 +409,7 @@ def test_job_limpar_contadores_executa(app):
 
 
 def test_job_limpar_contadores_excecao_logada(app):
-    """_job_limpar_contadores captura exceção e não propaga."""
+    """_job_limpar_contadores: exceção não propaga (embrulho de telemetria)."""
     jobs = _capturar_jobs_scheduler(app)
     with patch(
         "app.services.contadores_uso.limpar_contadores_antigos",
@@ -374,7 +430,7 @@ def test_job_lembrete_mfa_executa(app):
 
 
 def test_job_lembrete_mfa_excecao_logada(app):
-    """_job_lembrete_mfa captura exceção e não propaga."""
+    """_job_lembrete_mfa: exceção não propaga (embrulho de telemetria)."""
     jobs = _capturar_jobs_scheduler(app)
     with patch(
         "app.services.mfa_lembrete_service.processar_lembretes_mfa",
@@ -851,3 +907,28 @@ def test_warmup_excecao_nao_propaga():
         test_app.app_context(),
     ):
         captured["target"]()  # deve silenciar a exceção
+
+
+def test_iniciar_scheduler_com_eleicao_sobe_pausado_e_candidata(app):
+    """SCHEDULER_ELEICAO_LIDER: o scheduler sobe pausado e só a eleição
+    (advisory lock no Postgres) o retoma."""
+    from app import _iniciar_scheduler
+
+    mock_sched = MagicMock()
+    app.config["SCHEDULER_ELEICAO_LIDER"] = True
+    try:
+        with (
+            patch("apscheduler.schedulers.background.BackgroundScheduler", return_value=mock_sched),
+            patch("app.services.scheduler_lock.executar_job_com_lock"),
+            patch("atexit.register"),
+            patch("pytz.timezone"),
+            patch("app.services.scheduler_lider.EleicaoLider") as mock_eleicao,
+        ):
+            _iniciar_scheduler(app)
+    finally:
+        app.config["SCHEDULER_ELEICAO_LIDER"] = False
+
+    mock_sched.start.assert_called_once_with(paused=True)
+    mock_eleicao.assert_called_once()
+    assert mock_eleicao.call_args.args[1] is mock_sched
+    mock_eleicao.return_value.iniciar.assert_called_once()
@@ -5,7 +5,12 @@ import sys
 import time
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from app.cache import (
+    _AUSENTE,
+    _CacheL1,
+    _limites_namespace,
     cache_delete,
     cache_get,
     cache_set,
@@ -46,15 +51,13 @@ def test_cache_get_ttl_expirado_remove_chave_memoria():
     import app.cache as cache_mod
 
     key = "test_expired_ttl_key"
-    cache_mod._memory_cache[key] = "dado"
-    cache_mod._MEMORY_TTL[key] = time.time() - 1  # já expirou
-
     with patch("app.cache._get_redis", return_value=None):
-        result = cache_get(key)
+        cache_set(key, "dado", ttl_seconds=1)
+        with patch("app.cache.time.time", return_value=time.time() + 5):
+            result = cache_get(key)
 
     assert result is None
-    assert key not in cache_mod._memory_cache
-    assert key not in cache_mod._MEMORY_TTL
+    assert key not in cache_mod._l1._dados
 
 
 # ── _get_redis ───────────────────────────────────────────────────────────────
@@ -181,6 +184,205 @@ def test_cache_delete_usa_redis_quando_disponivel():
     mock_redis.delete.assert_called_once_with("del_key")
 
 
+def test_msgpack_preserva_datetime_date_e_decimal():
+    from datetime import UTC, date, datetime
+    from decimal import Decimal
+
+    from app.cache import _PREFIXO_MSGPACK, _desserializar, _SerializadorMsgpack
+
+    valor = {
+        "aberto_em": datetime(2026, 10, 19, 8, 30, tzinfo=UTC),
+        "naive": datetime(2026, 10, 19, 8, 30),
+        "dia": date(2026, 10, 19),
+        "custo": Decimal("12.50"),
+        "contagens": {"Aberto": 3},
+        "tags": ("a", "b"),
+    }
+    dados = _SerializadorMsgpack().dumps(valor)
+
+    assert dados.startswith(_PREFIXO_MSGPACK)
+    assert _desserializar(dados) == {**valor, "tags": ["a", "b"]}
+
+
+def test_desserializar_le_json_gravado_antes_do_msgpack():
+    from app.cache import _desserializar
+
+    assert _desserializar(b'{"Aberto": 5}') == {"Aberto": 5}
+    assert _desserializar("5") == 5
+
+
+def test_cache_set_com_serializador_json(monkeypatch):
+    import json
+
+    monkeypatch.setattr("app.cache.Config.CACHE_SERIALIZADOR", "json")
+    mock_redis = MagicMock()
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_set("json_key", {"a": 1}, ttl_seconds=60)
+        cache_delete("json_key")
+    assert json.loads(mock_redis.set.call_args.args[1]) == {"a": 1}
+
+
+def test_cache_get_many_um_mget_so_para_o_que_falta_no_l1():
+    from app.cache import _serializar, cache_get_many
+
+    mock_redis = MagicMock()
+    mock_redis.mget.return_value = [_serializar({"x": 1}), None]
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_delete("many:a")
+        cache_delete("many:b")
+        cache_delete("many:c")
+        cache_set("many:a", [1], ttl_seconds=60)
+        resultado = cache_get_many(["many:a", "many:b", "many:c", "many:a"])
+        assert cache_get("many:b") == {"x": 1}  # cópia L1 gravada pelo MGET
+        for key in ("many:a", "many:b", "many:c"):
+            cache_delete(key)
+
+    assert resultado == {"many:a": [1], "many:b": {"x": 1}}
+    mock_redis.mget.assert_called_once_with(["many:b", "many:c"])
+    mock_redis.get.assert_not_called()
+
+
+def test_cache_get_many_sem_redis_usa_memoria():
+    from app.cache import cache_get_many
+
+    cache_set("mem_many_1", 1, ttl_seconds=60)
+    assert cache_get_many(["mem_many_1", "mem_many_2"]) == {"mem_many_1": 1}
+    cache_delete("mem_many_1")
+
+
+def test_cache_set_many_usa_um_pipeline():
+    from app.cache import _desserializar, cache_set_many
+
+    mock_redis = MagicMock()
+    pipe = mock_redis.pipeline.return_value
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_set_many({"pipe:a": 1, "pipe:b": [2]}, ttl_seconds=30)
+        assert cache_get("pipe:a") == 1  # L1
+        cache_delete("pipe:a")
+        cache_delete("pipe:b")
+
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    gravados = {c.args[0]: _desserializar(c.args[1]) for c in pipe.set.call_args_list}
+    assert gravados == {"pipe:a": 1, "pipe:b": [2]}
+    assert all(c.kwargs["ex"] == 30 for c in pipe.set.call_args_list)
+    pipe.execute.assert_called_once()
+    mock_redis.set.assert_not_called()
+
+
+def test_cache_incr_em_memoria_atomico_sob_concorrencia():
+    import threading
+
+    from app.cache import cache_incr
+
+    cache_delete("contador:paralelo")
+    threads = [
+        threading.Thread(target=lambda: [cache_incr("contador:paralelo", 60) for _ in range(200)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert cache_get("contador:paralelo") == 1600
+    assert cache_incr("contador:paralelo", 60, amount=-600) == 1000
+    cache_delete("contador:paralelo")
+
+
+def test_cache_incr_bounded_em_memoria_para_no_limite():
+    from app.cache import cache_incr_bounded
+
+    cache_delete("contador:limite")
+    assert [cache_incr_bounded("contador:limite", 3, 60) for _ in range(4)] == [1, 2, 3, None]
+    assert cache_incr_bounded("contador:limite", 3, 60, amount=-1) == 2
+    cache_delete("contador:limite")
+
+
+def test_cache_incr_com_redis_um_script_com_ttl():
+    from app.cache import _INCR_LUA, cache_incr
+
+    mock_redis = MagicMock()
+    mock_redis.eval.return_value = 4
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        assert cache_incr("login_attempt:9.9.9.9", 300) == 4
+
+    mock_redis.eval.assert_called_once_with(_INCR_LUA, 1, "login_attempt:9.9.9.9", 1, 300)
+    mock_redis.get.assert_not_called()
+    mock_redis.set.assert_not_called()
+
+
+def test_cache_incr_bounded_com_redis_no_limite_devolve_none():
+    from app.cache import _INCR_LIMITADO_LUA, cache_incr_bounded
+
+    mock_redis = MagicMock()
+    mock_redis.eval.return_value = None
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        assert cache_incr_bounded("cota:u1", 5, 60) is None
+
+    mock_redis.eval.assert_called_once_with(_INCR_LIMITADO_LUA, 1, "cota:u1", 1, 60, 5)
+
+
+def test_cache_incr_redis_falhando_conta_em_memoria():
+    from app.cache import cache_incr
+
+    mock_redis = MagicMock()
+    mock_redis.eval.side_effect = Exception("redis fora")
+    cache_delete("contador:fallback")
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        assert cache_incr("contador:fallback", 60) == 1
+        assert cache_incr("contador:fallback", 60) == 2
+    cache_delete("contador:fallback")
+
+
+def test_get_static_cached_nao_grava_valor_lido_antes_de_invalidacao():
+    """static_cache_delete durante o fetcher: o valor velho não fica no cache."""
+    chamadas = []
+
+    def _fetcher():
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            static_cache_delete("corrida_invalidacao")  # outro request salvou no meio
+        return len(chamadas)
+
+    assert get_static_cached("corrida_invalidacao", _fetcher, ttl_seconds=60) == 1
+    assert get_static_cached("corrida_invalidacao", _fetcher, ttl_seconds=60) == 2
+    assert get_static_cached("corrida_invalidacao", _fetcher, ttl_seconds=60) == 2
+    static_cache_delete("corrida_invalidacao")
+
+
+def test_l1_invalidacao_de_outra_chave_nao_descarta_carga_em_curso():
+    l1 = _CacheL1(max_entradas=10, max_bytes=None)
+    geracao = l1.geracao()
+    l1.remover("categorias_setor")  # outra chave invalidada durante a carga
+    l1.gravar("usuarios_all", ["u1"], 60, geracao=geracao)
+    l1.gravar("categorias_setor", ["velho"], 60, geracao=geracao)
+
+    assert l1.obter("usuarios_all") == ["u1"]
+    assert l1.obter("categorias_setor") is _AUSENTE
+    assert l1.estatisticas()["descartados"] == 1
+
+    l1.gravar("categorias_setor", ["novo"], 60, geracao=l1.geracao())
+    assert l1.obter("categorias_setor") == ["novo"]
+
+
+def test_l1_limpar_descarta_toda_carga_em_curso():
+    l1 = _CacheL1(max_entradas=10, max_bytes=None)
+    geracao = l1.geracao()
+    l1.limpar()
+    l1.gravar("qualquer", 1, 60, geracao=geracao)
+    assert l1.obter("qualquer") is _AUSENTE
+
+
+def test_l1_poda_das_remocoes_rastreadas_continua_segura():
+    l1 = _CacheL1(max_entradas=10, max_bytes=None)
+    geracao = l1.geracao()
+    with patch("app.cache._MAX_REMOCOES_RASTREADAS", 2):
+        for i in range(3):
+            l1.remover(f"k{i}")
+    l1.gravar("k0", "velho", 60, geracao=geracao)
+    assert l1.obter("k0") is _AUSENTE
+
+
 def test_is_redis_available_retorna_true_quando_redis_ativo():
     """is_redis_available retorna True quando _get_redis retorna um cliente."""
     mock_redis = MagicMock()
@@ -231,3 +433,261 @@ def test_static_cache_delete_forca_re_fetch():
     static_cache_delete("sc_del_key")
     get_static_cached("sc_del_key", fetcher, ttl_seconds=300)
     assert fetcher.call_count == 2
+
+
+def test_get_static_cached_padrao_em_erro_nao_fica_em_cache():
+    """Falha do fetcher devolve padrao_em_erro sem guardá-lo: o próximo pedido
+    tenta de novo; sem padrao_em_erro, a exceção propaga."""
+    static_cache_delete("sc_erro_key")
+    fetcher = MagicMock(side_effect=[RuntimeError("db down"), ["setor"]])
+
+    assert get_static_cached("sc_erro_key", fetcher, ttl_seconds=300, padrao_em_erro=[]) == []
+    assert get_static_cached("sc_erro_key", fetcher, ttl_seconds=300, padrao_em_erro=[]) == [
+        "setor"
+    ]
+    assert fetcher.call_count == 2
+
+    static_cache_delete("sc_erro_key")
+    with pytest.raises(RuntimeError):
+        get_static_cached("sc_erro_key", MagicMock(side_effect=RuntimeError("x")), ttl_seconds=1)
+    static_cache_delete("sc_erro_key")
+
+
+# ── L1 limitado (LRU + TTL + namespaces) ─────────────────────────────────────
+
+
+def test_l1_despeja_menos_usada_recentemente():
+    l1 = _CacheL1(max_entradas=2, max_bytes=None)
+    l1.gravar("a", 1, 60)
+    l1.gravar("b", 2, 60)
+    assert l1.obter("a") == 1  # "b" passa a ser a menos usada
+    l1.gravar("c", 3, 60)
+
+    assert l1.obter("b") is _AUSENTE
+    assert (l1.obter("a"), l1.obter("c")) == (1, 3)
+    assert l1.estatisticas()["despejos"] == 1
+
+
+def test_cache_get_devolve_copia_que_o_chamador_pode_mutar():
+    """Mexer no valor lido (ou no que foi gravado) não muda o que o próximo
+    leitor recebe do L1 — como numa leitura do Redis."""
+    with patch("app.cache._get_redis", return_value=None):
+        cache_delete("relatorio:mutavel")
+        original = {"linhas": [{"id": 1}], "total": 1}
+        cache_set("relatorio:mutavel", original, ttl_seconds=60)
+        original["linhas"].append({"id": 2})
+
+        lido = cache_get("relatorio:mutavel")
+        lido["linhas"][0]["id"] = 99
+        lido["total"] = 0
+
+        assert cache_get("relatorio:mutavel") == {"linhas": [{"id": 1}], "total": 1}
+        cache_delete("relatorio:mutavel")
+
+
+def test_l1_limite_por_namespace_despeja_so_o_proprio_namespace():
+    l1 = _CacheL1(max_entradas=100, max_bytes=None, limites_namespace={"status_counts": (2, None)})
+    l1.gravar("outro:1", "x", 60)
+    for i in range(5):
+        l1.gravar(f"status_counts:user{i}", {"Aberto": i}, 60)
+
+    stats = l1.estatisticas()
+    assert stats["namespaces"]["status_counts"]["entradas"] == 2
+    assert l1.obter("outro:1") == "x"
+    assert l1.obter("status_counts:user4") == {"Aberto": 4}
+    assert l1.obter("status_counts:user0") is _AUSENTE
+
+
+def test_l1_teto_de_bytes_e_valor_grande_demais():
+    l1 = _CacheL1(max_entradas=100, max_bytes=4096)
+    l1.gravar("grande", "x" * 10_000, 60)
+    assert l1.obter("grande") is _AUSENTE
+    assert l1.estatisticas()["grandes_demais"] == 1
+
+    for i in range(20):
+        l1.gravar(f"k{i}", "y" * 500, 60)
+    stats = l1.estatisticas()
+    assert stats["bytes"] <= 4096
+    assert 0 < stats["entradas"] < 20
+
+
+def test_l1_varredura_remove_vencidas_sem_leitura():
+    l1 = _CacheL1(max_entradas=100, max_bytes=None)
+    l1.gravar("status_counts:u1", 1, 1)
+    l1.gravar("status_counts:u2", 2, 600)
+
+    with patch("app.cache.time.time", return_value=time.time() + 5):
+        assert l1.varrer() == 1
+
+    stats = l1.estatisticas()
+    assert stats["entradas"] == 1
+    assert stats["bytes"] > 0
+    assert stats["expirados"] == 1
+
+
+def test_limites_namespace_ignora_item_invalido():
+    limites = _limites_namespace("status_counts=500:2, login_attempt=0, lixo, ruim=abc")
+    assert limites == {"status_counts": (500, 2 * 1024 * 1024), "login_attempt": (0, None)}
+
+
+def test_cache_get_com_redis_usa_copia_l1_ate_o_teto():
+    """Com Redis, a 2ª leitura vem do L1; vencido o teto local, volta ao Redis."""
+    import json
+
+    mock_redis = MagicMock()
+    mock_redis.get.return_value = json.dumps([1, 2])
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_delete("relatorio:l1_teste")
+        assert cache_get("relatorio:l1_teste") == [1, 2]
+        assert cache_get("relatorio:l1_teste") == [1, 2]
+        assert mock_redis.get.call_count == 1
+        with patch("app.cache.time.time", return_value=time.time() + 3600):
+            cache_get("relatorio:l1_teste")
+        assert mock_redis.get.call_count == 2
+        cache_delete("relatorio:l1_teste")
+
+
+def test_cache_get_com_redis_nunca_usa_l1_para_login():
+    import json
+
+    mock_redis = MagicMock()
+    mock_redis.get.return_value = json.dumps(3)
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_set("login_attempt:1.2.3.4", 3, ttl_seconds=300)
+        cache_get("login_attempt:1.2.3.4")
+        cache_get("login_attempt:1.2.3.4")
+    assert mock_redis.get.call_count == 2
+
+
+# ── Single-flight / stale-while-revalidate ───────────────────────────────────
+
+
+class _SyncThread:
+    def __init__(self, target=None, **kwargs):
+        self._target = target
+
+    def start(self):
+        self._target()
+
+
+def _em_paralelo(fn, n=8):
+    import threading
+
+    barreira = threading.Barrier(n)
+    resultados = []
+
+    def _run():
+        barreira.wait()
+        resultados.append(fn())
+
+    threads = [threading.Thread(target=_run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return resultados
+
+
+def test_get_static_cached_um_fetcher_para_requisicoes_simultaneas():
+    static_cache_delete("sf_estatico")
+    chamadas = []
+
+    def _fetcher():
+        chamadas.append(1)
+        time.sleep(0.1)
+        return ["usuarios"]
+
+    resultados = _em_paralelo(lambda: get_static_cached("sf_estatico", _fetcher, ttl_seconds=60))
+
+    assert len(chamadas) == 1
+    assert resultados == [["usuarios"]] * 8
+    static_cache_delete("sf_estatico")
+
+
+def test_get_cached_um_fetcher_sem_redis():
+    from app.cache import get_cached
+
+    chamadas = []
+
+    def _fetcher():
+        chamadas.append(1)
+        time.sleep(0.1)
+        return {"total": 3}
+
+    with patch("app.cache._get_redis", return_value=None):
+        cache_delete("relatorio:sf")
+        resultados = _em_paralelo(lambda: get_cached("relatorio:sf", _fetcher, 60))
+        cache_delete("relatorio:sf")
+
+    assert len(chamadas) == 1
+    assert resultados == [{"total": 3}] * 8
+
+
+def test_get_cached_espera_o_worker_que_tem_o_lock_no_redis():
+    """Outro worker detém lock:<chave>: este espera o valor gravado em vez de
+    recalcular."""
+    import json
+
+    from app.cache import get_cached
+
+    envelope = json.dumps({"__fresco_ate": time.time() + 60, "__valor": [1, 2]})
+    mock_redis = MagicMock()
+    mock_redis.get.side_effect = [None, None, None, envelope]
+    mock_redis.set.return_value = False  # SET NX falhou: lock com outro worker
+    fetcher = MagicMock()
+
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_delete("relatorio:lock_outro")
+        assert get_cached("relatorio:lock_outro", fetcher, 60) == [1, 2]
+        cache_delete("relatorio:lock_outro")
+
+    fetcher.assert_not_called()
+
+
+def test_get_cached_com_lock_calcula_grava_e_libera():
+    from app.cache import _desserializar, get_cached
+
+    mock_redis = MagicMock()
+    mock_redis.get.return_value = None
+    mock_redis.set.return_value = True
+
+    with patch("app.cache._get_redis", return_value=mock_redis):
+        cache_delete("relatorio:lock_meu")
+        assert get_cached("relatorio:lock_meu", lambda: [7], 60, stale_seconds=30) == [7]
+        cache_delete("relatorio:lock_meu")
+
+    lock_call, set_call = mock_redis.set.call_args_list
+    assert lock_call.args[0] == "lock:relatorio:lock_meu"
+    assert lock_call.kwargs["nx"] is True
+    assert set_call.kwargs["ex"] == 90  # TTL + janela stale
+    assert _desserializar(set_call.args[1])["__valor"] == [7]
+    assert mock_redis.eval.call_args.args[2] == "lock:relatorio:lock_meu"
+
+
+def test_get_cached_valor_sem_envelope_conta_como_fresco():
+    from app.cache import get_cached
+
+    fetcher = MagicMock()
+    with patch("app.cache.cache_get", return_value=[{"id": 1}]):
+        assert get_cached("analytics_legado", fetcher, 60) == [{"id": 1}]
+    fetcher.assert_not_called()
+
+
+def test_get_static_cached_stale_devolve_antigo_e_revalida():
+    static_cache_delete("swr_estatico")
+    fetcher = MagicMock(side_effect=["antigo", "novo"])
+    get_static_cached("swr_estatico", fetcher, ttl_seconds=1, stale_seconds=60)
+
+    with (
+        patch("app.cache.time.time", return_value=time.time() + 5),
+        patch("app.cache.threading.Thread", _SyncThread),
+    ):
+        assert get_static_cached("swr_estatico", fetcher, ttl_seconds=1, stale_seconds=60) == (
+            "antigo"
+        )
+        assert get_static_cached("swr_estatico", fetcher, ttl_seconds=1, stale_seconds=60) == (
+            "novo"
+        )
+
+    assert fetcher.call_count == 2
+    static_cache_delete("swr_estatico")
@@ -0,0 +1,70 @@
+"""Testes das rotas GET /api/admin/jobs — resumo da telemetria dos jobs
+(job_runs) — e GET /api/admin/cache — ocupação do cache em memória."""
+
+from datetime import UTC, datetime, timedelta
+
+from app import db as db_module
+from app.db.models.job_run import JobRunRow
+
+
+def test_admin_jobs_sem_login_retorna_401(client):
+    resp = client.get("/api/admin/jobs")
+    assert resp.status_code == 401
+
+
+def test_admin_jobs_supervisor_sem_acesso(client_logado_supervisor):
+    """Perfil sem acesso: requer_perfil devolve o redirect para o painel, sem dados."""
+    resp = client_logado_supervisor.get("/api/admin/jobs")
+    assert resp.status_code == 302
+
+
+def test_admin_jobs_devolve_resumo(client_logado_admin, db_session):
+    inicio = datetime.now(UTC) - timedelta(minutes=5)
+    with db_module.SessionLocal() as session, session.begin():
+        session.add(
+            JobRunRow(
+                job="sla_escalacao",
+                inicio=inicio,
+                fim=inicio + timedelta(seconds=540),
+                duracao_ms=540_000,
+                intervalo_segundos=600.0,
+                processados=40,
+                acoes=3,
+                erros=0,
+                sucesso=True,
+                executor="srv:42",
+            )
+        )
+
+    resp = client_logado_admin.get("/api/admin/jobs?dias=1")
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["sucesso"] is True
+    [job] = [j for j in body["dados"] if j["job"] == "sla_escalacao"]
+    assert job["alerta_sobreposicao"] is True
+    assert job["ultimas"][0]["executor"] == "srv:42"
+
+
+def test_admin_jobs_parametro_invalido_retorna_400(client_logado_admin):
+    resp = client_logado_admin.get("/api/admin/jobs?dias=abc")
+    assert resp.status_code == 400
+
+
+def test_admin_cache_devolve_ocupacao_do_l1(client_logado_admin):
+    from app.cache import cache_delete, cache_set
+
+    cache_set("status_counts:rota_teste", {"Aberto": 1}, ttl_seconds=60)
+    try:
+        resp = client_logado_admin.get("/api/admin/cache")
+    finally:
+        cache_delete("status_counts:rota_teste")
+
+    assert resp.status_code == 200
+    dados = resp.get_json()["dados"]
+    assert dados["l1"]["namespaces"]["status_counts"]["entradas"] >= 1
+    assert {"hits", "misses", "despejos", "expirados"} <= set(dados["estatico"])
+
+
+def test_admin_cache_sem_login_retorna_401(client):
+    assert client.get("/api/admin/cache").status_code == 401
@@ -501,3 +501,99 @@ def test_paginar_supervisor_sem_areas_nao_expoe_todos_chamados(
     assert not mock_filtros.called, (
         "aplicar_filtros não deve ser chamado quando _aplicar_filtro_perfil retorna None"
     )
+
+
+# ── GET /api/export/chamados (exportação para BI) ─────────────────────────────
+
+
+def test_api_export_chamados_csv_no_escopo_do_supervisor(client_logado_supervisor, db_session):
+    """Supervisor exporta só a própria área, nas colunas pedidas, em anexo CSV."""
+    from tests.factories import make_chamado
+
+    da_area = make_chamado(
+        area="Manutencao",
+        rl_codigo="RL-BI",
+        status="Aberto",
+        responsavel_id=None,
+        supervisor_ids_com_acesso=["sup_1"],
+    )
+    make_chamado(
+        area="TI", rl_codigo="RL-BI", responsavel_id=None, supervisor_ids_com_acesso=["sup_2"]
+    )
+
+    r = client_logado_supervisor.get("/api/export/chamados?rl_codigo=RL-BI&colunas=id,area,status")
+
+    assert r.status_code == 200
+    assert r.mimetype == "text/csv"
+    assert r.headers["Content-Disposition"].startswith('attachment; filename="chamados_')
+    assert r.get_data(as_text=True).splitlines() == [
+        "id,area,status",
+        f"{da_area.id},Manutencao,Aberto",
+    ]
+
+
+def test_api_export_chamados_parametros_invalidos_retornam_400(client_logado_admin):
+    for query in (
+        "formato=xlsx",
+        "colunas=id,senha",
+        "de=2026-02-30",
+        "de=2026-03-02&ate=2026-03-01",
+    ):
+        r = client_logado_admin.get(f"/api/export/chamados?{query}")
+        assert r.status_code == 400, query
+        assert r.get_json().get("erro")
+
+
+def test_api_export_chamados_parquet_sem_pyarrow_retorna_501(client_logado_admin):
+    with patch("app.routes.api_chamados.parquet_disponivel", return_value=False):
+        r = client_logado_admin.get("/api/export/chamados?formato=parquet")
+    assert r.status_code == 501
+
+
+def test_api_export_chamados_solicitante_recebe_403(client_logado_solicitante):
+    r = client_logado_solicitante.get("/api/export/chamados")
+    assert r.status_code == 403
+
+
+def test_api_export_chamados_supervisor_varios_lotes_em_sessao_real(
+    client_logado_supervisor, db_sem_savepoint
+):
+    """Regressão: a permissão por lote (Usuario.get_by_ids) fechava a sessão do
+    cursor nomeado — o CSV de um supervisor parava no primeiro lote."""
+    from tests.factories import make_chamado
+
+    for _ in range(5):
+        make_chamado(
+            rl_codigo="RL-BI-LOTES",
+            area="Manutencao",
+            solicitante_id="sup_1",
+            responsavel_id="resp_bi",
+            supervisor_ids_com_acesso=["sup_1"],
+        )
+
+    with patch("app.services.filters.LOTE_STREAMING", 2):
+        r = client_logado_supervisor.get("/api/export/chamados?rl_codigo=RL-BI-LOTES&colunas=id")
+
+    assert r.status_code == 200
+    assert len(r.get_data(as_text=True).splitlines()) == 6  # cabeçalho + 5
+
+
+def test_api_export_chamados_falha_no_meio_nao_termina_o_arquivo(client_logado_admin):
+    """Erro depois do primeiro lote chega ao cliente como erro (conexão
+    derrubada), não como um CSV curto terminado normalmente."""
+    from types import SimpleNamespace
+
+    import pytest
+
+    from app.services.exportacao_colunar import COLUNAS_EXPORTAVEIS
+
+    def _lotes(*_args):
+        yield [SimpleNamespace(**(dict.fromkeys(COLUNAS_EXPORTAVEIS) | {"id": 1}))]
+        raise RuntimeError("conexão perdida")
+
+    with (
+        patch("app.routes.api_chamados.lotes_permitidos", side_effect=_lotes),
+        pytest.raises(RuntimeError, match="conexão perdida"),
+    ):
+        r = client_logado_admin.get("/api/export/chamados?colunas=id")
+        r.get_data()
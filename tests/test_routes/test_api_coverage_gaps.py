@@ -724,7 +724,7 @@ def test_notificar_participante_incluido_executa(app):
             "app.routes.api_colaboracao.Usuario.get_by_id", return_value=MagicMock(nome="Sup Novo")
         ),
         patch("app.services.notifications.notificar_participante_incluido") as mock_email,
-        patch("app.services.notifications_inapp.criar_notificacao") as mock_inapp,
+        patch("app.services.notifications_inapp.criar_notificacoes_em_lote") as mock_inapp,
         patch("app.services.webpush_service.enviar_webpush_usuario") as mock_push,
     ):
         _notificar_participante_incluido(
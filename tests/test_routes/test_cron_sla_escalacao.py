@@ -44,7 +44,8 @@ def test_cron_sla_escalacao_token_invalido_retorna_401(client, _sem_redis):
 
 
 def test_cron_sla_escalacao_token_correto_executa_job(client, _sem_redis):
-    """Token correto: chama os 2 processadores (motor unificado + avisos) e retorna sucesso+dados."""
+    """Token correto + ?aguardar=1: chama os 2 processadores (motor unificado +
+    avisos) dentro do request e retorna sucesso+dados."""
     secret = "segredo-teste-cron-valido-32ch"
     with (
         patch.dict(os.environ, {"CRON_SECRET": secret}, clear=False),
@@ -58,7 +59,7 @@ def test_cron_sla_escalacao_token_correto_executa_job(client, _sem_redis):
         ) as mock_avisos,
     ):
         resp = client.post(
-            "/internal/cron/sla-escalacao",
+            "/internal/cron/sla-escalacao?aguardar=1",
             headers={"X-Cron-Token": secret},
         )
 
@@ -105,7 +106,96 @@ def test_cron_sla_escalacao_isento_de_csrf():
         patch("app.services.sla_escalacao_service.processar_avisos_resolucao", return_value={}),
     ):
         resp = client_csrf.post(
-            "/internal/cron/sla-escalacao",
+            "/internal/cron/sla-escalacao?aguardar=1",
             headers={"X-Cron-Token": secret},
         )
     assert resp.status_code == 200
+
+
+# ── Modo assíncrono (padrão): 202 + polling ────────────────────────────────
+
+
+_SECRET = "segredo-teste-cron-valido-32ch"
+
+
+class _SyncThread:
+    """Substitui threading.Thread para rodar o job sincronamente no teste."""
+
+    def __init__(self, target=None, **kwargs):
+        self._target = target
+
+    def start(self):
+        self._target()
+
+
+def test_cron_sla_escalacao_assincrono_retorna_202_e_status(client, _sem_redis, db_session):
+    with (
+        patch.dict(os.environ, {"CRON_SECRET": _SECRET}, clear=False),
+        patch("app.services.job_runs_service.threading.Thread", _SyncThread),
+        patch(
+            "app.services.sla_escalacao_service.processar_escalonamento",
+            return_value={"processados": 3, "escalados": 1},
+        ),
+        patch(
+            "app.services.sla_escalacao_service.processar_avisos_resolucao",
+            return_value={"processados": 0},
+        ),
+    ):
+        resp = client.post("/internal/cron/sla-escalacao", headers={"X-Cron-Token": _SECRET})
+        assert resp.status_code == 202
+        dados = resp.get_json()["dados"]
+        assert dados["nova"] is True
+
+        status = client.get(dados["status_url"], headers={"X-Cron-Token": _SECRET})
+
+    assert status.status_code == 200
+    execucao = status.get_json()["dados"]
+    assert execucao["id"] == dados["execucao_id"]
+    assert execucao["status"] == "sucesso"
+    assert execucao["resultado"]["escalonamento"] == {"processados": 3, "escalados": 1}
+    assert (execucao["processados"], execucao["acoes"]) == (3, 1)
+
+
+def test_cron_sla_escalacao_disparo_concorrente_reaproveita_execucao(
+    client, _sem_redis, db_session
+):
+    """Com uma execução ainda em andamento, novo disparo devolve o mesmo id sem rodar o job."""
+    threads = []
+
+    class _ThreadPendente(_SyncThread):
+        def start(self):
+            threads.append(self)
+
+    with (
+        patch.dict(os.environ, {"CRON_SECRET": _SECRET}, clear=False),
+        patch("app.services.job_runs_service.threading.Thread", _ThreadPendente),
+        patch(
+            "app.services.sla_escalacao_service.processar_escalonamento", return_value={}
+        ) as mock_escalonamento,
+        patch("app.services.sla_escalacao_service.processar_avisos_resolucao", return_value={}),
+    ):
+        primeiro = client.post("/internal/cron/sla-escalacao", headers={"X-Cron-Token": _SECRET})
+        segundo = client.post("/internal/cron/sla-escalacao", headers={"X-Cron-Token": _SECRET})
+        em_andamento = client.get(
+            primeiro.get_json()["dados"]["status_url"], headers={"X-Cron-Token": _SECRET}
+        )
+
+        assert len(threads) == 1
+        mock_escalonamento.assert_not_called()
+        threads[0]._target()
+
+    assert segundo.status_code == 202
+    assert segundo.get_json()["dados"]["nova"] is False
+    assert segundo.get_json()["dados"]["execucao_id"] == primeiro.get_json()["dados"]["execucao_id"]
+    assert em_andamento.get_json()["dados"]["status"] == "em_andamento"
+    mock_escalonamento.assert_called_once()
+
+
+def test_cron_sla_escalacao_status_exige_token_e_execucao_existente(client, _sem_redis, db_session):
+    with patch.dict(os.environ, {"CRON_SECRET": _SECRET}, clear=False):
+        sem_token = client.get("/internal/cron/sla-escalacao/1")
+        inexistente = client.get(
+            "/internal/cron/sla-escalacao/999999999", headers={"X-Cron-Token": _SECRET}
+        )
+    assert sem_token.status_code == 401
+    assert inexistente.status_code == 404
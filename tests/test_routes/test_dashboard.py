@@ -200,14 +200,16 @@ def test_exportar_sem_login_redireciona(client):
 def test_exportar_com_supervisor_retorna_200_ou_redirect(client_logado_supervisor):
     """GET /exportar com supervisor retorna 200 (arquivo) ou redirect em caso de erro (mock)."""
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
         mock_doc = MagicMock()
         mock_doc.to_dict.return_value = {}
         mock_doc.id = "doc1"
-        mock_filtros.return_value = {"docs": [mock_doc]}
-        with patch("app.routes.dashboard._filtrar_chamados_por_permissao") as mock_filtrar:
+        mock_filtros.return_value = iter([[mock_doc]])
+        with patch(
+            "app.services.exportacao_service._filtrar_chamados_por_permissao"
+        ) as mock_filtrar:
             mock_filtrar.return_value = []
             r = client_logado_supervisor.get("/exportar", follow_redirects=False)
     assert r.status_code in (200, 302)
@@ -1438,15 +1440,11 @@ def test_exportar_neutraliza_formula_injection_em_xlsx(client_logado_supervisor)
     )
 
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao") as mock_perm,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao") as mock_perm,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
-        mock_filtros.return_value = {
-            "docs": [MagicMock()],
-            "cursor_next": None,
-            "cursor_prev": None,
-        }
+        mock_filtros.return_value = iter([[MagicMock()]])
         mock_perm.return_value = [chamado]
 
         r = client_logado_supervisor.get("/exportar", follow_redirects=False)
@@ -1473,6 +1471,196 @@ def test_exportar_neutraliza_formula_injection_em_xlsx(client_logado_supervisor)
     )
 
 
+def test_exportar_sem_teto_de_linhas_le_do_banco_em_streaming(client_logado_admin, db_session):
+    """/exportar traz todos os chamados filtrados (sem o antigo teto de 100), com
+    Content-Length do arquivo gerado."""
+    import io
+
+    from openpyxl import load_workbook
+
+    from tests.factories import make_chamado
+
+    for _ in range(105):
+        make_chamado(rl_codigo="RL-EXPORT-STREAM", area="Geral")
+
+    with patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)):
+        r = client_logado_admin.get("/exportar?rl_codigo=RL-EXPORT-STREAM", follow_redirects=False)
+
+    assert r.status_code == 200
+    assert r.content_length == len(r.data)
+    ws = load_workbook(io.BytesIO(r.data)).active
+    assert ws.max_row == 106  # cabeçalho + 105
+
+
+def test_exportar_supervisor_com_varios_lotes_em_sessao_real(
+    client_logado_supervisor, db_sem_savepoint
+):
+    """Regressão: com usuário não-admin, a permissão de cada lote consulta
+    usuarios (Usuario.get_by_ids) pelo SessionLocal() da thread — fechar essa
+    sessão matava o cursor nomeado do streaming e o segundo lote levantava
+    InvalidCursorName. Só aparece em sessão real (o savepoint de db_session
+    põe tudo numa conexão) e com mais linhas que o lote."""
+    import io
+
+    from openpyxl import load_workbook
+
+    from tests.factories import make_chamado
+
+    for _ in range(5):
+        make_chamado(
+            rl_codigo="RL-EXPORT-LOTES",
+            area="Manutencao",
+            solicitante_id="sup_1",
+            responsavel_id="resp_lotes",
+            supervisor_ids_com_acesso=["sup_1"],
+        )
+
+    with (
+        patch("app.services.filters.LOTE_STREAMING", 2),
+        patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
+    ):
+        r = client_logado_supervisor.get("/exportar?rl_codigo=RL-EXPORT-LOTES")
+
+    assert r.status_code == 200
+    assert load_workbook(io.BytesIO(r.data)).active.max_row == 6  # cabeçalho + 5
+
+
+# ── Exportação em segundo plano (EXPORTACAO_ASSINCRONA) ──────────────────────
+
+
+def _usuario_no_banco(usuario_id: str) -> None:
+    from app import db as db_module
+    from app.db.models.usuario import UsuarioRow
+
+    with db_module.SessionLocal() as session, session.begin():
+        session.add(UsuarioRow(id=usuario_id, email=f"{usuario_id}@test.com", nome=usuario_id))
+
+
+def _exportacao_pronta(usuario_id: str, arquivo: str, *, expira_em) -> int:
+    from datetime import UTC, datetime
+
+    from sqlalchemy import update
+
+    from app import db as db_module
+    from app.db.models.exportacao import ExportacaoRow
+    from app.services import exportacao_service
+
+    exportacao, _ = exportacao_service.enfileirar_exportacao(
+        usuario_id, "relatorio", "xlsx", {}, "en"
+    )
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(
+            update(ExportacaoRow)
+            .where(ExportacaoRow.id == exportacao["id"])
+            .values(
+                status="pronto",
+                arquivo=arquivo,
+                nome_arquivo="relatorio_completo.xlsx",
+                concluido_em=datetime.now(UTC),
+                expira_em=expira_em,
+            )
+        )
+    return exportacao["id"]
+
+
+def test_exportar_assincrono_enfileira_e_redireciona(client_logado_admin, db_session):
+    """Com a fila ligada, /exportar grava o pedido e volta ao painel sem gerar nada
+    no request; repetir o pedido não cria outro."""
+    from sqlalchemy import select
+
+    from app import db as db_module
+    from app.db.models.exportacao import ExportacaoRow
+
+    _usuario_no_banco("admin_1")
+    with (
+        patch("app.routes.dashboard.Config.EXPORTACAO_ASSINCRONA", True),
+        patch("app.routes.dashboard.disparar_processamento") as mock_disparar,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+    ):
+        r1 = client_logado_admin.get("/exportar?formato=csv&status=Aberto&pagina=2")
+        r2 = client_logado_admin.get("/exportar?formato=csv&status=Aberto")
+
+    assert r1.status_code == 302 and r2.status_code == 302
+    assert "/admin" in r1.location
+    mock_filtros.assert_not_called()
+    assert mock_disparar.call_count == 1
+    with db_module.SessionLocal() as session:
+        rows = session.execute(select(ExportacaoRow)).scalars().all()
+    assert len(rows) == 1
+    assert (rows[0].tipo, rows[0].formato, rows[0].status) == ("chamados", "csv", "pendente")
+    assert rows[0].parametros["filtros"] == {"status": "Aberto"}
+
+
+def test_exportar_assincrono_reaproveitado_nao_consome_cota(client_logado_admin, db_session):
+    """A cota diária só é cobrada quando um pedido novo entra na fila; repetir um
+    pedido que já está na fila não gasta cota nem esbarra no limite."""
+    _usuario_no_banco("admin_1")
+    with (
+        patch("app.routes.dashboard.Config.EXPORTACAO_ASSINCRONA", True),
+        patch("app.routes.dashboard.Config.EXPORT_EXCEL_MAX_POR_USUARIO_POR_DIA", 1),
+        patch("app.routes.dashboard.disparar_processamento"),
+        patch(
+            "app.routes.dashboard.verificar_e_incrementar_export",
+            side_effect=[(True, None), (False, "limite")],
+        ) as mock_cota,
+    ):
+        r1 = client_logado_admin.get("/exportar?formato=csv")
+        r2 = client_logado_admin.get("/exportar?formato=csv")
+        r3 = client_logado_admin.get("/exportar?formato=xlsx")
+
+    assert r1.status_code == r2.status_code == r3.status_code == 302
+    assert mock_cota.call_count == 2  # o repetido (r2) não cobrou
+    with client_logado_admin.session_transaction() as sess:
+        mensagens = [m for _, m in sess.get("_flashes", [])]
+    assert "limite" in mensagens
+
+
+def test_exportar_assincrono_com_arquivo_pronto_vai_direto_ao_download(
+    client_logado_admin, db_session, app, tmp_path
+):
+    """Pedido idêntico dentro da janela de reuso redireciona ao arquivo já gerado,
+    servido pela rota de download."""
+    from datetime import UTC, datetime, timedelta
+
+    _usuario_no_banco("admin_1")
+    (tmp_path / "pronto.xlsx").write_bytes(b"PK conteudo")
+    exportacao_id = _exportacao_pronta(
+        "admin_1", "local:pronto.xlsx", expira_em=datetime.now(UTC) + timedelta(hours=1)
+    )
+    app.config["EXPORTACAO_LOCAL_DIR"] = str(tmp_path)
+
+    with client_logado_admin.session_transaction() as sess:
+        sess["language"] = "en"
+    with patch("app.routes.dashboard.Config.EXPORTACAO_ASSINCRONA", True):
+        r = client_logado_admin.get("/exportar-avancado")
+    assert r.status_code == 302
+    assert r.location.endswith(f"/exportacoes/{exportacao_id}/download")
+
+    r = client_logado_admin.get(f"/exportacoes/{exportacao_id}/download")
+    assert r.status_code == 200
+    assert r.data == b"PK conteudo"
+    assert "relatorio_completo.xlsx" in r.headers["Content-Disposition"]
+
+
+def test_download_exportacao_de_outro_usuario_ou_vencida(client_logado_admin, db_session):
+    """Só o dono baixa; link vencido volta ao painel em vez de servir o arquivo."""
+    from datetime import UTC, datetime, timedelta
+
+    _usuario_no_banco("outro_usuario")
+    _usuario_no_banco("admin_1")
+    alheia = _exportacao_pronta(
+        "outro_usuario", "local:x.xlsx", expira_em=datetime.now(UTC) + timedelta(hours=1)
+    )
+    vencida = _exportacao_pronta(
+        "admin_1", "local:y.xlsx", expira_em=datetime.now(UTC) - timedelta(minutes=1)
+    )
+
+    assert client_logado_admin.get(f"/exportacoes/{alheia}/download").status_code == 404
+    r = client_logado_admin.get(f"/exportacoes/{vencida}/download")
+    assert r.status_code == 302
+    assert "/admin" in r.location
+
+
 # ── Regressão de segurança: /exportar e /exportar-avancado vazando outras áreas ──
 # Achado em QA manual: supervisor da área "Demo" baixou /exportar e recebeu linhas
 # de chamados da área "Manutencao"; /exportar-avancado trouxe métricas de
@@ -1499,11 +1687,11 @@ def test_exportar_escopa_query_por_supervisor_ids_com_acesso(client_logado_super
     mesmo padrão usado em obter_contexto_admin para o /painel (Postgres:
     ChamadoRow.supervisor_ids_com_acesso.contains([user.id]) em condicoes_base)."""
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao", return_value=[]),
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao", return_value=[]),
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
-        mock_filtros.return_value = {"docs": []}
+        mock_filtros.return_value = iter([])
 
         client_logado_supervisor.get("/exportar", follow_redirects=False)
 
@@ -1522,15 +1710,15 @@ def test_exportar_avancado_escopa_query_por_supervisor_ids_com_acesso(
 ):
     """/exportar-avancado deve escopar a query de chamados da mesma forma que /exportar."""
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao", return_value=[]),
-        patch("app.routes.dashboard.analisador") as mock_anal,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao", return_value=[]),
+        patch("app.services.exportacao_service.analisador") as mock_anal,
         patch("app.services.excel_export_service.exportador_excel") as mock_exp,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
         import io
 
-        mock_filtros.return_value = {"docs": []}
+        mock_filtros.return_value = iter([])
         mock_anal.obter_metricas_gerais.return_value = {}
         mock_anal.obter_metricas_supervisores.return_value = []
         mock_exp.exportar_relatorio_completo.return_value = io.BytesIO(b"PK fake")
@@ -1550,15 +1738,15 @@ def test_exportar_avancado_metricas_supervisores_filtradas_por_area(
     """/exportar-avancado não pode incluir, na aba de Performance, métricas de
     supervisores de áreas diferentes da do usuário que exportou."""
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao", return_value=[]),
-        patch("app.routes.dashboard.analisador") as mock_anal,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao", return_value=[]),
+        patch("app.services.exportacao_service.analisador") as mock_anal,
         patch("app.services.excel_export_service.exportador_excel") as mock_exp,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
         import io
 
-        mock_filtros.return_value = {"docs": []}
+        mock_filtros.return_value = iter([])
         mock_anal.obter_metricas_gerais.return_value = {}
         mock_anal.obter_metricas_supervisores.return_value = [
             {"supervisor_nome": "Sup Mesma Area", "area": "Manutencao"},
@@ -1569,7 +1757,8 @@ def test_exportar_avancado_metricas_supervisores_filtradas_por_area(
         client_logado_supervisor.get("/exportar-avancado", follow_redirects=False)
 
         _, kwargs = mock_exp.exportar_relatorio_completo.call_args
-        metricas_enviadas = kwargs.get("metricas_supervisores") or []
+        # Para não-admin as métricas vão como callable (avaliado após o streaming)
+        metricas_enviadas = kwargs["metricas_supervisores"]()
         areas_enviadas = {m.get("area") for m in metricas_enviadas}
         assert "TI" not in areas_enviadas, (
             "Métricas de supervisor de outra área ('TI') vazaram pro relatório "
@@ -1843,7 +2032,7 @@ def test_exportar_exception_redireciona(client_logado_supervisor):
     """GET /exportar quando ocorre exceção redireciona para painel."""
     with (
         patch(
-            "app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao",
+            "app.services.exportacao_service.iterar_chamados_filtrados",
             side_effect=Exception("timeout"),
         ),
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
@@ -1894,15 +2083,15 @@ def test_exportar_avancado_retorna_xlsx(client_logado_supervisor):
     from unittest.mock import MagicMock, patch
 
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao") as mock_perm,
-        patch("app.routes.dashboard.analisador") as mock_anal,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao") as mock_perm,
+        patch("app.services.exportacao_service.analisador") as mock_anal,
         patch("app.services.excel_export_service.exportador_excel") as mock_exp,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
         import io
 
-        mock_filtros.return_value = {"docs": [MagicMock()]}
+        mock_filtros.return_value = iter([[MagicMock()]])
         mock_perm.return_value = [_mock_chamado_obj()]
         mock_anal.obter_metricas_gerais.return_value = {}
         mock_anal.obter_metricas_supervisores.return_value = []
@@ -1936,12 +2125,12 @@ def test_exportar_avancado_limite_excedido_redireciona(client_logado_supervisor)
 def test_exportar_avancado_exception_redireciona(client_logado_supervisor):
     """GET /exportar-avancado quando serviço lança exceção redireciona."""
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao", return_value=[]),
-        patch("app.routes.dashboard.analisador") as mock_anal,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao", return_value=[]),
+        patch("app.services.exportacao_service.analisador") as mock_anal,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
-        mock_filtros.return_value = {"docs": []}
+        mock_filtros.return_value = iter([])
         mock_anal.obter_metricas_gerais.return_value = {}
         mock_anal.obter_metricas_supervisores.return_value = []
         # exportador_excel.exportar_relatorio_completo vai falhar porque não mockamos
@@ -1955,15 +2144,15 @@ def test_exportar_avancado_com_filtros_no_url(client_logado_supervisor):
     from unittest.mock import patch
 
     with (
-        patch("app.routes.dashboard.aplicar_filtros_dashboard_com_paginacao") as mock_filtros,
-        patch("app.routes.dashboard._filtrar_chamados_por_permissao") as mock_perm,
-        patch("app.routes.dashboard.analisador") as mock_anal,
+        patch("app.services.exportacao_service.iterar_chamados_filtrados") as mock_filtros,
+        patch("app.services.exportacao_service._filtrar_chamados_por_permissao") as mock_perm,
+        patch("app.services.exportacao_service.analisador") as mock_anal,
         patch("app.services.excel_export_service.exportador_excel") as mock_exp,
         patch("app.routes.dashboard.verificar_e_incrementar_export", return_value=(True, None)),
     ):
         import io
 
-        mock_filtros.return_value = {"docs": []}
+        mock_filtros.return_value = iter([])
         mock_perm.return_value = []
         mock_anal.obter_metricas_gerais.return_value = {}
         mock_anal.obter_metricas_supervisores.return_value = []
@@ -1,14 +1,15 @@
 """
-TDD — Polish Onda 4: _decide_migration_update e migrar() com edge cases.
+decidir_atualizacao (app/services/pii_recriptografia.py) e o CLI
+scripts/migrations/migrar_pii_criptografia.py.
 
-Cobre 3 estados de migração + casos limite:
-1. Doc completo (prefix + hash) → None (skip)
+Cobre os estados de migração + casos limite:
+1. Usuário completo (prefix + hash, chave atual) → None (skip)
 2. Plaintext + sem hash → encrypt + hash (migração completa)
 3. Prefix + sem hash → apenas hash (fix do bug de double-encrypt)
 4. Email vazio → None (skip)
-5. migrar() skips doc já migrado
-6. migrar() apply: commita doc elegível
-7. migrar() dry-run: não chama _commit_batch
+5. Prefix de chave anterior → rotaciona para a atual
+6. Nenhuma chave abre → InvalidToken
+7. CLI: dry-run chama estimar; --apply sem ENCRYPT_PII_AT_REST sai com erro
 """
 
 from __future__ import annotations
@@ -17,148 +18,125 @@ import hashlib
 from unittest.mock import MagicMock, patch
 
 import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.services.pii_encryption import ChaveiroPII
+from app.services.pii_recriptografia import decidir_atualizacao
 
 _FERNET_PREFIX = "fernet:v1:"
 
 
 @pytest.fixture(scope="module")
-def fernet():
-    from cryptography.fernet import Fernet
+def chave_antiga():
+    return Fernet.generate_key().decode()
 
-    return Fernet(Fernet.generate_key())
 
+@pytest.fixture(scope="module")
+def chaveiro():
+    return ChaveiroPII(Fernet.generate_key().decode())
 
-def _make_doc(doc_id: str, data: dict) -> MagicMock:
-    doc = MagicMock()
-    doc.id = doc_id
-    doc.to_dict.return_value = data
-    return doc
 
+def _hash(email: str) -> str:
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
 
-# ── _decide_migration_update — pure function ──────────────────────────────────
 
+# ── decidir_atualizacao — pure function ───────────────────────────────────────
 
-def test_decide_doc_completo_retorna_none(fernet):
-    """Doc com prefix + hash já migrado → None (skip)."""
-    from scripts.migrations.migrar_pii_criptografia import _decide_migration_update
 
-    email_enc = _FERNET_PREFIX + fernet.encrypt(b"user@dtx.aero").decode()
-    nome_enc = _FERNET_PREFIX + fernet.encrypt(b"User").decode()
-    data = {"email": email_enc, "nome": nome_enc, "email_lookup_hash": "abc123hash"}
-    assert _decide_migration_update(data, fernet) is None
+def test_decide_usuario_completo_retorna_none(chaveiro):
+    """Prefix + hash certo, tudo na chave atual → None (skip)."""
+    data = {
+        "email": chaveiro.cifrar("user@dtx.aero"),
+        "nome": chaveiro.cifrar("User"),
+        "email_lookup_hash": _hash("user@dtx.aero"),
+    }
+    assert decidir_atualizacao(data, chaveiro) is None
 
 
-def test_decide_plaintext_sem_hash_encripta_e_hash(fernet):
+def test_decide_plaintext_sem_hash_encripta_e_hash(chaveiro):
     """Plaintext + sem hash → dict com email/nome criptografado + hash correto."""
-    from scripts.migrations.migrar_pii_criptografia import _decide_migration_update
-
-    data = {"email": "user@dtx.aero", "nome": "Fulano"}
-    result = _decide_migration_update(data, fernet)
+    result = decidir_atualizacao({"email": "user@dtx.aero", "nome": "Fulano"}, chaveiro)
 
-    assert result is not None
     assert result["email"].startswith(_FERNET_PREFIX)
     assert result["nome"].startswith(_FERNET_PREFIX)
-    assert "email_lookup_hash" in result
-    expected_hash = hashlib.sha256(b"user@dtx.aero").hexdigest()
-    assert result["email_lookup_hash"] == expected_hash
+    assert chaveiro.decifrar(result["nome"]) == "Fulano"
+    assert result["email_lookup_hash"] == _hash("user@dtx.aero")
 
 
-def test_decide_prefix_sem_hash_apenas_adiciona_hash_sem_reencriptar(fernet):
-    """Prefix + sem hash: apenas adiciona email_lookup_hash — não re-criptografa email."""
-    from scripts.migrations.migrar_pii_criptografia import _decide_migration_update
+def test_decide_prefix_sem_hash_apenas_adiciona_hash_sem_reencriptar(chaveiro):
+    """Prefix + sem hash: apenas adiciona email_lookup_hash — não re-criptografa."""
+    data = {
+        "email": chaveiro.cifrar("Partial@dtx.aero"),
+        "nome": chaveiro.cifrar("Nome"),
+        "email_lookup_hash": "",
+    }
 
-    plain = b"partial@dtx.aero"
-    email_enc = _FERNET_PREFIX + fernet.encrypt(plain).decode()
-    data = {"email": email_enc, "nome": "Nome", "email_lookup_hash": ""}
+    result = decidir_atualizacao(data, chaveiro)
 
-    result = _decide_migration_update(data, fernet)
+    assert result == {"email_lookup_hash": _hash("partial@dtx.aero")}
 
-    assert result is not None
-    # email NÃO deve estar no update (já criptografado — fix do double-encrypt)
-    assert "email" not in result, "email não deve ser re-criptografado"
-    assert "nome" not in result, "nome não deve ser re-criptografado"
-    # Apenas hash adicionado
-    assert "email_lookup_hash" in result
-    expected_hash = hashlib.sha256(plain.decode().strip().lower().encode()).hexdigest()
-    assert result["email_lookup_hash"] == expected_hash
 
-
-def test_decide_email_vazio_retorna_none(fernet):
+def test_decide_email_vazio_retorna_none(chaveiro):
     """Email vazio → None (skip sem atualizar)."""
-    from scripts.migrations.migrar_pii_criptografia import _decide_migration_update
+    assert decidir_atualizacao({"email": "", "nome": "X"}, chaveiro) is None
+    assert decidir_atualizacao({"nome": "X"}, chaveiro) is None
 
-    assert _decide_migration_update({"email": "", "nome": "X"}, fernet) is None
-    assert _decide_migration_update({"nome": "X"}, fernet) is None
 
+def test_decide_chave_anterior_rotaciona_para_a_atual(chave_antiga):
+    """Valores da chave antiga (inclusive mfa_secret) são recifrados com a atual."""
+    chave_nova = Fernet.generate_key().decode()
+    antigo = ChaveiroPII(chave_antiga)
+    novo = ChaveiroPII(chave_nova, (chave_antiga,))
+    data = {
+        "email": antigo.cifrar("rot@dtx.aero"),
+        "nome": antigo.cifrar("Rot"),
+        "mfa_secret": antigo.cifrar("JBSWY3DPEHPK3PXP"),
+        "email_lookup_hash": _hash("rot@dtx.aero"),
+    }
 
-# ── migrar() com mocks ────────────────────────────────────────────────────────
+    result = decidir_atualizacao(data, novo)
 
+    assert set(result) == {"email", "nome", "mfa_secret"}
+    assert ChaveiroPII(chave_nova).decifrar(result["mfa_secret"]) == "JBSWY3DPEHPK3PXP"
+    assert decidir_atualizacao({**data, **result}, novo) is None
 
-def test_migrar_doc_completo_skip(fernet):
-    """migrar(): doc já migrado → pulados=1, atualizados=0, _commit_batch não chamado."""
-    email_enc = _FERNET_PREFIX + fernet.encrypt(b"done@dtx.aero").decode()
-    doc = _make_doc(
-        "uid1",
-        {
-            "email": email_enc,
-            "nome": _FERNET_PREFIX + fernet.encrypt(b"Done").decode(),
-            "email_lookup_hash": "somehash",
-        },
-    )
-    db = MagicMock()
 
-    from scripts.migrations.migrar_pii_criptografia import migrar
+def test_decide_nenhuma_chave_abre_levanta(chaveiro):
+    estranho = ChaveiroPII(Fernet.generate_key().decode())
+    with pytest.raises(InvalidToken):
+        decidir_atualizacao({"email": estranho.cifrar("x@dtx.aero")}, chaveiro)
 
-    with (
-        patch(
-            "scripts.migrations.migrar_pii_criptografia._iter_collection_paginated",
-            return_value=iter([doc]),
-        ),
-        patch("scripts.migrations.migrar_pii_criptografia._commit_batch") as mock_commit,
-    ):
-        stats = migrar(db, fernet, dry_run=False)
 
-    assert stats["atualizados"] == 0
-    assert stats["pulados"] == 1
-    mock_commit.assert_not_called()
+# ── CLI ───────────────────────────────────────────────────────────────────────
 
 
-def test_migrar_plaintext_apply_encripta_e_commita(fernet):
-    """migrar() apply: doc plaintext → atualizados=1, _commit_batch chamado uma vez."""
-    doc = _make_doc("uid2", {"email": "novo@dtx.aero", "nome": "Novo"})
-    db = MagicMock()
-
-    from scripts.migrations.migrar_pii_criptografia import migrar
+def test_main_dry_run_so_estima(capsys):
+    from scripts.migrations import migrar_pii_criptografia as cli
 
+    estimativa = {
+        "total": 1000,
+        "amostra": 200,
+        "precisam_atualizar": 150,
+        "erros": 0,
+        "usuarios_por_segundo": 400.0,
+        "estimativa_segundos": 2.5,
+    }
     with (
-        patch(
-            "scripts.migrations.migrar_pii_criptografia._iter_collection_paginated",
-            return_value=iter([doc]),
-        ),
-        patch("scripts.migrations.migrar_pii_criptografia._commit_batch") as mock_commit,
+        patch("app.create_app", return_value=MagicMock()),
+        patch("app.services.pii_recriptografia.estimar", return_value=estimativa) as estimar,
+        patch("app.services.pii_recriptografia.executar") as executar,
     ):
-        stats = migrar(db, fernet, dry_run=False)
-
-    assert stats["atualizados"] == 1
-    assert stats["erros"] == 0
-    mock_commit.assert_called_once()
-
+        cli.main(["--amostra", "200", "--workers", "2"])
 
-def test_migrar_dry_run_nao_chama_commit_batch(fernet):
-    """migrar(dry_run=True): docs elegíveis contados mas _commit_batch NÃO chamado."""
-    doc = _make_doc("uid3", {"email": "dry@dtx.aero", "nome": "Dry"})
-    db = MagicMock()
+    estimar.assert_called_once_with(lote=500, workers=2, amostra=200)
+    executar.assert_not_called()
+    assert "Estimativa total: 2.5 s" in capsys.readouterr().out
 
-    from scripts.migrations.migrar_pii_criptografia import migrar
 
-    with (
-        patch(
-            "scripts.migrations.migrar_pii_criptografia._iter_collection_paginated",
-            return_value=iter([doc]),
-        ),
-        patch("scripts.migrations.migrar_pii_criptografia._commit_batch") as mock_commit,
-    ):
-        stats = migrar(db, fernet, dry_run=True)
+def test_main_apply_exige_encrypt_pii_at_rest(monkeypatch):
+    from scripts.migrations import migrar_pii_criptografia as cli
 
-    assert stats["atualizados"] == 1
-    mock_commit.assert_not_called()
+    monkeypatch.setenv("ENCRYPT_PII_AT_REST", "false")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--apply"])
+    assert exc.value.code == 1
@@ -0,0 +1,148 @@
+"""scripts/qa/simuladores — servidores falsos e harness de vazão.
+
+Testa:
+- Falhas.sortear: latência/429/503 conforme taxas configuradas
+- apps Graph/push/LibreTranslate respondem no formato do provedor real
+- percentil (rank mais próximo)
+- executar(): e-mail via Graph simulado ponta a ponta (notifications_core
+  usando GRAPH_LOGIN_BASE_URL/GRAPH_API_BASE_URL) e tradução com 429 injetado
+"""
+
+import pytest
+
+
+def test_falhas_sem_taxas_nunca_falha():
+    from scripts.qa.simuladores import Falhas
+
+    falhas = Falhas(latencia_ms=10, jitter_ms=0, semente=1)
+    for _ in range(50):
+        espera, status = falhas.sortear()
+        assert status is None
+        assert espera == pytest.approx(0.01)
+
+
+def test_falhas_taxa_429_total_sempre_throttle():
+    from scripts.qa.simuladores import Falhas
+
+    falhas = Falhas(taxa_429=1.0, semente=1)
+    assert {falhas.sortear()[1] for _ in range(20)} == {429}
+
+
+def test_app_graph_token_e_send_mail():
+    from scripts.qa.simuladores import criar_app_graph
+
+    app = criar_app_graph()
+    client = app.test_client()
+
+    token = client.post("/tenant-x/oauth2/v2.0/token", data={"grant_type": "client_credentials"})
+    assert token.status_code == 200
+    assert token.get_json()["access_token"]
+
+    sem_auth = client.post("/v1.0/users/a@x.com/sendMail", json={})
+    assert sem_auth.status_code == 401
+
+    envio = client.post(
+        "/v1.0/users/a@x.com/sendMail",
+        json={"message": {"toRecipients": [{"emailAddress": {"address": "b@x.com"}}]}},
+        headers={"Authorization": "Bearer t"},
+    )
+    assert envio.status_code == 202
+    assert app.config["CONTADORES"]["sendMail:ok"] == 1
+
+
+def test_app_graph_batch_responde_por_item():
+    from scripts.qa.simuladores import criar_app_graph
+
+    app = criar_app_graph()
+    mensagem = {"message": {"toRecipients": [{"emailAddress": {"address": "b@x.com"}}]}}
+    resp = app.test_client().post(
+        "/v1.0/$batch",
+        json={
+            "requests": [
+                {"id": "0", "method": "POST", "url": "/users/a/sendMail", "body": mensagem},
+                {"id": "1", "method": "POST", "url": "/users/a/sendMail", "body": {}},
+            ]
+        },
+        headers={"Authorization": "Bearer t"},
+    )
+
+    assert resp.status_code == 200
+    assert [r["status"] for r in resp.get_json()["responses"]] == [202, 400]
+
+
+def test_app_graph_429_devolve_retry_after():
+    from scripts.qa.simuladores import Falhas, criar_app_graph
+
+    app = criar_app_graph(Falhas(taxa_429=1.0, retry_after_segundos=7))
+    resp = app.test_client().post("/t/oauth2/v2.0/token")
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "7"
+
+
+def test_app_push_expirado_devolve_410():
+    from scripts.qa.simuladores import criar_app_push
+
+    client = criar_app_push().test_client()
+    assert client.post("/push/disp1", data=b"cifrado").status_code == 201
+    assert client.post("/push/expirado-1", data=b"cifrado").status_code == 410
+
+
+def test_app_libretranslate_formato_resposta():
+    from scripts.qa.simuladores import criar_app_libretranslate
+
+    client = criar_app_libretranslate().test_client()
+    resp = client.post("/translate", json={"q": "olá", "source": "auto", "target": "en"})
+    assert resp.get_json() == {
+        "translatedText": "[en] olá",
+        "detectedLanguage": {"confidence": 90.0, "language": "pt"},
+    }
+    assert client.post("/translate", json={"q": ["a", "b"]}).status_code == 400
+
+
+def test_percentil_rank_mais_proximo():
+    from scripts.qa.simuladores.harness import percentil
+
+    valores = [float(v) for v in range(1, 101)]
+    assert percentil(valores, 50) == 50.0
+    assert percentil(valores, 99) == 99.0
+    assert percentil([], 50) == 0.0
+
+
+def test_executar_email_contra_graph_simulado(app):
+    from scripts.qa.simuladores import Falhas
+    from scripts.qa.simuladores.harness import executar
+
+    relatorio = executar(
+        "email", taxa=40, duracao=0.25, concorrencia=4, falhas=Falhas(semente=1), app=app
+    )
+
+    assert relatorio.disparos == 10
+    assert relatorio.sucessos == 10
+    assert relatorio.recebido_pelo_simulador["sendMail:ok"] == 10
+    assert relatorio.latencia_p50_ms > 0
+
+
+def test_executar_traducao_conta_429_como_falha(app):
+    from scripts.qa.simuladores import Falhas
+    from scripts.qa.simuladores.harness import executar
+
+    relatorio = executar(
+        "traducao",
+        taxa=40,
+        duracao=0.25,
+        concorrencia=4,
+        falhas=Falhas(taxa_429=1.0, semente=1),
+        app=app,
+    )
+
+    assert relatorio.sucessos == 0
+    assert relatorio.falhas == relatorio.disparos == 10
+    assert relatorio.recebido_pelo_simulador["translate:429"] == 10
+
+
+def test_executar_alvo_invalido():
+    from scripts.qa.simuladores import Falhas
+    from scripts.qa.simuladores.harness import executar
+
+    with pytest.raises(ValueError):
+        executar("sms", taxa=1, duracao=1, concorrencia=1, falhas=Falhas())
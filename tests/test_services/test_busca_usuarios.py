@@ -0,0 +1,93 @@
+"""Testes do índice cego da busca de usuários (usuarios_busca) contra o
+Postgres de teste, com PII criptografada de verdade."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, select
+
+import app.db as db_module
+from app.db.models.usuario_busca import UsuarioBuscaRow
+from app.models_usuario import Usuario
+from app.services import busca_usuarios
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+@pytest.fixture
+def pii_com_indice():
+    from cryptography.fernet import Fernet
+
+    env = {"ENCRYPT_PII_AT_REST": "true", "ENCRYPTION_KEY": Fernet.generate_key().decode()}
+    with (
+        patch.dict(os.environ, env),
+        patch("app.services.pii_encryption._get_flask_config", return_value=None),
+        patch("config.Config.BUSCA_USUARIOS_INDICE_CEGO", True),
+    ):
+        yield
+
+
+def _tokens_gravados(usuario_id):
+    with db_module.SessionLocal() as session:
+        return set(
+            session.execute(
+                select(UsuarioBuscaRow.token).where(UsuarioBuscaRow.usuario_id == usuario_id)
+            ).scalars()
+        )
+
+
+def test_tokens_nao_contem_texto_e_normalizam_acento_e_caixa(pii_com_indice):
+    from app.services.pii_encryption import blind_index_key
+
+    chave = blind_index_key()
+    tokens = busca_usuarios.tokens_usuario(chave, "João", "jo@b.com")
+
+    assert busca_usuarios.tokens_usuario(chave, "JOAO", "JO@B.COM") == tokens
+    assert busca_usuarios.tokens_busca(chave, "Joã") <= tokens
+    assert all(len(t) == 16 and set(t) <= set("0123456789abcdef") for t in tokens)
+    assert busca_usuarios.tokens_busca(chave, "j") is None
+
+
+def test_save_e_update_mantem_o_indice(pii_com_indice):
+    usuario = Usuario(id="bi_1", email="julia@dtx.aero", nome="Júlia Salgado")
+    assert usuario.save()
+    antes = _tokens_gravados("bi_1")
+    assert antes
+
+    usuario.update(nome="Marcos")
+
+    depois = _tokens_gravados("bi_1")
+    assert depois != antes
+    assert busca_usuarios.buscar_ids("marcos") == {"bi_1"}
+    assert busca_usuarios.buscar_ids("salgado") == set()
+
+
+def test_buscar_ativos_pelo_indice_so_descriptografa_candidatos(pii_com_indice):
+    Usuario(id="bi_julia", email="julia@dtx.aero", nome="Julia Salgado").save()
+    Usuario(id="bi_jul_inativo", email="jul@dtx.aero", nome="Júlio Reis", ativo=False).save()
+    Usuario(id="bi_outro", email="pedro@dtx.aero", nome="Pedro Lima").save()
+
+    with patch.object(Usuario, "get_all", side_effect=AssertionError("sem índice")):
+        assert [u.id for u in Usuario.buscar_ativos("Júlia")] == ["bi_julia"]
+        assert [u.id for u in Usuario.buscar_ativos("ul")] == ["bi_julia"]
+        assert [u.id for u in Usuario.buscar_ativos("pedro@")] == ["bi_outro"]
+        assert Usuario.buscar_ativos("xyz") == []
+
+
+def test_indice_desligado_usa_o_caminho_antigo(pii_com_indice):
+    with patch("config.Config.BUSCA_USUARIOS_INDICE_CEGO", False):
+        assert busca_usuarios.buscar_ids("julia") is None
+
+
+def test_reindexar_todos_faz_backfill(pii_com_indice):
+    Usuario(id="bi_a", email="a@dtx.aero", nome="Ana").save()
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(delete(UsuarioBuscaRow))
+
+    assert busca_usuarios.reindexar_todos(dry_run=True)["usuarios"] >= 1
+    assert busca_usuarios.buscar_ids("ana") == set()
+
+    busca_usuarios.reindexar_todos(dry_run=False)
+
+    assert busca_usuarios.buscar_ids("ana") == {"bi_a"}
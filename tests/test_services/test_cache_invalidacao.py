@@ -0,0 +1,120 @@
+"""Testes do barramento de invalidação de cache entre workers.
+
+Dois BarramentoInvalidacao no mesmo processo fazem o papel de dois workers
+(cada um com a própria origem). O caminho LISTEN/NOTIFY roda contra o
+Postgres de teste de verdade; o do Redis, com um pubsub mockado.
+"""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import cache
+from app.services import cache_invalidacao as ci
+from app.services.cache_invalidacao import CANAL, BarramentoInvalidacao
+
+
+@pytest.fixture
+def barramentos():
+    criados: list[BarramentoInvalidacao] = []
+
+    def _novo(engine=None, **kwargs) -> BarramentoInvalidacao:
+        barramento = BarramentoInvalidacao(engine, intervalo_segundos=0.05, **kwargs)
+        criados.append(barramento)
+        return barramento
+
+    yield _novo
+    for barramento in criados:
+        barramento.parar()
+
+
+def _esperar(condicao, limite: float = 5.0) -> bool:
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_tratar_remove_chave_de_outra_origem(barramentos):
+    cache._l1_estatico.gravar("inv_teste", [1], 60)
+    b = barramentos()
+
+    payload = json.dumps({"tipo": "estatico", "chave": "inv_teste", "origem": "outro:1:x"})
+
+    assert b.tratar(payload) is True
+    assert cache._l1_estatico.obter("inv_teste") is cache._AUSENTE
+
+
+def test_tratar_ignora_a_propria_origem_e_mensagem_invalida(barramentos):
+    cache._l1_estatico.gravar("inv_proprio", [1], 60)
+    b = barramentos()
+
+    proprio = json.dumps({"tipo": "estatico", "chave": "inv_proprio", "origem": b.origem})
+
+    assert b.tratar(proprio) is False
+    assert b.tratar("não é json") is False
+    assert b.tratar(json.dumps({"tipo": "outro", "chave": "inv_proprio"})) is False
+    assert cache._l1_estatico.obter("inv_proprio") == [1]
+    cache.static_cache_delete("inv_proprio")
+
+
+def test_listen_notify_invalida_outro_worker(db_engine, barramentos):
+    ouvinte = barramentos(db_engine)
+    emissor = barramentos(db_engine)
+    ouvinte.iniciar()
+    assert _esperar(lambda: ouvinte.ativo)
+    cache._l1_estatico.gravar("inv_pg", ["setor antigo"], 60)
+
+    emissor.publicar("estatico", "inv_pg")
+
+    assert _esperar(lambda: cache._l1_estatico.obter("inv_pg") is cache._AUSENTE)
+
+
+def test_redis_pubsub_assina_canal_e_aplica_mensagens(barramentos):
+    cache._l1.gravar("inv_l1", {"a": 1}, 60)
+    cache._l1_estatico.gravar("inv_reconexao", [1], 60)
+    mensagens = [{"type": "message", "data": json.dumps({"tipo": "l1", "chave": "inv_l1"})}]
+    pubsub = MagicMock()
+    pubsub.get_message.side_effect = lambda timeout: mensagens.pop() if mensagens else None
+    redis = MagicMock()
+    redis.pubsub.return_value = pubsub
+    b = barramentos(redis_cliente=redis)
+
+    b.iniciar()
+
+    assert _esperar(lambda: cache._l1.obter("inv_l1") is cache._AUSENTE)
+    pubsub.subscribe.assert_called_once_with(CANAL)
+    assert b.ativo is True
+    # Ao conectar, descarta o cache estático (invalidações perdidas).
+    assert cache._l1_estatico.obter("inv_reconexao") is cache._AUSENTE
+
+
+def test_publicar_no_redis(barramentos):
+    redis = MagicMock()
+    b = barramentos(redis_cliente=redis)
+
+    b.publicar("estatico", "categorias_setor")
+
+    canal, payload = redis.publish.call_args.args
+    assert canal == CANAL
+    assert json.loads(payload) == {
+        "tipo": "estatico",
+        "chave": "categorias_setor",
+        "origem": b.origem,
+    }
+
+
+def test_static_cache_delete_publica_e_ttl_estende_com_barramento(barramentos):
+    b = barramentos(redis_cliente=MagicMock())
+    b._conectado = True
+
+    with patch.object(ci, "_barramento", b), patch.object(ci, "_barramento_pid", ci.os.getpid()):
+        cache.static_cache_delete("categorias_setor")
+        assert cache.ttl_invalidavel(1800) == cache.Config.CACHE_ESTATICO_TTL_INVALIDAVEL_SEGUNDOS
+
+    b._redis.publish.assert_called_once()
+    assert cache.ttl_invalidavel(1800) == 1800
@@ -159,7 +159,7 @@ class TestNotificarCancelamentoChamado:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_cancelamento_chamado(
@@ -188,7 +188,7 @@ class TestNotificarCancelamentoChamado:
                 return_value=[sup, obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_cancelamento_chamado(
@@ -230,6 +230,40 @@ class TestNotificarCancelamentoChamado:
 
         mock_email.assert_not_called()
 
+    def test_html_montado_uma_vez_para_todos_destinatarios(self):
+        """O corpo do e-mail não depende do destinatário: é montado uma única
+        vez por evento e reaproveitado no fan-out (antes era refeito por usuário)."""
+        from app.services.chamado_notificacao_service import notificar_cancelamento_chamado
+
+        destinatarios = [_usuario_mock(f"u{i}", f"U{i}", f"u{i}@test.com") for i in range(5)]
+
+        with (
+            patch(
+                "app.services.chamado_notificacao_service.destinatarios_do_chamado",
+                return_value=destinatarios,
+            ),
+            patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
+            patch("app.services.chamado_notificacao_service.webpush_service"),
+            patch(
+                "app.services.chamado_notificacao_service.build_email_shell",
+                return_value="<html/>",
+            ) as mock_shell,
+        ):
+            mock_email.return_value = (True, None)
+            notificar_cancelamento_chamado(
+                chamado_id="ch_1",
+                numero_chamado="CH-001",
+                categoria="TI",
+                motivo="Problema resolvido",
+                solicitante_nome="João",
+                dados_chamado={},
+            )
+
+        assert mock_email.call_count == 5
+        mock_shell.assert_called_once()
+        assert {c.args[2] for c in mock_email.call_args_list} == {"<html/>"}
+
 
 class TestNotificarEdicaoDescricaoSolicitante:
     def test_email_enviado_ao_responsavel_e_observadores(self):
@@ -245,7 +279,7 @@ class TestNotificarEdicaoDescricaoSolicitante:
                 return_value=[sup, obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_edicao_descricao_solicitante(
@@ -275,7 +309,7 @@ class TestNotificarEdicaoDescricaoSolicitante:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_edicao_descricao_solicitante(
@@ -334,7 +368,7 @@ class TestNotificarObservadoresCriacao:
         with (
             patch("app.services.chamado_notificacao_service.Usuario") as mock_uclass,
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_uclass.get_by_id.side_effect = lambda uid: {
@@ -384,7 +418,7 @@ class TestNotificarObservadoresCriacao:
         with (
             patch("app.services.chamado_notificacao_service.Usuario") as mock_uclass,
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_uclass.get_by_id.side_effect = lambda uid: {
@@ -416,7 +450,7 @@ class TestNotificarObservadoresCriacao:
                 return_value=[usuario_sem_email],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             notificar_cancelamento_chamado(
                 chamado_id="ch_1",
@@ -486,7 +520,7 @@ class TestNotificarAnexoTardioChamado:
                 return_value=[sup, obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_anexo_tardio_chamado(
@@ -516,7 +550,7 @@ class TestNotificarAnexoTardioChamado:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_anexo_tardio_chamado(
@@ -574,7 +608,7 @@ class TestNotificarRespostaSolicitanteChamado:
                 return_value=[sup, obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_resposta_solicitante_chamado(
@@ -605,7 +639,7 @@ class TestNotificarRespostaSolicitanteChamado:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_resposta_solicitante_chamado(
@@ -711,7 +745,7 @@ class TestNotificarRespostaSupervisorChamado:
                 return_value=[sol, obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_resposta_supervisor_chamado(
@@ -742,7 +776,7 @@ class TestNotificarRespostaSupervisorChamado:
                 return_value=[sol],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_resposta_supervisor_chamado(
@@ -798,7 +832,7 @@ class TestNotificarRespostaSupervisorChamado:
                 return_value=[sol],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_resposta_supervisor_chamado(
@@ -836,7 +870,9 @@ class TestInAppEWebPushNotificacoes:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_edicao_descricao_solicitante(
                 chamado_id="ch_1",
@@ -848,7 +884,7 @@ class TestInAppEWebPushNotificacoes:
                 dados_chamado=self._dados(),
             )
         mock_inapp.assert_called_once()
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_edicao_descricao"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_edicao_descricao"
 
     def test_inapp_criada_em_anexo_tardio(self):
         """notificar_anexo_tardio_chamado cria in-app para cada destinatário."""
@@ -863,7 +899,9 @@ class TestInAppEWebPushNotificacoes:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_anexo_tardio_chamado(
                 chamado_id="ch_1",
@@ -875,7 +913,7 @@ class TestInAppEWebPushNotificacoes:
                 dados_chamado=self._dados(),
             )
         mock_inapp.assert_called_once()
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_anexo_tardio"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_anexo_tardio"
 
     def test_inapp_criada_em_cancelamento(self):
         """notificar_cancelamento_chamado cria in-app para cada destinatário."""
@@ -890,7 +928,9 @@ class TestInAppEWebPushNotificacoes:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_cancelamento_chamado(
                 chamado_id="ch_1",
@@ -901,7 +941,7 @@ class TestInAppEWebPushNotificacoes:
                 dados_chamado=self._dados(),
             )
         mock_inapp.assert_called_once()
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_cancelamento"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_cancelamento"
 
     def test_webpush_enviado_em_edicao_descricao(self, app):
         """notificar_edicao_descricao_solicitante envia web push por destinatário."""
@@ -917,7 +957,7 @@ class TestInAppEWebPushNotificacoes:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.webpush_service.enviar_webpush_usuario") as mock_push,
         ):
             notificar_edicao_descricao_solicitante(
@@ -945,7 +985,7 @@ class TestInAppEWebPushNotificacoes:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.webpush_service.enviar_webpush_usuario") as mock_push,
         ):
             notificar_anexo_tardio_chamado(
@@ -977,7 +1017,7 @@ class TestEmailShellEstrutura:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_cancelamento_chamado(
@@ -1002,7 +1042,7 @@ class TestEmailShellEstrutura:
                 return_value=[sup],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_edicao_descricao_solicitante(
@@ -1032,7 +1072,9 @@ class TestNotificarObservadoresMudancaStatus:
                 return_value=[obs1, obs2],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             mock_email.return_value = (True, None)
             notificar_observadores_mudanca_status(
@@ -1047,7 +1089,9 @@ class TestNotificarObservadoresMudancaStatus:
             )
 
         assert mock_email.call_count == 2
-        assert mock_inapp.call_count == 2
+        # in-app de todos os destinatários num único INSERT em lote
+        mock_inapp.assert_called_once()
+        assert [n["usuario_id"] for n in mock_inapp.call_args.args[0]] == ["obs_1", "obs_2"]
 
     def test_sem_observadores_nao_envia_nada(self):
         """Sem destinatários → nenhum email ou in-app."""
@@ -1059,7 +1103,9 @@ class TestNotificarObservadoresMudancaStatus:
                 return_value=[],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_observadores_mudanca_status(
                 chamado_id="ch_1",
@@ -1084,7 +1130,7 @@ class TestNotificarObservadoresMudancaStatus:
                 return_value=[obs],
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
         ):
             mock_email.return_value = (True, None)
             notificar_observadores_mudanca_status(
@@ -1119,7 +1165,9 @@ class TestNotificarObservadoresMudancaStatusLacunas:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_observadores_mudanca_status(
                 chamado_id="ch_1",
@@ -1128,7 +1176,7 @@ class TestNotificarObservadoresMudancaStatusLacunas:
                 novo_status="Concluído",
                 dados_chamado=self._dados(),
             )
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_status_concluido"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_status_concluido"
 
     def test_tipo_inapp_em_atendimento_usa_observador_status_em_atendimento(self):
         """Lacuna 2: tipo in-app para 'Em Atendimento' deve ser 'observador_status_em_atendimento'."""
@@ -1143,7 +1191,9 @@ class TestNotificarObservadoresMudancaStatusLacunas:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_observadores_mudanca_status(
                 chamado_id="ch_1",
@@ -1152,7 +1202,7 @@ class TestNotificarObservadoresMudancaStatusLacunas:
                 novo_status="Em Atendimento",
                 dados_chamado=self._dados(),
             )
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_status_em_atendimento"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_status_em_atendimento"
 
     def test_webpush_enviado_por_destinatario(self, app):
         """Lacuna 1: web push enviado para cada destinatário em mudança de status."""
@@ -1168,7 +1218,7 @@ class TestNotificarObservadoresMudancaStatusLacunas:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.webpush_service.enviar_webpush_usuario") as mock_push,
         ):
             notificar_observadores_mudanca_status(
@@ -1195,7 +1245,9 @@ class TestNotificarObservadoresCriacaoInApp:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_uclass.get_by_id.return_value = mock_u
@@ -1207,7 +1259,7 @@ class TestNotificarObservadoresCriacaoInApp:
                 observadores=obs_list,
             )
         mock_inapp.assert_called_once()
-        assert mock_inapp.call_args.kwargs.get("tipo") == "observador_incluido"
+        assert mock_inapp.call_args.args[0][0]["tipo"] == "observador_incluido"
 
     def test_webpush_enviado_na_inclusao_de_observador(self, app):
         """notificar_observadores_criacao envia web push para obs com usuario_id."""
@@ -1221,7 +1273,7 @@ class TestNotificarObservadoresCriacaoInApp:
             patch(
                 "app.services.chamado_notificacao_service.enviar_email", return_value=(True, None)
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.webpush_service.enviar_webpush_usuario") as mock_push,
         ):
             mock_uclass.get_by_id.return_value = mock_u
@@ -1240,7 +1292,9 @@ class TestNotificarObservadoresCriacaoInApp:
 
         obs_list = [{"nome": "Obs Externo"}]
         with (
-            patch("app.services.chamado_notificacao_service.criar_notificacao") as mock_inapp,
+            patch(
+                "app.services.chamado_notificacao_service.criar_notificacoes_em_lote"
+            ) as mock_inapp,
         ):
             notificar_observadores_criacao(
                 chamado_id="ch_1",
@@ -1287,7 +1341,7 @@ class TestNotificarExtensaoAutomaticaPrevisao:
                 "app.services.chamado_notificacao_service.enviar_email",
                 return_value=(True, None),
             ),
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         )
 
@@ -1321,7 +1375,11 @@ class TestNotificarExtensaoAutomaticaPrevisao:
             )
 
         assert mock_email.call_count == 4
-        assert mock_inapp.call_count == 4
+        mock_inapp.assert_called_once()
+        lote = mock_inapp.call_args.args[0]
+        assert {n["usuario_id"] for n in lote} == {"sol_1", "gestor_sol_1", "gestor_at_1", "resp_1"}
+        confirmacao = next(n for n in lote if n["usuario_id"] == "resp_1")
+        assert confirmacao["tipo"] == "previsao_extensao_automatica_confirmacao"
         destinatarios_email = {call.args[0] for call in mock_email.call_args_list}
         assert destinatarios_email == {
             "sol@test.com",
@@ -1485,7 +1543,7 @@ class TestNotificarSolicitacaoPrevisaoAtendimento:
                 side_effect=lambda sid, acao: f"https://x/decidir/{sid}/{acao}",
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_email.return_value = (True, None)
@@ -1577,7 +1635,7 @@ class TestNotificarSolicitacaoPrevisaoAtendimento:
                 return_value="",
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_email.return_value = (True, None)
@@ -1611,7 +1669,7 @@ class TestNotificarDecisaoPrevisaoAtendimento:
                 return_value=solicitante,
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_email.return_value = (True, None)
@@ -1643,7 +1701,7 @@ class TestNotificarDecisaoPrevisaoAtendimento:
                 return_value=solicitante,
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_email.return_value = (True, None)
@@ -1678,7 +1736,7 @@ class TestNotificarDecisaoPrevisaoAtendimento:
                 return_value=solicitante,
             ),
             patch("app.services.chamado_notificacao_service.enviar_email") as mock_email,
-            patch("app.services.chamado_notificacao_service.criar_notificacao"),
+            patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
             patch("app.services.chamado_notificacao_service.webpush_service"),
         ):
             mock_email.return_value = (True, None)
@@ -0,0 +1,306 @@
+"""Testes de chamado_timers_service — gatilhos temporais por chamado.
+
+Testa:
+- calcular_timers: aviso prévio antes do TAT, previsão de atendimento como
+  piso, aviso 50%/80%, lembrete de confirmação
+- ganchos de escrita (salvar/atualizar_campos) só gravam com a flag ligada
+- despachante: só chamados com timer vencido chegam ao handler; tick
+  escalado reprograma o timer para o próximo nível
+- fora do expediente o timer volta no primeiro minuto útil; o adiamento
+  sobrevive a edições que não mudam o prazo
+- claim recente de outro worker é respeitado; claim expirado é retomado
+- reconstruir_timers cobre chamados gravados antes da ativação
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db as db_module
+from app.db.models.chamado import ChamadoRow
+from app.db.models.chamado_timer import ChamadoTimerRow
+from app.models import Chamado
+from app.services import chamado_timers_service as cts
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+_BRT = ZoneInfo("America/Sao_Paulo")
+_contador = {"n": 0}
+
+
+@pytest.fixture
+def timers_ligados(app):
+    app.config["CHAMADO_TIMERS_ENABLED"] = True
+    with app.app_context():
+        yield
+    app.config["CHAMADO_TIMERS_ENABLED"] = False
+
+
+@pytest.fixture(autouse=True)
+def _sem_gestores():
+    from app.cache import static_cache_delete
+
+    static_cache_delete("sla_gestores_usuarios")
+    with patch("app.models_usuario.Usuario.get_all", return_value=[]):
+        yield
+    static_cache_delete("sla_gestores_usuarios")
+
+
+def _dt(year, month, day, hour, minute=0) -> datetime:
+    return datetime(year, month, day, hour, minute)
+
+
+def _criar_chamado(*, data_abertura: datetime | None = None, **campos) -> int:
+    _contador["n"] += 1
+    chamado = Chamado(
+        categoria=campos.pop("categoria", "Manutenção"),
+        tipo_solicitacao="Corretiva",
+        descricao="Teste",
+        responsavel="Resp",
+        area="Engenharia",
+        status=campos.pop("status", "Aberto"),
+        numero_chamado=f"CH-TMR-{_contador['n']:04d}",
+    )
+    chamado_id = chamado.salvar()
+    assert chamado_id is not None
+    with db_module.SessionLocal() as session, session.begin():
+        if data_abertura is not None:
+            session.execute(
+                update(ChamadoRow)
+                .where(ChamadoRow.id == chamado_id)
+                .values(data_abertura=data_abertura)
+            )
+        cts.sincronizar_timers(session, chamado_id)
+    if campos:
+        assert Chamado.get_by_id(chamado_id).atualizar_campos(**campos)
+    return chamado_id
+
+
+def _timers(chamado_id: int) -> dict[str, ChamadoTimerRow]:
+    with db_module.SessionLocal() as session:
+        rows = session.execute(
+            select(ChamadoTimerRow).where(ChamadoTimerRow.chamado_id == chamado_id)
+        ).scalars()
+        return {r.tipo: r for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# calcular_timers
+# ---------------------------------------------------------------------------
+
+
+def test_escalonamento_vence_no_aviso_previo_antes_do_tat():
+    row = ChamadoRow(
+        status="Aberto",
+        categoria="Manutenção",
+        escalacao_nivel=0,
+        data_abertura=_dt(2024, 6, 3, 9, 0),  # segunda → TAT quarta 16:30
+    )
+    due, payload = cts.calcular_timers(row)[cts.TIPO_ESCALONAMENTO]
+    assert due == datetime(2024, 6, 5, 16, 0, tzinfo=_BRT)
+    assert payload == {"nivel_alvo": 1, "fase": "pre_aviso"}
+
+    row.escalacao_pre_aviso_nivel_enviado = 1
+    due, payload = cts.calcular_timers(row)[cts.TIPO_ESCALONAMENTO]
+    assert due == datetime(2024, 6, 5, 16, 30, tzinfo=_BRT)
+    assert payload["fase"] == "tick"
+
+
+def test_previsao_atendimento_e_piso_do_escalonamento():
+    row = ChamadoRow(
+        status="Em Atendimento",
+        categoria="Manutenção",
+        escalacao_nivel=1,
+        escalacao_proximo_tick_em=_dt(2024, 6, 5, 10, 0),
+        previsao_atendimento=_dt(2024, 6, 10, 9, 0),
+    )
+    due, _ = cts.calcular_timers(row)[cts.TIPO_ESCALONAMENTO]
+    assert due == datetime(2024, 6, 10, 9, 0, tzinfo=_BRT)
+
+
+def test_aviso_resolucao_mira_o_proximo_marco():
+    from app.services.business_time import percentual_prazo_resolucao
+
+    row = ChamadoRow(
+        status="Em Atendimento",
+        categoria="Manutenção",
+        responsavel_id="resp_1",
+        escalacao_nivel=4,
+        data_em_atendimento=_dt(2024, 6, 3, 9, 0),
+        alerta_supervisor_50_enviado=False,
+        alerta_supervisor_80_enviado=False,
+    )
+    due, payload = cts.calcular_timers(row)[cts.TIPO_AVISO_RESOLUCAO]
+    assert payload == {"marco": 50}
+    assert percentual_prazo_resolucao(row.data_em_atendimento, "Manutenção", due) >= 0.5
+    antes = due - timedelta(minutes=2)
+    assert percentual_prazo_resolucao(row.data_em_atendimento, "Manutenção", antes) < 0.5
+
+    row.alerta_supervisor_50_enviado = True
+    _, payload = cts.calcular_timers(row)[cts.TIPO_AVISO_RESOLUCAO]
+    assert payload == {"marco": 80}
+
+    row.alerta_supervisor_80_enviado = True
+    assert cts.TIPO_AVISO_RESOLUCAO not in cts.calcular_timers(row)
+
+
+def test_lembrete_confirmacao_24h_depois_48h():
+    from datetime import UTC
+
+    conclusao = datetime(2024, 6, 3, 12, 0, tzinfo=UTC)
+    row = ChamadoRow(
+        status="Concluído",
+        confirmacao_solicitante="pendente",
+        data_conclusao=conclusao,
+        lembrete_confirmacao_1_enviado=False,
+        lembrete_confirmacao_2_enviado=False,
+    )
+    timers = cts.calcular_timers(row)
+    assert list(timers) == [cts.TIPO_LEMBRETE_CONFIRMACAO]
+    assert timers[cts.TIPO_LEMBRETE_CONFIRMACAO] == (conclusao + timedelta(hours=24), {"numero": 1})
+
+    row.lembrete_confirmacao_1_enviado = True
+    due, payload = cts.calcular_timers(row)[cts.TIPO_LEMBRETE_CONFIRMACAO]
+    assert due == conclusao + timedelta(hours=48)
+    assert payload == {"numero": 2}
+
+    row.confirmacao_solicitante = "confirmado"
+    assert cts.calcular_timers(row) == {}
+
+
+# ---------------------------------------------------------------------------
+# Ganchos de escrita
+# ---------------------------------------------------------------------------
+
+
+def test_flag_desligada_nao_grava_timers(app):
+    with app.app_context():
+        chamado = Chamado(
+            categoria="Manutenção",
+            tipo_solicitacao="Corretiva",
+            descricao="Teste",
+            responsavel="Resp",
+            area="Engenharia",
+            status="Aberto",
+            numero_chamado="CH-TMR-OFF",
+        )
+        chamado_id = chamado.salvar()
+    assert _timers(chamado_id) == {}
+
+
+def test_mudanca_de_status_troca_os_timers(timers_ligados):
+    chamado_id = _criar_chamado(data_abertura=_dt(2024, 6, 3, 9, 0))
+    assert set(_timers(chamado_id)) == {cts.TIPO_ESCALONAMENTO}
+
+    Chamado.get_by_id(chamado_id).atualizar_campos(
+        status="Concluído",
+        confirmacao_solicitante="pendente",
+        data_conclusao=_dt(2024, 6, 4, 9, 0),
+    )
+    timers = _timers(chamado_id)
+    assert set(timers) == {cts.TIPO_LEMBRETE_CONFIRMACAO}
+    assert timers[cts.TIPO_LEMBRETE_CONFIRMACAO].payload == {"numero": 1}
+
+
+# ---------------------------------------------------------------------------
+# Despachante
+# ---------------------------------------------------------------------------
+
+
+def test_despacha_so_o_vencido_e_reprograma_o_proximo_tick(timers_ligados):
+    vencido = _criar_chamado(data_abertura=_dt(2024, 6, 3, 9, 0))  # TAT quarta 16:30
+    no_prazo = _criar_chamado(data_abertura=_dt(2024, 6, 6, 9, 0))  # TAT segunda seguinte
+    agora = _dt(2024, 6, 6, 9, 0)  # quinta, dentro do expediente
+
+    with (
+        patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"),
+        patch(
+            "app.services.sla_escalacao_service._processar_chamado_escalonamento",
+            wraps=cts.sla._processar_chamado_escalonamento,
+        ) as handler,
+    ):
+        resultado = cts.despachar_timers_vencidos(agora=agora)
+
+    assert resultado["vencidos"] == 1
+    assert [c.args[0].id for c in handler.call_args_list] == [vencido]
+    assert resultado[cts.TIPO_ESCALONAMENTO]["escalados"] == 1
+    assert Chamado.get_by_id(vencido).escalacao_nivel == 1
+
+    timer = _timers(vencido)[cts.TIPO_ESCALONAMENTO]
+    assert timer.payload == {"nivel_alvo": 2, "fase": "pre_aviso"}
+    assert timer.due_at > agora.replace(tzinfo=_BRT)
+    assert timer.claimed_by is None
+    assert _timers(no_prazo)[cts.TIPO_ESCALONAMENTO].claimed_by is None
+
+
+def test_fora_do_expediente_volta_no_primeiro_minuto_util(timers_ligados):
+    chamado_id = _criar_chamado(data_abertura=_dt(2024, 6, 3, 9, 0))
+    agora = _dt(2024, 6, 6, 20, 0)  # quinta à noite
+
+    with patch("app.services.sla_escalacao_service.notificar_escalada_gerencial") as mock_notif:
+        resultado = cts.despachar_timers_vencidos(agora=agora)
+
+    mock_notif.assert_not_called()
+    assert resultado[cts.TIPO_ESCALONAMENTO]["pulados_fora_janela"] == 1
+    assert resultado["reprogramados"] == 1
+    timer = _timers(chamado_id)[cts.TIPO_ESCALONAMENTO]
+    assert timer.due_at == datetime(2024, 6, 7, 7, 0, tzinfo=_BRT)
+    assert timer.claimed_by is None
+
+
+def test_adiamento_sobrevive_a_edicao_que_nao_muda_o_prazo(timers_ligados):
+    chamado_id = _criar_chamado(data_abertura=_dt(2024, 6, 3, 9, 0))
+    with patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"):
+        cts.despachar_timers_vencidos(agora=_dt(2024, 6, 6, 20, 0))
+    adiado = datetime(2024, 6, 7, 7, 0, tzinfo=_BRT)
+    assert _timers(chamado_id)[cts.TIPO_ESCALONAMENTO].due_at == adiado
+
+    assert Chamado.get_by_id(chamado_id).atualizar_campos(descricao="Outra descrição")
+    assert _timers(chamado_id)[cts.TIPO_ESCALONAMENTO].due_at == adiado
+
+    # Campo que muda o prazo recalcula e descarta o adiamento.
+    previsao = datetime(2024, 6, 10, 9, 0, tzinfo=_BRT)
+    assert Chamado.get_by_id(chamado_id).atualizar_campos(previsao_atendimento=previsao)
+    timer = _timers(chamado_id)[cts.TIPO_ESCALONAMENTO]
+    assert timer.due_at == timer.prazo_calculado > adiado
+
+
+def test_claim_recente_e_respeitado_e_expirado_retomado(timers_ligados):
+    chamado_id = _criar_chamado(data_abertura=_dt(2024, 6, 3, 9, 0))
+    agora = _dt(2024, 6, 6, 9, 0).replace(tzinfo=_BRT)
+
+    def _reivindicar_como(outro: str, quando: datetime) -> None:
+        with db_module.SessionLocal() as session, session.begin():
+            session.execute(
+                update(ChamadoTimerRow)
+                .where(ChamadoTimerRow.chamado_id == chamado_id)
+                .values(claimed_by=outro, claimed_at=quando)
+            )
+
+    _reivindicar_como("outro-worker", agora - timedelta(minutes=1))
+    with patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"):
+        assert cts.despachar_timers_vencidos(agora=agora)["vencidos"] == 0
+
+    _reivindicar_como("worker-morto", agora - timedelta(hours=1))
+    with patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"):
+        assert cts.despachar_timers_vencidos(agora=agora)["vencidos"] == 1
+    assert Chamado.get_by_id(chamado_id).escalacao_nivel == 1
+
+
+def test_reconstruir_timers_cobre_chamados_anteriores(app):
+    with app.app_context():
+        chamado_id = _criar_chamado()
+        with db_module.SessionLocal() as session, session.begin():
+            session.execute(
+                ChamadoTimerRow.__table__.delete().where(ChamadoTimerRow.chamado_id == chamado_id)
+            )
+        assert _timers(chamado_id) == {}
+
+        resultado = cts.reconstruir_timers()
+
+    assert resultado["chamados"] >= 1
+    assert resultado["erros"] == 0
+    assert set(_timers(chamado_id)) == {cts.TIPO_ESCALONAMENTO}
@@ -212,7 +212,7 @@ def test_criar_chamado_com_setores_adicionais_dispara_notificacao_setores(app):
         patch(
             "app.services.chamados_criacao_service.notificar_setores_adicionais_chamado"
         ) as mock_notif_setores,
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -249,7 +249,7 @@ def test_criar_chamado_com_setores_adicionais_dispara_notificacao_setores(app):
 
 
 def test_criar_chamado_nao_notifica_inapp_quando_responsavel_e_solicitante(app):
-    """Quando responsavel_id == solicitante_id, criar_notificacao não deve ser chamado."""
+    """Quando responsavel_id == solicitante_id, nenhuma notificação in-app deve ser criada."""
     form = {
         "categoria": "Manutencao",
         "tipo": "Manutencao",
@@ -271,7 +271,9 @@ def test_criar_chamado_nao_notifica_inapp_quando_responsavel_e_solicitante(app):
         patch("app.services.chamados_criacao_service.Historico"),
         patch("app.services.chamados_criacao_service.Usuario.get_by_id", return_value=MagicMock()),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao") as mock_criar_notif,
+        patch(
+            "app.services.chamados_criacao_service.criar_notificacoes_em_lote"
+        ) as mock_criar_notif,
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario") as mock_webpush,
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -300,7 +302,7 @@ def test_criar_chamado_nao_notifica_inapp_quando_responsavel_e_solicitante(app):
 
 
 def test_criar_chamado_persiste_categoria_e_solicitante_nome_na_notificacao(app):
-    """criar_notificacao deve receber categoria e solicitante_nome para i18n na leitura."""
+    """A notificação in-app deve levar categoria e solicitante_nome para i18n na leitura."""
     form = {
         "categoria": "Nao Aplicavel",
         "tipo": "Manutencao",
@@ -327,7 +329,9 @@ def test_criar_chamado_persiste_categoria_e_solicitante_nome_na_notificacao(app)
             return_value=responsavel_usuario,
         ),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao") as mock_criar_notif,
+        patch(
+            "app.services.chamados_criacao_service.criar_notificacoes_em_lote"
+        ) as mock_criar_notif,
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -348,9 +352,9 @@ def test_criar_chamado_persiste_categoria_e_solicitante_nome_na_notificacao(app)
             )
 
     mock_criar_notif.assert_called_once()
-    kwargs = mock_criar_notif.call_args.kwargs
-    assert kwargs.get("categoria") == "Nao Aplicavel"
-    assert kwargs.get("solicitante_nome") == "Solicitante Teste"
+    (notificacao,) = mock_criar_notif.call_args.args[0]
+    assert notificacao.get("categoria") == "Nao Aplicavel"
+    assert notificacao.get("solicitante_nome") == "Solicitante Teste"
 
 
 # ── links externos OneDrive/SharePoint ────────────────────────────────────────
@@ -1124,7 +1128,7 @@ def test_criacao_compras_nao_exige_responsavel_mesmo_com_supervisores(app):
         ),
         patch("app.services.chamados_criacao_service.Historico"),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
         patch(
@@ -1167,7 +1171,7 @@ def test_criacao_compras_ignora_responsavel_id_enviado_no_form(app):
         ),
         patch("app.services.chamados_criacao_service.Historico"),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
         app.app_context(),
@@ -1199,7 +1203,7 @@ def test_criacao_compras_grava_supervisor_ids_com_acesso_para_todos(app):
         ),
         patch("app.services.chamados_criacao_service.Historico"),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
         app.app_context(),
@@ -1234,7 +1238,7 @@ def test_criacao_compras_notifica_todos_supervisores_da_area(app):
         patch(
             "app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"
         ) as mock_email,
-        patch("app.services.chamados_criacao_service.criar_notificacao") as mock_inapp,
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote") as mock_inapp,
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario") as mock_webpush,
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
         app.app_context(),
@@ -1254,8 +1258,9 @@ def test_criacao_compras_notifica_todos_supervisores_da_area(app):
     }
     assert ids_notificados_email == {sup.id for sup in supervisores}
 
-    assert mock_inapp.call_count == 3
-    ids_notificados_inapp = {call.kwargs["usuario_id"] for call in mock_inapp.call_args_list}
+    # um único INSERT em lote para todos os supervisores do grupo
+    mock_inapp.assert_called_once()
+    ids_notificados_inapp = {n["usuario_id"] for n in mock_inapp.call_args.args[0]}
     assert ids_notificados_inapp == {sup.id for sup in supervisores}
 
     assert mock_webpush.call_count == 3
@@ -1289,7 +1294,7 @@ def test_criacao_estoque_nao_exige_responsavel_mesmo_com_supervisor(app):
         ),
         patch("app.services.chamados_criacao_service.Historico"),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
         patch(
@@ -1346,7 +1351,7 @@ def test_criar_chamado_aog_nao_grava_nivel_e_notifica_todos_usuarios(app):
         patch(
             "app.services.chamados_criacao_service.notificar_abertura_aog_todos_gestores"
         ) as mock_notif_aog,
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -1400,7 +1405,7 @@ def test_criar_chamado_aog_grava_rl_codigo_e_cria_grupo_rl(app):
         patch("app.services.chamados_criacao_service.Usuario.get_by_id", return_value=None),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
         patch("app.services.chamados_criacao_service.notificar_abertura_aog_todos_gestores"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -1458,7 +1463,7 @@ def test_criar_chamado_normal_nao_grava_nivel_4_nem_notifica_aog(app):
         patch(
             "app.services.chamados_criacao_service.notificar_abertura_aog_todos_gestores"
         ) as mock_notif_aog,
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -1772,7 +1777,7 @@ def test_criar_chamado_aog_notificacao_falha_nao_impede_thread(app):
             "app.services.chamados_criacao_service.notificar_abertura_aog_todos_gestores",
             side_effect=RuntimeError("broadcast falhou"),
         ),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch("app.services.chamados_criacao_service.threading.Thread", side_effect=_FakeThread),
     ):
@@ -1797,7 +1802,7 @@ def test_criar_chamado_aog_notificacao_falha_nao_impede_thread(app):
 
 
 def test_criar_chamado_notificacao_inapp_falha_nao_impede_thread(app):
-    """criar_notificacao lançando exceção dentro da thread de notificação é
+    """criar_notificacoes_em_lote lançando exceção dentro da thread de notificação é
     capturado e logado (debug), não propaga pro caller."""
     form = {
         "categoria": "Manutencao",
@@ -1826,7 +1831,7 @@ def test_criar_chamado_notificacao_inapp_falha_nao_impede_thread(app):
         ),
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
         patch(
-            "app.services.chamados_criacao_service.criar_notificacao",
+            "app.services.chamados_criacao_service.criar_notificacoes_em_lote",
             side_effect=RuntimeError("notificação in-app indisponível"),
         ),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario") as mock_webpush,
@@ -1850,7 +1855,7 @@ def test_criar_chamado_notificacao_inapp_falha_nao_impede_thread(app):
 
     assert erro is None
     assert chamado_id is not None
-    # criar_notificacao lançou antes do webpush (mesmo bloco try) — webpush não é chamado
+    # criar_notificacoes_em_lote lançou antes do webpush (mesmo bloco try) — webpush não é chamado
     mock_webpush.assert_not_called()
 
 
@@ -9,12 +9,14 @@ from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import select
 
 from app import db as db_module
 from app.db.models.apoio import DigestDiarioUsuarioRow
 from app.db.models.chamado import ChamadoRow
 from app.models import Chamado
-from app.services.digest_diario_service import processar_digest_diario
+from app.services.digest_diario_service import _percentual_tat_sql, processar_digest_diario
+from app.services.sla_escalacao_service import calcular_deadline_inicial
 
 pytestmark = pytest.mark.usefixtures("db_session")
 
@@ -75,26 +77,43 @@ def _mock_usuario(email: str = "resp@dtx.aero"):
     return u
 
 
+def _usuarios(usuario=None):
+    """get_by_ids falso: devolve o mesmo usuário pra todo id pedido."""
+    usuario = usuario or _mock_usuario()
+    return patch(
+        "app.models_usuario.Usuario.get_by_ids",
+        side_effect=lambda ids: {uid: usuario for uid in ids},
+    )
+
+
+def _notificar():
+    """notificar_digests_diarios falso: todo digest do lote 'sai'."""
+    return patch(
+        "app.services.digest_diario_service.notificar_digests_diarios",
+        side_effect=lambda digests: [True] * len(digests),
+    )
+
+
 def test_digest_dispara_24h_apos_chamado_mais_antigo():
     agora = _dt(2024, 6, 6, 9, 0)  # 24h depois
     _criar_chamado(responsavel_id="resp_1", data_abertura=_dt(2024, 6, 5, 9, 0))
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif,
-        patch("app.models_usuario.Usuario.get_by_id", return_value=_mock_usuario()),
+        _notificar() as mock_notif,
+        _usuarios(),
     ):
         resultado = processar_digest_diario(agora=agora)
 
     assert resultado["digests_enviados"] == 1
-    mock_notif.assert_called_once()
-    assert mock_notif.call_args.kwargs["usuario_id"] == "resp_1"
+    [digest] = mock_notif.call_args.args[0]
+    assert digest["usuario_id"] == "resp_1"
 
 
 def test_digest_nao_dispara_antes_de_24h():
     agora = _dt(2024, 6, 5, 20, 0)  # só 11h depois
     _criar_chamado(responsavel_id="resp_1", data_abertura=_dt(2024, 6, 5, 9, 0))
 
-    with patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif:
+    with _notificar() as mock_notif:
         resultado = processar_digest_diario(agora=agora)
 
     assert resultado["digests_enviados"] == 0
@@ -107,8 +126,8 @@ def test_digest_repete_a_cada_24h():
     _definir_ultimo_envio("resp_1", _dt(2024, 6, 6, 9, 30))  # >=24h atrás
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif,
-        patch("app.models_usuario.Usuario.get_by_id", return_value=_mock_usuario()),
+        _notificar() as mock_notif,
+        _usuarios(),
     ):
         resultado = processar_digest_diario(agora=agora)
 
@@ -121,7 +140,7 @@ def test_digest_nao_repete_antes_de_24h_do_ultimo_envio():
     _criar_chamado(responsavel_id="resp_1", data_abertura=_dt(2024, 6, 1, 9, 0))
     _definir_ultimo_envio("resp_1", _dt(2024, 6, 6, 9, 0))  # só 3h atrás
 
-    with patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif:
+    with _notificar() as mock_notif:
         resultado = processar_digest_diario(agora=agora)
 
     assert resultado["digests_enviados"] == 0
@@ -143,12 +162,12 @@ def test_digest_agrupa_vencidos_perto_de_vencer_vs_abertos():
     )
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif,
-        patch("app.models_usuario.Usuario.get_by_id", return_value=_mock_usuario()),
+        _notificar() as mock_notif,
+        _usuarios(),
     ):
         processar_digest_diario(agora=agora)
 
-    kwargs = mock_notif.call_args.kwargs
+    [kwargs] = mock_notif.call_args.args[0]
     assert len(kwargs["vencidos_ou_perto"]) == 1
     assert len(kwargs["abertos"]) == 1
 
@@ -168,12 +187,12 @@ def test_digest_ordena_por_prioridade_categoria():
     )
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif,
-        patch("app.models_usuario.Usuario.get_by_id", return_value=_mock_usuario()),
+        _notificar() as mock_notif,
+        _usuarios(),
     ):
         processar_digest_diario(agora=agora)
 
-    kwargs = mock_notif.call_args.kwargs
+    [kwargs] = mock_notif.call_args.args[0]
     todos = kwargs["vencidos_ou_perto"] + kwargs["abertos"]
     categorias_em_ordem = [item["categoria"] for item in todos]
     assert categorias_em_ordem == ["AOG", "Projetos", "Manutenção"]
@@ -182,7 +201,7 @@ def test_digest_ordena_por_prioridade_categoria():
 def test_digest_sem_chamados_pendentes_nao_envia():
     agora = _dt(2024, 6, 7, 9, 0)
 
-    with patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif:
+    with _notificar() as mock_notif:
         resultado = processar_digest_diario(agora=agora)
 
     assert resultado["digests_enviados"] == 0
@@ -196,8 +215,8 @@ def test_digest_usuario_sem_email_pula():
     u_sem_email.email = None
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario") as mock_notif,
-        patch("app.models_usuario.Usuario.get_by_id", return_value=u_sem_email),
+        _notificar() as mock_notif,
+        _usuarios(u_sem_email),
     ):
         resultado = processar_digest_diario(agora=agora)
 
@@ -221,8 +240,8 @@ def test_digest_grava_ultimo_envio_apos_disparar():
     _criar_chamado(responsavel_id="resp_1", data_abertura=_dt(2024, 6, 5, 9, 0))
 
     with (
-        patch("app.services.digest_diario_service.notificar_digest_diario"),
-        patch("app.models_usuario.Usuario.get_by_id", return_value=_mock_usuario()),
+        _notificar(),
+        _usuarios(),
     ):
         processar_digest_diario(agora=agora)
 
@@ -230,3 +249,74 @@ def test_digest_grava_ultimo_envio_apos_disparar():
         estado = session.get(DigestDiarioUsuarioRow, "resp_1")
         assert estado is not None
         assert estado.ultimo_envio_em is not None
+
+
+def test_digest_lote_so_grava_envio_de_quem_recebeu():
+    """Vários responsáveis saem num único lote; quem falhou no envio não tem
+    ultimo_envio_em gravado e volta na próxima passada."""
+    agora = _dt(2024, 6, 6, 9, 0)
+    _criar_chamado(responsavel_id="resp_1", data_abertura=_dt(2024, 6, 5, 9, 0))
+    _criar_chamado(responsavel_id="resp_2", data_abertura=_dt(2024, 6, 5, 8, 0))
+    _criar_chamado(responsavel_id="resp_3", data_abertura=_dt(2024, 6, 5, 20, 0))  # <24h
+
+    with (
+        patch(
+            "app.services.digest_diario_service.notificar_digests_diarios",
+            return_value=[True, False],
+        ) as mock_notif,
+        _usuarios(),
+    ):
+        resultado = processar_digest_diario(agora=agora)
+
+    mock_notif.assert_called_once()
+    assert [d["usuario_id"] for d in mock_notif.call_args.args[0]] == ["resp_1", "resp_2"]
+    assert resultado == {"usuarios_processados": 2, "digests_enviados": 1, "erros": 1}
+    with db_module.SessionLocal() as session:
+        assert session.get(DigestDiarioUsuarioRow, "resp_1") is not None
+        assert session.get(DigestDiarioUsuarioRow, "resp_2") is None
+
+
+def _pct_referencia(categoria: str, status: str, data_abertura: datetime, agora: datetime):
+    """Cálculo em Python do % do TAT (o mesmo que o digest fazia por chamado
+    antes de ir pra SQL) — referência pra paridade."""
+    deadline = calcular_deadline_inicial(categoria, status, data_abertura)
+    total = (deadline.replace(tzinfo=None) - data_abertura.replace(tzinfo=None)).total_seconds()
+    if total <= 0:
+        return 1.0
+    decorrido = (agora - data_abertura.replace(tzinfo=None)).total_seconds()
+    return max(0.0, decorrido / total)
+
+
+def test_percentual_tat_sql_igual_ao_calculo_do_motor():
+    """O % do TAT derivado em SQL bate com calcular_deadline_inicial pra
+    aberturas em todos os dias da semana (inclusive fim de semana e depois
+    do fim do expediente), TAT padrão, Projetos e AOG nas duas fases."""
+    agora = _dt(2024, 6, 12, 11, 0)
+    casos = [("Manutenção", "Aberto"), ("Projetos", "Em Atendimento")]
+    casos += [("AOG", "Aberto"), ("AOG", "Em Atendimento")]
+    ids = []
+    for dia in range(1, 11):  # sáb 01/06 .. seg 10/06
+        for hora in (6, 12, 17):
+            for categoria, status in casos:
+                ids.append(
+                    _criar_chamado(
+                        responsavel_id="resp_paridade",
+                        data_abertura=_dt(2024, 6, dia, hora, 15),
+                        categoria=categoria,
+                        status=status,
+                    )
+                )
+
+    stmt = select(
+        ChamadoRow.categoria,
+        ChamadoRow.status,
+        ChamadoRow.data_abertura,
+        _percentual_tat_sql(agora),
+    ).where(ChamadoRow.id.in_(ids))
+    with db_module.SessionLocal() as session:
+        linhas = session.execute(stmt).all()
+
+    assert len(linhas) == len(ids)
+    for categoria, status, abertura, pct in linhas:
+        esperado = _pct_referencia(categoria, status, abertura, agora)
+        assert pct == pytest.approx(esperado), (categoria, status, abertura)
@@ -0,0 +1,101 @@
+"""Testes do diretório de usuários em memória (carga única + atualização
+incremental por usuarios.atualizado_em), contra o Postgres de teste."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.models_usuario import Usuario
+from app.services import diretorio_usuarios as du
+from app.services.diretorio_usuarios import DiretorioUsuarios
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+def _criar(id_, nome, perfil="solicitante", areas=None, nivel_gestao=None):
+    usuario = Usuario(
+        id=id_,
+        email=f"{id_}@dtx.aero",
+        nome=nome,
+        perfil=perfil,
+        areas=areas or [],
+        nivel_gestao=nivel_gestao,
+    )
+    assert usuario.save()
+    return usuario
+
+
+@pytest.fixture
+def diretorio():
+    _criar("dir_ana", "Ana", perfil="supervisor", areas=["Manutenção"])
+    _criar("dir_bia", "Bia", areas=["Manutenção", "Engenharia"], nivel_gestao="gestor_setor")
+    _criar("dir_caio", "Caio", areas=["Engenharia"])
+    return DiretorioUsuarios(intervalo_segundos=0)
+
+
+def _ids(usuarios):
+    return [u.id for u in usuarios if u.id.startswith("dir_")]
+
+
+def test_carga_inicial_e_indices(diretorio):
+    assert _ids(diretorio.todos()) == ["dir_ana", "dir_bia", "dir_caio"]
+    assert _ids(diretorio.por_area("Manutenção")) == ["dir_ana", "dir_bia"]
+    assert _ids(diretorio.por_perfil("supervisor")) == ["dir_ana"]
+    assert _ids(diretorio.por_nivel_gestao("gestor_setor")) == ["dir_bia"]
+    assert diretorio.por_area("Inexistente") == []
+
+
+def test_atualizacao_incremental_so_relê_linhas_alteradas(diretorio):
+    diretorio.todos()
+    versao = diretorio.versao
+    assert diretorio.atualizar() is False
+    assert diretorio.versao == versao
+
+    Usuario.get_by_id("dir_caio").update(areas=["Manutenção"], perfil="admin")
+    with patch.object(Usuario, "_from_rows", wraps=Usuario._from_rows) as from_rows:
+        assert diretorio.atualizar() is True
+
+    (rows,) = from_rows.call_args.args
+    assert [r.id for r in rows] == ["dir_caio"]
+    assert diretorio.versao == versao + 1
+    assert _ids(diretorio.por_area("Manutenção")) == ["dir_ana", "dir_bia", "dir_caio"]
+    assert _ids(diretorio.por_area("Engenharia")) == ["dir_bia"]
+    assert _ids(diretorio.por_perfil("admin")) == ["dir_caio"]
+
+
+def test_exclusao_sai_do_diretorio_e_dos_indices(diretorio):
+    diretorio.todos()
+
+    Usuario.get_by_id("dir_bia").delete()
+
+    assert _ids(diretorio.todos()) == ["dir_ana", "dir_caio"]
+    assert diretorio.por_nivel_gestao("gestor_setor") == []
+    assert _ids(diretorio.por_area("Engenharia")) == ["dir_caio"]
+
+
+def test_intervalo_evita_consulta_e_escrita_local_forca_atualizacao(db_session):
+    _criar("dir_ana", "Ana")
+    diretorio = DiretorioUsuarios(intervalo_segundos=3600)
+    diretorio.todos()
+    _criar("dir_novo", "Novo")
+    assert diretorio.atualizar() is False
+
+    diretorio.marcar_desatualizado()
+
+    assert _ids(diretorio.todos()) == ["dir_ana", "dir_novo"]
+
+
+def test_get_all_e_supervisores_por_area_usam_o_diretorio(diretorio):
+    with (
+        patch.object(du, "_diretorio", diretorio),
+        patch.object(du, "_diretorio_pid", du.os.getpid()),
+        patch("config.Config.CACHE_DIRETORIO_USUARIOS_SEGUNDOS", 15),
+    ):
+        assert _ids(Usuario.get_all()) == ["dir_ana", "dir_bia", "dir_caio"]
+        assert _ids(Usuario.get_supervisores_por_area("Manutenção")) == ["dir_ana", "dir_bia"]
+        assert _ids(Usuario.get_supervisores_por_area("Engenharia")) == ["dir_bia"]
+
+        from app.services.gestor_escalonamento_service import construir_mapa_gestor_setor
+
+        mapa = construir_mapa_gestor_setor()
+    assert mapa["Manutenção"] == mapa["Engenharia"] == "dir_bia@dtx.aero"
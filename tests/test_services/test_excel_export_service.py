@@ -1,34 +1,29 @@
 """Testes do serviço de exportação Excel (exportador_excel.exportar_relatorio_completo)."""
 
-import io
-
 import pytest
 
-from app.services.excel_export_service import MAX_EXPORT_CHAMADOS, _safe_cell, exportador_excel
-
-
-def test_max_export_chamados_constante():
-    """MAX_EXPORT_CHAMADOS está definido e é inteiro positivo."""
-    assert MAX_EXPORT_CHAMADOS > 0
-    assert isinstance(MAX_EXPORT_CHAMADOS, int)
+from app.services.excel_export_service import (
+    _safe_cell,
+    exportador_excel,
+    exportar_chamados_xlsx,
+)
 
 
-def test_exportar_relatorio_completo_lista_vazia_retorna_bytes():
-    """exportar_relatorio_completo com lista vazia de chamados retorna BytesIO (arquivo xlsx)."""
+def test_exportar_relatorio_completo_lista_vazia_retorna_arquivo_xlsx():
+    """exportar_relatorio_completo com lista vazia de chamados retorna arquivo xlsx no início."""
     output = exportador_excel.exportar_relatorio_completo(
         chamados=[],
         metricas_gerais={},
         metricas_supervisores=[],
         filtros_aplicados={},
     )
-    assert isinstance(output, io.BytesIO)
-    data = output.getvalue()
+    data = output.read()
     assert len(data) > 0
     assert data[:2] == b"PK"
 
 
 def test_exportar_relatorio_completo_com_chamado_mock_retorna_bytes():
-    """exportar_relatorio_completo com um Chamado real retorna BytesIO sem exceção."""
+    """exportar_relatorio_completo com um Chamado real gera o xlsx sem exceção."""
     from app.models import Chamado
 
     chamado = Chamado(
@@ -58,8 +53,7 @@ def test_exportar_relatorio_completo_com_chamado_mock_retorna_bytes():
         metricas_supervisores=[{"supervisor_nome": "João", "total_chamados": 1}],
         filtros_aplicados={},
     )
-    assert isinstance(output, io.BytesIO)
-    assert len(output.getvalue()) > 0
+    assert output.read(2) == b"PK"
 
 
 # ── Testes de segurança: formula injection ────────────────────────────────────
@@ -244,3 +238,76 @@ def test_exportar_relatorio_completo_status_sem_categoria_traduzido():
     valores_coluna_a = [c[0].value for c in ws.iter_rows(min_col=1, max_col=1) if c[0].value]
     assert "No Category" in valores_coluna_a
     assert "Sem Categoria" not in valores_coluna_a
+
+
+# ── Streaming: chamados vêm de um gerador, percorrido uma única vez ──────────
+
+
+def test_exportar_relatorio_completo_consome_gerador_uma_vez_e_conta_abas_de_analise():
+    """Chamados vindos de gerador (cursor do banco) preenchem detalhes e análises."""
+    from openpyxl import load_workbook
+
+    chamados = (
+        _mock_chamado(status=s, categoria=c)
+        for s, c in [("Aberto", "TI"), ("Aberto", None), ("Concluído", "TI")]
+    )
+    output = exportador_excel.exportar_relatorio_completo(
+        chamados=chamados,
+        metricas_gerais={},
+        metricas_supervisores=[],
+        filtros_aplicados={},
+    )
+    wb = load_workbook(output)
+    assert len(list(wb.worksheets[1].iter_rows(min_row=2))) == 3
+    status = {r[0]: r[1] for r in wb.worksheets[3].iter_rows(min_row=3, values_only=True)}
+    assert status == {"Aberto": 2, "Concluído": 1}
+    categorias = [r[:2] for r in wb.worksheets[4].iter_rows(min_row=3, values_only=True)]
+    assert ("Sem Categoria", 1) in categorias
+
+
+def test_exportar_relatorio_completo_avalia_metricas_callable_depois_dos_chamados():
+    """Métricas passadas como callable só são calculadas depois de percorrer os chamados."""
+    from openpyxl import load_workbook
+
+    vistos = []
+
+    def chamados():
+        for _ in range(2):
+            vistos.append(1)
+            yield _mock_chamado()
+
+    def metricas_gerais():
+        return {"total_chamados": len(vistos)}
+
+    output = exportador_excel.exportar_relatorio_completo(
+        chamados=chamados(),
+        metricas_gerais=metricas_gerais,
+        metricas_supervisores=lambda: [{"supervisor_nome": "Ana"}],
+        filtros_aplicados={},
+        language="en",
+    )
+    wb = load_workbook(output)
+    resumo = {r[0]: r[1] for r in wb.worksheets[0].iter_rows(values_only=True) if r and r[0]}
+    assert resumo["Total Tickets"] == 2
+    assert wb.worksheets[2].cell(row=2, column=1).value == "Ana"
+
+
+def test_exportar_chamados_xlsx_escreve_cabecalho_e_neutraliza_formulas():
+    """Planilha simples do /exportar: cabeçalho fixo + uma linha por chamado, com _safe_cell."""
+    from openpyxl import load_workbook
+
+    chamado = _mock_chamado()
+    chamado.descricao = "=CMD('calc')"
+    wb = load_workbook(exportar_chamados_xlsx(iter([chamado])))
+    linhas = list(wb.active.iter_rows(values_only=True))
+    assert linhas[0][0] == "Chamado"
+    assert linhas[0][-1] == "Descrição"
+    assert len(linhas) == 2
+    assert linhas[1][-1] == "'=CMD('calc')"
+
+
+def test_exportar_chamados_xlsx_sem_chamados_mantem_cabecalho():
+    from openpyxl import load_workbook
+
+    wb = load_workbook(exportar_chamados_xlsx([]))
+    assert len(list(wb.active.iter_rows())) == 1
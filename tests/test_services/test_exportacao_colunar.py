@@ -0,0 +1,111 @@
+"""Testes de exportacao_colunar — exportação CSV/Parquet para BI.
+
+Testa:
+- colunas_pedidas: padrão sem descricao, ordem pedida, coluna desconhecida
+- condicoes_periodo: intervalo inclusivo no fuso do SLA; datas inválidas
+- gerar_csv: cabeçalho e um pedaço por lote, datas em UTC, fórmula neutralizada
+- lotes_permitidos aplica período e escopo
+"""
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from app import db as db_module
+from app.db.models.chamado import ChamadoRow
+from app.services import exportacao_colunar as col
+from tests.conftest import _usuario_mock
+from tests.factories import make_chamado
+
+# ── colunas_pedidas ──────────────────────────────────────────────────────────
+
+
+def test_colunas_padrao_omitem_descricao():
+    assert col.colunas_pedidas(None) == col.COLUNAS_PADRAO
+    assert col.colunas_pedidas("  ") == col.COLUNAS_PADRAO
+    assert "descricao" not in col.COLUNAS_PADRAO
+
+
+def test_colunas_na_ordem_pedida_sem_repetir():
+    assert col.colunas_pedidas("status, id,status,,descricao") == ("status", "id", "descricao")
+
+
+@pytest.mark.parametrize("parametro", ["id,senha", ",,"])
+def test_colunas_invalidas_levantam_value_error(parametro):
+    with pytest.raises(ValueError):
+        col.colunas_pedidas(parametro)
+
+
+# ── condicoes_periodo ────────────────────────────────────────────────────────
+
+
+def test_periodo_vazio_nao_filtra():
+    assert col.condicoes_periodo(None, "") == []
+
+
+@pytest.mark.parametrize(("de", "ate"), [("2026-13-01", None), ("2026-03-10", "2026-03-01")])
+def test_periodo_invalido_levanta_value_error(de, ate):
+    with pytest.raises(ValueError):
+        col.condicoes_periodo(de, ate)
+
+
+def _abrir_em(data_abertura: datetime):
+    chamado = make_chamado(rl_codigo="RL-COL-PER")
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(
+            update(ChamadoRow)
+            .where(ChamadoRow.id == int(chamado.id))
+            .values(data_abertura=data_abertura)
+        )
+    return chamado
+
+
+def test_periodo_inclusivo_no_fuso_do_sla(db_session):
+    admin = _usuario_mock("col_admin", "col@test.com", "Col", "admin", "Geral")
+    # 23h de 10/03 em São Paulo já é 11/03 em UTC.
+    dentro = _abrir_em(datetime(2026, 3, 11, 2, 0, tzinfo=UTC))
+    _abrir_em(datetime(2026, 3, 11, 4, 0, tzinfo=UTC))
+
+    with patch("config.Config.SLA_TIMEZONE", "America/Sao_Paulo"):
+        periodo = col.condicoes_periodo("2026-03-01", "2026-03-10")
+    lotes = list(col.lotes_permitidos(admin, {"rl_codigo": "RL-COL-PER"}, periodo))
+
+    assert [c.id for lote in lotes for c in lote] == [int(dentro.id)]
+
+
+# ── gerar_csv ────────────────────────────────────────────────────────────────
+
+
+def _chamado(**campos):
+    return SimpleNamespace(**{c: None for c in col.COLUNAS_EXPORTAVEIS} | campos)
+
+
+def test_csv_um_pedaco_por_lote():
+    lotes = [
+        [_chamado(id=1, status="Aberto"), _chamado(id=2, status="Concluído")],
+        [_chamado(id=3, descricao="=HYPERLINK()")],
+    ]
+
+    pedacos = list(col.gerar_csv(lotes, ("id", "status", "descricao")))
+
+    assert [p.decode("utf-8") for p in pedacos] == [
+        "id,status,descricao\r\n",
+        "1,Aberto,\r\n2,Concluído,\r\n",
+        "3,,'=HYPERLINK()\r\n",
+    ]
+
+
+def test_csv_datas_em_utc_iso():
+    abertura = datetime.fromisoformat("2026-03-10T09:30:00-03:00")
+    (_, linha) = col.gerar_csv([[_chamado(data_abertura=abertura)]], ("data_abertura",))
+    assert linha == b"2026-03-10T12:30:00+00:00\r\n"
+
+
+def test_parquet_indisponivel_sem_pyarrow():
+    with patch.object(col, "_pyarrow", return_value=(None, None)):
+        assert not col.parquet_disponivel()
+        with pytest.raises(RuntimeError):
+            next(col.gerar_parquet([], ("id",)))
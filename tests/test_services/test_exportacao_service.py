@@ -0,0 +1,308 @@
+"""Testes de exportacao_service — exportações geradas em segundo plano.
+
+Testa:
+- enfileirar_exportacao: pedido idêntico cai no mesmo registro; filtros
+  diferentes geram outro; arquivo pronto é reaproveitado dentro da janela
+- processar_pendentes gera o arquivo no disco local, conta as linhas e
+  notifica o usuário com o link de download
+- supervisor com mais linhas que o lote de streaming, em sessão real
+- usuário que perdeu o perfil recebe erro, não o arquivo
+- processamento abandonado volta para a fila; esgotado vira erro
+- conclusão de tentativa antiga não sobrescreve a atual
+- limpar_expiradas apaga o arquivo vencido
+"""
+
+import io
+import os
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import select, update
+
+from app import db as db_module
+from app.db.models.exportacao import ExportacaoRow
+from app.db.models.notificacao import NotificacaoRow
+from app.db.models.usuario import UsuarioRow
+from app.services import exportacao_service as exp
+from tests.conftest import _usuario_mock
+from tests.factories import make_chamado
+
+USUARIO_ID = "exp_admin"
+
+
+@pytest.fixture
+def usuario(db_session):
+    with db_module.SessionLocal() as session, session.begin():
+        session.add(UsuarioRow(id=USUARIO_ID, email="exp@test.com", nome="Exp", perfil="admin"))
+    return _usuario_mock(USUARIO_ID, "exp@test.com", "Exp", "admin")
+
+
+@pytest.fixture
+def armazenamento_local(app, tmp_path):
+    anteriores = (app.config["ANEXO_STORAGE_BACKEND"], app.config["EXPORTACAO_LOCAL_DIR"])
+    app.config["ANEXO_STORAGE_BACKEND"] = "local"
+    app.config["EXPORTACAO_LOCAL_DIR"] = str(tmp_path)
+    with app.app_context():
+        yield tmp_path
+    app.config["ANEXO_STORAGE_BACKEND"], app.config["EXPORTACAO_LOCAL_DIR"] = anteriores
+
+
+def _row(exportacao_id: int) -> ExportacaoRow:
+    with db_module.SessionLocal() as session:
+        return session.get(ExportacaoRow, exportacao_id)
+
+
+def _notificacoes() -> list[NotificacaoRow]:
+    with db_module.SessionLocal() as session:
+        return list(
+            session.execute(select(NotificacaoRow).where(NotificacaoRow.usuario_id == USUARIO_ID))
+            .scalars()
+            .all()
+        )
+
+
+def _atualizar(exportacao_id: int, **valores) -> None:
+    with db_module.SessionLocal() as session, session.begin():
+        session.execute(
+            update(ExportacaoRow).where(ExportacaoRow.id == exportacao_id).values(**valores)
+        )
+
+
+# ── enfileirar_exportacao ────────────────────────────────────────────────────
+
+
+def test_pedido_identico_na_fila_reaproveita_o_registro(usuario):
+    primeira, nova = exp.enfileirar_exportacao(
+        USUARIO_ID, "chamados", "xlsx", {"status": "Aberto"}, "pt_BR"
+    )
+    repetida, nova_repetida = exp.enfileirar_exportacao(
+        USUARIO_ID, "chamados", "xlsx", {"status": "Aberto"}, "pt_BR"
+    )
+    outra, nova_outra = exp.enfileirar_exportacao(
+        USUARIO_ID, "chamados", "xlsx", {"status": "Concluído"}, "pt_BR"
+    )
+
+    assert nova and not nova_repetida and nova_outra
+    assert repetida["id"] == primeira["id"]
+    assert outra["id"] != primeira["id"]
+    assert primeira["status"] == "pendente"
+
+
+def test_arquivo_pronto_reaproveitado_so_dentro_da_janela(usuario):
+    pronta, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "csv", {}, "pt_BR")
+    agora = datetime.now(UTC)
+    _atualizar(
+        pronta["id"],
+        status="pronto",
+        arquivo="local:x.csv",
+        concluido_em=agora,
+        expira_em=agora + timedelta(hours=24),
+    )
+
+    with patch("config.Config.EXPORTACAO_JANELA_REUSO_MINUTOS", 10):
+        reaproveitada, nova = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "csv", {}, "pt_BR")
+    assert not nova
+    assert reaproveitada["id"] == pronta["id"]
+    assert reaproveitada["status"] == "pronto"
+
+    with patch("config.Config.EXPORTACAO_JANELA_REUSO_MINUTOS", 0):
+        _, nova = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "csv", {}, "pt_BR")
+    assert nova
+
+
+def test_exportacao_reaproveitavel_so_com_pedido_equivalente(usuario):
+    assert exp.exportacao_reaproveitavel(USUARIO_ID, "chamados", "csv", {}, "en") is None
+    pedido, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "csv", {}, "en")
+
+    assert (
+        exp.exportacao_reaproveitavel(USUARIO_ID, "chamados", "csv", {}, "en")["id"]
+        == (pedido["id"])
+    )
+    assert exp.exportacao_reaproveitavel(USUARIO_ID, "chamados", "xlsx", {}, "en") is None
+
+
+def test_enfileirar_rejeita_tipo_ou_formato_invalido(usuario):
+    with pytest.raises(ValueError):
+        exp.enfileirar_exportacao(USUARIO_ID, "chamados", "pdf", {}, "pt_BR")
+
+
+# ── processar_pendentes ──────────────────────────────────────────────────────
+
+
+def test_processa_fila_grava_arquivo_e_notifica(usuario, armazenamento_local):
+    for _ in range(3):
+        make_chamado(rl_codigo="RL-EXP-FILA", area="Geral")
+    exportacao, _ = exp.enfileirar_exportacao(
+        USUARIO_ID, "chamados", "xlsx", {"rl_codigo": "RL-EXP-FILA"}, "pt_BR"
+    )
+
+    with patch("app.models_usuario.Usuario.get_by_id", return_value=usuario):
+        resultado = exp.processar_pendentes()
+
+    assert resultado == {"processados": 1, "prontos": 1, "erros": 0}
+    row = _row(exportacao["id"])
+    assert row.status == "pronto"
+    assert row.linhas == 3
+    assert row.tentativas == 1
+    assert row.expira_em > datetime.now(UTC)
+    assert row.arquivo.startswith("local:")
+    caminho = os.path.join(armazenamento_local, row.arquivo[len("local:") :])
+    assert os.path.getsize(caminho) == row.tamanho_bytes
+    with open(caminho, "rb") as f:
+        assert load_workbook(io.BytesIO(f.read())).active.max_row == 4
+
+    (notificacao,) = _notificacoes()
+    assert notificacao.tipo == "exportacao_pronta"
+    assert notificacao.chamado_id is None
+    assert notificacao.link == f"/exportacoes/{exportacao['id']}/download"
+    assert row.nome_arquivo in notificacao.mensagem
+
+
+def test_csv_usa_as_colunas_da_planilha(usuario, armazenamento_local):
+    make_chamado(rl_codigo="RL-EXP-CSV", area="Geral", descricao="=cmd()")
+    exportacao, _ = exp.enfileirar_exportacao(
+        USUARIO_ID, "chamados", "csv", {"rl_codigo": "RL-EXP-CSV"}, "pt_BR"
+    )
+
+    with patch("app.models_usuario.Usuario.get_by_id", return_value=usuario):
+        exp.processar_pendentes()
+
+    row = _row(exportacao["id"])
+    assert row.nome_arquivo.endswith(".csv")
+    with open(os.path.join(armazenamento_local, row.arquivo[len("local:") :]), "rb") as f:
+        conteudo = f.read().decode("utf-8-sig").splitlines()
+    assert conteudo[0].startswith("Chamado,Categoria,RL")
+    assert len(conteudo) == 2
+    assert "'=cmd()" in conteudo[1]
+
+
+def test_supervisor_com_mais_linhas_que_o_lote_em_sessao_real(
+    db_sem_savepoint, armazenamento_local
+):
+    """Regressão: com supervisor, a permissão de cada lote consulta usuarios pelo
+    SessionLocal() da thread; isso matava o cursor do streaming no segundo lote.
+    Mais de LOTE_STREAMING (500) linhas, sem o savepoint de db_session."""
+    from sqlalchemy import insert
+
+    from app.db.models.chamado import ChamadoRow
+
+    supervisor = _usuario_mock("exp_sup", "sup@test.com", "Sup", "supervisor", "Manutencao")
+    linhas = 501
+    with db_module.SessionLocal() as session, session.begin():
+        session.add(UsuarioRow(id="exp_sup", email="sup@test.com", nome="Sup", perfil="supervisor"))
+        session.execute(
+            insert(ChamadoRow),
+            [
+                {
+                    "categoria": "Manutencao",
+                    "tipo_solicitacao": "Manutencao",
+                    "descricao": "lote",
+                    "area": "Manutencao",
+                    "rl_codigo": "RL-EXP-SUP",
+                    "solicitante_id": "exp_sup",
+                    "responsavel_id": "resp_lote",
+                    "supervisor_ids_com_acesso": ["exp_sup"],
+                }
+                for _ in range(linhas)
+            ],
+        )
+    exportacao, _ = exp.enfileirar_exportacao(
+        "exp_sup", "chamados", "csv", {"rl_codigo": "RL-EXP-SUP"}, "en"
+    )
+
+    with patch("app.models_usuario.Usuario.get_by_id", return_value=supervisor):
+        resultado = exp.processar_pendentes()
+
+    assert resultado == {"processados": 1, "prontos": 1, "erros": 0}
+    assert _row(exportacao["id"]).linhas == linhas
+
+
+def test_usuario_sem_perfil_recebe_erro(usuario, armazenamento_local):
+    exportacao, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "en")
+    solicitante = _usuario_mock(USUARIO_ID, "exp@test.com", "Exp", "solicitante")
+
+    with patch("app.models_usuario.Usuario.get_by_id", return_value=solicitante):
+        resultado = exp.processar_pendentes()
+
+    assert resultado["erros"] == 1
+    row = _row(exportacao["id"])
+    assert row.status == "erro"
+    assert row.arquivo is None
+    assert "PermissionError" in row.erro
+    (notificacao,) = _notificacoes()
+    assert notificacao.tipo == "exportacao_erro"
+    assert notificacao.titulo == "Export failed"
+    assert os.listdir(armazenamento_local) == []
+
+
+def test_processamento_abandonado_volta_para_a_fila(usuario):
+    exportacao, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "pt_BR")
+    _atualizar(
+        exportacao["id"],
+        status="processando",
+        tentativas=1,
+        iniciado_em=datetime.now(UTC) - timedelta(hours=1),
+    )
+
+    reivindicada = exp.reivindicar_proxima()
+
+    assert reivindicada["id"] == exportacao["id"]
+    assert reivindicada["tentativas"] == 2
+    assert exp.reivindicar_proxima() is None
+
+
+def test_processamento_abandonado_sem_tentativas_vira_erro(usuario):
+    exportacao, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "pt_BR")
+    _atualizar(
+        exportacao["id"],
+        status="processando",
+        tentativas=exp.MAX_TENTATIVAS,
+        iniciado_em=datetime.now(UTC) - timedelta(hours=1),
+    )
+
+    assert exp.reivindicar_proxima() is None
+    assert _row(exportacao["id"]).status == "erro"
+    assert [n.tipo for n in _notificacoes()] == ["exportacao_erro"]
+
+
+def test_tentativa_antiga_nao_conclui_pedido_reivindicado_de_novo(usuario):
+    exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "pt_BR")
+    antiga = exp.reivindicar_proxima()
+    _atualizar(antiga["id"], tentativas=2)
+
+    assert not exp._concluir(antiga, status="pronto")
+    assert _row(antiga["id"]).status == "processando"
+
+
+# ── limpar_expiradas / download ──────────────────────────────────────────────
+
+
+def test_limpar_expiradas_apaga_arquivo_vencido(usuario, armazenamento_local):
+    exportacao, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "pt_BR")
+    (armazenamento_local / "vencido.xlsx").write_bytes(b"PK")
+    agora = datetime.now(UTC)
+    _atualizar(
+        exportacao["id"],
+        status="pronto",
+        arquivo="local:vencido.xlsx",
+        concluido_em=agora - timedelta(days=2),
+        expira_em=agora - timedelta(days=1),
+    )
+    assert not exp.disponivel_para_download(exp.obter_exportacao(exportacao["id"], USUARIO_ID))
+
+    resultado = exp.limpar_expiradas()
+
+    assert resultado["arquivos_removidos"] == 1
+    assert not (armazenamento_local / "vencido.xlsx").exists()
+    row = _row(exportacao["id"])
+    assert row.status == "expirado"
+    assert row.arquivo is None
+
+
+def test_obter_exportacao_so_para_o_dono(usuario):
+    exportacao, _ = exp.enfileirar_exportacao(USUARIO_ID, "chamados", "xlsx", {}, "pt_BR")
+
+    assert exp.obter_exportacao(exportacao["id"], USUARIO_ID)["id"] == exportacao["id"]
+    assert exp.obter_exportacao(exportacao["id"], "outro_usuario") is None
@@ -202,7 +202,9 @@ class TestCriacaoComObservadores:
         stack.enter_context(
             patch("app.services.chamados_criacao_service.Usuario.get_by_id", return_value=sup_mock)
         )
-        stack.enter_context(patch("app.services.chamados_criacao_service.criar_notificacao"))
+        stack.enter_context(
+            patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote")
+        )
         stack.enter_context(patch("app.services.chamados_criacao_service.enviar_webpush_usuario"))
 
     def test_notificacao_observadores_disparada(self, app):
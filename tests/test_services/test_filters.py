@@ -12,6 +12,7 @@ from app.services.filters import (
     aplicar_filtros_dashboard,
     aplicar_filtros_dashboard_com_paginacao,
     construir_condicoes_para_contagem,
+    iterar_chamados_filtrados,
 )
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -243,6 +244,39 @@ def test_paginacao_respeita_condicoes_base():
     assert resultado["docs"][0].solicitante_id == "user_pag_scope_a"
 
 
+# ── iterar_chamados_filtrados (exportação em streaming) ─────────────────────
+
+
+def test_iterar_chamados_filtrados_entrega_tudo_em_lotes_na_ordem_do_dashboard():
+    for _ in range(5):
+        _criar_chamado("user_stream_1", rl_codigo="RL-STREAM-1")
+
+    lotes = list(iterar_chamados_filtrados([], {"rl_codigo": "RL-STREAM-1"}, lote=2))
+
+    assert [len(lote) for lote in lotes] == [2, 2, 1]
+    paginado = aplicar_filtros_dashboard_com_paginacao([], {"rl_codigo": "RL-STREAM-1"}, limite=50)
+    assert [c.id for lote in lotes for c in lote] == [c.id for c in paginado["docs"]]
+
+
+def test_iterar_chamados_filtrados_aplica_condicoes_base_e_busca():
+    _criar_chamado("user_stream_a", rl_codigo="RL-STREAM-2", descricao="Bomba vazando")
+    _criar_chamado("user_stream_a", rl_codigo="RL-STREAM-2", descricao="Troca de lâmpada")
+    _criar_chamado("user_stream_b", rl_codigo="RL-STREAM-2", descricao="Bomba parada")
+
+    from app.db.models.chamado import ChamadoRow
+
+    condicoes_base = [ChamadoRow.solicitante_id == "user_stream_a"]
+    chamados = [
+        c
+        for lote in iterar_chamados_filtrados(
+            condicoes_base, {"rl_codigo": "RL-STREAM-2", "search": "bomba"}, lote=1
+        )
+        for c in lote
+    ]
+
+    assert [c.descricao for c in chamados] == ["Bomba vazando"]
+
+
 # ── aplicar_filtros_dashboard (legado, sem cursor) ──────────────────────────
 
 
@@ -144,6 +144,21 @@ def test_is_gate_valido_fallback_estatico_quando_excecao():
         assert is_gate_valido("Invalido") is False
 
 
+def test_is_gate_valido_falha_do_banco_nao_fica_em_cache():
+    """A allowlist estática da falha não é cacheada: quando o banco volta, os
+    gates cadastrados valem já no pedido seguinte."""
+    from app.services.gates_service import is_gate_valido
+
+    with patch("app.services.gates_service.CategoriaGate") as mock_cls:
+        mock_cls.get_all_ativos.side_effect = [
+            Exception("db down"),
+            [_make_gate_mock("Gate 9", "Pintura")],
+        ]
+        assert is_gate_valido("Gate 9 - Pintura") is False
+        assert is_gate_valido("Gate 9 - Pintura") is True
+        assert mock_cls.get_all_ativos.call_count == 2
+
+
 def test_is_gate_valido_gate_pai_sem_subetapa_rejeitado():
     """'Gate 1' sem sub-etapa é rejeitado (não está no Firestore nem no estático)."""
     from app.services.gates_service import is_gate_valido
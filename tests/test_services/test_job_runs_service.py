@@ -0,0 +1,283 @@
+"""Testes de job_runs_service — telemetria dos jobs agendados.
+
+Testa:
+- _resumir: processados sem contar duas vezes o despachante de timers,
+  ações sem pulados/adiados, erros em todos os níveis
+- disparo_agendado: último disparo e intervalo de gatilhos interval e cron
+- executar_com_telemetria grava sucesso e falha (sem propagar a exceção)
+- resumo_jobs: agregados, tendência e alerta de sobreposição
+- limpar_execucoes_antigas respeita a retenção
+- enfileirar_job: execução abandonada expira; lock ocupado fecha como pulada;
+  falha ao gravar a telemetria mantém o desfecho real do job
+"""
+
+import os
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytz
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import select
+
+from app import db as db_module
+from app.db.models.job_run import JobRunRow
+from app.services import job_runs_service as jrs
+
+_BRT = pytz.timezone("America/Sao_Paulo")
+
+
+@pytest.fixture
+def telemetria_ligada(app, db_session):
+    app.config["JOB_RUNS_ENABLED"] = True
+    yield
+    app.config["JOB_RUNS_ENABLED"] = False
+
+
+def _execucoes(job: str) -> list[JobRunRow]:
+    with db_module.SessionLocal() as session:
+        return list(
+            session.execute(select(JobRunRow).where(JobRunRow.job == job).order_by(JobRunRow.id))
+            .scalars()
+            .all()
+        )
+
+
+def _gravar(job: str, duracao_ms: int, *, intervalo: float = 600.0, atras: int = 0, **campos):
+    inicio = datetime.now(UTC) - timedelta(minutes=atras)
+    with db_module.SessionLocal() as session, session.begin():
+        session.add(
+            JobRunRow(
+                job=job,
+                inicio=inicio,
+                fim=inicio + timedelta(milliseconds=duracao_ms),
+                duracao_ms=duracao_ms,
+                intervalo_segundos=intervalo,
+                processados=campos.get("processados", 0),
+                acoes=campos.get("acoes", 0),
+                erros=campos.get("erros", 0),
+                sucesso=campos.get("sucesso", True),
+                executor="teste:1",
+            )
+        )
+
+
+# ---------------------------------------------------------------------------
+# _resumir
+# ---------------------------------------------------------------------------
+
+
+def test_resumir_escalonamento_soma_niveis_aninhados():
+    resultado = {
+        "escalonamento": {
+            "processados": 12,
+            "escalados": 2,
+            "emails": 3,
+            "pre_avisos": 1,
+            "erros": 1,
+            "pulados_fora_janela": 4,
+            "adiados": 5,
+        },
+        "avisos_resolucao": {"processados": 3, "notificados_50": 1, "erros": 0},
+    }
+    assert jrs._resumir(resultado) == (15, 7, 1)
+
+
+def test_resumir_timers_nao_conta_vencidos_duas_vezes():
+    resultado = {
+        "vencidos": 4,
+        "reprogramados": 4,
+        "erros": 0,
+        "escalonamento": {"processados": 3, "escalados": 1, "erros": 1},
+        "lembrete_confirmacao": {"processados": 1, "lembrete_1": 1},
+    }
+    assert jrs._resumir(resultado) == (4, 2, 1)
+
+
+def test_resumir_retorno_que_nao_e_dict():
+    assert jrs._resumir(True) == (0, 0, 0)
+    assert jrs._resumir(None) == (0, 0, 0)
+    assert jrs._resumir({"removidos": 7, "dry_run": False, "erros": 0}) == (0, 7, 0)
+
+
+# ---------------------------------------------------------------------------
+# disparo_agendado
+# ---------------------------------------------------------------------------
+
+
+def test_disparo_agendado_intervalo():
+    inicio = _BRT.localize(datetime(2026, 10, 19, 8, 0))
+    gatilho = IntervalTrigger(minutes=10, start_date=inicio, timezone=_BRT)
+    agora = _BRT.localize(datetime(2026, 10, 19, 9, 23, 15))
+
+    agendado, intervalo = jrs.disparo_agendado(gatilho, agora)
+
+    assert agendado == _BRT.localize(datetime(2026, 10, 19, 9, 20))
+    assert intervalo == 600.0
+
+
+def test_disparo_agendado_cron_semanal():
+    gatilho = CronTrigger(day_of_week="fri", hour=10, minute=0, timezone=_BRT)
+    agora = _BRT.localize(datetime(2026, 10, 23, 10, 0, 2))  # sexta
+
+    agendado, intervalo = jrs.disparo_agendado(gatilho, agora)
+
+    assert agendado == _BRT.localize(datetime(2026, 10, 23, 10, 0))
+    assert intervalo == 7 * 24 * 3600
+
+
+def test_disparo_agendado_sem_gatilho():
+    assert jrs.disparo_agendado(None, datetime.now(UTC)) == (None, None)
+
+
+# ---------------------------------------------------------------------------
+# executar_com_telemetria
+# ---------------------------------------------------------------------------
+
+
+def test_execucao_com_sucesso_grava_contadores(app, telemetria_ligada):
+    inicio = datetime.now(UTC) - timedelta(minutes=1)
+    gatilho = IntervalTrigger(minutes=30, start_date=inicio)
+
+    resultado = jrs.executar_com_telemetria(
+        app,
+        "digest_teste",
+        lambda: {"usuarios_processados": 5, "digests_enviados": 2, "erros": 1},
+        gatilho=gatilho,
+    )
+
+    assert resultado["digests_enviados"] == 2
+    [run] = _execucoes("digest_teste")
+    assert run.sucesso is True
+    assert (run.processados, run.acoes, run.erros) == (5, 2, 1)
+    assert run.agendado_para == inicio
+    assert run.atraso_ms >= 60_000
+    assert run.intervalo_segundos == 1800.0
+    assert run.resultado == {"usuarios_processados": 5, "digests_enviados": 2, "erros": 1}
+    assert run.executor.endswith(f":{os.getpid()}")
+
+
+def test_excecao_do_job_vira_falha_registrada(app, telemetria_ligada):
+    def _job():
+        raise RuntimeError("graph fora do ar")
+
+    assert jrs.executar_com_telemetria(app, "falha_teste", _job) is None
+
+    [run] = _execucoes("falha_teste")
+    assert run.sucesso is False
+    assert run.erros == 1
+    assert run.erro == "RuntimeError: graph fora do ar"
+    assert run.agendado_para is None
+
+
+def test_flag_desligada_nao_grava(app, db_session):
+    assert jrs.executar_com_telemetria(app, "sem_telemetria", lambda: {"processados": 1})
+    assert _execucoes("sem_telemetria") == []
+
+
+# ---------------------------------------------------------------------------
+# resumo_jobs / retenção
+# ---------------------------------------------------------------------------
+
+
+def test_resumo_marca_job_perto_do_intervalo(db_session):
+    for duracao in (100_000, 200_000, 500_000):  # até 500 s num intervalo de 600 s
+        _gravar("lento_teste", duracao, processados=10, acoes=1)
+    _gravar("rapido_teste", 2_000, erros=1, sucesso=False)
+
+    resumo = {j["job"]: j for j in jrs.resumo_jobs(7, fracao_alerta=0.8)}
+
+    lento = resumo["lento_teste"]
+    assert lento["execucoes"] == 3
+    assert lento["duracao_max_ms"] == 500_000
+    assert lento["processados"] == 30
+    assert lento["uso_intervalo"] == pytest.approx(0.833, abs=1e-3)
+    assert lento["alerta_sobreposicao"] is True
+    assert sum(d["execucoes"] for d in lento["tendencia"]) == 3
+    assert len(lento["ultimas"]) == 3
+
+    rapido = resumo["rapido_teste"]
+    assert rapido["alerta_sobreposicao"] is False
+    assert (rapido["falhas"], rapido["erros"]) == (1, 1)
+
+
+def test_resumo_limita_ultimas_e_janela(db_session):
+    for i in range(5):
+        _gravar("janela_teste", 1_000 + i, atras=i)
+    _gravar("janela_teste", 9_999, atras=60 * 24 * 10)  # fora da janela de 7 dias
+
+    [job] = [j for j in jrs.resumo_jobs(7, ultimas=2) if j["job"] == "janela_teste"]
+
+    assert job["execucoes"] == 5
+    assert job["duracao_max_ms"] == 1_004
+    assert [u["duracao_ms"] for u in job["ultimas"]] == [1_000, 1_001]
+
+
+def test_limpar_execucoes_antigas(db_session):
+    _gravar("retencao_teste", 1_000)
+    _gravar("retencao_teste", 1_000, atras=60 * 24 * 40)
+
+    assert jrs.limpar_execucoes_antigas(dias=30)["removidos"] >= 1
+    assert len(_execucoes("retencao_teste")) == 1
+
+
+# ---------------------------------------------------------------------------
+# enfileirar_job
+# ---------------------------------------------------------------------------
+
+
+def test_execucao_abandonada_nao_bloqueia_novo_disparo(db_session):
+    antigo, nova = jrs._reservar_execucao("fila_teste")
+    assert nova is True
+    assert jrs._reservar_execucao("fila_teste") == (antigo, False)
+
+    with db_module.SessionLocal() as session, session.begin():
+        session.get(JobRunRow, antigo).inicio = datetime.now(UTC) - timedelta(hours=1)
+
+    novo, nova = jrs._reservar_execucao("fila_teste")
+
+    assert nova is True and novo != antigo
+    assert jrs.obter_execucao(antigo)["status"] == "falha"
+    assert jrs.obter_execucao(novo)["status"] == "em_andamento"
+
+
+class _SyncThread:
+    def __init__(self, target=None, **kwargs):
+        self._target = target
+
+    def start(self):
+        self._target()
+
+
+def test_lock_com_outro_worker_fecha_execucao_como_pulada(app, db_session):
+    with (
+        patch("app.services.job_runs_service.threading.Thread", _SyncThread),
+        patch("app.services.scheduler_lock.executar_job_com_lock", return_value=None),
+    ):
+        execucao_id, _ = jrs.enfileirar_job(app, "pulado_teste", lambda: {})
+
+    execucao = jrs.obter_execucao(execucao_id, "pulado_teste")
+    assert execucao["status"] == "pulado"
+    assert jrs.obter_execucao(execucao_id, "outro_job") is None
+    assert all(j["job"] != "pulado_teste" for j in jrs.resumo_jobs(1))
+
+
+@pytest.mark.parametrize(
+    ("fn_job", "status", "erro"),
+    [
+        (lambda: {"processados": 1}, "sucesso", None),
+        (lambda: 1 / 0, "falha", "ZeroDivisionError: division by zero"),
+    ],
+)
+def test_falha_da_telemetria_mantem_desfecho_do_job(app, db_session, fn_job, status, erro):
+    with (
+        patch("app.services.job_runs_service.threading.Thread", _SyncThread),
+        patch.object(jrs, "_serializar", side_effect=ValueError("circular")),
+    ):
+        execucao_id, _ = jrs.enfileirar_job(app, "telemetria_falha_teste", fn_job)
+
+    execucao = jrs.obter_execucao(execucao_id)
+    assert execucao["status"] == status
+    assert execucao["erro"] == erro
+    assert execucao["resultado"] == {"telemetria": "não gravada"}
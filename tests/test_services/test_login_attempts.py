@@ -3,6 +3,7 @@
 from unittest.mock import patch
 
 from app.services.login_attempts import (
+    ATTEMPT_WINDOW,
     LoginAttemptTracker,
 )
 
@@ -21,16 +22,27 @@ def test_get_attempt_count_com_tentativas_retorna_valor():
     assert count == 3
 
 
-def test_increment_attempt_aumenta_contador():
-    """increment_attempt retorna contador incrementado e chama cache_set."""
-    with (
-        patch("app.services.login_attempts.cache_get", return_value=2),
-        patch("app.services.login_attempts.cache_set") as mock_set,
-    ):
+def test_increment_attempt_usa_contador_atomico():
+    """increment_attempt delega a cache_incr com a janela ATTEMPT_WINDOW."""
+    with patch("app.services.login_attempts.cache_incr", return_value=3) as mock_incr:
         new_count = LoginAttemptTracker.increment_attempt("ip1")
     assert new_count == 3
-    mock_set.assert_called_once()
-    assert mock_set.call_args[0][1] == 3
+    mock_incr.assert_called_once_with("login_attempt:ip1", ATTEMPT_WINDOW)
+
+
+def test_increment_attempt_em_memoria_conta_e_mantem_janela():
+    """Sem Redis, falhas seguidas somam e não renovam o TTL da 1ª falha."""
+    import time
+
+    from app.cache import cache_delete
+
+    cache_delete("login_attempt:janela@test.com")
+    assert LoginAttemptTracker.increment_attempt("janela@test.com") == 1
+    with patch("app.cache.time.time", return_value=time.time() + ATTEMPT_WINDOW - 10):
+        assert LoginAttemptTracker.increment_attempt("janela@test.com") == 2
+    with patch("app.cache.time.time", return_value=time.time() + ATTEMPT_WINDOW + 1):
+        assert LoginAttemptTracker.get_attempt_count("janela@test.com") == 0
+    cache_delete("login_attempt:janela@test.com")
 
 
 def test_is_locked_out_sem_lockout_retorna_false():
@@ -238,6 +238,8 @@ def test_setor_get_all_excecao_no_banco_retorna_lista_vazia(app, monkeypatch):
     monkeypatch.setattr(models_categorias.db_module, "SessionLocal", _explode)
 
     assert models_categorias.CategoriaSetor.get_all() == []
+    with pytest.raises(RuntimeError):
+        models_categorias.CategoriaSetor.get_all(levantar_erro=True)
 
 
 def test_setor_get_all_incluindo_inativos_excecao_no_banco_retorna_lista_vazia(app, monkeypatch):
@@ -411,6 +411,76 @@ def test_delete_remove_usuario(app):
         assert Usuario.get_by_id("u1") is None
 
 
+# ── get_by_id_sessao (cache do user_loader) ───────────────────────────────────
+
+
+@pytest.fixture
+def cache_sessao_ligado(monkeypatch):
+    from app.cache import static_cache_delete
+
+    monkeypatch.setattr("config.Config.CACHE_USUARIO_SESSAO_SEGUNDOS", 60)
+    yield
+    static_cache_delete("usuario_sessao:u_sessao")
+
+
+def test_get_by_id_sessao_le_o_banco_uma_vez(app, cache_sessao_ligado):
+    with _pii_off():
+        Usuario(id="u_sessao", email="s@b.com", nome="Sessao").save()
+        with patch.object(Usuario, "get_by_id", wraps=Usuario.get_by_id) as espiao:
+            primeiro = Usuario.get_by_id_sessao("u_sessao")
+            segundo = Usuario.get_by_id_sessao("u_sessao")
+
+    assert primeiro is not segundo
+    assert primeiro.nome == segundo.nome == "Sessao"
+    assert espiao.call_count == 1
+
+
+def test_get_by_id_sessao_update_que_falha_nao_vaza_estado(app, cache_sessao_ligado):
+    with _pii_off():
+        u = Usuario(id="u_sessao", email="s@b.com", nome="Sessao")
+        u.set_password("antiga")
+        u.save()
+        atual = Usuario.get_by_id_sessao("u_sessao")
+
+        # mfa_secret é cifrado depois que senha e mfa_enabled já mudaram o objeto.
+        with patch("app.models_usuario.maybe_encrypt", side_effect=RuntimeError("kms")):
+            assert atual.update(senha="nova", mfa_enabled=True, mfa_secret="S3CR3T") is False
+        assert atual.mfa_enabled is True
+
+        depois = Usuario.get_by_id_sessao("u_sessao")
+    assert depois.mfa_enabled is False
+    assert depois.mfa_secret is None
+    assert depois.check_password("antiga")
+
+
+def test_get_by_id_sessao_update_e_delete_invalidam(app, cache_sessao_ligado):
+    with _pii_off():
+        u = Usuario(id="u_sessao", email="s@b.com", nome="Sessao")
+        u.save()
+        Usuario.get_by_id_sessao("u_sessao")
+
+        Usuario.get_by_id("u_sessao").update(ativo=False, mfa_enabled=True)
+        atualizado = Usuario.get_by_id_sessao("u_sessao")
+        assert (atualizado.ativo, atualizado.mfa_enabled) == (False, True)
+
+        u.delete()
+        assert Usuario.get_by_id_sessao("u_sessao") is None
+
+
+def test_get_by_id_sessao_nao_guarda_usuario_ausente(app, cache_sessao_ligado):
+    assert Usuario.get_by_id_sessao("u_sessao") is None
+    with _pii_off():
+        Usuario(id="u_sessao", email="s@b.com", nome="Sessao").save()
+        assert Usuario.get_by_id_sessao("u_sessao").nome == "Sessao"
+
+
+def test_get_by_id_sessao_desligado_vai_sempre_ao_banco(app):
+    with patch.object(Usuario, "get_by_id", return_value=None) as mock_get:
+        Usuario.get_by_id_sessao("u_qualquer")
+        Usuario.get_by_id_sessao("u_qualquer")
+    assert mock_get.call_count == 2
+
+
 # ── get_all ───────────────────────────────────────────────────────────────────
 
 
@@ -854,3 +924,20 @@ def test_integracao_fernet_to_dict_from_dict_round_trip():
         recuperado = Usuario.from_dict(d, id="u1")
         assert recuperado.email == "secreto@b.com"
         assert recuperado.nome == "Nome Secreto"
+
+
+def test_get_all_descriptografa_pii_em_lote():
+    """get_all lê a configuração de PII uma vez por lote, não uma vez por campo."""
+    from app.services import pii_encryption
+
+    with _pii_on():
+        for i in range(3):
+            Usuario(id=f"lote{i}", email=f"lote{i}@dtx.aero", nome=f"Lote {i}").save()
+        with patch.object(pii_encryption, "_ler_config", wraps=pii_encryption._ler_config) as ler:
+            usuarios = Usuario.get_all()
+            por_id = Usuario.get_by_ids(["lote0", "lote2"])
+
+    assert [u.nome for u in usuarios if u.id.startswith("lote")] == ["Lote 0", "Lote 1", "Lote 2"]
+    assert por_id["lote2"].email == "lote2@dtx.aero"
+    # is_pii_encryption_enabled do get_all + um maybe_decrypt_many por consulta.
+    assert ler.call_count == 3
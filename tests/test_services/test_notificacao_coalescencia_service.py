@@ -0,0 +1,188 @@
+"""
+Coalescência de e-mails de fan-out (notificacao_coalescencia_service).
+
+Testa:
+- janela 0 → coalescencia_ativa() False (fan-out envia na hora, como antes)
+- um evento na janela → e-mail original, sem resumo
+- N eventos do mesmo (destinatário, chamado) → um único e-mail-resumo
+- chamados/destinatários diferentes não se misturam
+- uma única thread despachante, qualquer que seja o número de chaves
+- janela limitada a _JANELA_MAX_SEGUNDOS (teto do que se perde sem shutdown)
+- fan-out de mudança de status passa pela janela quando ativa e loga o
+  enfileiramento, não um envio
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+MODULO = "app.services.notificacao_coalescencia_service"
+
+
+@pytest.fixture
+def janela_longa(app):
+    """Janela grande o bastante para o timer nunca disparar sozinho no teste."""
+    from app.services import notificacao_coalescencia_service as coal
+
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 3600
+    yield coal
+    with patch(f"{MODULO}.enviar_email", return_value=(True, None)):
+        coal.despachar_pendentes()
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 0
+
+
+def _enfileirar(coal, destinatario, chamado_id, resumo, **kw):
+    coal.enfileirar_email(
+        destinatario,
+        f"Assunto {resumo}",
+        f"<p>{resumo}</p>",
+        resumo,
+        chamado_id=chamado_id,
+        numero_chamado=kw.pop("numero_chamado", "CH-1"),
+        resumo=resumo,
+        link=kw.pop("link", "http://x/chamado/ch1"),
+        **kw,
+    )
+
+
+def test_janela_zero_desativa_coalescencia(app):
+    from app.services.notificacao_coalescencia_service import coalescencia_ativa
+
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 0
+    with app.app_context():
+        assert coalescencia_ativa() is False
+
+
+def test_fora_de_app_context_nao_coalesce():
+    from app.services.notificacao_coalescencia_service import coalescencia_ativa
+
+    assert coalescencia_ativa() is False
+
+
+def test_evento_unico_envia_email_original(app, janela_longa):
+    with app.app_context():
+        assert janela_longa.coalescencia_ativa() is True
+        _enfileirar(janela_longa, "a@x.com", "ch1", "Status updated to Done")
+
+    with patch(f"{MODULO}.enviar_email", return_value=(True, None)) as mock_email:
+        assert janela_longa.despachar_pendentes() == 1
+
+    mock_email.assert_called_once()
+    args = mock_email.call_args.args
+    assert args[0] == "a@x.com"
+    assert args[1] == "Assunto Status updated to Done"
+    assert args[2] == "<p>Status updated to Done</p>"
+
+
+def test_varios_eventos_viram_um_resumo(app, janela_longa):
+    with app.app_context():
+        _enfileirar(janela_longa, "a@x.com", "ch1", "Description edited by Ana")
+        _enfileirar(janela_longa, "A@X.com", "ch1", "Status updated to Done")
+        _enfileirar(janela_longa, "a@x.com", "ch1", "New reply from Ana", importance="high")
+
+    with patch(f"{MODULO}.enviar_email", return_value=(True, None)) as mock_email:
+        assert janela_longa.despachar_pendentes() == 1
+
+    mock_email.assert_called_once()
+    args, kwargs = mock_email.call_args
+    assert args[1] == "Ticket CH-1: 3 updates"
+    assert "Description edited by Ana" in args[2]
+    assert "Status updated to Done" in args[2]
+    assert "http://x/chamado/ch1" in args[2]
+    assert "- New reply from Ana" in args[3]
+    assert kwargs["importance"] == "high"
+
+
+def test_chaves_distintas_nao_se_misturam(app, janela_longa):
+    with app.app_context():
+        _enfileirar(janela_longa, "a@x.com", "ch1", "e1")
+        _enfileirar(janela_longa, "a@x.com", "ch2", "e2", numero_chamado="CH-2")
+        _enfileirar(janela_longa, "b@x.com", "ch1", "e3")
+
+    with patch(f"{MODULO}.enviar_email", return_value=(True, None)) as mock_email:
+        assert janela_longa.despachar_pendentes() == 3
+
+    assert mock_email.call_count == 3
+    assuntos = sorted(c.args[1] for c in mock_email.call_args_list)
+    assert assuntos == ["Assunto e1", "Assunto e2", "Assunto e3"]
+
+
+def test_timer_despacha_ao_fim_da_janela(app):
+    import threading
+
+    from app.services import notificacao_coalescencia_service as coal
+
+    enviado = threading.Event()
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 0.05
+    try:
+        with (
+            patch(
+                f"{MODULO}.enviar_email", side_effect=lambda *a, **k: enviado.set() or (True, None)
+            ),
+        ):
+            with app.app_context():
+                _enfileirar(coal, "a@x.com", "ch1", "e1")
+            assert enviado.wait(2)
+    finally:
+        app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 0
+
+
+def test_muitas_chaves_usam_uma_unica_thread(app, janela_longa):
+    import threading
+
+    with app.app_context():
+        _enfileirar(janela_longa, "a@x.com", "ch0", "e0")
+        threads_antes = threading.active_count()
+        for i in range(1, 50):
+            _enfileirar(janela_longa, f"d{i}@x.com", f"ch{i}", f"e{i}")
+
+    assert threading.active_count() == threads_antes
+    nomes = [t.name for t in threading.enumerate()]
+    assert nomes.count("coalescencia-email") == 1
+
+
+def test_janela_limitada_ao_teto(app):
+    from app.services import notificacao_coalescencia_service as coal
+
+    app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 86400
+    try:
+        with app.app_context():
+            assert coal._janela_segundos() == coal._JANELA_MAX_SEGUNDOS
+    finally:
+        app.config["NOTIFY_COALESCE_WINDOW_SECONDS"] = 0
+
+
+def test_fanout_status_passa_pela_janela(app, janela_longa, caplog):
+    from app.services.chamado_notificacao_service import notificar_observadores_mudanca_status
+
+    usuario = MagicMock(id="u1", email="obs@x.com")
+    with (
+        caplog.at_level("INFO", logger="app.services.chamado_notificacao_service"),
+        app.app_context(),
+        patch(
+            "app.services.chamado_notificacao_service.destinatarios_do_chamado",
+            return_value=[usuario],
+        ),
+        patch("app.services.chamado_notificacao_service.criar_notificacoes_em_lote"),
+        patch("app.services.chamado_notificacao_service.webpush_service"),
+        patch("app.services.chamado_notificacao_service.enviar_email") as mock_direto,
+    ):
+        for status in ("Em Atendimento", "Concluído"):
+            notificar_observadores_mudanca_status(
+                chamado_id="ch1",
+                numero_chamado="CH-1",
+                categoria="Projetos",
+                novo_status=status,
+                dados_chamado={},
+            )
+
+    mock_direto.assert_not_called()
+    assert "queued for coalescing to obs@x.com" in caplog.text
+    assert "sent to obs@x.com" not in caplog.text
+    with (
+        caplog.at_level("INFO", logger=MODULO),
+        patch(f"{MODULO}.enviar_email", return_value=(True, None)) as mock_email,
+    ):
+        assert janela_longa.despachar_pendentes() == 1
+    assert mock_email.call_args.args[1] == "Ticket CH-1: 2 updates"
+    assert "Coalesced e-mail (2 event(s)) sent to obs@x.com" in caplog.text
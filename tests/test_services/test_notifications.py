@@ -950,6 +950,160 @@ def test_enviar_via_graph_excecao_generica_no_sendmail():
     assert "network error" in str(err)
 
 
+# ── enviar_emails_em_lote — JSON batching do Graph ───────────────────────────
+
+
+def _resp_json(corpo: dict):
+    import json
+
+    resp = MagicMock()
+    resp.__enter__ = lambda s: s
+    resp.__exit__ = MagicMock(return_value=False)
+    resp.read.return_value = json.dumps(corpo).encode()
+    resp.status = 200
+    return resp
+
+
+_ENV_GRAPH = {
+    "GRAPH_TENANT_ID": "tid",
+    "GRAPH_CLIENT_ID": "cid",
+    "GRAPH_CLIENT_SECRET": "sec",
+    "GRAPH_SENDER_EMAIL": "x@dtx.aero",
+}
+
+
+def _mensagens(n: int) -> list[dict]:
+    return [
+        {"destinatario": f"d{i}@test.com", "assunto": f"A{i}", "corpo_html": "<p>H</p>"}
+        for i in range(n)
+    ]
+
+
+def _enviar_lote_graph_real(app, mensagens, respostas_batch):
+    """Chama enviar_emails_em_lote com envio real ligado; o primeiro urlopen
+    devolve o token e os seguintes, na ordem, cada resposta de $batch."""
+    from app.services.notifications import enviar_emails_em_lote
+
+    mock_urlopen = MagicMock(
+        side_effect=[_resp_json({"access_token": "tok"})] + [_resp_json(r) for r in respostas_batch]
+    )
+    with (
+        app.app_context(),
+        patch.dict("os.environ", _ENV_GRAPH),
+        patch("urllib.request.urlopen", mock_urlopen),
+        patch("app.services.notifications_core.time.sleep") as mock_sleep,
+    ):
+        app.config["TESTING"] = False
+        app.config["NOTIFY_EMAIL_ENABLED"] = True
+        try:
+            resultados = enviar_emails_em_lote(mensagens)
+        finally:
+            app.config["TESTING"] = True
+            app.config["NOTIFY_EMAIL_ENABLED"] = False
+    return resultados, mock_urlopen, mock_sleep
+
+
+def _ids_do_batch(mock_urlopen, chamada: int) -> list[str]:
+    import json
+
+    return [
+        r["id"] for r in json.loads(mock_urlopen.call_args_list[chamada][0][0].data)["requests"]
+    ]
+
+
+def test_enviar_emails_em_lote_um_token_e_batch_de_4(app):
+    """9 e-mails = 1 token + 3 POST /$batch (4 + 4 + 1) — o Outlook só admite 4
+    sendMail simultâneos na mesma caixa. Falha de um item não derruba os demais."""
+    import json
+
+    respostas = [
+        {"responses": [{"id": str(i), "status": 202} for i in range(4)]},
+        {"responses": [{"id": str(i), "status": 202} for i in range(4, 8)]},
+        {"responses": [{"id": "8", "status": 202}]},
+    ]
+    respostas[0]["responses"][3] = {"id": "3", "status": 400, "body": {"error": "bad"}}
+
+    resultados, mock_urlopen, mock_sleep = _enviar_lote_graph_real(app, _mensagens(9), respostas)
+
+    assert mock_urlopen.call_count == 4
+    req_batch = mock_urlopen.call_args_list[1][0][0]
+    assert req_batch.full_url.endswith("/v1.0/$batch")
+    corpo = json.loads(req_batch.data)
+    assert len(corpo["requests"]) == 4
+    assert corpo["requests"][0]["url"] == "/users/x%40dtx.aero/sendMail"
+    assert corpo["requests"][0]["body"]["message"]["subject"] == "A0"
+    assert [ok for ok, _ in resultados].count(True) == 8
+    assert resultados[3][0] is False
+    assert "400" in resultados[3][1]
+    mock_sleep.assert_not_called()
+
+
+def test_enviar_emails_em_lote_reenvia_429_depois_do_retry_after(app):
+    """Itens que voltam 429 no meio de um lote com 202 são reenviados só eles,
+    depois do Retry-After do Graph; um item que segue em 429 até a última rodada
+    fica como falha."""
+    respostas = [
+        {
+            "responses": [
+                {"id": "0", "status": 202},
+                {"id": "1", "status": 429, "headers": {"Retry-After": "7"}, "body": {}},
+                {"id": "2", "status": 202},
+                {"id": "3", "status": 429, "headers": {"Retry-After": "2"}, "body": {}},
+            ]
+        },
+        {"responses": [{"id": "4", "status": 202}]},
+        {
+            "responses": [
+                {"id": "1", "status": 202},
+                {"id": "3", "status": 429, "headers": {"Retry-After": "1"}, "body": {}},
+            ]
+        },
+        {"responses": [{"id": "3", "status": 429, "body": {}}]},
+    ]
+
+    resultados, mock_urlopen, mock_sleep = _enviar_lote_graph_real(app, _mensagens(5), respostas)
+
+    assert mock_urlopen.call_count == 5
+    assert _ids_do_batch(mock_urlopen, 3) == ["1", "3"]
+    assert _ids_do_batch(mock_urlopen, 4) == ["3"]
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [7.0, 1.0]
+    assert [ok for ok, _ in resultados] == [True, True, True, False, True]
+    assert "429" in resultados[3][1]
+
+
+def test_enviar_emails_em_lote_falha_token_marca_todos(app):
+    import urllib.error
+
+    from app.services.notifications import enviar_emails_em_lote
+
+    with (
+        app.app_context(),
+        patch.dict("os.environ", _ENV_GRAPH),
+        patch("urllib.request.urlopen", side_effect=urllib.error.URLError("timeout")),
+    ):
+        app.config["TESTING"] = False
+        app.config["NOTIFY_EMAIL_ENABLED"] = True
+        try:
+            resultados = enviar_emails_em_lote(_mensagens(2) + [{"destinatario": ""}])
+        finally:
+            app.config["TESTING"] = True
+            app.config["NOTIFY_EMAIL_ENABLED"] = False
+
+    assert [ok for ok, _ in resultados] == [False, False, False]
+    assert "OAuth2" in resultados[0][1]
+    assert resultados[2] == (False, None)
+
+
+def test_enviar_emails_em_lote_suprimido_em_testes(app):
+    from app.services.notifications import enviar_emails_em_lote
+
+    with app.app_context(), patch("urllib.request.urlopen") as mock_urlopen:
+        resultados = enviar_emails_em_lote(_mensagens(3))
+
+    mock_urlopen.assert_not_called()
+    assert resultados == [(True, None)] * 3
+
+
 # ── Ramos de falha das funções de notificação ────────────────────────────────
 
 
@@ -2258,3 +2412,25 @@ def test_notificar_digest_diario_falha_loga_warning(app):
         notificar_digest_diario(
             usuario_id="resp_1", email_dest="resp@dtx.aero", vencidos_ou_perto=[], abertos=[]
         )
+
+
+def test_notificar_digests_diarios_envia_em_lote(app):
+    from app.services.notifications import notificar_digests_diarios
+
+    digests = [
+        {"usuario_id": "r1", "email_dest": "r1@dtx.aero", "vencidos_ou_perto": [], "abertos": []},
+        {"usuario_id": "r2", "email_dest": "r2@dtx.aero", "vencidos_ou_perto": [], "abertos": []},
+    ]
+    with (
+        app.app_context(),
+        patch(
+            "app.services.notifications_escalonamento.enviar_emails_em_lote",
+            return_value=[(True, None), (False, "HTTP 429")],
+        ) as mock_lote,
+    ):
+        enviados = notificar_digests_diarios(digests)
+
+    assert enviados == [True, False]
+    [mensagens] = mock_lote.call_args[0]
+    assert [m["destinatario"] for m in mensagens] == ["r1@dtx.aero", "r2@dtx.aero"]
+    assert "0 open ticket" in mensagens[0]["assunto"]
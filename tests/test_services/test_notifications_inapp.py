@@ -133,6 +133,87 @@ def test_criar_notificacao_sem_categoria_grava_none():
     assert row.solicitante_nome is None
 
 
+# ── criar_notificacoes_em_lote ─────────────────────────────────────────────────
+
+
+def test_criar_notificacoes_em_lote_persiste_todas_na_ordem():
+    """Um único lote grava uma linha por destinatário e devolve os ids na ordem."""
+    from app.services.notifications_inapp import (
+        contar_nao_lidas,
+        criar_notificacoes_em_lote,
+        db_module,
+    )
+
+    chamado = make_chamado()
+    ids = criar_notificacoes_em_lote(
+        [
+            {
+                "usuario_id": uid,
+                "chamado_id": chamado.id,
+                "numero_chamado": chamado.numero_chamado,
+                "titulo": "Título",
+                "mensagem": "TI",
+                "tipo": "observador_incluido",
+                "categoria": "TI",
+            }
+            for uid in ("lote_a", "lote_b", "lote_c")
+        ]
+    )
+
+    assert len(ids) == 3
+    session = db_module.SessionLocal()
+    assert [session.get(NotificacaoRow, i).usuario_id for i in ids] == [
+        "lote_a",
+        "lote_b",
+        "lote_c",
+    ]
+    assert contar_nao_lidas("lote_b") == 1
+
+
+def test_criar_notificacoes_em_lote_descarta_itens_invalidos():
+    """Itens sem usuario_id ou com chamado_id inválido ficam de fora do INSERT."""
+    from app.services.notifications_inapp import criar_notificacoes_em_lote
+
+    chamado = make_chamado()
+    ids = criar_notificacoes_em_lote(
+        [
+            {"usuario_id": "", "chamado_id": chamado.id, "titulo": "T", "mensagem": "M"},
+            {"usuario_id": "u1", "chamado_id": "nao-numerico", "titulo": "T", "mensagem": "M"},
+            {"usuario_id": "u1", "chamado_id": chamado.id, "titulo": "T", "mensagem": "M"},
+        ]
+    )
+
+    assert len(ids) == 1
+
+
+def test_criar_notificacoes_em_lote_vazio_nao_abre_sessao(monkeypatch):
+    """Lista vazia (ou só itens inválidos) retorna [] sem tocar no banco."""
+    from app.services import notifications_inapp
+
+    def _explode():
+        raise AssertionError("não deveria abrir sessão")
+
+    monkeypatch.setattr(notifications_inapp.db_module, "SessionLocal", _explode)
+
+    assert notifications_inapp.criar_notificacoes_em_lote([]) == []
+    assert notifications_inapp.criar_notificacoes_em_lote([{"usuario_id": "u1"}]) == []
+
+
+def test_criar_notificacoes_em_lote_retorna_vazio_quando_banco_falha(monkeypatch):
+    """Falha no banco é logada e o lote inteiro retorna [] (sem propagar)."""
+    from app.services import notifications_inapp
+
+    def _explode():
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(notifications_inapp.db_module, "SessionLocal", _explode)
+
+    result = notifications_inapp.criar_notificacoes_em_lote(
+        [{"usuario_id": "u1", "chamado_id": 1, "titulo": "T", "mensagem": "M"}]
+    )
+    assert result == []
+
+
 # ── listar_para_usuario ────────────────────────────────────────────────────────
 
 
@@ -89,7 +89,7 @@ def _criar_chamado_patched(form, area_solicitante, get_by_email_return):
         patch("app.services.chamados_criacao_service.notificar_aprovador_novo_chamado"),
         patch("app.services.chamados_criacao_service.notificar_setores_adicionais_chamado"),
         patch("app.services.chamados_criacao_service._notificar_observadores_inclusao"),
-        patch("app.services.chamados_criacao_service.criar_notificacao"),
+        patch("app.services.chamados_criacao_service.criar_notificacoes_em_lote"),
         patch("app.services.chamados_criacao_service.enviar_webpush_usuario"),
         patch(
             "app.services.chamados_criacao_service.Usuario.get_by_email",
@@ -251,3 +251,92 @@ def test_string_unicode_round_trip(valid_fernet_key):
     ):
         ct = encrypt_field(texto)
         assert decrypt_field(ct) == texto
+
+
+# ── Chaveiro (cache por versão de chave, MultiFernet) e lote ──────────────────
+
+
+def _env_pii(key: str, anteriores: str = ""):
+    return patch.dict(
+        os.environ,
+        {
+            "ENCRYPT_PII_AT_REST": "true",
+            "ENCRYPTION_KEY": key,
+            "ENCRYPTION_KEYS_ANTERIORES": anteriores,
+        },
+        clear=False,
+    )
+
+
+def test_chaveiro_e_construido_uma_vez_por_versao_de_chave(valid_fernet_key):
+    """Vários campos com a mesma chave reutilizam a mesma instância; chave nova gera outra."""
+    from cryptography.fernet import Fernet
+
+    from app.services import pii_encryption
+
+    with patch("app.services.pii_encryption._get_flask_config", return_value=None):
+        with (
+            _env_pii(valid_fernet_key),
+            patch.object(
+                pii_encryption, "ChaveiroPII", wraps=pii_encryption.ChaveiroPII
+            ) as construtor,
+        ):
+            pii_encryption._chaveiro.cache_clear()
+            for i in range(50):
+                pii_encryption.maybe_decrypt(pii_encryption.encrypt_field(f"user{i}@dtx.aero"))
+            assert construtor.call_count == 1
+            primeiro = pii_encryption._chaveiro_configurado()
+
+        with _env_pii(Fernet.generate_key().decode()):
+            assert pii_encryption._chaveiro_configurado() is not primeiro
+
+
+def test_rotacao_chave_anterior_decifra_e_rotate_field_recifra(valid_fernet_key):
+    """Com a chave antiga em ENCRYPTION_KEYS_ANTERIORES, dados antigos seguem legíveis."""
+    from cryptography.fernet import Fernet, InvalidToken
+
+    from app.services.pii_encryption import decrypt_field, encrypt_field, rotate_field
+
+    nova = Fernet.generate_key().decode()
+    with patch("app.services.pii_encryption._get_flask_config", return_value=None):
+        with _env_pii(valid_fernet_key):
+            antigo = encrypt_field("João Silva")
+        with _env_pii(nova, anteriores=valid_fernet_key):
+            assert decrypt_field(antigo) == "João Silva"
+            rotacionado = rotate_field(antigo)
+            assert rotate_field("legado@dtx.aero").startswith("fernet:v1:")
+        with _env_pii(nova):
+            assert decrypt_field(rotacionado) == "João Silva"
+            with pytest.raises(InvalidToken):
+                decrypt_field(antigo)
+
+
+def test_encrypt_many_decrypt_many_round_trip_com_legado(valid_fernet_key):
+    from app.services.pii_encryption import decrypt_many, encrypt_many
+
+    with (
+        patch("app.services.pii_encryption._get_flask_config", return_value=None),
+        _env_pii(valid_fernet_key),
+    ):
+        cifrados = encrypt_many(["a@dtx.aero", "Ana", ""])
+        assert all(c.startswith("fernet:v1:") for c in cifrados)
+        assert decrypt_many([*cifrados, "legado"]) == ["a@dtx.aero", "Ana", "", "legado"]
+
+
+def test_maybe_decrypt_many_mantem_valor_que_falha(valid_fernet_key, caplog):
+    """Token de outra chave volta como está (igual a maybe_decrypt), com um único warning."""
+    from cryptography.fernet import Fernet
+
+    from app.services.pii_encryption import encrypt_field, maybe_decrypt_many
+
+    with patch("app.services.pii_encryption._get_flask_config", return_value=None):
+        with _env_pii(Fernet.generate_key().decode()):
+            estrangeiro = encrypt_field("outro")
+        with _env_pii(valid_fernet_key):
+            bom = encrypt_field("Ana")
+            with caplog.at_level("WARNING", logger="app.services.pii_encryption"):
+                resultado = maybe_decrypt_many([bom, estrangeiro, estrangeiro, "legado"])
+
+    assert resultado == ["Ana", estrangeiro, estrangeiro, "legado"]
+    assert len(caplog.records) == 1
+    assert "2 campo(s)" in caplog.records[0].getMessage()
@@ -0,0 +1,144 @@
+"""Testes do job de criptografia/rotação de PII contra o Postgres de teste:
+checkpoint/retomada, CAS por usuário, rotação MultiFernet e pool de processos."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import select
+
+import app.db as db_module
+from app.db.models.pii_recriptografia import PiiRecriptografiaRow
+from app.db.models.usuario import UsuarioRow
+from app.models_usuario import Usuario
+from app.services import pii_recriptografia
+from app.services.pii_encryption import ChaveiroPII
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+def _env(key: str, anteriores: str = ""):
+    return patch.dict(
+        os.environ,
+        {
+            "ENCRYPT_PII_AT_REST": "true",
+            "ENCRYPTION_KEY": key,
+            "ENCRYPTION_KEYS_ANTERIORES": anteriores,
+        },
+    )
+
+
+@pytest.fixture(autouse=True)
+def _sem_flask_config():
+    with patch("app.services.pii_encryption._get_flask_config", return_value=None):
+        yield
+
+
+@pytest.fixture
+def usuarios_plaintext():
+    with patch.dict(os.environ, {"ENCRYPT_PII_AT_REST": "false"}):
+        for i in range(7):
+            Usuario(id=f"pii_{i}", email=f"u{i}@dtx.aero", nome=f"Usuário {i}").save()
+
+
+def _linhas():
+    with db_module.SessionLocal() as session:
+        return {
+            r.id: r
+            for r in session.execute(select(UsuarioRow).where(UsuarioRow.id.like("pii_%")))
+            .scalars()
+            .all()
+        }
+
+
+def test_criptografia_inicial_retomada_e_idempotencia(usuarios_plaintext):
+    key = Fernet.generate_key().decode()
+    with _env(key):
+        parcial = pii_recriptografia.executar(execucao="t", lote=3, workers=1, max_lotes=1)
+        assert parcial["ultimo_id"] == "pii_2"
+        assert parcial["concluido"] is False
+        assert not _linhas()["pii_3"].email.startswith("fernet:v1:")
+
+        final = pii_recriptografia.executar(execucao="t", lote=3, workers=1)
+
+        assert final["concluido"] is True
+        assert final["processados"] == 7
+        assert final["atualizados"] == 7
+        assert Usuario.get_by_email("u5@dtx.aero").nome == "Usuário 5"
+        linhas = _linhas()
+        assert all(
+            r.email.startswith("fernet:v1:") and r.email_lookup_hash for r in linhas.values()
+        )
+
+        # Execução concluída recomeça do zero e não acha nada a mudar.
+        de_novo = pii_recriptografia.executar(execucao="t", lote=3, workers=1)
+        assert de_novo["processados"] == 7
+        assert de_novo["atualizados"] == 0
+        assert de_novo["concluido"] is True
+
+
+def test_execucao_concluida_pega_usuario_gravado_depois(usuarios_plaintext):
+    key = Fernet.generate_key().decode()
+    with _env(key):
+        assert pii_recriptografia.executar(execucao="t", lote=3, workers=1)["concluido"]
+
+    with patch.dict(os.environ, {"ENCRYPT_PII_AT_REST": "false"}):
+        Usuario(id="pii_novo", email="novo@dtx.aero", nome="Novo").save()
+
+    with _env(key):
+        final = pii_recriptografia.executar(execucao="t", lote=3, workers=1)
+
+    assert final["atualizados"] == 1
+    assert _linhas()["pii_novo"].email.startswith("fernet:v1:")
+
+
+def test_rotacao_de_chave_com_pool_de_processos(usuarios_plaintext):
+    antiga, nova = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    with _env(antiga):
+        pii_recriptografia.executar(lote=4, workers=1)
+
+    with _env(nova, anteriores=antiga):
+        estimativa = pii_recriptografia.estimar(lote=4, workers=2, amostra=100)
+        assert estimativa["precisam_atualizar"] == 7
+        assert estimativa["usuarios_por_segundo"] > 0
+
+        stats = pii_recriptografia.executar(lote=4, workers=2)
+
+    assert stats["execucao"] == pii_recriptografia.execucao_padrao(nova)
+    assert stats["atualizados"] == 7
+    so_nova = ChaveiroPII(nova)
+    assert {so_nova.decifrar(r.nome) for r in _linhas().values()} == {
+        f"Usuário {i}" for i in range(7)
+    }
+
+
+def test_cas_nao_sobrescreve_usuario_alterado_durante_o_job(usuarios_plaintext):
+    key = Fernet.generate_key().decode()
+    processar = pii_recriptografia.processar_lote
+
+    def _processar_e_app_edita(*args):
+        resultado = processar(*args)
+        with patch.dict(os.environ, {"ENCRYPT_PII_AT_REST": "false"}):
+            Usuario.get_by_id("pii_1").update(nome="Editado no meio")
+        return resultado
+
+    with (
+        _env(key),
+        patch.object(pii_recriptografia, "processar_lote", side_effect=_processar_e_app_edita),
+    ):
+        stats = pii_recriptografia.executar(execucao="cas", lote=10, workers=1)
+
+    assert stats["conflitos"] == 1
+    assert stats["atualizados"] == 6
+    assert _linhas()["pii_1"].nome == "Editado no meio"
+    with db_module.SessionLocal() as session:
+        assert session.get(PiiRecriptografiaRow, "cas").conflitos == 1
+
+
+def test_sem_chave_levanta_valor_claro():
+    with (
+        patch.dict(os.environ, {"ENCRYPTION_KEY": ""}),
+        pytest.raises(ValueError, match="ENCRYPTION_KEY"),
+    ):
+        pii_recriptografia.executar()
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app import db as db_module
 from app.models import Chamado
 from app.services.report_service import enviar_alertas_prazo_24h
 
@@ -902,3 +903,176 @@ def test_enviar_relatorio_semanal_loga_warning_quando_responsavel_sem_email(app,
         record.levelno == logging.WARNING and "sup_sem_email" in record.getMessage()
         for record in caplog.records
     )
+
+
+# ── snapshot / reenvio ────────────────────────────────────────────────────────
+
+
+def _chamado_relatorio(numero, area, responsavel_id, atrasado=False):
+    return {
+        "id": numero,
+        "numero": numero,
+        "categoria": "Projetos",
+        "tipo": "Manutenção",
+        "area": area,
+        "responsavel": "Supervisor",
+        "responsavel_id": responsavel_id,
+        "solicitante": "Solicitante",
+        "status": "Aberto",
+        "data_abertura_fmt": "01/01/2026",
+        "dias_aberto": 5,
+        "sla_label": "Atrasado" if atrasado else "No prazo",
+        "atrasado": atrasado,
+        "sla_dias": 3,
+        "alerta_prazo_24h_enviado_em": None,
+    }
+
+
+def test_montar_snapshot_indexa_por_responsavel_e_area():
+    from app.services.report_service import montar_snapshot
+
+    chamados = [
+        _chamado_relatorio("CH-1", "Manutenção", "sup1", atrasado=True),
+        _chamado_relatorio("CH-2", "Manutenção", "sup2"),
+        _chamado_relatorio("CH-3", "TI", "sup1"),
+        _chamado_relatorio("CH-4", "TI", ""),
+    ]
+
+    snapshot = montar_snapshot(chamados, [], "01/01/2026", "", "")
+
+    assert snapshot["total_chamados"] == 4
+    assert snapshot["total_atrasados"] == 1
+    assert snapshot["sem_responsavel"] == {"total": 1, "atrasados": 0}
+    sup1 = snapshot["por_responsavel"]["sup1"]
+    assert (sup1["total"], sup1["atrasados"]) == (2, 1)
+    assert "CH-1" in sup1["html_atrasados"] and "CH-3" in sup1["html_outros"]
+    assert sup1["texto_atrasados"] == ["  CH-1 | Projetos | Solicitante | 01/01/2026 (5d)"]
+    assert set(snapshot["por_area"]) == {"Manutenção", "TI"}
+    assert "CH-4" in snapshot["por_area"]["TI"]["html"]
+    assert "CH-1" in snapshot["html_atrasados"] and "CH-2" not in snapshot["html_atrasados"]
+
+
+def test_publicos_montam_email_dos_fragmentos_sem_renderizar_de_novo(app):
+    """As tabelas saem uma vez no snapshot: mais destinatários não geram mais
+    chamadas a _tabela_html (antes, cada público renderizava as suas)."""
+    from app.services import report_service
+    from app.services.report_service import enviar_relatorio_semanal
+
+    chamados = [
+        _chamado_relatorio("CH-1", "Manutenção", "sup1", atrasado=True),
+        _chamado_relatorio("CH-2", "TI", "sup1"),
+    ]
+    supervisor = _make_usuario("sup@test.com", "Supervisor", "supervisor")
+    admins = [_make_usuario(f"admin{i}@test.com", f"Admin {i}", "admin") for i in range(3)]
+
+    with (
+        app.app_context(),
+        patch("app.services.report_service.buscar_chamados_abertos", return_value=chamados),
+        patch("app.services.report_service.buscar_chamados_cancelados_semana", return_value=[]),
+        patch("app.services.report_service.Usuario.get_by_ids", return_value={"sup1": supervisor}),
+        patch("app.services.report_service.Usuario.get_all", return_value=admins),
+        patch(
+            "app.services.report_service.construir_mapa_gestor_setor",
+            return_value={"Manutenção": "gestor.man@dtx.aero", "TI": "gestor.ti@dtx.aero"},
+        ),
+        patch(
+            "app.services.report_service.construir_mapa_niveis_superiores",
+            return_value={"gm": "gm@dtx.aero", "assistente_gm": "agm@dtx.aero"},
+        ),
+        patch(
+            "app.services.report_service._tabela_html", wraps=report_service._tabela_html
+        ) as mock_tabela,
+        patch("app.services.report_service.enviar_email", return_value=(True, None)) as mock_send,
+    ):
+        resultado = enviar_relatorio_semanal()
+
+    assert mock_send.call_count == 1 + 3 + 2 + 2
+    # sup1: atrasados + outros; 2 áreas; atrasados de todas as áreas.
+    assert mock_tabela.call_count == 5
+    assert resultado["reenvio_pendente"] is False
+
+
+def test_envio_que_falhou_e_refeito_do_snapshot_sem_recalcular(app):
+    """O snapshot fica gravado: o reenvio não busca chamados de novo e só
+    manda para quem não recebeu."""
+    from app.db.models.relatorio_semanal import RelatorioSemanalRow
+    from app.services import report_service
+    from app.services.report_service import enviar_relatorio_semanal, reenviar_relatorio_semanal
+
+    chamados = [
+        _chamado_relatorio("CH-1", "Manutenção", "sup1"),
+        _chamado_relatorio("CH-2", "TI", "sup2", atrasado=True),
+    ]
+    supervisores = {
+        "sup1": _make_usuario("sup1@test.com", "Sup 1"),
+        "sup2": _make_usuario("sup2@test.com", "Sup 2"),
+    }
+
+    def _falha_para_sup2(email, *args, **kwargs):
+        return (False, "Graph 503") if email == "sup2@test.com" else (True, None)
+
+    with (
+        app.app_context(),
+        patch("app.services.report_service.Usuario.get_by_ids", return_value=supervisores),
+        patch("app.services.report_service.Usuario.get_all", return_value=[]),
+        patch("app.services.report_service.construir_mapa_gestor_setor", return_value={}),
+        patch("app.services.report_service.construir_mapa_niveis_superiores", return_value={}),
+    ):
+        with (
+            patch("app.services.report_service.buscar_chamados_abertos", return_value=chamados),
+            patch("app.services.report_service.enviar_email", side_effect=_falha_para_sup2),
+        ):
+            primeiro = enviar_relatorio_semanal()
+
+        with db_module.SessionLocal() as session:
+            row = session.query(RelatorioSemanalRow).one()
+            assert row.status == report_service.STATUS_COM_FALHAS
+            assert row.entregues == ["responsavel:sup1"]
+            assert row.tentativas == 1
+
+        with (
+            patch("app.services.report_service.buscar_chamados_abertos") as mock_buscar,
+            patch("app.services.report_service._tabela_html") as mock_tabela,
+            patch(
+                "app.services.report_service.enviar_email", return_value=(True, None)
+            ) as mock_send,
+        ):
+            segundo = reenviar_relatorio_semanal()
+            terceiro = reenviar_relatorio_semanal()
+
+    assert primeiro["erros"] == 1 and primeiro["reenvio_pendente"] is True
+    mock_buscar.assert_not_called()
+    mock_tabela.assert_not_called()
+    assert [c[0][0] for c in mock_send.call_args_list] == ["sup2@test.com"]
+    assert "CH-2" in mock_send.call_args[0][2]
+    assert segundo["enviados"] == 1 and segundo["reenvio_pendente"] is False
+    assert terceiro["total_chamados"] == 0  # nada pendente
+
+    with db_module.SessionLocal() as session:
+        row = session.query(RelatorioSemanalRow).one()
+        assert row.status == report_service.STATUS_CONCLUIDO
+        assert sorted(row.entregues) == ["responsavel:sup1", "responsavel:sup2"]
+
+
+def test_rodar_de_novo_no_mesmo_dia_nao_repete_email(app):
+    from app.services.report_service import enviar_relatorio_semanal
+
+    chamados = [_chamado_relatorio("CH-1", "Manutenção", "sup1")]
+    supervisor = _make_usuario("sup@test.com", "Supervisor", "supervisor")
+
+    with (
+        app.app_context(),
+        patch(
+            "app.services.report_service.buscar_chamados_abertos", return_value=chamados
+        ) as mock_buscar,
+        patch("app.services.report_service.Usuario.get_by_ids", return_value={"sup1": supervisor}),
+        patch("app.services.report_service.Usuario.get_all", return_value=[]),
+        patch("app.services.report_service.enviar_email", return_value=(True, None)) as mock_send,
+    ):
+        enviar_relatorio_semanal()
+        segundo = enviar_relatorio_semanal()
+
+    assert mock_buscar.call_count == 1
+    assert mock_send.call_count == 1
+    assert segundo["enviados"] == 0
+    assert segundo["total_chamados"] == 1
@@ -0,0 +1,83 @@
+"""Testes da eleição de líder do APScheduler (scheduler_lider.EleicaoLider).
+
+Rodam contra o Postgres de teste de verdade (advisory lock é do servidor, não
+dá pra simular com mock), com o scheduler mockado.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.scheduler_lider import EleicaoLider
+
+
+@pytest.fixture
+def candidatos(db_engine):
+    criados: list[EleicaoLider] = []
+
+    def _novo() -> tuple[EleicaoLider, MagicMock]:
+        scheduler = MagicMock()
+        eleicao = EleicaoLider(db_engine, scheduler, intervalo_segundos=0.01)
+        criados.append(eleicao)
+        return eleicao, scheduler
+
+    yield _novo
+    for eleicao in criados:
+        eleicao.parar()
+
+
+def test_so_um_candidato_assume(candidatos):
+    a, sched_a = candidatos()
+    b, sched_b = candidatos()
+
+    a.passo()
+    b.passo()
+
+    assert a.lider is True
+    assert b.lider is False
+    sched_a.resume.assert_called_once()
+    sched_b.resume.assert_not_called()
+
+
+def test_lider_renova_sem_reassumir(candidatos):
+    a, sched_a = candidatos()
+    a.passo()
+    a.passo()
+    a.passo()
+
+    assert a.lider is True
+    sched_a.resume.assert_called_once()
+
+
+def test_failover_quando_lider_sai(candidatos):
+    a, sched_a = candidatos()
+    b, sched_b = candidatos()
+    a.passo()
+    b.passo()
+
+    a.parar()
+    sched_a.pause.assert_called_once()
+    b.passo()
+
+    assert b.lider is True
+    sched_b.resume.assert_called_once()
+
+
+def test_lider_que_perde_a_conexao_pausa_e_volta_a_candidato(candidatos):
+    a, sched_a = candidatos()
+    b, sched_b = candidatos()
+    a.passo()
+
+    # Conexão do líder cai: a renovação falha, o scheduler pausa e a conexão
+    # é descartada — o Postgres solta o lock da sessão e outro assume.
+    conexao = a._conexao
+    conexao.invalidate()
+    a._conexao = MagicMock(
+        execute=MagicMock(side_effect=OSError("conexão perdida")), invalidate=MagicMock()
+    )
+    a.passo()
+
+    assert a.lider is False
+    sched_a.pause.assert_called_once()
+    b.passo()
+    assert b.lider is True
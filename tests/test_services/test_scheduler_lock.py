@@ -2,6 +2,19 @@
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _sem_clientes_redis_em_cache():
+    """Cada teste instala o próprio mock de redis.from_url — o cliente
+    reaproveitado entre ticks não pode vazar de um teste para o outro."""
+    from app.services import scheduler_lock
+
+    scheduler_lock._clientes.clear()
+    yield
+    scheduler_lock._clientes.clear()
+
 
 def test_executar_sem_redis_url_chama_job_diretamente(app):
     """Sem REDIS_URL configurada, fn_job() é chamado diretamente."""
@@ -86,3 +99,19 @@ def test_executar_sem_redis_py_chama_job_como_fallback(app):
         executar_job_com_lock(app, "job_teste", fn)
 
     fn.assert_called_once()
+
+
+def test_cliente_redis_reaproveitado_entre_ticks(app):
+    """Ticks seguidos reutilizam o mesmo cliente (e pool) Redis."""
+    from app.services.scheduler_lock import executar_job_com_lock
+
+    mock_redis_inst = MagicMock()
+    with (
+        patch.dict(app.config, {"REDIS_URL": "redis://localhost:6379"}),
+        patch("redis.from_url", return_value=mock_redis_inst) as mock_from_url,
+    ):
+        for _ in range(3):
+            executar_job_com_lock(app, "job_teste", MagicMock())
+
+    mock_from_url.assert_called_once_with("redis://localhost:6379")
+    assert mock_redis_inst.lock.call_count == 3
@@ -767,6 +767,44 @@ def test_escalonamento_nivel_4_nao_e_mais_processado():
     assert Chamado.get_by_id(chamado_id).escalacao_nivel == 4
 
 
+def test_escalonamento_percorre_todos_os_lotes_keyset():
+    """Mais chamados elegíveis que o tamanho do lote → todos são avaliados
+    (o antigo .limit(500) sem ORDER BY deixava o excedente de fora)."""
+    abertura = _dt(2024, 6, 3, 9, 0)
+    agora = _dt(2024, 6, 6, 9, 0)
+    ids = [_criar_chamado_aberto(data_abertura=abertura) for _ in range(5)]
+
+    with (
+        patch("app.services.sla_escalacao_service._TAMANHO_LOTE", 2),
+        patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"),
+    ):
+        resultado = processar_escalonamento(agora=agora)
+
+    assert resultado["processados"] == 5
+    assert resultado["escalados"] == 5
+    assert all(Chamado.get_by_id(cid).escalacao_nivel == 1 for cid in ids)
+
+
+def test_escalonamento_tick_futuro_filtrado_em_sql():
+    """Nível >= 1 com próximo tick além da janela de aviso prévio nem chega
+    a ser lido; tick dentro da janela (ou vencido) continua sendo avaliado."""
+    abertura = _dt(2024, 6, 3, 9, 0)
+    agora = _dt(2024, 6, 6, 9, 0)
+    _criar_chamado_aberto(nivel=1, data_abertura=abertura, proximo_tick_em=_dt(2024, 6, 6, 12, 0))
+    _criar_chamado_aberto(nivel=1, data_abertura=abertura, proximo_tick_em=_dt(2024, 6, 6, 9, 20))
+    _criar_chamado_aberto(nivel=1, data_abertura=abertura, proximo_tick_em=_dt(2024, 6, 6, 8, 0))
+
+    with (
+        patch("app.services.sla_escalacao_service.notificar_escalada_gerencial"),
+        patch("app.services.sla_escalacao_service.notificar_pre_aviso_escalonamento"),
+    ):
+        resultado = processar_escalonamento(agora=agora)
+
+    assert resultado["processados"] == 2
+    assert resultado["pre_avisos"] == 1
+    assert resultado["escalados"] == 1
+
+
 def test_escalonamento_pre_aviso_dispara_dentro_da_janela_30min():
     abertura = _dt(2024, 6, 3, 9, 0)  # TAT vence quarta 16:30
     agora = _dt(2024, 6, 5, 16, 5)  # 25 min antes do TAT
@@ -948,6 +986,24 @@ def test_aviso_80_enviado_quando_percentual_80():
     assert mock_notif.call_count == 2
 
 
+def test_aviso_resolucao_ignora_em_sql_chamados_com_ambos_avisos_enviados():
+    from app.services.sla_escalacao_service import processar_avisos_resolucao
+
+    agora = _dt(2024, 6, 3, 10, 0)
+    _criar_chamado_em_atendimento(alerta_50=True, alerta_80=True)
+    _criar_chamado_em_atendimento(alerta_50=True)
+
+    with (
+        patch("app.services.sla_escalacao_service.percentual_prazo_resolucao", return_value=0.9),
+        patch("app.services.sla_escalacao_service.notificar_aviso_resolucao_supervisor"),
+        patch("app.services.sla_escalacao_service._TAMANHO_LOTE", 1),
+    ):
+        resultado = processar_avisos_resolucao(agora=agora)
+
+    assert resultado["processados"] == 1
+    assert resultado["notificados_80"] == 1
+
+
 def test_aviso_50_nao_reenviado_se_ja_enviado():
     """alerta_50=True, percentual=0.6 → idempotente: nenhuma nova notificação."""
     from app.services.sla_escalacao_service import processar_avisos_resolucao
@@ -1202,3 +1258,58 @@ def test_escalonamento_em_atendimento_com_previsao_futura_nao_escala():
     assert resultado["escalados"] == 0
     mock_notif.assert_not_called()
     assert Chamado.get_by_id(chamado_id).escalacao_nivel == 0
+
+
+# ---------------------------------------------------------------------------
+# Concorrência — SLA_ESCALACAO_CONCORRENCIA
+# ---------------------------------------------------------------------------
+
+
+def test_escalonamento_paralelo_respeita_limite_e_soma_stats(app):
+    """Com concorrência 3, os handlers rodam sobrepostos (nunca mais que 3 ao
+    mesmo tempo, cada um com app context próprio) e os contadores de todos os
+    chamados chegam somados no resultado."""
+    import threading
+    import time
+
+    from flask import current_app
+
+    rows = [MagicMock(id=i) for i in range(12)]
+    lock = threading.Lock()
+    ativos = {"agora": 0, "max": 0}
+
+    def _handler(row, agora, stats, *_mapas):
+        assert current_app.config["SLA_ESCALACAO_CONCORRENCIA"] == 3
+        with lock:
+            ativos["agora"] += 1
+            ativos["max"] = max(ativos["max"], ativos["agora"])
+        time.sleep(0.02)
+        with lock:
+            ativos["agora"] -= 1
+        if row.id == 5:
+            raise RuntimeError("falha simulada")
+        stats["escalados"] += 1
+        stats["emails"] += 1
+
+    app.config["SLA_ESCALACAO_CONCORRENCIA"] = 3
+    try:
+        with (
+            app.app_context(),
+            patch(
+                "app.services.sla_escalacao_service._iterar_chamados_em_lotes",
+                return_value=iter(rows),
+            ),
+            patch(
+                "app.services.sla_escalacao_service._processar_chamado_escalonamento",
+                side_effect=_handler,
+            ),
+        ):
+            resultado = processar_escalonamento(agora=_dt(2024, 6, 6, 9, 0))
+    finally:
+        app.config["SLA_ESCALACAO_CONCORRENCIA"] = 1
+
+    assert resultado["processados"] == 12
+    assert resultado["escalados"] == 11
+    assert resultado["emails"] == 11
+    assert resultado["erros"] == 1
+    assert 1 < ativos["max"] <= 3